@@ -0,0 +1,182 @@
+"""
+Runs the ETL extractors against an in-memory stand-in for the Pulse bucket.
+
+    python benchmarks/etl.py --latency-ms 20 --bandwidth-mbps 50 --modes serial concurrent
+    python benchmarks/etl.py --datasets agg_user top_user --workers 32 --output etl.json
+
+Modes:
+    serial       one request at a time, as the extractor scripts run
+    concurrent   documents fetched by --workers threads
+    incremental  re-run after --changed of the documents were rewritten, reusing the
+                 rows of unchanged documents from the first run (warm-up not timed)
+    pipelined    --workers download threads feeding --processes parser processes
+    shared       pipelined, also producing every dataset read from the same documents
+                 (top districts and pincodes); rows count all of them
+
+Each (dataset, mode) runs in a forked process so peak RSS is its own. Before the
+runs, discovering the documents of every dataset prefix by full listings is
+compared with building the availability catalog (delimiter listings per state).
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import pandas as pd
+
+from fake_gcs import FakeClient, generate_tree
+from pulse_etl import DATASETS, Catalog, RunMetrics, extract, extract_pipelined, extract_shared, siblings
+from pulse_storage import GCSStorage
+
+BUCKET_NAME = "phonepe-insight-transaction"
+
+MODES = ("serial", "concurrent", "incremental", "pipelined", "shared")
+
+
+def max_rss_mib():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2**20
+
+
+def touch(client, dataset, fraction, seed):
+    """Rewrites fraction of the dataset's documents unchanged, so only their generation moves."""
+    prefix = DATASETS[dataset].prefix
+    names = sorted(name for bucket, name in client.objects if bucket == BUCKET_NAME and name.startswith(prefix))
+    for name in random.Random(seed).sample(names, int(len(names) * fraction)):
+        client.put(BUCKET_NAME, name, client.objects[(BUCKET_NAME, name)][0])
+
+
+def run_one(client, dataset, mode, workers, processes, changed, seed):
+    storage = GCSStorage(BUCKET_NAME, client=client)
+    cache = None
+    if mode == "incremental":
+        cache = {}
+        extract(storage, dataset, workers=workers, cache=cache)
+        touch(client, dataset, changed, seed)
+    client.reset_counts()
+    metrics = RunMetrics(dataset)
+    rss_start = max_rss_mib()
+    start = time.perf_counter()
+    if mode == "pipelined":
+        df = extract_pipelined(storage, dataset, io_workers=workers, processes=processes, metrics=metrics)
+    elif mode == "shared":
+        frames = extract_shared(storage, siblings(dataset), io_workers=workers, processes=processes, metrics=metrics)
+        df = pd.concat(frames.values(), ignore_index=True)
+    else:
+        df = extract(storage, dataset, workers=1 if mode == "serial" else workers, cache=cache)
+    wall = time.perf_counter() - start
+    return {
+        "dataset": dataset,
+        "mode": mode,
+        "workers": 1 if mode == "serial" else workers,
+        "processes": processes if mode in ("pipelined", "shared") else None,
+        "wall_s": round(wall, 4),
+        "files": client.counts["download"],
+        "rows": len(df),
+        "files_per_s": round(client.counts["download"] / wall, 1),
+        "rows_per_s": round(len(df) / wall, 1),
+        "requests": client.counts["list"] + client.counts["exists"] + client.counts["download"],
+        "mib_downloaded": round(client.counts["bytes"] / 2**20, 2),
+        "rss_start_mib": round(rss_start, 1),
+        "peak_rss_mib": round(max_rss_mib(), 1),
+        "stage_seconds": {f"{stage['dataset']}/{stage['stage']}": stage["seconds"]
+                          for stage in metrics.report()["stages"]} or None,
+    }
+
+
+def compare_discovery(client):
+    """Wall time, requests and listed records of finding every dataset's documents, per method."""
+    storage = GCSStorage(BUCKET_NAME, client=client)
+    prefixes = sorted({spec.prefix for spec in DATASETS.values()})
+    methods = {
+        "full_listing": lambda: [storage.list(prefix) for prefix in prefixes],
+        "catalog": lambda: Catalog(storage, prefixes=prefixes).refresh(),
+    }
+    results = {}
+    for method, run in methods.items():
+        client.reset_counts()
+        start = time.perf_counter()
+        run()
+        results[method] = {"wall_s": round(time.perf_counter() - start, 4), "requests": client.counts["list"],
+                           "listed": client.counts["listed"]}
+        print(f"  discovery {method:13} {results[method]['wall_s']:>9.3f} s  {results[method]['requests']:>5} requests",
+              file=sys.stderr)
+    return results
+
+
+def _child(conn, *args):
+    conn.send(run_one(*args))
+    conn.close()
+
+
+def run_isolated(*args):
+    """run_one in a forked process, which sees the parent's tree without rebuilding it."""
+    ctx = multiprocessing.get_context("fork")
+    parent, child = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=_child, args=(child,) + args)
+    process.start()
+    result = parent.recv()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the ETL extractors against a fake GCS bucket.")
+    parser.add_argument("--datasets", nargs="+", choices=list(DATASETS), default=list(DATASETS))
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--scale", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--processes", type=int, default=None, help="parser processes of pipelined mode")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="simulated round trip of every request")
+    parser.add_argument("--bandwidth-mbps", type=float, default=None, help="simulated download bandwidth")
+    parser.add_argument("--changed", type=float, default=0.05, help="fraction of documents rewritten for incremental")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    objects = generate_tree(BUCKET_NAME, args.scale, args.seed)
+    bandwidth = args.bandwidth_mbps * 1e6 / 8 if args.bandwidth_mbps else None
+    client = FakeClient(objects, latency=args.latency_ms / 1000, bandwidth=bandwidth)
+    print(f"tree: {len(objects)} objects, {sum(len(data) for data, _ in objects.values()) / 2**20:.1f} MiB",
+          file=sys.stderr)
+
+    discovery = compare_discovery(client)
+    results = []
+    for dataset in args.datasets:
+        for mode in args.modes:
+            result = run_isolated(client, dataset, mode, args.workers, args.processes, args.changed, args.seed)
+            results.append(result)
+            print(f"  {dataset:16} {mode:11} {result['wall_s']:>9.3f} s  {result['files_per_s']:>8} files/s"
+                  f"  {result['rows_per_s']:>10} rows/s  peak {result['peak_rss_mib']} MiB", file=sys.stderr)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "scale": args.scale,
+            "latency_ms": args.latency_ms,
+            "bandwidth_mbps": args.bandwidth_mbps,
+            "seed": args.seed,
+        },
+        "discovery": discovery,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+In-memory stand-in for the parts of google.cloud.storage the extractors use
+(Client.list_blobs with or without a delimiter, Client.bucket, Bucket.blob,
+Blob.exists/download/upload),
+serving a synthetic Pulse JSON tree with a simulated per-request latency and bandwidth.
+"""
+import bisect
+import json
+import threading
+import time
+
+import numpy as np
+
+from synthetic import BRANDS, DISTRICTS_PER_STATE, FIRST_YEAR, QUARTERS, STATES, TOP_PER_STATE, TRANSACTION_TYPES, YEARS, split_scale
+
+LIST_PAGE_SIZE = 1000
+
+
+class FakeBlob:
+    def __init__(self, client, bucket_name, name, generation=None, size=None):
+        self._client = client
+        self.bucket_name = bucket_name
+        self.name = name
+        self.generation = generation
+        self.size = size
+
+    def exists(self):
+        self._client._request("exists")
+        return (self.bucket_name, self.name) in self._client.objects
+
+    def download_as_bytes(self, start=None, end=None):
+        if (self.bucket_name, self.name) not in self._client.objects:
+            # what pulse_storage maps NotFound to when google-cloud is not installed
+            raise FileNotFoundError(self.name)
+        data, _ = self._client.objects[(self.bucket_name, self.name)]
+        if start is not None or end is not None:
+            # like the client, end is inclusive
+            data = data[start or 0:None if end is None else end + 1]
+        self._client._request("download", len(data))
+        return data
+
+    def download_as_text(self):
+        return self.download_as_bytes().decode("utf-8")
+
+    def upload_from_string(self, data):
+        data = data.encode("utf-8") if isinstance(data, str) else bytes(data)
+        self._client._request("upload", len(data))
+        self._client.put(self.bucket_name, self.name, data)
+
+
+class FakeListing:
+    """Iterator of a list_blobs call; like the real one, prefixes fills up as the pages are read."""
+
+    def __init__(self, client, bucket_name, prefix, delimiter):
+        self._client = client
+        self._bucket_name = bucket_name
+        self._prefix = prefix
+        self._delimiter = delimiter
+        self.prefixes = set()
+
+    def __iter__(self):
+        client, prefix = self._client, self._prefix
+        entries = []
+        for name in client.names(self._bucket_name, prefix):
+            rest = name[len(prefix):]
+            if self._delimiter and self._delimiter in rest:
+                entry = prefix + rest.split(self._delimiter, 1)[0] + self._delimiter
+                if not entries or entries[-1] != entry:
+                    entries.append(entry)
+            else:
+                entries.append((name,))
+        for start in range(0, max(len(entries), 1), LIST_PAGE_SIZE):
+            page = entries[start:start + LIST_PAGE_SIZE]
+            client._request("list")
+            with client._lock:
+                client.counts["listed"] += len(page)
+            for entry in page:
+                if isinstance(entry, str):
+                    self.prefixes.add(entry)
+                    continue
+                data, generation = client.objects[(self._bucket_name, entry[0])]
+                yield FakeBlob(client, self._bucket_name, entry[0], generation, len(data))
+
+
+class FakeBucket:
+    def __init__(self, client, name):
+        self._client = client
+        self.name = name
+
+    def blob(self, name):
+        return FakeBlob(self._client, self.name, name)
+
+
+class FakeClient:
+    """
+    objects maps (bucket, name) -> (bytes, generation). Every exists/download and
+    every listing page costs latency seconds, downloads also len(bytes)/bandwidth.
+    counts["listed"] is the number of object and prefix records the listings returned.
+    """
+
+    def __init__(self, objects=None, latency=0.0, bandwidth=None):
+        self.objects = objects if objects is not None else {}
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.counts = {"list": 0, "listed": 0, "exists": 0, "download": 0, "upload": 0, "bytes": 0}
+        self._lock = threading.Lock()
+        self._sorted = None
+
+    def _request(self, kind, size=0):
+        with self._lock:
+            self.counts[kind] += 1
+            self.counts["bytes"] += size
+        delay = self.latency + (size / self.bandwidth if self.bandwidth else 0.0)
+        if delay:
+            time.sleep(delay)
+
+    def reset_counts(self):
+        with self._lock:
+            self.counts = dict.fromkeys(self.counts, 0)
+
+    def bucket(self, name):
+        return FakeBucket(self, name)
+
+    def list_blobs(self, bucket_name, prefix="", delimiter=None):
+        return FakeListing(self, bucket_name, prefix, delimiter)
+
+    def names(self, bucket_name, prefix=""):
+        """Sorted names of the bucket's objects that start with prefix."""
+        with self._lock:
+            if self._sorted is None:
+                self._sorted = sorted(self.objects)
+            keys = self._sorted
+        start = bisect.bisect_left(keys, (bucket_name, prefix))
+        names = []
+        for bucket, name in keys[start:]:
+            if bucket != bucket_name or not name.startswith(prefix):
+                break
+            names.append(name)
+        return names
+
+    def put(self, bucket_name, name, data):
+        """Writes an object, bumping its generation like GCS does on overwrite."""
+        previous = self.objects.get((bucket_name, name))
+        if previous is None:
+            self._sorted = None
+        self.objects[(bucket_name, name)] = (data, previous[1] + 1 if previous else 1)
+
+
+# Synthetic Pulse tree
+def _metric(rng, high):
+    return {"type": "TOTAL", "count": int(rng.integers(1, high)), "amount": float(rng.integers(1, high) * 250.5)}
+
+
+def _documents(rng, districts, pincodes):
+    """JSON document of each tree path (relative to .../state/<state>/<year>/<quarter>.json)."""
+    return {
+        "aggregated/transaction": {"data": {"transactionData": [
+            {"name": t, "paymentInstruments": [_metric(rng, 5_000_000)]} for t in TRANSACTION_TYPES]}},
+        "aggregated/insurance": {"data": {"transactionData": [
+            {"name": "Insurance", "paymentInstruments": [_metric(rng, 50_000)]}]}},
+        "aggregated/user": {"data": {
+            "aggregated": {"registeredUsers": int(rng.integers(1, 5_000_000)), "appOpens": 0},
+            "usersByDevice": [{"brand": b, "count": int(rng.integers(1, 500_000)),
+                               "percentage": float(rng.random())} for b in BRANDS]}},
+        "map/transaction/hover": {"data": {"hoverDataList": [
+            {"name": d, "metric": [_metric(rng, 5_000_000)]} for d in districts]}},
+        "map/insurance/hover": {"data": {"hoverDataList": [
+            {"name": d, "metric": [_metric(rng, 50_000)]} for d in districts]}},
+        "map/user/hover": {"data": {"hoverData": {
+            d: {"registeredUsers": int(rng.integers(1, 5_000_000)), "appOpens": int(rng.integers(0, 200_000_000))}
+            for d in districts}}},
+        "top/transaction": {"data": {"states": None,
+            "districts": [{"entityName": d, "metric": _metric(rng, 5_000_000)} for d in districts[:len(pincodes)]],
+            "pincodes": [{"entityName": str(p), "metric": _metric(rng, 5_000_000)} for p in pincodes]}},
+        "top/insurance": {"data": {"states": None,
+            "districts": [{"entityName": d, "metric": _metric(rng, 50_000)} for d in districts[:len(pincodes)]],
+            "pincodes": [{"entityName": str(p), "metric": _metric(rng, 50_000)} for p in pincodes]}},
+        "top/user": {"data": {"states": None,
+            "districts": [{"name": d, "registeredUsers": int(rng.integers(1, 5_000_000))} for d in districts[:len(pincodes)]],
+            "pincodes": [{"name": str(p), "registeredUsers": int(rng.integers(1, 5_000_000))} for p in pincodes]}},
+    }
+
+
+def generate_tree(bucket_name, scale=1, seed=0):
+    """objects dict of a synthetic pulse-data/{aggregated,map,top}/... tree, sized like benchmarks/synthetic.py."""
+    rng = np.random.default_rng(seed)
+    year_factor, entity_factor = split_scale(scale)
+    objects = {}
+    for i in range(STATES):
+        state = f"state-{i:02d}"
+        districts = [f"{state} district {j}" for j in range(DISTRICTS_PER_STATE * entity_factor)]
+        pincodes = [100000 + i * 10000 + j for j in range(TOP_PER_STATE * entity_factor)]
+        for year in range(FIRST_YEAR, FIRST_YEAR + YEARS * year_factor):
+            for quarter in QUARTERS:
+                for path, document in _documents(rng, districts, pincodes).items():
+                    name = f"pulse-data/{path}/country/india/state/{state}/{year}/{quarter}.json"
+                    objects[(bucket_name, name)] = (json.dumps(document).encode("utf-8"), 1)
+    return objects
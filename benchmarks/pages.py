@@ -0,0 +1,196 @@
+"""
+Data-preparation path of each dashboard page, on the page's default selections,
+and a rendering step that turns the prepared frames into serialized figures.
+
+Preparation runs cold: the joins, market frame and ranking indexes come from a
+fresh PageData on every call, the same PageData the dashboard caches per data_key.
+"""
+import plotly.express as px
+
+from pulse_analytics import (
+    ALL,
+    PageData,
+    average_usage_by_state,
+    brand_engagement,
+    brand_engagement_by_state,
+    brand_trend,
+    calculate_year_growth,
+    calculate_year_growth1,
+    engagement_over,
+    engagement_summary,
+    location_breakdown,
+    location_slices,
+    most_used_brand,
+    penetration_by_state,
+    safe_groupby,
+    state_user_engagement,
+    totals_by,
+    transaction_type_summary,
+    type_amounts,
+    unique_values,
+)
+
+TXN = ("Transaction_amount", "Transaction_count")
+
+
+def first_year(df):
+    return sorted(df["Years"].unique())[0]
+
+
+def ques1(d):
+    df = d["Aggre_transaction"]
+    summary = transaction_type_summary(df)
+    return {
+        "summary": summary,
+        "by_state": type_amounts(df, "States"),
+        "by_year": type_amounts(df, "Years"),
+        "by_quarter": type_amounts(df, "Quarter", Years=first_year(df)),
+        "by_type": type_amounts(df),
+        "top_amount": summary.sort_values("Transaction_amount", ascending=False).head(5),
+        "top_count": summary.sort_values("Transaction_count", ascending=False).head(5),
+    }
+
+
+def ques2(d):
+    agg_user, map_user = d["Aggre_user"], d["Map_user"]
+    state_scores, best_brand = brand_engagement_by_state(agg_user)
+    brand_users = totals_by(agg_user, "Brand", ["Transaction_count"], sort_by="Transaction_count")
+    return {
+        "state_scores": state_scores,
+        "best_brand": best_brand,
+        "brand_users": brand_users,
+        "brand_share": totals_by(agg_user, "Brand", ["Transaction_Percentage"], sort_by="Transaction_Percentage"),
+        "trend": brand_trend(agg_user),
+        "brand_trend": brand_trend(agg_user, sorted(agg_user["Brand"].unique())[0]),
+        "engagement": brand_engagement(agg_user),
+        "registered": totals_by(map_user, "States", ["RegisteredUser"], sort_by="RegisteredUser"),
+        "app_opens": totals_by(map_user, "States", ["AppOpens"], sort_by="AppOpens"),
+        "state_engagement": state_user_engagement(map_user),
+    }
+
+
+def ques3(d):
+    agg = d["Aggre_insurance"]
+    pages = PageData(d)
+    state_rank = pages.index("insurance_state")
+    district_rank = pages.index("insurance_district")
+    pincode_rank = pages.index("insurance_pincode")
+    joins = pages.joins()
+    state_pen = pages.index("penetration_state")
+    dist_pen = pages.index("penetration_district")
+    pin_pen = pages.index("penetration_pincode")
+    return {
+        "state_map": state_rank.table(),
+        "state_top": state_rank.top("Transaction_amount", 10),
+        "trend": safe_groupby(agg, ["Years", "Quarter"], {"Transaction_amount": "sum"}),
+        "district_top": district_rank.top("Transaction_amount", 5),
+        "district_bottom": district_rank.bottom("Transaction_count", 5),
+        "pincode_top": pincode_rank.top("Transaction_amount", 5),
+        "pincode_bottom": pincode_rank.bottom("Transaction_count", 5),
+        "state_penetration": state_pen.table(),
+        "district_penetration": dist_pen.top("Penetration", 5),
+        "pincode_penetration": pin_pen.top("Penetration", 5),
+        "state_growth": calculate_year_growth(joins["state"], ["States"], "Overall", "Overall", decimals=None),
+        "district_growth": calculate_year_growth(joins["district"], ["District", "States"], "Overall", "Overall",
+                                                 decimals=None),
+        "pincode_growth": calculate_year_growth(joins["pincode"], ["Pincodes", "States"], "Overall", "Overall",
+                                                decimals=None),
+    }
+
+
+def ques4(d):
+    pages = PageData(d)
+    market = pages.market()
+    market_rank = pages.index("market_state")
+    usage_year = first_year(market)
+    usage, usage_by_state = average_usage_by_state(market, usage_year)
+    return {
+        "totals": market_rank.table(),
+        "top_amount": market_rank.top("Transaction_amount", 5),
+        "bottom_users": market_rank.bottom("RegisteredUser", 5),
+        "yearwise": totals_by(market, "States", ["Transaction_count", "RegisteredUser"]),
+        "penetration": penetration_by_state(market),
+        "penetration_year": penetration_by_state(market, Years=usage_year),
+        "growth": calculate_year_growth(market, ["States"], "Overall", "Overall", decimals=0),
+        "growth_label": calculate_year_growth1(market, ["States"], "Overall", "Overall"),
+        "usage": usage,
+        "usage_by_state": usage_by_state,
+        "top_usage": market_rank.top("Average Usage", 5),
+    }
+
+
+def ques5(d):
+    map_user = d["Map_user"]
+    pages = PageData(d)
+    state_rank = pages.index("engagement_state")
+    district_rank = pages.index("engagement_district")
+    engagement_summary(map_user)
+    return {
+        "state_engagement": state_rank.table(),
+        "district_engagement": district_rank.table(),
+        "yearly": engagement_over(map_user, ["Years"]),
+        "quarterly": engagement_over(map_user, ["Quarter"]),
+        "periods": engagement_over(map_user, ["Years", "Quarter"]),
+        "top_states": state_rank.top("EngagementRatio", 5),
+        "bottom_districts": district_rank.bottom("EngagementRatio", 5),
+        "brand_share": totals_by(d["Aggre_user"], "Brand", ["Transaction_count"]),
+        "top_pincodes": pages.index("user_pincode").top("RegisteredUser", 5),
+        "top_txn_states": pages.index("top_district_state").top("Transaction_amount", 5),
+        "top_districts": pages.index("top_district").top("Transaction_amount", 5),
+        "top_txn_pincodes": pages.index("top_transaction_pincode").top("Transaction_amount", 5),
+    }
+
+
+def map_page(d):
+    """The map page's state view of every dataset on its first column."""
+    out = {}
+    for name, df in d.items():
+        column = [c for c in df.columns if c not in ("States", "District", "Pincodes", "Years", "Quarter")][0]
+        if column == "Transaction_type":
+            out[name] = transaction_type_summary(df)
+        elif column == "Brand":
+            out[name] = most_used_brand(df)
+        else:
+            out[name] = totals_by(df, "States", [column])
+    return out
+
+
+def home(d):
+    state = sorted(d["Aggre_transaction"]["States"].unique())[0]
+    district = sorted(unique_values(d["Map_transaction"], "District", States=state))[0]
+    pincode = sorted(unique_values(d["Top_transaction"], "Pincodes", States=state))[0]
+    out = {}
+    for label, selection in (("india", (ALL, ALL, ALL)), ("state", (state, ALL, ALL)),
+                             ("district", (state, district, ALL)), ("pincode", (state, ALL, pincode))):
+        slices = location_slices(d, *selection)
+        out[f"{label}_totals"] = slices[1][list(TXN)].sum().to_frame().T
+        for kind, frame in zip(("insurance", "transaction", "user"), location_breakdown(d, *selection)):
+            out[f"{label}_{kind}"] = frame
+    return out
+
+
+PAGES = {
+    "ques1": ques1,
+    "ques2": ques2,
+    "ques3": ques3,
+    "ques4": ques4,
+    "ques5": ques5,
+    "map": map_page,
+    "home": home,
+}
+
+
+def render(frames):
+    """
+    Builds and serializes one bar chart per prepared frame, which is what the
+    dashboard ships to the browser. Choropleths are drawn as bars so no GeoJSON
+    has to be fetched.
+    """
+    size = 0
+    for frame in frames.values():
+        if frame.empty:
+            continue
+        x = frame.columns[0]
+        y = frame.select_dtypes("number").columns[-1]
+        size += len(px.bar(frame, x=x, y=y).to_json())
+    return size
@@ -0,0 +1,123 @@
+"""
+Times the data preparation and the rendering of each dashboard page on
+synthetic Pulse-shaped data.
+
+    python benchmarks/run.py --scales 1 10 --repeat 5 --output bench.json
+    python benchmarks/run.py --scales 1 --compare bench.json
+
+Latencies are reported as percentiles in milliseconds; peak memory is the
+tracemalloc peak of one extra, traced run of the phase.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import pandas as pd
+
+from pulse_analytics import prepare_datasets
+from pages import PAGES, render
+from synthetic import generate_raw
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    rank = (len(ordered) - 1) * q / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def measure(fn, repeat):
+    """(latency summary, result of the last call) for repeat timed calls plus one traced call."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    summary = {
+        "runs": repeat,
+        "p50_ms": round(percentile(samples, 50), 3),
+        "p90_ms": round(percentile(samples, 90), 3),
+        "p99_ms": round(percentile(samples, 99), 3),
+        "min_ms": round(min(samples), 3),
+        "max_ms": round(max(samples), 3),
+        "peak_mib": round(peak / 2**20, 2),
+    }
+    return summary, result
+
+
+def run(scales, pages, repeat, seed, with_render):
+    results = []
+    for scale in scales:
+        raw = generate_raw(scale, seed)
+        rows = sum(len(df) for df in raw.values())
+        summary, datasets = measure(lambda: prepare_datasets({k: v.copy() for k, v in raw.items()}), repeat)
+        results.append({"scale": scale, "page": "load", "phase": "prepare", "rows": rows, **summary})
+        print(f"scale {scale}x: {rows} rows, prepare_datasets p50 {summary['p50_ms']} ms", file=sys.stderr)
+        for page in pages:
+            summary, frames = measure(lambda: PAGES[page](datasets), repeat)
+            results.append({"scale": scale, "page": page, "phase": "prepare", "rows": rows, **summary})
+            print(f"  {page:6} prepare p50 {summary['p50_ms']:>10} ms  peak {summary['peak_mib']} MiB", file=sys.stderr)
+            if with_render:
+                summary, _ = measure(lambda: render(frames), repeat)
+                results.append({"scale": scale, "page": page, "phase": "render", "rows": rows, **summary})
+                print(f"  {page:6} render  p50 {summary['p50_ms']:>10} ms  peak {summary['peak_mib']} MiB", file=sys.stderr)
+    return results
+
+
+def compare(results, baseline_path):
+    """Prints the p50 of each result against the same (scale, page, phase) of a previous run."""
+    with open(baseline_path) as f:
+        baseline = {(r["scale"], r["page"], r["phase"]): r for r in json.load(f)["results"]}
+    print(f"{'scale':>5} {'page':6} {'phase':7} {'base p50':>10} {'new p50':>10} {'change':>8}")
+    for r in results:
+        base = baseline.get((r["scale"], r["page"], r["phase"]))
+        if base is None:
+            continue
+        change = (r["p50_ms"] / base["p50_ms"] - 1) * 100 if base["p50_ms"] else 0.0
+        print(f"{r['scale']:>5} {r['page']:6} {r['phase']:7} {base['p50_ms']:>10} {r['p50_ms']:>10} {change:>7.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dashboard pages on synthetic Pulse data.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--pages", nargs="+", choices=list(PAGES), default=list(PAGES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-render", action="store_true", help="only time data preparation")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--compare", help="JSON output of an earlier run to compare against")
+    args = parser.parse_args()
+
+    results = run(args.scales, args.pages, args.repeat, args.seed, not args.no_render)
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
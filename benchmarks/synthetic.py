@@ -0,0 +1,78 @@
+"""
+Synthetic datasets with the schemas of the ten extractor output CSVs.
+
+Scale 1 roughly matches the real Pulse cardinality (36 states, ~780 districts,
+top-10 pincodes and districts per state, 2018-2024, 4 quarters). Larger scales
+multiply the row count: part of the factor goes into more years, the rest into
+more districts and pincodes per state.
+"""
+import numpy as np
+import pandas as pd
+
+STATES = 36
+DISTRICTS_PER_STATE = 22
+TOP_PER_STATE = 10
+FIRST_YEAR = 2018
+YEARS = 7
+QUARTERS = (1, 2, 3, 4)
+TRANSACTION_TYPES = ("Recharge & bill payments", "Peer-to-peer payments", "Merchant payments",
+                     "Financial Services", "Others")
+BRANDS = ("Xiaomi", "Samsung", "Vivo", "Oppo", "Realme", "Apple", "Motorola", "OnePlus",
+          "Huawei", "Lenovo", "Others")
+
+
+def split_scale(scale):
+    """(year factor, entity factor) whose product is scale."""
+    year_factor = max(1, int(round(scale ** 0.3)))
+    return year_factor, max(1, scale // year_factor)
+
+
+def _frame(rng, keys, measures):
+    """Cartesian product of the key columns with random measures."""
+    index = pd.MultiIndex.from_product(list(keys.values()), names=list(keys))
+    df = index.to_frame(index=False)
+    for name, (low, high) in measures.items():
+        df[name] = rng.integers(low, high, len(df))
+    return df
+
+
+def _per_state(rng, states, names_per_state, years, name_col, measures):
+    frames = []
+    for state in states:
+        frames.append(_frame(rng, {"States": [state], "Years": years, "Quarter": QUARTERS,
+                                   name_col: names_per_state[state]}, measures))
+    return pd.concat(frames, ignore_index=True)
+
+
+def generate_raw(scale=1, seed=0):
+    """Raw frames keyed by output file name, as the loaders return them."""
+    rng = np.random.default_rng(seed)
+    year_factor, entity_factor = split_scale(scale)
+    states = [f"State {i:02d}" for i in range(STATES)]
+    years = list(range(FIRST_YEAR, FIRST_YEAR + YEARS * year_factor))
+    districts = {s: [f"{s} district {j}" for j in range(DISTRICTS_PER_STATE * entity_factor)] for s in states}
+    top_districts = {s: districts[s][:TOP_PER_STATE * entity_factor] for s in states}
+    pincodes = {s: [100000 + i * 10000 + j for j in range(TOP_PER_STATE * entity_factor)]
+                for i, s in enumerate(states)}
+
+    txn = {"Transaction_count": (1_000, 5_000_000), "Transaction_amount": (1_000_000, 50_000_000_000)}
+    ins = {"Transaction_count": (10, 50_000), "Transaction_amount": (10_000, 500_000_000)}
+    users = {"RegisteredUser": (1_000, 5_000_000), "AppOpens": (0, 200_000_000)}
+    base = {"States": states, "Years": years, "Quarter": QUARTERS}
+
+    agg_user = _frame(rng, {**base, "Brand": BRANDS}, {"Transaction_count": (100, 2_000_000)})
+    agg_user["Transaction_Percentage"] = rng.random(len(agg_user)) / len(BRANDS)
+
+    return {
+        "agg_insurance.csv": _frame(rng, {**base, "Transaction_type": ["Insurance"]}, ins),
+        "agg_trans.csv": _frame(rng, {**base, "Transaction_type": TRANSACTION_TYPES}, txn),
+        "agg_user.csv": agg_user,
+        "map_insurance.csv": _per_state(rng, states, districts, years, "District", ins),
+        "map_transaction.csv": _per_state(rng, states, districts, years, "District", txn),
+        "map_user.csv": _per_state(rng, states, districts, years, "District", users),
+        "top_insurance.csv": _per_state(rng, states, pincodes, years, "Pincodes", ins),
+        "top_transaction.csv": _per_state(rng, states, pincodes, years, "Pincodes", txn),
+        "top_user.csv": _per_state(rng, states, pincodes, years, "Pincodes",
+                                   {"RegisteredUser": users["RegisteredUser"]}),
+        "top_district.csv": _per_state(rng, states, top_districts, years, "District", txn),
+    }
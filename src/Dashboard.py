@@ -4,26 +4,43 @@ import pandas as pd
 import requests
 import plotly.express as px
 from streamlit_option_menu import option_menu
-from google.cloud import storage
-from io import BytesIO
 import os
-from google.oauth2 import service_account
+import uuid
+from pulse_analytics import (
+    ALL, PageData, filter_slice, safe_groupby, totals_by, unique_values, prepare_datasets, load_raw, load_coverage, data_version, parse_where, Prewarmer, VersionWatcher,
+    calculate_year_growth, calculate_year_growth1, quarterly_totals, ranked_rows,
+    type_totals_by_state, most_used_brand, transaction_type_summary, type_amounts,
+    brand_engagement_by_state, brand_trend, brand_engagement, state_user_engagement,
+    penetration_by_state, average_usage_by_state, engagement_summary, engagement_over,
+    location_slices, location_breakdown, DATASET_FILES, CachedExpress, FigureCache, Profiler, row_count,
+)
+from pulse_storage import open_storage, storage_url
+
+# Chart calls go through charts.* and plotly_chart, so each figure is built only on a figure-cache miss
+charts = CachedExpress(px)
+
+@st.cache_resource
+def figure_cache():
+    """Serialized figures of all sessions, bounded by PULSE_FIGURE_CACHE_MB."""
+    return FigureCache(max_bytes=int(float(os.environ.get("PULSE_FIGURE_CACHE_MB", "256")) * 2**20))
+
+# Opt-in timing of sections and data-load steps: ?profile=1 or PULSE_PROFILE=1 shows the debug
+# panel, PULSE_PROFILE_LOG=<file> appends every span of every run to that file as a JSON line
+show_profile = os.environ.get("PULSE_PROFILE", "") not in ("", "0") or st.query_params.get("profile") == "1"
+profiler = Profiler(
+    enabled=show_profile,
+    log_path=os.environ.get("PULSE_PROFILE_LOG") or None,
+    counters={
+        "figure_hits": lambda: figure_cache().stats()["hits"],
+        "figure_misses": lambda: figure_cache().stats()["misses"],
+    },
+    context={"run": uuid.uuid4().hex[:12]},
+)
 
-def safe_groupby(df, group_cols, agg_dict):
-    if df.empty or not all(col in df.columns for col in group_cols):
-        return pd.DataFrame()
-    return df.groupby(group_cols).agg(agg_dict).reset_index()
-    
-def plot_bar(df, x, y, title, color=None, color_scale="Rainbow", text=None, hover_data=None,barmode =None):
-    if df.empty:
-        st.warning(f"No data available for {title}.")
-        return
-    if x == "Pincodes":
-        df[x] = df[x].astype(str)
-    fig = px.bar(df, x=x, y=y, color=color or y, color_continuous_scale=color_scale,
-                title=title, text=text, hover_data=hover_data)
-    fig.update_layout(xaxis_tickangle=45, xaxis_type="category")
-    st.plotly_chart(fig, use_container_width=True)
+def plotly_chart(fig, **kwargs):
+    """st.plotly_chart of a charts.* figure, keyed by chart type, data, styling and data version."""
+    with profiler.span("figure", kind=fig.kind):
+        st.plotly_chart(figure_cache().spec(fig, loaded_version), **kwargs)
 
 def plot_line(df, x, y, title, color=None, color_scale="Rainbow", text=None, hover_data=None, markers=True, line_dash=None):
     if df.empty:
@@ -32,7 +49,7 @@ def plot_line(df, x, y, title, color=None, color_scale="Rainbow", text=None, hov
     df = df.copy()
     if x in ["Pincodes", "Years"]:
         df[x] = df[x].astype(str)
-    fig = px.line(
+    fig = charts.line(
         df,
         x=x,
         y=y,
@@ -54,101 +71,180 @@ def plot_line(df, x, y, title, color=None, color_scale="Rainbow", text=None, hov
         xaxis_type='category',
         hovermode="x unified"
     )
-    st.plotly_chart(fig, use_container_width=True)
+    plotly_chart(fig, use_container_width=True)
 
 
 def plot_scatter(df, x, y, color, title, hover_data=None):
     if df.empty:
         st.warning(f"No data available for {title}.")
         return
-    fig = px.scatter(df, x=x, y=y, color=color, title=title, hover_data=hover_data)
-    st.plotly_chart(fig, use_container_width=True)
-
-creds_json = st.secrets["GCP_SERVICE_ACCOUNT"]
-creds_dict = json.loads(creds_json)
-credentials = service_account.Credentials.from_service_account_info(creds_dict)
-project_id = creds_dict["project_id"]
-
-@st.cache_data(show_spinner=True)
-def list_csv_files(bucket_name: str, prefix: str = ""):
-    """List all CSV files in a GCP bucket under a given prefix."""
-    client = storage.Client(project=project_id, credentials=credentials)
-    blobs = client.list_blobs(bucket_name, prefix=prefix)
-    csv_files = [blob.name for blob in blobs if blob.name.endswith(".csv")]
-    return csv_files
-
-@st.cache_data(show_spinner=True)
-def load_csvs_to_dataframes(bucket_name: str, prefix: str = ""):
-    
-    client = storage.Client(project=project_id, credentials=credentials)
-    bucket = client.bucket(bucket_name)
-    
-    csv_files = list_csv_files(bucket_name, prefix)
-    dataframes = {}
-    
-    for file_name in csv_files:
-        blob = bucket.blob(file_name)
-        data = blob.download_as_bytes()
-        df = pd.read_csv(BytesIO(data))
-        key = file_name.split("/")[-1] 
-        dataframes[key] = df
-    return dataframes
-
-
-bucket_name = "phonepe-insight-transaction"
-prefix = "output/" 
-
-dataframes = load_csvs_to_dataframes(bucket_name, prefix)
-
-df1 = dataframes["agg_insurance.csv"]
-
-# Access an individual file DataFrame:Aggre_insurance = pd.DataFrame(table1,columns = ("States", "Years", "Quarter", "Transaction_type", "Transaction_count","Transaction_amount"))
-df1 = dataframes["agg_insurance.csv"]
-Aggre_insurance = pd.DataFrame(df1,columns = ("States", "Years", "Quarter", "Transaction_type", "Transaction_count","Transaction_amount"))
-print(Aggre_insurance)
-
-
-df2 = dataframes["agg_trans.csv"]
-Aggre_transaction = pd.DataFrame(df2,columns = ("States", "Years", "Quarter", "Transaction_type", "Transaction_count", "Transaction_amount"))
-print(Aggre_transaction)
-
-df3 = dataframes["agg_user.csv"]
-Aggre_user = pd.DataFrame(df3, columns=("States", "Years", "Quarter", "Brand", "Transaction_count", "Transaction_Percentage"))
-Aggre_user["Transaction_count"] = pd.to_numeric(Aggre_user["Transaction_count"], errors="coerce").fillna(0)
-Aggre_user["Transaction_Percentage"] = pd.to_numeric(Aggre_user["Transaction_Percentage"], errors="coerce").fillna(0)
-
-df4 = dataframes["map_insurance.csv"]
-Map_insurance = pd.DataFrame(df4,columns = ("States", "Years", "Quarter", "District", "Transaction_count","Transaction_amount"))
-print(Map_insurance)
-
-df5 = dataframes["map_transaction.csv"]
-Map_transaction = pd.DataFrame(df5,columns = ("States", "Years", "Quarter", "District", "Transaction_count", "Transaction_amount"))
-print(Map_transaction)
-
-df6 = dataframes["map_user.csv"]
-Map_user = pd.DataFrame(df6,columns = ("States", "Years", "Quarter", "District", "RegisteredUser", "AppOpens"))
-print(Map_user)
-
-df7 = dataframes["top_insurance.csv"]
-Top_insurance = pd.DataFrame(df7,columns = ("States", "Years", "Quarter", "Pincodes", "Transaction_count", "Transaction_amount"))
-Top_insurance["Pincodes"] = Top_insurance["Pincodes"].astype('object')
-print(Top_insurance)
-
-df8 = dataframes["top_transaction.csv"]
-Top_transaction = pd.DataFrame(df8,columns = ("States", "Years", "Quarter", "Pincodes", "Transaction_count", "Transaction_amount"))
-Top_transaction["Pincodes"] = Top_transaction["Pincodes"].astype('object')
-print(Top_transaction)
-
-df9 = dataframes["top_user.csv"]
-Top_user = pd.DataFrame(df9, columns = ("States", "Years", "Quarter", "Pincodes", "RegisteredUser"))
-Top_user["Pincodes"] = Top_user["Pincodes"].astype('object')
-print(Top_user)
+    fig = charts.scatter(df, x=x, y=y, color=color, title=title, hover_data=hover_data)
+    plotly_chart(fig, use_container_width=True)
+
+@st.cache_resource
+def get_storage(url: str):
+    """Storage backend of url; GCS credentials come from st.secrets only when a gs:// URL is used."""
+    if not url.startswith("gs://"):
+        return open_storage(url)
+    from google.oauth2 import service_account
+
+    creds_dict = json.loads(st.secrets["GCP_SERVICE_ACCOUNT"])
+    credentials = service_account.Credentials.from_service_account_info(creds_dict)
+    return open_storage(url, project=creds_dict["project_id"], credentials=credentials)
+
+@st.cache_resource
+def version_watcher(storage_location: str, prefix: str = ""):
+    """Data version of the storage, re-checked every PULSE_VERSION_CHECK_SECONDS by one thread shared by all sessions."""
+    storage = get_storage(storage_location)
+    interval = float(os.environ.get("PULSE_VERSION_CHECK_SECONDS", "30"))
+    return VersionWatcher(lambda: data_version(storage, prefix), interval).start()
+
+@st.cache_data(show_spinner=True, max_entries=2)
+def load_dataframes(storage_location: str, prefix: str, version: str, data_filter: str = ""):
+    """
+    (version, raw frames) of one data version: its published tables, else every CSV
+    under prefix. A published version never changes, so it is loaded once; the
+    previous version stays cached until a newer one has loaded. data_filter (see
+    PULSE_DATA_FILTER) restricts the rows, and only the partitions holding them are read.
+    """
+    profiler.note(cache_hit=False)
+    return load_raw(get_storage(storage_location), prefix, version, where=parse_where(data_filter))
 
-df10 = dataframes["top_district.csv"]
-Top_district = pd.DataFrame(df10, columns = ("States", "Years", "Quarter", "District", "Transaction_count","Transaction_amount"))
-print(Top_district)
+@st.cache_resource(show_spinner=False, max_entries=2)
+def data_coverage(storage_location: str, prefix: str, version: str, data_filter: str, _raw):
+    """
+    Coverage index of one data version: the one shipped in its manifest, else (or
+    when data_filter loaded only a slice) built from its frames.
+    """
+    profiler.note(cache_hit=False)
+    return load_coverage(get_storage(storage_location), prefix, version, _raw, where=parse_where(data_filter))
+
+@st.cache_resource
+def fetch_geojson(url: str):
+    """State boundaries; they do not depend on the data version, so they are fetched once per server."""
+    profiler.note(cache_hit=False)
+    return requests.get(url).json()
+
+def load_geojson(url: str):
+    with profiler.span("load.geojson", cache_hit=True):
+        return fetch_geojson(url)
+
+
+# PULSE_STORAGE=file://<dir> (or memory://) runs the dashboard without GCP
+storage_location = storage_url("gs://phonepe-insight-transaction")
+prefix = os.environ.get("PULSE_DATA_PREFIX", "output/")
+# PULSE_DATA_FILTER="Years=2023,2024;States=Karnataka" serves only that slice, reading only its partitions
+# for every page. The pages' own selectors filter the loaded frames; they are not pushed into the read
+data_filter = os.environ.get("PULSE_DATA_FILTER", "")
+INDIA_GEOJSON_URL = "https://gist.githubusercontent.com/jbrobst/56c13bbbf9d97d187fea01ca62ea5112/raw/e388c4cae20aa53cb5090210a42ebb9b765c0a36/india_states.geojson"
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def derived_frames(name, data_key, _make):
+    """The insurance/user joins or the market frame, built once per data_key."""
+    return _make()
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def ranking_index(name, data_key, _make):
+    """Top/bottom-N index of one entity level, built once per name and data_key."""
+    return _make()
+
+def page_data(d, data_key):
+    """The pages' joins, market frame and ranking indexes of d, cached per data_key."""
+    def cache(name, make):
+        if name in ("joins", "market"):
+            return derived_frames(name, data_key, make)
+        return ranking_index(name, data_key, make)
+    return PageData(d, cache)
+
+def warm_caches(version):
+    """
+    Fills the caches the pages read on their default view for one data version,
+    through the same page_data the pages use, so their first run is a cache hit.
+    """
+    loaded_version, raw = load_dataframes(storage_location, prefix, version, data_filter)
+    d = prepare_datasets(raw)
+    data_coverage(storage_location, prefix, loaded_version, data_filter, raw)
+    page_data(d, f"{storage_location}/{prefix}@{loaded_version}").warm()
+    try:
+        load_geojson(INDIA_GEOJSON_URL)
+    except Exception as exc:
+        # Best effort: the data is warm without it, and the map page fetches it when shown
+        print(f"Prefetching the state boundaries failed: {exc}")
+
+@st.cache_resource
+def prewarmer(storage_location: str, prefix: str = ""):
+    """Warms the caches in the background at server start and on every new data version."""
+    return Prewarmer(warm_caches, version_watcher(storage_location, prefix)).start()
+
+
+# Sessions read the newest warm version. A session's first run waits, once, for the first
+# warm-up to finish or fail; later runs go ahead with whatever is loaded
+warmer = prewarmer(storage_location, prefix)
+if not warmer.settled.is_set() and not st.session_state.get("prewarm_waited"):
+    st.session_state["prewarm_waited"] = True
+    with st.spinner("Preparing the latest PhonePe Pulse data..."), profiler.span("load.prewarm_wait"):
+        warmer.settled.wait(timeout=float(os.environ.get("PULSE_PREWARM_WAIT_SECONDS", "120")))
+
+# Read once per script run, so a run never mixes two versions
+with profiler.span("load.dataframes", cache_hit=True):
+    loaded_version, dataframes = load_dataframes(storage_location, prefix, warmer.version or warmer.watcher.current,
+                                                    data_filter)
+    profiler.note(rows_out=row_count(dataframes))
+profiler.context["data_version"] = loaded_version
+
+with profiler.span("load.prepare", rows_in=row_count(dataframes)):
+    datasets = prepare_datasets(dataframes)
+    profiler.note(rows_out=row_count(datasets))
+with profiler.span("load.coverage", cache_hit=True):
+    coverage = data_coverage(storage_location, prefix, loaded_version, data_filter, dataframes)
+# Tags each dataset with its output file, so selectors can look it up in the coverage index
+for name, df in datasets.items():
+    df.attrs["source"] = DATASET_FILES[name]
+Aggre_insurance = datasets["Aggre_insurance"]
+Aggre_transaction = datasets["Aggre_transaction"]
+Aggre_user = datasets["Aggre_user"]
+Map_insurance = datasets["Map_insurance"]
+Map_transaction = datasets["Map_transaction"]
+Map_user = datasets["Map_user"]
+Top_insurance = datasets["Top_insurance"]
+Top_transaction = datasets["Top_transaction"]
+Top_user = datasets["Top_user"]
+Top_district = datasets["Top_district"]
+
+# Identifies the loaded data; derived tables are rebuilt only when it changes
+data_key = f"{storage_location}/{prefix}@{loaded_version}"
+pages = page_data(datasets, data_key)
+
+def with_data(options, df, column, **selected):
+    """
+    The options of a selector over column that have rows in df's dataset under the
+    other selections, in their original order, as told by the coverage index
+    rather than a scan of df. All the options when df is untagged or none has rows.
+    """
+    available = coverage.values(df.attrs.get("source"), column, **selected)
+    if available is None:
+        return options
+    available = set(available)
+    kept = [option for option in options if option == ALL or option in available]
+    return kept or options
 
 #QUERY AND FUNCTIONS FOR BUSINESS CASES
+# Sections with their own widgets run as fragments: changing one of those widgets
+# reruns only that section. Selections shared by several sections stay page-level.
+@st.fragment
+def chart_and_data(section, df):
+    """Runs a section that returns (data, figure) and shows the figure and its data in tabs."""
+    result = section(df)
+    if result is None:
+        return
+    data, fig = result
+    tab1, tab2 = st.tabs(["Bar Graph", "Raw Data"])
+    with tab1:
+        plotly_chart(fig)
+    with tab2:
+        st.dataframe(data, hide_index=True)
+
+@profiler.profiled()
 def plot_transaction_dynamics(df_transaction):
     st.write("Transaction Dynamics by each States, Year and Quarter")
     
@@ -156,25 +252,22 @@ def plot_transaction_dynamics(df_transaction):
     quarter_of_agg_transaction = df_transaction["Quarter"].unique()
     states_of_agg_transaction = df_transaction["States"].unique()
     sel_year = st.selectbox("Select Year", year_of_agg_transaction, key="year_select_plot_transaction_dynamics")
-    sel_quarter = st.selectbox("Select Quarter", quarter_of_agg_transaction, key="quarter_select_plot_transaction_dynamics")
-    sel_state = st.selectbox("Select State", states_of_agg_transaction, key="state_select_plot_transaction_dynamics")
+    sel_quarter = st.selectbox("Select Quarter", with_data(quarter_of_agg_transaction, df_transaction, "Quarter", Years=sel_year), key="quarter_select_plot_transaction_dynamics")
+    sel_state = st.selectbox("Select State", with_data(states_of_agg_transaction, df_transaction, "States", Years=sel_year, Quarter=sel_quarter), key="state_select_plot_transaction_dynamics")
    
-    df = df_transaction[
-        (df_transaction["States"] == sel_state) &
-        (df_transaction["Years"] == sel_year) &
-        (df_transaction["Quarter"] == sel_quarter)
-    ]
+    df = filter_slice(df_transaction, States=sel_state, Years=sel_year, Quarter=sel_quarter)
    
     if df.empty:
         st.warning("No data available for the selected filters.")
         return
     
-    fig = px.bar(df, x="Transaction_type", y="Transaction_amount",
+    fig = charts.bar(df, x="Transaction_type", y="Transaction_amount",
                 color="Transaction_type",
                 title=f"Transaction Amount by Type in {sel_state} {sel_year}- Q{sel_quarter} ")
     
     return df, fig
 
+@profiler.profiled()
 def most_transaction(df_transaction):
     st.subheader("Transaction Amount in each Transaction Type by Year ")
     
@@ -183,23 +276,19 @@ def most_transaction(df_transaction):
     transaction_type_of_agg_transaction = df_transaction["Transaction_type"].unique()
     sel_transaction_type = st.selectbox("Select Transaction Type", transaction_type_of_agg_transaction, key="transaction_type_select_agg")
    
-    df1 = df_transaction[
-        (df_transaction["Transaction_type"] == sel_transaction_type) &
-        (df_transaction["Years"] == sel_year)       
-    ].groupby("States").agg({
-        "Transaction_amount": "sum",
-        "Transaction_count": "sum"
-    }).reset_index().sort_values("Transaction_amount", ascending=False, ignore_index=True)
+    df1 = type_totals_by_state(df_transaction, sel_transaction_type, sel_year)
     
     if df1.empty:
         st.warning("No data available for the selected filters.")
         return
     
-    fig1 = px.bar(df1, x="States", y="Transaction_amount",
+    fig1 = charts.bar(df1, x="States", y="Transaction_amount",
                  title=f"State wise {sel_transaction_type} Amount — {sel_year}")
     
     return df1, fig1
 
+@st.fragment
+@profiler.profiled()
 def Aggre_plot(df):
     """
     Plots Transaction Amount and Count by State
@@ -210,27 +299,22 @@ def Aggre_plot(df):
     year_of_agg_transaction = df["Years"].unique()
     sel_year = st.selectbox("Select Year", year_of_agg_transaction, key="year_select_agg_trans_plot")  
     quarter_of_agg_transaction = df["Quarter"].unique()
-    sel_quarter = st.selectbox("Select Quarter", quarter_of_agg_transaction, key="quarter_select_agg_trans_plot")
+    sel_quarter = st.selectbox("Select Quarter", with_data(quarter_of_agg_transaction, df, "Quarter", Years=sel_year), key="quarter_select_agg_trans_plot")
     
     if sel_year is not None and sel_quarter is not None:
-        filtered_df = df[(df["Years"] == sel_year) & (df["Quarter"] == sel_quarter)]
         title_prefix = f"Year {sel_year} - Quarter {sel_quarter}"
     elif sel_year is not None:
-        filtered_df = df[df["Years"] == sel_year]
         title_prefix = f"Year {sel_year}"
     elif sel_quarter is not None:
-        filtered_df = df[df["Quarter"] == sel_quarter]
         title_prefix = f"Quarter {sel_quarter}"
     else:
-        filtered_df = df.copy()
         title_prefix = "All Data"
 
-    filtered_df.reset_index(drop=True, inplace=True)
+    filtered_df = filter_slice(df, Years=sel_year, Quarter=sel_quarter).reset_index(drop=True)
 
-    grouped = filtered_df.groupby("States")[["Transaction_count", "Transaction_amount"]].sum().reset_index()
+    grouped = totals_by(filtered_df, "States", ["Transaction_count", "Transaction_amount"])
     
-    url = "https://gist.githubusercontent.com/jbrobst/56c13bbbf9d97d187fea01ca62ea5112/raw/e388c4cae20aa53cb5090210a42ebb9b765c0a36/india_states.geojson"
-    geo_data = json.loads(requests.get(url).content)
+    geo_data = load_geojson(INDIA_GEOJSON_URL)
 
     tab1, tab2 = st.tabs(["TRANSACTION AMOUNT", "TRANSACTION COUNT"])
     #Transaction Amount
@@ -238,7 +322,7 @@ def Aggre_plot(df):
         st.subheader(f"{title_prefix} - TRANSACTION AMOUNT")
         st.bar_chart(grouped.set_index("States")["Transaction_amount"])
         st.write("********************************************************")
-        fig_amount = px.choropleth(
+        fig_amount = charts.choropleth(
             grouped,
             geojson=geo_data,
             locations="States",
@@ -254,14 +338,14 @@ def Aggre_plot(df):
             height=600
         )
         fig_amount.update_geos(visible=False)
-        st.plotly_chart(fig_amount,use_container_width=True)
+        plotly_chart(fig_amount,use_container_width=True)
         st.write("********************************************************")
     #Transaction Count
     with tab2:
         st.subheader(f"{title_prefix} - TRANSACTION COUNT")
         st.bar_chart(grouped.set_index("States")["Transaction_count"])
         
-        fig_count = px.choropleth(
+        fig_count = charts.choropleth(
             grouped,
             geojson=geo_data,
             locations="States",
@@ -276,38 +360,31 @@ def Aggre_plot(df):
             height=600
         )
         fig_count.update_geos(visible=False)
-        st.plotly_chart(fig_count,use_container_width = True)
+        plotly_chart(fig_count,use_container_width = True)
         st.write("********************************************************")
 
     return filtered_df
 
+@profiler.profiled()
 def plot_insurance_in_each_quarter(df_insurance):
     st.subheader("Insurance Transaction Amount by Quarter in each year")
     
     year_of_agg_insurance = df_insurance["Years"].unique()
     states_of_agg_insurance = df_insurance["States"].unique()
     sel_year_agg_insurance = st.selectbox("Select Year", year_of_agg_insurance, key="year_select_plot_transaction_dynamics")
-    sel_state_agg_insurance = st.selectbox("Select State", states_of_agg_insurance, key="state_select_plot_transaction_dynamics")
-    
-    df = (
-        df_insurance[
-            (df_insurance["States"] == sel_state_agg_insurance) &
-            (df_insurance["Years"] == sel_year_agg_insurance)
-        ]
-        .groupby("Quarter", as_index=False)
-        .agg({
-            "Transaction_amount": "sum",
-            "Transaction_count": "sum"
-        })
-    )
+    sel_state_agg_insurance = st.selectbox("Select State", with_data(states_of_agg_insurance, df_insurance, "States", Years=sel_year_agg_insurance), key="state_select_plot_transaction_dynamics")
+    
+    df = quarterly_totals(df_insurance, ["Transaction_amount", "Transaction_count"],
+                          States=sel_state_agg_insurance, Years=sel_year_agg_insurance)
     if df.empty:
         st.warning("No data available for the selected filters.")
         return
-    fig = px.bar(df, x="Quarter", y="Transaction_amount", color="Transaction_count",
+    fig = charts.bar(df, x="Quarter", y="Transaction_amount", color="Transaction_count",
                  title=f"{sel_state_agg_insurance} - {sel_year_agg_insurance} Insurance Transaction Amount by Quarter")
     
     return df, fig
 
+@profiler.profiled()
 def user_brand_in_each_state(df_user):
     st.subheader("User Engagement by Brand in each year, quarter and states")
     
@@ -315,25 +392,23 @@ def user_brand_in_each_state(df_user):
     Aggre_user_Years = df_user["Years"].unique()
     Aggre_user_Quarter = df_user["Quarter"].unique()
     sel_year = st.selectbox("Select Year", Aggre_user_Years, key="year_select_agg_user")
-    sel_quarter = st.selectbox("Select Quarter", Aggre_user_Quarter, key="quarter_select_agg_user")
-    sel_state = st.selectbox("Select State", Aggre_user_State, key="state_select_agg_user")
+    sel_quarter = st.selectbox("Select Quarter", with_data(Aggre_user_Quarter, df_user, "Quarter", Years=sel_year), key="quarter_select_agg_user")
+    sel_state = st.selectbox("Select State", with_data(Aggre_user_State, df_user, "States", Years=sel_year, Quarter=sel_quarter), key="state_select_agg_user")
     
-    df = df_user[
-        (df_user["States"] == sel_state) &
-        (df_user["Years"] == sel_year) &
-        (df_user["Quarter"] == sel_quarter)
-    ]  
+    df = filter_slice(df_user, States=sel_state, Years=sel_year, Quarter=sel_quarter)
     
     if df.empty:
         st.warning("No data available for the selected filters.")
         return
     
-    fig = px.bar(df, x="Brand", y="Transaction_Percentage",
+    fig = charts.bar(df, x="Brand", y="Transaction_Percentage",
                  title=f"User Engagement by Brand in {sel_state} - {sel_year} Q{sel_quarter} ",
                  color="Transaction_Percentage")
     
     return df, fig
 
+@st.fragment
+@profiler.profiled()
 def most_used_device_in_each_state_in_india_map(df_user):
     """
     Plots the most used device in each state on an India map.
@@ -344,28 +419,20 @@ def most_used_device_in_each_state_in_india_map(df_user):
     Aggre_user_Years = df_user["Years"].unique()
     Aggre_user_Quarter = df_user["Quarter"].unique()
     sel_year = st.selectbox("Select Year", Aggre_user_Years, key="year_select_most_used_device")
-    sel_quarter = st.selectbox("Select Quarter", Aggre_user_Quarter, key="quarter_select_most_used_device")
+    sel_quarter = st.selectbox("Select Quarter", with_data(Aggre_user_Quarter, df_user, "Quarter", Years=sel_year), key="quarter_select_most_used_device")
    
-    df = df_user[(df_user["Years"] == sel_year) & (df_user["Quarter"] == sel_quarter)]
+    most_used = most_used_brand(df_user, Years=sel_year, Quarter=sel_quarter)
     
-    if df.empty:
+    if most_used.empty:
         st.warning("No data available for the selected filters.")
         return
     
-    most_used = (
-        df.sort_values(["States", "Transaction_Percentage"], ascending=[True, False])
-        .groupby("States")
-        .first()
-        .reset_index()
-    )
-    
-    url = "https://gist.githubusercontent.com/jbrobst/56c13bbbf9d97d187fea01ca62ea5112/raw/e388c4cae20aa53cb5090210a42ebb9b765c0a36/india_states.geojson"
-    geo_data = json.loads(requests.get(url).content)
+    geo_data = load_geojson(INDIA_GEOJSON_URL)
     col1, col2 = st.columns(2)
     with col1:
         tab1, tab2 = st.tabs(["Bar Charts", "Raw Data"])    
         with tab1:
-            fig = px.choropleth(
+            fig = charts.choropleth(
                 most_used,
                 geojson=geo_data,
                 locations="States",
@@ -380,15 +447,17 @@ def most_used_device_in_each_state_in_india_map(df_user):
                 height=600
             )
             fig.update_geos(visible=False)
-            st.plotly_chart(fig)
+            plotly_chart(fig)
         with tab2:    
             st.dataframe(most_used,hide_index=True)
     with col2:    
         st.write("Pie Chart for Percentage")
-        fig1 = px.pie(most_used,"Brand","Transaction_Percentage",title="Most Used Device in Each States by percentage")
-        st.plotly_chart(fig1)
+        fig1 = charts.pie(most_used,"Brand","Transaction_Percentage",title="Most Used Device in Each States by percentage")
+        plotly_chart(fig1)
     return most_used
   
+@st.fragment
+@profiler.profiled()
 def map_bar_for_state_sum_for_each_quarter(df_transaction):
     """
     Shows bar charts of Transaction Count and Transaction Amount for a state,
@@ -397,31 +466,20 @@ def map_bar_for_state_sum_for_each_quarter(df_transaction):
     states_of_map_transaction = df_transaction["States"].unique()
     sel_state = st.selectbox("Select State", states_of_map_transaction, key="state_select_map_transaction") 
     year_of_map_transaction = df_transaction["Years"].unique()
-    sel_year = st.selectbox("Select Year", year_of_map_transaction, key="year_select_map_transaction")
+    sel_year = st.selectbox("Select Year", with_data(year_of_map_transaction, df_transaction, "Years", States=sel_state), key="year_select_map_transaction")
 
-    df = df_transaction[
-        (df_transaction["Years"] == sel_year) &
-        (df_transaction["States"] == sel_state)
-    ]
+    df_summary = quarterly_totals(df_transaction, ["Transaction_count", "Transaction_amount"],
+                                  Years=sel_year, States=sel_state)
 
-    if df.empty:
+    if df_summary.empty:
         st.warning("No data available for the selected filters.")
         return
 
-    df_summary = (
-        df.groupby("Quarter", as_index=False)
-        .agg({
-            "Transaction_count": "sum",
-            "Transaction_amount": "sum"
-        })
-        .sort_values("Quarter")
-    )
-
     # Create tabs
     tab1, tab2 = st.tabs(["Transaction Count", "Transaction Amount"])
     #Transaction Count
     with tab1:
-        fig_count = px.bar(
+        fig_count = charts.bar(
             df_summary,
             x="Quarter",
             y="Transaction_count",
@@ -430,11 +488,11 @@ def map_bar_for_state_sum_for_each_quarter(df_transaction):
             color_continuous_scale="Sunsetdark",
             text_auto=True
         )
-        st.plotly_chart(fig_count, use_container_width=True)
+        plotly_chart(fig_count, use_container_width=True)
 
     #Transaction Amount
     with tab2:
-        fig_amount = px.bar(
+        fig_amount = charts.bar(
             df_summary,
             x="Quarter",
             y="Transaction_amount",
@@ -443,10 +501,12 @@ def map_bar_for_state_sum_for_each_quarter(df_transaction):
             color_continuous_scale="Sunsetdark",
             text_auto=True
         )
-        st.plotly_chart(fig_amount, use_container_width=True)
+        plotly_chart(fig_amount, use_container_width=True)
 
     return df_summary
 
+@st.fragment
+@profiler.profiled()
 def map_bar(df_transaction):
     """
     Plots district-wise Transaction Count and Amount for a specific state, year, and quarter.
@@ -455,24 +515,19 @@ def map_bar(df_transaction):
     states_of_map_transaction = df_transaction["States"].unique()
     sel_state = st.selectbox("Select State", states_of_map_transaction, key="state_select_map_transaction_map_bar1") 
     year_of_map_transaction = df_transaction["Years"].unique()
-    sel_year = st.selectbox("Select Year", year_of_map_transaction, key="year_select_map_transaction_map_bar")
+    sel_year = st.selectbox("Select Year", with_data(year_of_map_transaction, df_transaction, "Years", States=sel_state), key="year_select_map_transaction_map_bar")
     quarter_of_map_transaction = df_transaction["Quarter"].unique()
-    sel_quarter = st.selectbox("Select Quarter", quarter_of_map_transaction, key="quarter_select_map_transaction_map_bar2") 
+    sel_quarter = st.selectbox("Select Quarter", with_data(quarter_of_map_transaction, df_transaction, "Quarter", States=sel_state, Years=sel_year), key="quarter_select_map_transaction_map_bar2") 
     
-    filtered_df = df_transaction[
-        (df_transaction["Years"] == sel_year) &
-        (df_transaction["Quarter"] == sel_quarter) &
-        (df_transaction["States"] == sel_state)
-    ]
+    filtered_df = ranked_rows(df_transaction, "Transaction_count", Years=sel_year, Quarter=sel_quarter, States=sel_state)
 
     if filtered_df.empty:
         st.warning("No data available for the selected filters.")
         return
 
-    filtered_df = filtered_df.sort_values(by="Transaction_count", ascending=False)
     tab1, tab2 = st.tabs(["Transaction Count", "Transaction Amount"])
     with tab1:
-        fig_count = px.bar(
+        fig_count = charts.bar(
             filtered_df,
             x="District",
             y="Transaction_count",
@@ -481,10 +536,10 @@ def map_bar(df_transaction):
             color_continuous_scale="Sunsetdark"
         )
         fig_count.update_layout(xaxis_tickangle=45)
-        st.plotly_chart(fig_count, use_container_width=True)
+        plotly_chart(fig_count, use_container_width=True)
 
     with tab2:
-        fig_amount = px.bar(
+        fig_amount = charts.bar(
             filtered_df,
             x="District",
             y="Transaction_amount",
@@ -493,42 +548,37 @@ def map_bar(df_transaction):
             color_continuous_scale="Sunsetdark"
         )
         fig_amount.update_layout(xaxis_tickangle=45)
-        st.plotly_chart(fig_amount, use_container_width=True)
+        plotly_chart(fig_amount, use_container_width=True)
 
     return filtered_df
 
+@st.fragment
+@profiler.profiled()
 def map_filter_by_state_and_district(df_map):
     """Filters insurance data by year, state, and district,
     then displays transaction count and amount by quarter.
     """
     states_of_map_transaction = df_map["States"].unique()
     sel_state = st.selectbox("Select State", states_of_map_transaction, key="state_map_filter_by_state_and_district") 
-    districts_for_state = (Map_transaction[Map_transaction["States"] == sel_state]["District"].unique().tolist())
+    districts_for_state = unique_values(Map_transaction, "District", States=sel_state)
     sel_district = st.selectbox("Select District", districts_for_state, key="district_map_filter_by_state_and_district")
     year_of_map_transaction = df_map["Years"].unique()
-    sel_year = st.selectbox("Select Year", year_of_map_transaction, key="year_map_filter_by_state_and_district")
+    sel_year = st.selectbox("Select Year", with_data(year_of_map_transaction, df_map, "Years", States=sel_state), key="year_map_filter_by_state_and_district")
 
-    df = df_map[
-        (df_map["Years"] == sel_year) &
-        (df_map["States"] == sel_state) &
-        (df_map["District"] == sel_district)
-    ]
+    df_grouped = quarterly_totals(df_map, ["Transaction_count", "Transaction_amount"],
+                                  Years=sel_year, States=sel_state, District=sel_district)
 
-    if df.empty:
+    if df_grouped.empty:
         st.warning("No data available for the selected filters.")
         return
 
-    df_grouped = df.groupby("Quarter", as_index=False).agg({
-        "Transaction_count": "sum",
-        "Transaction_amount": "sum"
-    })
     tab1, tab2 = st.tabs(["Bar Charts", "Raw Data"])
 
     with tab1:
         sub_tab1, sub_tab2 = st.tabs(["Transaction Count", "Transaction Amount"])
         # Transaction Count
         with sub_tab1:
-            fig_count = px.bar(
+            fig_count = charts.bar(
                 df_grouped,
                 x="Quarter",
                 y="Transaction_count",
@@ -541,10 +591,10 @@ def map_filter_by_state_and_district(df_map):
                 labels={"Quarter": "Quarter", "Transaction_count": "Count of Transactions"},
                 template="plotly_white",
             )
-            st.plotly_chart(fig_count, use_container_width=True)
+            plotly_chart(fig_count, use_container_width=True)
         # Transaction Amount
         with sub_tab2:
-            fig_amount = px.bar(
+            fig_amount = charts.bar(
                 df_grouped,
                 x="Quarter",
                 y="Transaction_amount",
@@ -557,11 +607,13 @@ def map_filter_by_state_and_district(df_map):
                 labels={"Quarter": "Quarter", "Transaction_amount": "Transaction Amount"},
                 template="plotly_white",
             )
-            st.plotly_chart(fig_amount, use_container_width=True)
+            plotly_chart(fig_amount, use_container_width=True)
     with tab2:
         st.dataframe(df_grouped, hide_index=True)   
         st.write("*****************************************************")
 
+@st.fragment
+@profiler.profiled()
 def map_user_total_registered_user_and_app_open(df_transaction):
     """Shows bar charts of Registered Users and App Opens for a state in a given year.
     """
@@ -569,28 +621,18 @@ def map_user_total_registered_user_and_app_open(df_transaction):
     states_of_map_user = df_transaction["States"].unique()
     sel_state = st.selectbox("Select State", states_of_map_user, key="state_select_map_user")
     year_of_map_user = df_transaction["Years"].unique()
-    sel_year = st.selectbox("Select Year", year_of_map_user, key="year_select_map_user")
+    sel_year = st.selectbox("Select Year", with_data(year_of_map_user, df_transaction, "Years", States=sel_state), key="year_select_map_user")
    
-    df = df_transaction[
-        (df_transaction["Years"] == sel_year) &
-        (df_transaction["States"] == sel_state)
-     ]
-    if df.empty:
+    df_summary = totals_by(df_transaction, "District", ["RegisteredUser", "AppOpens"], Years=sel_year, States=sel_state)
+    if df_summary.empty:
         st.warning("No data available for the selected filters.")
         return
-    df_summary = (
-        df.groupby("District", as_index=False)
-        .agg({
-            "RegisteredUser": "sum",
-            "AppOpens": "sum"
-        })
-    )
 
     # Create tabs
     tab1, tab2 = st.tabs(["Registered Users", "App Opens"])
 
     with tab1:
-        fig_users = px.bar(
+        fig_users = charts.bar(
             df_summary,
             x="District",
             y="RegisteredUser",
@@ -599,10 +641,10 @@ def map_user_total_registered_user_and_app_open(df_transaction):
             color_continuous_scale="Sunsetdark"
         )
         fig_users.update_layout(xaxis_tickangle=45)
-        st.plotly_chart(fig_users, use_container_width=True)
+        plotly_chart(fig_users, use_container_width=True)
 
     with tab2:
-        fig_opens = px.bar(
+        fig_opens = charts.bar(
             df_summary,
             x="District",
             y="AppOpens",
@@ -611,10 +653,12 @@ def map_user_total_registered_user_and_app_open(df_transaction):
             color_continuous_scale="Sunsetdark"
         )
         fig_opens.update_layout(xaxis_tickangle=45)
-        st.plotly_chart(fig_opens, use_container_width=True)
+        plotly_chart(fig_opens, use_container_width=True)
 
     return df_summary
 
+@st.fragment
+@profiler.profiled()
 def map_use_registered_user_and_app_open(df_user):
     """
     Plots district-wise Registered Users and App Opens for a specific state, year, and quarter.
@@ -625,22 +669,17 @@ def map_use_registered_user_and_app_open(df_user):
     states_of_map_user = df_user["States"].unique()
     sel_state = st.selectbox("Select State", states_of_map_user, key="state_map_use_registered_user_and_app_open")
     year_of_map_user = df_user["Years"].unique()
-    sel_year = st.selectbox("Select Year", year_of_map_user, key="year_map_use_registered_user_and_app_open")
+    sel_year = st.selectbox("Select Year", with_data(year_of_map_user, df_user, "Years", States=sel_state), key="year_map_use_registered_user_and_app_open")
     quarter_of_map_user = df_user["Quarter"].unique()
-    sel_quarter = st.selectbox("Select Quarter", quarter_of_map_user, key="quarter_map_use_registered_user_and_app_open")
+    sel_quarter = st.selectbox("Select Quarter", with_data(quarter_of_map_user, df_user, "Quarter", States=sel_state, Years=sel_year), key="quarter_map_use_registered_user_and_app_open")
 
-    filtered_df = df_user[
-        (df_user["Years"] == sel_year) &
-        (df_user["Quarter"] == sel_quarter) &
-        (df_user["States"] == sel_state)
-    ]
+    filtered_df = ranked_rows(df_user, "RegisteredUser", Years=sel_year, Quarter=sel_quarter, States=sel_state)
     if filtered_df.empty:
         st.warning("No data available for the selected filters.")
         return
-    filtered_df = filtered_df.sort_values(by="RegisteredUser", ascending=False)
     tab1, tab2 = st.tabs(["Registered Users", "App Opens"])
     with tab1:
-        fig_users = px.bar(
+        fig_users = charts.bar(
             filtered_df,
             x="District",
             y="RegisteredUser",
@@ -649,9 +688,9 @@ def map_use_registered_user_and_app_open(df_user):
             color_continuous_scale="Sunsetdark"
         )
         fig_users.update_layout(xaxis_tickangle=45)
-        st.plotly_chart(fig_users, use_container_width=True)
+        plotly_chart(fig_users, use_container_width=True)
     with tab2:
-        fig_opens = px.bar(
+        fig_opens = charts.bar(
             filtered_df,
             x="District",
             y="AppOpens",
@@ -660,10 +699,12 @@ def map_use_registered_user_and_app_open(df_user):
             color_continuous_scale="Sunsetdark"
         )
         fig_opens.update_layout(xaxis_tickangle=45)
-        st.plotly_chart(fig_opens, use_container_width=True)
+        plotly_chart(fig_opens, use_container_width=True)
 
     return filtered_df
 
+@st.fragment
+@profiler.profiled()
 def map_user_filter_by_state_and_district(df_user):
     """Filters user data by year, state, and district,
     then displays registeduser and appopens by quarter."""
@@ -672,26 +713,19 @@ def map_user_filter_by_state_and_district(df_user):
     year_of_map_user = df_user["Years"].unique()
     sel_year = st.selectbox("Select Year", year_of_map_user, key="year_map_user_filter_by_state_and_district")
     states_of_map_user = df_user["States"].unique()
-    sel_state = st.selectbox("Select State", states_of_map_user, key="state_map_user_filter_by_state_and_district")
-    districts_for_state = (Map_user[Map_user["States"] == sel_state]["District"].unique().tolist())
+    sel_state = st.selectbox("Select State", with_data(states_of_map_user, df_user, "States", Years=sel_year), key="state_map_user_filter_by_state_and_district")
+    districts_for_state = unique_values(Map_user, "District", States=sel_state)
     sel_district = st.selectbox("Select District", districts_for_state, key="district_map_user_filter_by_state_and_district")
-    df = df_user[
-        (df_user["Years"] == sel_year) &
-        (df_user["States"] == sel_state) &
-        (df_user["District"] == sel_district)
-    ]
-    if df.empty:
+    df_grouped = quarterly_totals(df_user, ["RegisteredUser", "AppOpens"],
+                                  Years=sel_year, States=sel_state, District=sel_district)
+    if df_grouped.empty:
         st.warning("No data available for the selected filters.")
         return
-    df_grouped = df.groupby("Quarter", as_index=False).agg({
-        "RegisteredUser": "sum",
-        "AppOpens": "sum"
-    })
     tab1, tab2 = st.tabs(["Bar Charts", "Raw Data"])
     with tab1:
         sub_tab1, sub_tab2 = st.tabs(["Registered Users", "App Opens"])
         with sub_tab1:
-            fig_users = px.bar(
+            fig_users = charts.bar(
                 df_grouped,
                 x="Quarter",
                 y="RegisteredUser",
@@ -704,9 +738,9 @@ def map_user_filter_by_state_and_district(df_user):
                 labels={"Quarter": "Quarter", "RegisteredUser": "Count of Registered Users"},
                 template="plotly_white",
             )
-            st.plotly_chart(fig_users, use_container_width=True)
+            plotly_chart(fig_users, use_container_width=True)
         with sub_tab2:
-            fig_opens = px.bar(
+            fig_opens = charts.bar(
                 df_grouped,     
                 x="Quarter",
                 y="AppOpens",
@@ -719,7 +753,7 @@ def map_user_filter_by_state_and_district(df_user):
                 labels={"Quarter": "Quarter", "AppOpens": "Count of App Opens"},
                 template="plotly_white",
             )
-            st.plotly_chart(fig_opens, use_container_width=True)
+            plotly_chart(fig_opens, use_container_width=True)
     with tab2:
         st.dataframe(df_grouped, hide_index=True)
         st.markdown("### Data Summary")
@@ -727,6 +761,8 @@ def map_user_filter_by_state_and_district(df_user):
         
     return df_grouped
 
+@st.fragment
+@profiler.profiled()
 def Top_count_amount(df_top):
     """
     Shows bar charts of Transaction Count and Transaction Amount for a state,
@@ -737,29 +773,17 @@ def Top_count_amount(df_top):
     Top_transaction_States = df_top["States"].unique()
     Top_transaction_Years = df_top["Years"].unique()
     sel_state = st.selectbox("Select State", Top_transaction_States, key="state_select_top_transaction")
-    sel_year = st.selectbox("Select Year", Top_transaction_Years, key="year_select_top_transaction")
+    sel_year = st.selectbox("Select Year", with_data(Top_transaction_Years, df_top, "Years", States=sel_state), key="year_select_top_transaction")
     
-    df = df_top[
-        (df_top["Years"] == sel_year) &
-        (df_top["States"] == sel_state) 
-    ]
+    df_summary = quarterly_totals(df_top, ["Transaction_count", "Transaction_amount"], Years=sel_year, States=sel_state)
 
-    if df.empty:
+    if df_summary.empty:
         st.warning("No data available for the selected filters.")
         return
-    
-    df_summary = (
-        df.groupby("Quarter", as_index=False)
-        .agg({
-            "Transaction_count": "sum",
-            "Transaction_amount": "sum"
-        })
-        .sort_values("Quarter")
-    )
     tab1, tab2 = st.tabs(["Transaction Count", "Transaction Amount"])
 
     with tab1:
-        fig_count = px.bar(
+        fig_count = charts.bar(
             df_summary,
             x="Quarter",
             y="Transaction_count",
@@ -768,10 +792,10 @@ def Top_count_amount(df_top):
             color_continuous_scale="Sunsetdark",
             text_auto=True
         )
-        st.plotly_chart(fig_count, use_container_width=True)
+        plotly_chart(fig_count, use_container_width=True)
 
     with tab2:
-        fig_amount = px.bar(
+        fig_amount = charts.bar(
             df_summary,
             x="Quarter",
             y="Transaction_amount",
@@ -780,9 +804,11 @@ def Top_count_amount(df_top):
             color_continuous_scale="Sunsetdark",
             text_auto=True
         )
-        st.plotly_chart(fig_amount, use_container_width=True)
+        plotly_chart(fig_amount, use_container_width=True)
     return df_summary
 
+@st.fragment
+@profiler.profiled()
 def Top_pie(df_transaction):
     """
     Plots district-wise Transaction Count and Amount for a specific state, year, and quarter
@@ -794,24 +820,19 @@ def Top_pie(df_transaction):
     Top_transaction_States = df_transaction["States"].unique()
     Top_transaction_Quarter = df_transaction["Quarter"].unique()
     sel_state = st.selectbox("Select State", Top_transaction_States, key="state_Top_pie")
-    sel_year = st.selectbox("Select Year", Top_transaction_Years, key="year_Top_pie")
-    sel_quarter = st.selectbox("Select Quarter", Top_transaction_Quarter, key="quarter_Top_pie")
+    sel_year = st.selectbox("Select Year", with_data(Top_transaction_Years, df_transaction, "Years", States=sel_state), key="year_Top_pie")
+    sel_quarter = st.selectbox("Select Quarter", with_data(Top_transaction_Quarter, df_transaction, "Quarter", States=sel_state, Years=sel_year), key="quarter_Top_pie")
     # Filter data
-    filtered_df = df_transaction[
-        (df_transaction["Years"] == sel_year) &
-        (df_transaction["Quarter"] == sel_quarter) &
-        (df_transaction["States"] == sel_state)
-    ]
+    filtered_df = ranked_rows(df_transaction, "Transaction_count", Years=sel_year, Quarter=sel_quarter, States=sel_state)
 
     if filtered_df.empty:
         st.warning("No data available for the selected filters.")
         return
     filtered_df["Pincodes"] = filtered_df["Pincodes"].astype(str)
-    filtered_df = filtered_df.sort_values(by="Transaction_count", ascending=False)
 
     tab1, tab2 = st.tabs(["Transaction Count", "Transaction Amount"])
     with tab1:
-        fig_count = px.pie(
+        fig_count = charts.pie(
             filtered_df,
             names="Pincodes",
             values="Transaction_count",
@@ -820,10 +841,10 @@ def Top_pie(df_transaction):
             color_discrete_sequence=px.colors.sequential.Sunsetdark
         )
         fig_count.update_traces(textposition='inside', textinfo='percent+label')
-        st.plotly_chart(fig_count, use_container_width=True)
+        plotly_chart(fig_count, use_container_width=True)
 
     with tab2:
-        fig_amount = px.pie(
+        fig_amount = charts.pie(
             filtered_df,
             names="Pincodes",
             values="Transaction_amount",
@@ -832,10 +853,12 @@ def Top_pie(df_transaction):
             color_discrete_sequence=px.colors.sequential.Sunsetdark
         )
         fig_amount.update_traces(textposition='inside', textinfo='percent+label')
-        st.plotly_chart(fig_amount, use_container_width=True)
+        plotly_chart(fig_amount, use_container_width=True)
 
     return filtered_df
 
+@st.fragment
+@profiler.profiled()
 def Top_filter_by_state_and_pincode(df_user):
     """Filters user data by year, state, and Pincodes,
     then displays Transaction count and Transaction Amount."""
@@ -844,29 +867,21 @@ def Top_filter_by_state_and_pincode(df_user):
     Top_transaction_Years = df_user["Years"].unique()
     Top_transaction_States = df_user["States"].unique()
     sel_state = st.selectbox("Select State", Top_transaction_States, key="state_Top_filter_by_state_and_pincode")
-    sel_year = st.selectbox("Select Year", Top_transaction_Years, key="year_Top_filter_by_state_and_pincode")
-    pincode_for_state = df_user[df_user["States"] == sel_state]["Pincodes"].unique().tolist()
+    sel_year = st.selectbox("Select Year", with_data(Top_transaction_Years, df_user, "Years", States=sel_state), key="year_Top_filter_by_state_and_pincode")
+    pincode_for_state = unique_values(df_user, "Pincodes", States=sel_state)
     sel_pincode = st.selectbox("Select Pincode", pincode_for_state, key="Pincodes_Top_filter_by_state_and_pincode")
-    df = df_user[
-        (df_user["Years"] == sel_year) &
-        (df_user["States"] == sel_state) &
-        (df_user["Pincodes"] == sel_pincode)
-    ]
-    if df.empty:
+    df_grouped = quarterly_totals(df_user, ["Transaction_count", "Transaction_amount"],
+                                  Years=sel_year, States=sel_state, Pincodes=sel_pincode)
+    if df_grouped.empty:
         st.warning("No data available for the selected filters.")
         return
 
-    df_grouped = df.groupby("Quarter", as_index=False).agg({
-        "Transaction_count": "sum",
-        "Transaction_amount": "sum"
-    })
-
     tab1, tab2 = st.tabs(["Bar Charts", "Raw Data"])
     with tab1:
         sub_tab1, sub_tab2 = st.tabs(["Transaction count", "Transaction amount"])
 
         with sub_tab1:
-            fig_users = px.bar(
+            fig_users = charts.bar(
                 df_grouped,
                 x="Quarter",
                 y="Transaction_count",
@@ -879,10 +894,10 @@ def Top_filter_by_state_and_pincode(df_user):
                 labels={"Quarter": "Quarter", "Transaction_count": "Count of Transaction"},
                 template="plotly_white",
             )
-            st.plotly_chart(fig_users, use_container_width=True)
+            plotly_chart(fig_users, use_container_width=True)
 
         with sub_tab2:
-            fig_opens = px.bar(
+            fig_opens = charts.bar(
                 df_grouped,     
                 x="Quarter",
                 y="Transaction_amount",
@@ -895,7 +910,7 @@ def Top_filter_by_state_and_pincode(df_user):
                 labels={"Quarter": "Quarter", "Transaction_amount": "Transaction amount"},
                 template="plotly_white",
             )
-            st.plotly_chart(fig_opens, use_container_width=True)
+            plotly_chart(fig_opens, use_container_width=True)
     with tab2:
         st.dataframe(df_grouped, hide_index=True)
         st.markdown("### Data Summary")
@@ -903,6 +918,8 @@ def Top_filter_by_state_and_pincode(df_user):
         
     return df_grouped
 
+@st.fragment
+@profiler.profiled()
 def Top_register_user(df_top):
     """
     Shows bar charts of register_user for a state,
@@ -912,25 +929,14 @@ def Top_register_user(df_top):
     Top_user_States = Top_user["States"].unique()
     Top_user_Years = Top_user["Years"].unique()
     sel_year = st.selectbox("Select Year", Top_user_Years, key="year_select_Top_user")
-    sel_state = st.selectbox("Select State", Top_user_States, key="state_select_Top_user")
-    df = df_top[
-        (df_top["Years"] == sel_year) &
-        (df_top["States"] == sel_state) 
-    ]
+    sel_state = st.selectbox("Select State", with_data(Top_user_States, df_top, "States", Years=sel_year), key="state_select_Top_user")
+    df_summary = quarterly_totals(df_top, ["RegisteredUser"], Years=sel_year, States=sel_state)
 
-    if df.empty:
+    if df_summary.empty:
         st.warning("No data available for the selected filters.")
         return
-    
-    df_summary = (
-        df.groupby("Quarter", as_index=False)
-        .agg({
-            "RegisteredUser": "sum",
-        })
-        .sort_values("Quarter")
-    )   
 
-    fig_count = px.bar(
+    fig_count = charts.bar(
         df_summary,
         x="Quarter",
         y="RegisteredUser",
@@ -939,10 +945,12 @@ def Top_register_user(df_top):
         color_continuous_scale="Sunsetdark",
         text_auto=True
         )
-    st.plotly_chart(fig_count, use_container_width=True)
+    plotly_chart(fig_count, use_container_width=True)
 
     return df_summary
 
+@st.fragment
+@profiler.profiled()
 def Top_use_pie(df_transaction):
     """
     Plots district-wise Transaction Count and Amount for a specific state, year, and quarter
@@ -954,21 +962,16 @@ def Top_use_pie(df_transaction):
     Top_user_Years = Top_user["Years"].unique()
     Top_user_Quarter = Top_user["Quarter"].unique()
     sel_year = st.selectbox("Select Year", Top_user_Years, key="year_Top_use_pie")
-    sel_state = st.selectbox("Select State", Top_user_States, key="state_Top_use_pie")
-    sel_quarter = st.selectbox("Select Quarter", Top_user_Quarter, key="quarter_Top_use_pie")
-    filtered_df = df_transaction[
-        (df_transaction["Years"] == sel_year) &
-        (df_transaction["Quarter"] == sel_quarter) &
-        (df_transaction["States"] == sel_state)
-    ]
+    sel_state = st.selectbox("Select State", with_data(Top_user_States, df_transaction, "States", Years=sel_year), key="state_Top_use_pie")
+    sel_quarter = st.selectbox("Select Quarter", with_data(Top_user_Quarter, df_transaction, "Quarter", Years=sel_year, States=sel_state), key="quarter_Top_use_pie")
+    filtered_df = ranked_rows(df_transaction, "RegisteredUser", Years=sel_year, Quarter=sel_quarter, States=sel_state)
 
     if filtered_df.empty:
         st.warning("No data available for the selected filters.")
         return
 
     filtered_df["Pincodes"] = filtered_df["Pincodes"].astype(str)
-    filtered_df = filtered_df.sort_values(by="RegisteredUser", ascending=False)
-    fig_count = px.pie(
+    fig_count = charts.pie(
         filtered_df,
         names="Pincodes",
         values="RegisteredUser",
@@ -977,10 +980,12 @@ def Top_use_pie(df_transaction):
         color_discrete_sequence=px.colors.sequential.Sunsetdark
     )
     fig_count.update_traces(textposition='inside', textinfo='percent+label')
-    st.plotly_chart(fig_count, use_container_width=True)
+    plotly_chart(fig_count, use_container_width=True)
 
     return filtered_df
 
+@st.fragment
+@profiler.profiled()
 def Top_Registered_by_state_and_pincode(df_user):
     """Filters user data by year, state, and Pincodes,
     then displays Registered Users."""
@@ -990,23 +995,16 @@ def Top_Registered_by_state_and_pincode(df_user):
     Top_user_States = Top_user["States"].unique()
     Top_user_Years = Top_user["Years"].unique()
     sel_year = st.selectbox("Select Year", Top_user_Years, key="year_Top_Registered_by_state_and_pincode")
-    sel_state = st.selectbox("Select State", Top_user_States, key="state_Top_Registered_by_state_and_pincode")
-    pincode_for_state = Top_user[Top_user["States"] == sel_state]["Pincodes"].unique().tolist()
+    sel_state = st.selectbox("Select State", with_data(Top_user_States, df_user, "States", Years=sel_year), key="state_Top_Registered_by_state_and_pincode")
+    pincode_for_state = unique_values(Top_user, "Pincodes", States=sel_state)
     sel_pincode = st.selectbox("Select Pincode", pincode_for_state, key="Pincodes_select_Top_user")
-    df = df_user[
-        (df_user["Years"] == sel_year) &
-        (df_user["States"] == sel_state) &
-        (df_user["Pincodes"] == sel_pincode)
-    ]   
-    if df.empty:
+    df_grouped = quarterly_totals(df_user, ["RegisteredUser"], Years=sel_year, States=sel_state, Pincodes=sel_pincode)
+    if df_grouped.empty:
         st.warning("No data available for the selected filters.")
         return
-    df_grouped = df.groupby("Quarter", as_index=False).agg({
-        "RegisteredUser": "sum",
-    })
     tab1, tab2 = st.tabs(["Bar Charts", "Raw Data"])
     with tab1:
-        fig_users = px.bar(
+        fig_users = charts.bar(
             df_grouped,
             x="Quarter",
             y="RegisteredUser",
@@ -1019,13 +1017,14 @@ def Top_Registered_by_state_and_pincode(df_user):
             labels={"Quarter": "Quarter", "RegisteredUser": "Count of RegisteredUser"},
             template="plotly_white",
         )
-        st.plotly_chart(fig_users, use_container_width=True)
+        plotly_chart(fig_users, use_container_width=True)
     with tab2:
         st.dataframe(df_grouped, hide_index=True)
         st.markdown("### Data Summary")
         st.write(df_grouped.describe())
     return df_grouped
 
+@profiler.profiled()
 def ques1(df):
     st.write("*****************************************************************************************************")
     st.header("Transaction Type Trends Analysis")
@@ -1035,33 +1034,17 @@ def ques1(df):
     sel_year_map = st.selectbox("Select Year (Map View)", year_list_map, key="map_year")
     sel_quarter_map = st.selectbox("Select Quarter (Map View)", quarter_list_map, key="map_quarter")
 
-    map_df = df.copy() 
-    if sel_year_map != "All Years":
-        map_df = map_df[map_df["Years"] == int(sel_year_map)]
-    if sel_quarter_map != "All Quarters":
-        map_df = map_df[map_df["Quarter"] == int(sel_quarter_map)]
-        
-    most_used = (
-        map_df.groupby(["States", "Transaction_type"], as_index=False)["Transaction_amount"].sum()
-        .sort_values(["States", "Transaction_amount"], ascending=[True, False])
-        .groupby("States").first().reset_index()
+    most_used1 = transaction_type_summary(
+        df,
+        Years=ALL if sel_year_map == "All Years" else int(sel_year_map),
+        Quarter=ALL if sel_quarter_map == "All Quarters" else int(sel_quarter_map),
     )
-    totalamount_per_state = map_df.groupby("States", as_index=False)["Transaction_amount"].sum()
-    totalcount_per_state = map_df.groupby("States", as_index=False)["Transaction_count"].sum()
-    
-    most_used1 = pd.merge(totalamount_per_state,totalcount_per_state,on="States")
-    total_transaction = most_used1["Transaction_amount"].sum()
-    total_count = most_used1["Transaction_count"].sum()
-    most_used1["Count_Percentage"] = (most_used1["Transaction_count"]/total_count) * 100
-    most_used1["Transaction_Percentage"] = (most_used1["Transaction_amount"]/total_transaction) * 100
-    most_used1["Transaction_type"] = most_used["Transaction_type"]
 
     # Choropleth Map
-    url = "https://gist.githubusercontent.com/jbrobst/56c13bbbf9d97d187fea01ca62ea5112/raw/e388c4cae20aa53cb5090210a42ebb9b765c0a36/india_states.geojson"
-    geo_data = json.loads(requests.get(url).content)
+    geo_data = load_geojson(INDIA_GEOJSON_URL)
     col1,col2 = st.columns(2)
     with col1:
-        fig_map = px.choropleth(
+        fig_map = charts.choropleth(
             most_used1,
             geojson=geo_data,
             locations="States",
@@ -1080,10 +1063,10 @@ def ques1(df):
             height=600
         )
         fig_map.update_geos(visible=False)
-        st.plotly_chart(fig_map, use_container_width=True)
+        plotly_chart(fig_map, use_container_width=True)
     
     with col2:
-        fig_map1 = px.choropleth(
+        fig_map1 = charts.choropleth(
             most_used1,
             geojson=geo_data,
             locations="States",
@@ -1102,324 +1085,306 @@ def ques1(df):
             height=600
         )
         fig_map1.update_geos(visible=False)
-        st.plotly_chart(fig_map1, use_container_width=True)
+        plotly_chart(fig_map1, use_container_width=True)
     
     # State-wise Trend
-    st.subheader("State-wise Transaction Trends")
-    state_list = ["All States"] + sorted(df["States"].unique().tolist())
-    sel_state_sw = st.selectbox("Select State (State-wise View)", state_list, key="sw_state")
-    df_sw = df.copy()
-    if sel_state_sw != "All States":
-        df_sw = df_sw[df_sw["States"] == sel_state_sw]
-
-    state_data = df_sw.groupby(["States", "Transaction_type"], as_index=False)["Transaction_amount"].sum()
-    fig_state = px.bar(state_data, x="States", y="Transaction_amount", color="Transaction_type", barmode="group")
-    st.plotly_chart(fig_state, use_container_width=True)
+    @st.fragment
+    @profiler.profiled()
+    def state_trend_section():
+        st.subheader("State-wise Transaction Trends")
+        state_list = ["All States"] + sorted(df["States"].unique().tolist())
+        sel_state_sw = st.selectbox("Select State (State-wise View)", state_list, key="sw_state")
+        state_data = type_amounts(df, "States", States=ALL if sel_state_sw == "All States" else sel_state_sw)
+        fig_state = charts.bar(state_data, x="States", y="Transaction_amount", color="Transaction_type", barmode="group")
+        plotly_chart(fig_state, use_container_width=True)
+
+    state_trend_section()
     
     # Year-wise Trends
-    st.subheader("Year-wise Transaction Trends")
-    year_list = ["All Years"] + sorted(df["Years"].unique().tolist())
-    sel_year_yw = st.selectbox("Select Year (Year-wise View)", year_list, key="yw_year")
-    df_yw = df.copy()
-    if sel_year_yw != "All Years":
-        df_yw = df_yw[df_yw["Years"] == int(sel_year_yw)]
-
-    year_data = df_yw.groupby(["Years", "Transaction_type"], as_index=False)["Transaction_amount"].sum()
-    fig_year = px.line(year_data, x="Years", y="Transaction_amount", color="Transaction_type", markers=True)
-    st.plotly_chart(fig_year, use_container_width=True)
+    @st.fragment
+    @profiler.profiled()
+    def year_trend_section():
+        st.subheader("Year-wise Transaction Trends")
+        year_list = ["All Years"] + sorted(df["Years"].unique().tolist())
+        sel_year_yw = st.selectbox("Select Year (Year-wise View)", year_list, key="yw_year")
+        year_data = type_amounts(df, "Years", Years=ALL if sel_year_yw == "All Years" else int(sel_year_yw))
+        fig_year = charts.line(year_data, x="Years", y="Transaction_amount", color="Transaction_type", markers=True)
+        plotly_chart(fig_year, use_container_width=True)
+
+    year_trend_section()
     
     # Quarter wise Trends
-    st.subheader("Quarter-wise Transaction Trends")
-    year_list_qw = sorted(df["Years"].unique().tolist())
-    sel_year_qw = st.selectbox("Select Year (Quarter-wise View)", year_list_qw, key="qw_year")
-    df_qw = df[df["Years"] == int(sel_year_qw)]
-    quarter_data = df_qw.groupby(["Quarter", "Transaction_type"], as_index=False)["Transaction_amount"].sum()
-    fig_quarter = px.bar(quarter_data, x="Quarter", y="Transaction_amount", color="Transaction_type", barmode="group")
-    st.plotly_chart(fig_quarter, use_container_width=True)
+    @st.fragment
+    @profiler.profiled()
+    def quarter_trend_section():
+        st.subheader("Quarter-wise Transaction Trends")
+        year_list_qw = sorted(df["Years"].unique().tolist())
+        sel_year_qw = st.selectbox("Select Year (Quarter-wise View)", year_list_qw, key="qw_year")
+        quarter_data = type_amounts(df, "Quarter", Years=int(sel_year_qw))
+        fig_quarter = charts.bar(quarter_data, x="Quarter", y="Transaction_amount", color="Transaction_type", barmode="group")
+        plotly_chart(fig_quarter, use_container_width=True)
+
+    quarter_trend_section()
 
 
     # Transaction Type Distribution
-    st.subheader("Transaction Type Distribution")
-    year_list_tw = ["All Years"] + sorted(df["Years"].unique().tolist())
-    quarter_list_tw = ["All Quarters"] + sorted(df["Quarter"].unique().tolist())
-    sel_year_tw = st.selectbox("Select Year (Type-wise View)", year_list_tw, key="tw_year")
-    sel_quarter_tw = st.selectbox("Select Quarter (Type-wise View)", quarter_list_tw, key="tw_quarter")
-    df_tw = df.copy()
-    if sel_year_tw != "All Years":
-        df_tw = df_tw[df_tw["Years"] == int(sel_year_tw)]
-    if sel_quarter_tw != "All Quarters":
-        df_tw = df_tw[df_tw["Quarter"] == int(sel_quarter_tw)]
-
-    type_data = df_tw.groupby("Transaction_type", as_index=False)["Transaction_amount"].sum()
-    fig_type = px.pie(type_data, names="Transaction_type", values="Transaction_amount", hole=0.4)
-    st.plotly_chart(fig_type, use_container_width=True)
+    @st.fragment
+    @profiler.profiled()
+    def type_share_section():
+        st.subheader("Transaction Type Distribution")
+        year_list_tw = ["All Years"] + sorted(df["Years"].unique().tolist())
+        quarter_list_tw = ["All Quarters"] + sorted(df["Quarter"].unique().tolist())
+        sel_year_tw = st.selectbox("Select Year (Type-wise View)", year_list_tw, key="tw_year")
+        sel_quarter_tw = st.selectbox("Select Quarter (Type-wise View)", quarter_list_tw, key="tw_quarter")
+        type_data = type_amounts(
+            df,
+            Years=ALL if sel_year_tw == "All Years" else int(sel_year_tw),
+            Quarter=ALL if sel_quarter_tw == "All Quarters" else int(sel_quarter_tw),
+        )
+        fig_type = charts.pie(type_data, names="Transaction_type", values="Transaction_amount", hole=0.4)
+        plotly_chart(fig_type, use_container_width=True)
+
+    type_share_section()
 
     # Top/Bottom 5 States by Transaction Amount
-    sort_most_used = most_used1[["States", "Transaction_amount", "Transaction_Percentage"]].sort_values(
-        by="Transaction_amount", ascending=False
-    )
-    sort_most_used1 = most_used1[["States", "Transaction_count", "Count_Percentage"]].sort_values(
-        by="Transaction_count", ascending=False
-    )
+    @st.fragment
+    @profiler.profiled()
+    def top_states_section():
+        sort_most_used = most_used1[["States", "Transaction_amount", "Transaction_Percentage"]].sort_values(
+            by="Transaction_amount", ascending=False
+        )
+        sort_most_used1 = most_used1[["States", "Transaction_count", "Count_Percentage"]].sort_values(
+            by="Transaction_count", ascending=False
+        )
 
-    choice = st.selectbox(
-        "Select View",
-        ["Top 5 States based on Transaction Amount and Transaction Count", "Bottom 5 States based on Transaction Amount and and Transaction Count"],
-        index=0
-    )
+        choice = st.selectbox(
+            "Select View",
+            ["Top 5 States based on Transaction Amount and Transaction Count", "Bottom 5 States based on Transaction Amount and and Transaction Count"],
+            index=0
+        )
 
-    tab_chart, tab_data = st.tabs(["Bar Chart", "Raw Data"])
+        tab_chart, tab_data = st.tabs(["Bar Chart", "Raw Data"])
 
-    if choice == "Top 5 States based on Transaction Amount and Transaction Count":
-        amount_df = sort_most_used.head(5)
-        count_df = sort_most_used1.head(5)
+        if choice == "Top 5 States based on Transaction Amount and Transaction Count":
+            amount_df = sort_most_used.head(5)
+            count_df = sort_most_used1.head(5)
         
-    else:
-        amount_df = sort_most_used.tail(5)
-        count_df = sort_most_used1.tail(5)
+        else:
+            amount_df = sort_most_used.tail(5)
+            count_df = sort_most_used1.tail(5)
 
-    if choice == "Top 5 States based on Transaction Amount and Transaction Count":
-        chartname_amount = "Top 5 States based on Transaction Amount"
-        chartname_count = "Top 5 States based on Transaction Count"
-    else:
-        chartname_amount = "Bottom 5 States based on Transaction Amount"
-        chartname_count = "Bottom 5 States based on Transaction Count"
-    with tab_chart:
-        col1,col2 = st.columns(2)
-        with col1:
-            fig_filtered = px.bar(
-                amount_df,
-                x="States",
-                y="Transaction_amount",
-                title=chartname_amount,
-                color="Transaction_amount",
-                color_continuous_scale="Rainbow",
-                hover_data={
-                    "Transaction_amount": ":,.0f",
-                    "Transaction_Percentage": True,
-                    "States": False
-                }
-            )
-            fig_filtered.update_layout(xaxis_tickangle=45)
-            st.plotly_chart(fig_filtered, use_container_width=True)
+        if choice == "Top 5 States based on Transaction Amount and Transaction Count":
+            chartname_amount = "Top 5 States based on Transaction Amount"
+            chartname_count = "Top 5 States based on Transaction Count"
+        else:
+            chartname_amount = "Bottom 5 States based on Transaction Amount"
+            chartname_count = "Bottom 5 States based on Transaction Count"
+        with tab_chart:
+            col1,col2 = st.columns(2)
+            with col1:
+                fig_filtered = charts.bar(
+                    amount_df,
+                    x="States",
+                    y="Transaction_amount",
+                    title=chartname_amount,
+                    color="Transaction_amount",
+                    color_continuous_scale="Rainbow",
+                    hover_data={
+                        "Transaction_amount": ":,.0f",
+                        "Transaction_Percentage": True,
+                        "States": False
+                    }
+                )
+                fig_filtered.update_layout(xaxis_tickangle=45)
+                plotly_chart(fig_filtered, use_container_width=True)
         
-        with col2:
-            fig_count = px.bar(
-                count_df,
-                x="States",
-                y="Transaction_count",
-                title=chartname_count,
-                color="Transaction_count",
-                color_continuous_scale="Rainbow",
-                hover_data={
-                    "Transaction_count": ":,.0f",
-                    "Count_Percentage": True,
-                    "States": False
-                }
-            )
-            fig_count.update_layout(xaxis_tickangle=45)
-            st.plotly_chart(fig_count, use_container_width=True)
+            with col2:
+                fig_count = charts.bar(
+                    count_df,
+                    x="States",
+                    y="Transaction_count",
+                    title=chartname_count,
+                    color="Transaction_count",
+                    color_continuous_scale="Rainbow",
+                    hover_data={
+                        "Transaction_count": ":,.0f",
+                        "Count_Percentage": True,
+                        "States": False
+                    }
+                )
+                fig_count.update_layout(xaxis_tickangle=45)
+                plotly_chart(fig_count, use_container_width=True)
 
-    with tab_data:
-        col1,col2 = st.columns(2)
-        with col1:
-            st.dataframe(amount_df, hide_index=True, use_container_width=True)
-        with col2:    
-            st.dataframe(count_df, hide_index=True, use_container_width=True)
+        with tab_data:
+            col1,col2 = st.columns(2)
+            with col1:
+                st.dataframe(amount_df, hide_index=True, use_container_width=True)
+            with col2:    
+                st.dataframe(count_df, hide_index=True, use_container_width=True)
+
+    top_states_section()
 
+@profiler.profiled()
 def ques2(Aggre_user, Map_user):
     st.header("Device Dominance and User Engagement Analysis")
-    st.subheader("Device Brand Engagement Across States")
-    years = ["All"] + sorted(Aggre_user["Years"].unique().tolist())
-    selected_years = st.selectbox("Select Year", years, key="brand_year1")
-
-    quarters = ["All"] + sorted(Aggre_user["Quarter"].unique().tolist())
-    selected_quarters = st.selectbox("Select Quarter", quarters, key="brand_quarter1")
-    def filter_data(df, selected_years, selected_quarters):
-        if selected_years != "All":
-            df = df[df["Years"] == int(selected_years)]
-        if selected_quarters != "All":
-            df = df[df["Quarter"] == selected_quarters]   
-        return df
-
-    agg_user_filtered = filter_data(Aggre_user, selected_years, selected_quarters)
-    brand_state = agg_user_filtered.groupby(["States", "Brand"]).agg({
-        "Transaction_count": "sum",
-        "Transaction_Percentage": "mean"
-    }).reset_index()
-
-    # Engagement Score = Transaction_count × Transaction_Percentage
-    brand_state["Engagement_Score"] = (
-        brand_state["Transaction_count"] * brand_state["Transaction_Percentage"]
-    )
-    state_filter = brand_state.groupby("States").agg({
-        "Transaction_count": "sum",
-        "Transaction_Percentage": "mean"
-    }).reset_index()
-    state_filter["Engagement_Score"] = (
-        state_filter["Transaction_count"] * state_filter["Transaction_Percentage"]
-    )
-    best_brand = brand_state.loc[
-    brand_state.groupby("States")["Engagement_Score"].idxmax()
-    ].reset_index(drop=True)
-    st.write("Engagement score = Transaction_count * Transaction_Percentage")
-    url = "https://gist.githubusercontent.com/jbrobst/56c13bbbf9d97d187fea01ca62ea5112/raw/e388c4cae20aa53cb5090210a42ebb9b765c0a36/india_states.geojson"
-    geo_data = json.loads(requests.get(url).content)
-    col1,col2 = st.columns(2)
-    with col1:
-        fig1 = px.choropleth(
-            state_filter ,
-            geojson=geo_data, 
-            locations="States",
-            scope="asia",
-            featureidkey="properties.ST_NM",
-            color="Engagement_Score",
-            hover_data=["Transaction_count","Transaction_Percentage"],
-            title=f"Engagement_Score in each States {selected_years} Y and {selected_quarters} Q ",
-            fitbounds="locations",
-            width=800,
-            height=600)
-        fig1.update_geos(visible=False)
-        st.plotly_chart(fig1, use_container_width=True)
-    with col2:
-        fig2 = px.choropleth(
-            best_brand,
-            geojson=geo_data, 
-            locations="States",
-            scope="asia",
-            featureidkey="properties.ST_NM",
-            color="Brand",
-            hover_data=["Engagement_Score","Brand","Transaction_count"],
-            title=f"Best brand in each states ( based on Engagement Score ) in {selected_years} Y and {selected_quarters} Q ",
-            fitbounds="locations",
-            width=800,
-            height=600)
-        fig2.update_geos(visible=False)
-        st.plotly_chart(fig2, use_container_width=True)
-    st.write("*********************************************************")    
+    @st.fragment
+    @profiler.profiled()
+    def brand_map_section():
+        st.subheader("Device Brand Engagement Across States")
+        years = ["All"] + sorted(Aggre_user["Years"].unique().tolist())
+        selected_years = st.selectbox("Select Year", years, key="brand_year1")
+
+        quarters = ["All"] + sorted(Aggre_user["Quarter"].unique().tolist())
+        selected_quarters = st.selectbox("Select Quarter", quarters, key="brand_quarter1")
+        state_filter, best_brand = brand_engagement_by_state(Aggre_user, Years=selected_years, Quarter=selected_quarters)
+        st.write("Engagement score = Transaction_count * Transaction_Percentage")
+        geo_data = load_geojson(INDIA_GEOJSON_URL)
+        col1,col2 = st.columns(2)
+        with col1:
+            fig1 = charts.choropleth(
+                state_filter ,
+                geojson=geo_data, 
+                locations="States",
+                scope="asia",
+                featureidkey="properties.ST_NM",
+                color="Engagement_Score",
+                hover_data=["Transaction_count","Transaction_Percentage"],
+                title=f"Engagement_Score in each States {selected_years} Y and {selected_quarters} Q ",
+                fitbounds="locations",
+                width=800,
+                height=600)
+            fig1.update_geos(visible=False)
+            plotly_chart(fig1, use_container_width=True)
+        with col2:
+            fig2 = charts.choropleth(
+                best_brand,
+                geojson=geo_data, 
+                locations="States",
+                scope="asia",
+                featureidkey="properties.ST_NM",
+                color="Brand",
+                hover_data=["Engagement_Score","Brand","Transaction_count"],
+                title=f"Best brand in each states ( based on Engagement Score ) in {selected_years} Y and {selected_quarters} Q ",
+                fitbounds="locations",
+                width=800,
+                height=600)
+            fig2.update_geos(visible=False)
+            plotly_chart(fig2, use_container_width=True)
+        st.write("*********************************************************")    
+
+    brand_map_section()
     
     # ---------- Device Popularity ----------
-    st.subheader("Device Brands by Transaction Count and Transaction Percentage")
+    @st.fragment
+    @profiler.profiled()
+    def device_popularity_section():
+        st.subheader("Device Brands by Transaction Count and Transaction Percentage")
 
-    States = ["All"] + sorted(Aggre_user["States"].unique().tolist())
-    selected_States= st.selectbox("Select States", States, key="brand_States")
+        States = ["All"] + sorted(Aggre_user["States"].unique().tolist())
+        selected_States= st.selectbox("Select States", States, key="brand_States")
    
-    years = ["All"] + sorted(Aggre_user["Years"].unique().tolist())
-    selected_year = st.selectbox("Select Year", years, key="brand_year")
+        years = ["All"] + sorted(Aggre_user["Years"].unique().tolist())
+        selected_year = st.selectbox("Select Year", years, key="brand_year")
 
-    quarters = ["All"] + sorted(Aggre_user["Quarter"].unique().tolist())
-    selected_quarter = st.selectbox("Select Quarter", quarters, key="brand_quarter")
+        quarters = ["All"] + sorted(Aggre_user["Quarter"].unique().tolist())
+        selected_quarter = st.selectbox("Select Quarter", quarters, key="brand_quarter")
     
-    filtered_data = Aggre_user.copy()
-    if selected_year != "All":
-        filtered_data = filtered_data[filtered_data["Years"] == selected_year]
-    if selected_quarter != "All":
-        filtered_data = filtered_data[filtered_data["Quarter"] == selected_quarter]
-    if selected_States != "All":
-        filtered_data =  filtered_data[filtered_data["States"] == selected_States]
+        filtered_data = filter_slice(Aggre_user, Years=selected_year, Quarter=selected_quarter, States=selected_States)
     
     
-    if filtered_data.empty:
-        st.warning("⚠️ No data available.")
+        if filtered_data.empty:
+            st.warning("⚠️ No data available.")
         
-    brand_users = (
-        filtered_data.groupby("Brand")["Transaction_count"].sum()
-        .reset_index()
-        .sort_values(by="Transaction_count", ascending=False)
-    )
-    top5_users = brand_users.nlargest(5, "Transaction_count")
-    bottom5_users= brand_users.nsmallest(5, "Transaction_count")
+        brand_users = totals_by(filtered_data, "Brand", ["Transaction_count"], sort_by="Transaction_count")
+        top5_users = brand_users.nlargest(5, "Transaction_count")
+        bottom5_users= brand_users.nsmallest(5, "Transaction_count")
     
-    brand_users1 = (
-        filtered_data.groupby("Brand")["Transaction_Percentage"].sum().round(2)
-        .reset_index()
-        .sort_values(by="Transaction_Percentage", ascending=False)
-    )
-    top5_users1 = brand_users1.nlargest(5, "Transaction_Percentage")
-    bottom5_users1= brand_users1.nsmallest(5, "Transaction_Percentage")
+        brand_users1 = totals_by(filtered_data, "Brand", ["Transaction_Percentage"]).round({"Transaction_Percentage": 2})
+        brand_users1 = brand_users1.sort_values(by="Transaction_Percentage", ascending=False)
+        top5_users1 = brand_users1.nlargest(5, "Transaction_Percentage")
+        bottom5_users1= brand_users1.nsmallest(5, "Transaction_Percentage")
     
-    tab1,tab2 = st.tabs(["Transaction count","Transaction Percentage"])
-    with tab1:
-        col1,col2 = st.columns(2)
-        with col1:
-        # Bar chart
-            fig1 = px.bar(
-                brand_users,
-                x="Brand",
-                y="Transaction_count",
-                title=f"Device Brand by Transaction count  ({selected_year}, {selected_quarter})",
-                text="Transaction_count"
-            )
-            fig1.update_traces(textposition="outside")
-            st.plotly_chart(fig1, use_container_width=True)
-        
-        with col2:
-            choice= st.selectbox("Select Top or Bottom",["Top 5 Device Brand by Transaction count","Bottom 5 Device Brand by Transaction count"])
-            if choice == "Top 5 Device Brand by Transaction count":
-                fig1= px.bar(
-                top5_users,
-                x="Brand",
-                y="Transaction_count",
-                title=f"Top 5 Transaction count by Device Brand ({selected_year}, {selected_quarter})",
-                text="Transaction_count"
+        tab1,tab2 = st.tabs(["Transaction count","Transaction Percentage"])
+        with tab1:
+            col1,col2 = st.columns(2)
+            with col1:
+            # Bar chart
+                fig1 = charts.bar(
+                    brand_users,
+                    x="Brand",
+                    y="Transaction_count",
+                    title=f"Device Brand by Transaction count  ({selected_year}, {selected_quarter})",
+                    text="Transaction_count"
                 )
                 fig1.update_traces(textposition="outside")
-                st.plotly_chart(fig1, use_container_width=True)
-            elif choice == "Bottom 5 Device Brand by Transaction count":
-                fig2= px.bar(
-                bottom5_users,
-                x="Brand",
-                y="Transaction_count",
-                title=f"Bottom 5 Transaction count by Device Brand ({selected_year}, {selected_quarter})",
-                text="Transaction_count"
-                )
-                fig2.update_traces(textposition="outside")
-                st.plotly_chart(fig2, use_container_width=True)
-    with tab2:
-        col1,col2 = st.columns(2)        
-        with col1:
-            fig1 = px.bar(
-                brand_users1,
-                x="Brand",
-                y="Transaction_Percentage",
-                title=f"Device Brand by Transaction Percentage ({selected_year}, {selected_quarter})",
-                text="Transaction_Percentage"
-            )
-            fig1.update_traces(textposition="outside")
-            st.plotly_chart(fig1, use_container_width=True)
-        with col2:
-            choice= st.selectbox("Select Top or Bottom",["Top 5 Device Brand by Transaction Percentage","Bottom 5 Device Brand by Transaction Percentage"],key="Transaction_Percentage")
-            if choice == "Top 5 Device Brand by Transaction Percentage":
-                fig1= px.bar(
-                top5_users1,
-                x="Brand",
-                y="Transaction_Percentage",
-                title=f"Top 5 Transaction count by Device Brand ({selected_year}, {selected_quarter})",
-                text="Transaction_Percentage"
+                plotly_chart(fig1, use_container_width=True)
+        
+            with col2:
+                choice= st.selectbox("Select Top or Bottom",["Top 5 Device Brand by Transaction count","Bottom 5 Device Brand by Transaction count"])
+                if choice == "Top 5 Device Brand by Transaction count":
+                    fig1= charts.bar(
+                    top5_users,
+                    x="Brand",
+                    y="Transaction_count",
+                    title=f"Top 5 Transaction count by Device Brand ({selected_year}, {selected_quarter})",
+                    text="Transaction_count"
+                    )
+                    fig1.update_traces(textposition="outside")
+                    plotly_chart(fig1, use_container_width=True)
+                elif choice == "Bottom 5 Device Brand by Transaction count":
+                    fig2= charts.bar(
+                    bottom5_users,
+                    x="Brand",
+                    y="Transaction_count",
+                    title=f"Bottom 5 Transaction count by Device Brand ({selected_year}, {selected_quarter})",
+                    text="Transaction_count"
+                    )
+                    fig2.update_traces(textposition="outside")
+                    plotly_chart(fig2, use_container_width=True)
+        with tab2:
+            col1,col2 = st.columns(2)        
+            with col1:
+                fig1 = charts.bar(
+                    brand_users1,
+                    x="Brand",
+                    y="Transaction_Percentage",
+                    title=f"Device Brand by Transaction Percentage ({selected_year}, {selected_quarter})",
+                    text="Transaction_Percentage"
                 )
                 fig1.update_traces(textposition="outside")
-                st.plotly_chart(fig1, use_container_width=True)
-            elif choice == "Bottom 5 Device Brand by Transaction Percentage":
-                fig2= px.bar(
-                bottom5_users1,
-                x="Brand",
-                y="Transaction_Percentage",
-                title=f"Bottom 5 Transaction Percentage by Device Brand ({selected_year}, {selected_quarter})",
-                text="Transaction_Percentage"
-                )
-                fig2.update_traces(textposition="outside")
-                st.plotly_chart(fig2, use_container_width=True)
+                plotly_chart(fig1, use_container_width=True)
+            with col2:
+                choice= st.selectbox("Select Top or Bottom",["Top 5 Device Brand by Transaction Percentage","Bottom 5 Device Brand by Transaction Percentage"],key="Transaction_Percentage")
+                if choice == "Top 5 Device Brand by Transaction Percentage":
+                    fig1= charts.bar(
+                    top5_users1,
+                    x="Brand",
+                    y="Transaction_Percentage",
+                    title=f"Top 5 Transaction count by Device Brand ({selected_year}, {selected_quarter})",
+                    text="Transaction_Percentage"
+                    )
+                    fig1.update_traces(textposition="outside")
+                    plotly_chart(fig1, use_container_width=True)
+                elif choice == "Bottom 5 Device Brand by Transaction Percentage":
+                    fig2= charts.bar(
+                    bottom5_users1,
+                    x="Brand",
+                    y="Transaction_Percentage",
+                    title=f"Bottom 5 Transaction Percentage by Device Brand ({selected_year}, {selected_quarter})",
+                    text="Transaction_Percentage"
+                    )
+                    fig2.update_traces(textposition="outside")
+                    plotly_chart(fig2, use_container_width=True)
+
+    device_popularity_section()
 
     # Device Trend Over Time
     st.subheader("Device Brand Trend Over Time")
     col1,col2 = st.columns(2)
     with col1:
-        brand_trend = (
-            Aggre_user.groupby(["Years", "Quarter", "Brand"])["Transaction_count"].sum()
-            .reset_index()
-        )
-        fig3 = px.line(
-            brand_trend,
+        trend = brand_trend(Aggre_user)
+        fig3 = charts.line(
+            trend,
             x="Years",
             y="Transaction_count",
             color="Brand",
@@ -1427,23 +1392,25 @@ def ques2(Aggre_user, Map_user):
             title="Device Brand Registered Users Over Time",
             markers=True
         )
-        st.plotly_chart(fig3, use_container_width=True)
+        plotly_chart(fig3, use_container_width=True)
 
     # Device Trend Over Time for each Brand 
     with col2: 
-        brands = sorted(Aggre_user["Brand"].unique().tolist()) 
-        selected_brand = st.selectbox("Select Mobile Brand", brands, key="trend_brand") 
-        Aggre_user["Years"] = Aggre_user["Years"].astype(str) 
-        
-        brand_trend = ( Aggre_user[Aggre_user["Brand"] == selected_brand].groupby(["Years", "Quarter"])["Transaction_count"].sum() .reset_index() ) 
-        plot_line(brand_trend, "Years", "Transaction_count", f"Registered Users Trend for {selected_brand}", color="Quarter")
+        @st.fragment
+        @profiler.profiled()
+        def brand_trend_section():
+            brands = sorted(Aggre_user["Brand"].unique().tolist()) 
+            selected_brand = st.selectbox("Select Mobile Brand", brands, key="trend_brand") 
+            trend = brand_trend(Aggre_user, selected_brand)
+            plot_line(trend, "Years", "Transaction_count", f"Registered Users Trend for {selected_brand}", color="Quarter")
+
+        brand_trend_section()
     
     # Engagement by Brand
     st.subheader("Device Brand Engagement Comparison")
-    brand_state = Aggre_user.groupby("Brand")["Transaction_count"].sum().reset_index()
-    brand_state["Engagement_Score"] = (brand_state["Transaction_count"] * (Aggre_user.groupby("Brand")["Transaction_Percentage"].mean().values) )
+    brand_state = brand_engagement(Aggre_user)
 
-    fig5 = px.scatter(
+    fig5 = charts.scatter(
         brand_state,
         x="Transaction_count",
         y="Engagement_Score",
@@ -1452,223 +1419,207 @@ def ques2(Aggre_user, Map_user):
         title="Device Dominance vs Engagement",
         hover_data=["Brand"]
     )
-    st.plotly_chart(fig5, use_container_width=True)
+    plotly_chart(fig5, use_container_width=True)
     
     # User in each states
-    st.subheader(" States by Registered Users / App Open ")
-    years = ["All"] + sorted(Map_user["Years"].unique().tolist())
-    selected_year = st.selectbox("Select Year", years, key="user_year")
+    @st.fragment
+    @profiler.profiled()
+    def user_states_section():
+        st.subheader(" States by Registered Users / App Open ")
+        years = ["All"] + sorted(Map_user["Years"].unique().tolist())
+        selected_year = st.selectbox("Select Year", years, key="user_year")
 
-    quarters = ["All"] + sorted(Map_user["Quarter"].unique().tolist())
-    selected_quarter = st.selectbox("Select Quarter", quarters, key="user_quarter")
-    filtered_data = Map_user.copy()
-    if selected_year != "All":
-        filtered_data = filtered_data[filtered_data["Years"] == selected_year]
-    if selected_quarter != "All":
-        filtered_data = filtered_data[filtered_data["Quarter"] == selected_quarter]
+        quarters = ["All"] + sorted(Map_user["Quarter"].unique().tolist())
+        selected_quarter = st.selectbox("Select Quarter", quarters, key="user_quarter")
+        filtered_data = filter_slice(Map_user, Years=selected_year, Quarter=selected_quarter)
     
     
-    if filtered_data.empty:
-        st.warning("⚠️ No data available.")
+        if filtered_data.empty:
+            st.warning("⚠️ No data available.")
         
-    Registered_users = (
-        filtered_data.groupby("States")["RegisteredUser"].sum()
-        .reset_index()
-        .sort_values(by="RegisteredUser", ascending=False)
-    )
-    App_open = (
-        filtered_data.groupby("States")["AppOpens"].sum()
-        .reset_index()
-        .sort_values(by="AppOpens", ascending=False)
-    )
+        Registered_users = totals_by(filtered_data, "States", ["RegisteredUser"], sort_by="RegisteredUser")
+        App_open = totals_by(filtered_data, "States", ["AppOpens"], sort_by="AppOpens")
     
-    tab1,tab2,tab3 = st.tabs(["Registered User","App opens","User Engagement"])
-    with tab1:
-        col1,col2 = st.columns(2)
-        with col1:
-            url = "https://gist.githubusercontent.com/jbrobst/56c13bbbf9d97d187fea01ca62ea5112/raw/e388c4cae20aa53cb5090210a42ebb9b765c0a36/india_states.geojson"
-            geo_data = json.loads(requests.get(url).content)
-            fig4 = px.choropleth(
-                Registered_users,
-                geojson=geo_data, 
-                locations="States",
-                scope="asia",
-                featureidkey="properties.ST_NM",
-                color="RegisteredUser",
-                hover_data=["RegisteredUser"],
-                title=f"Registered Users in each states {selected_year} Y and {selected_quarter} Q",
-                fitbounds="locations",
-                width=1000,
-                height=600)
-            fig4.update_geos(visible=False)
-            st.plotly_chart(fig4, use_container_width=True)
-        with col2:    
-            fig2 = px.bar(
-                Registered_users,
-                x="States",
-                y="RegisteredUser",
-                title=f"Registered User in {selected_year} Y, {selected_quarter} Q",
-                text="RegisteredUser"
-            )
-            fig2.update_traces(textposition="outside")
-            st.plotly_chart(fig2, use_container_width=True)
+        tab1,tab2,tab3 = st.tabs(["Registered User","App opens","User Engagement"])
+        with tab1:
+            col1,col2 = st.columns(2)
+            with col1:
+                geo_data = load_geojson(INDIA_GEOJSON_URL)
+                fig4 = charts.choropleth(
+                    Registered_users,
+                    geojson=geo_data, 
+                    locations="States",
+                    scope="asia",
+                    featureidkey="properties.ST_NM",
+                    color="RegisteredUser",
+                    hover_data=["RegisteredUser"],
+                    title=f"Registered Users in each states {selected_year} Y and {selected_quarter} Q",
+                    fitbounds="locations",
+                    width=1000,
+                    height=600)
+                fig4.update_geos(visible=False)
+                plotly_chart(fig4, use_container_width=True)
+            with col2:    
+                fig2 = charts.bar(
+                    Registered_users,
+                    x="States",
+                    y="RegisteredUser",
+                    title=f"Registered User in {selected_year} Y, {selected_quarter} Q",
+                    text="RegisteredUser"
+                )
+                fig2.update_traces(textposition="outside")
+                plotly_chart(fig2, use_container_width=True)
         
-    with tab2:
-        col1,col2 = st.columns(2)
-        with col1:
-            url = "https://gist.githubusercontent.com/jbrobst/56c13bbbf9d97d187fea01ca62ea5112/raw/e388c4cae20aa53cb5090210a42ebb9b765c0a36/india_states.geojson"
-            geo_data = json.loads(requests.get(url).content)
+        with tab2:
+            col1,col2 = st.columns(2)
+            with col1:
+                geo_data = load_geojson(INDIA_GEOJSON_URL)
             
-            fig4 = px.choropleth(
-                App_open,
-                geojson=geo_data, 
-                locations="States",
-                scope="asia",
-                featureidkey="properties.ST_NM",
-                color="AppOpens",
-                hover_data=["AppOpens"],
-                title=f"App Opens in each states in {selected_year} Y and {selected_quarter} Q",
-                fitbounds="locations",
-                width=1000,
-                height=600)
-            fig4.update_geos(visible=False)
-            st.plotly_chart(fig4, use_container_width=True)
-        with col2:
-            fig2 = px.bar(
-                App_open,
-                x="States",
-                y="AppOpens",
-                title=f"App Opens in {selected_year} Y, {selected_quarter} Q",
-                text="AppOpens"
-            )
-            fig2.update_traces(textposition="outside")
-            st.plotly_chart(fig2, use_container_width=True)
+                fig4 = charts.choropleth(
+                    App_open,
+                    geojson=geo_data, 
+                    locations="States",
+                    scope="asia",
+                    featureidkey="properties.ST_NM",
+                    color="AppOpens",
+                    hover_data=["AppOpens"],
+                    title=f"App Opens in each states in {selected_year} Y and {selected_quarter} Q",
+                    fitbounds="locations",
+                    width=1000,
+                    height=600)
+                fig4.update_geos(visible=False)
+                plotly_chart(fig4, use_container_width=True)
+            with col2:
+                fig2 = charts.bar(
+                    App_open,
+                    x="States",
+                    y="AppOpens",
+                    title=f"App Opens in {selected_year} Y, {selected_quarter} Q",
+                    text="AppOpens"
+                )
+                fig2.update_traces(textposition="outside")
+                plotly_chart(fig2, use_container_width=True)
 
-    with tab3:
+        with tab3:
         
-        #User Engagement 
-        st.subheader("User Engagement (AppOpens per Registered User)")
-        map_user_group = (
-            filtered_data.groupby("States")[["RegisteredUser", "AppOpens"]].sum()
-            .reset_index()
-        )
-        map_user_group["Engagement_Ratio"] = (
-            map_user_group["AppOpens"] / map_user_group["RegisteredUser"]
-        )
+            #User Engagement 
+            st.subheader("User Engagement (AppOpens per Registered User)")
+            map_user_group = state_user_engagement(filtered_data)
         
-        col1,col2 = st.columns(2)
-        with col1:
-            fig2 = px.choropleth(
-                map_user_group,
-                geojson=geo_data, 
-                locations="States",
-                scope="asia",
-                featureidkey="properties.ST_NM",
-                color="Engagement_Ratio",
-                hover_data=["RegisteredUser", "AppOpens"],
-                title=f"User Engagement in each states  {selected_year} Y and {selected_quarter} Q ",
-                fitbounds="locations",
-                width=800,
-                height=600)
-            fig2.update_geos(visible=False)
-            
-            st.plotly_chart(fig2, use_container_width=True)
-        with col2:
-            fig2 = px.bar(
+            col1,col2 = st.columns(2)
+            with col1:
+                fig2 = charts.choropleth(
                     map_user_group,
-                    x="States",
-                    y="Engagement_Ratio",
-                    title=f"User Engagement in each state {selected_year} Y and {selected_quarter} Q",
-                    text="Engagement_Ratio"
-                )
-            fig2.update_traces(textposition="inside")
-            st.plotly_chart(fig2, use_container_width=True) 
+                    geojson=geo_data, 
+                    locations="States",
+                    scope="asia",
+                    featureidkey="properties.ST_NM",
+                    color="Engagement_Ratio",
+                    hover_data=["RegisteredUser", "AppOpens"],
+                    title=f"User Engagement in each states  {selected_year} Y and {selected_quarter} Q ",
+                    fitbounds="locations",
+                    width=800,
+                    height=600)
+                fig2.update_geos(visible=False)
+            
+                plotly_chart(fig2, use_container_width=True)
+            with col2:
+                fig2 = charts.bar(
+                        map_user_group,
+                        x="States",
+                        y="Engagement_Ratio",
+                        title=f"User Engagement in each state {selected_year} Y and {selected_quarter} Q",
+                        text="Engagement_Ratio"
+                    )
+                fig2.update_traces(textposition="inside")
+                plotly_chart(fig2, use_container_width=True) 
+
+    user_states_section()
     
+@profiler.profiled()
 def ques3(df_agg, df_map, df_top, Top_user, Map_user):
     st.write("*****************************************************************************************************")
     st.header("Insurance Penetration & Trends Dashboard ")
 
     # 1. Insurance Map 
-    st.subheader("Insurance Penetration Map")
-    years_map = ["All"] + sorted(df_agg.get("Years", pd.Series()).unique().tolist())
-    quarters_map = ["All"] + sorted(df_agg.get("Quarter", pd.Series()).unique().tolist())
-    sel_year_map = st.selectbox("Select Year (Map)", years_map, key="map_year")
-    sel_quarter_map = st.selectbox("Select Quarter (Map)", quarters_map, key="map_quarter")
+    @st.fragment
+    @profiler.profiled()
+    def insurance_map_section():
+        st.subheader("Insurance Penetration Map")
+        years_map = ["All"] + sorted(df_agg.get("Years", pd.Series()).unique().tolist())
+        quarters_map = ["All"] + sorted(df_agg.get("Quarter", pd.Series()).unique().tolist())
+        sel_year_map = st.selectbox("Select Year (Map)", years_map, key="map_year")
+        sel_quarter_map = st.selectbox("Select Quarter (Map)", quarters_map, key="map_quarter")
     
 
-    agg_filt = df_agg.copy()
-    if sel_year_map != "All":
-        agg_filt = agg_filt[agg_filt["Years"] == sel_year_map]
-    if sel_quarter_map != "All":
-        agg_filt = agg_filt[agg_filt["Quarter"] == sel_quarter_map]
+        state_rank = pages.index("insurance_state")
+        map_df = state_rank.table(sel_year_map, sel_quarter_map)
 
-    if agg_filt.empty:
-        st.warning("⚠️ No state-level data available.")
-    else:
-        agg_filt["States"] = agg_filt["States"].str.title()
-        with st.spinner("Loading map..."):
-            tab1,tab2 = st.tabs(["Insurance amount" , "Insurance count"])
-            with tab1:
-                col1,col2 = st.columns(2)
-                with col1:
-                    url = "https://gist.githubusercontent.com/jbrobst/56c13bbbf9d97d187fea01ca62ea5112/raw/e388c4cae20aa53cb5090210a42ebb9b765c0a36/india_states.geojson"
-                    geojson = requests.get(url).json()
-                    map_df = safe_groupby(agg_filt, ["States"], {"Transaction_amount": "sum", "Transaction_count": "sum"})
-                    fig_map = px.choropleth(
-                        map_df,
-                        geojson=geojson,
-                        featureidkey="properties.ST_NM",
-                        locations="States",
-                        scope="asia",
-                        color="Transaction_amount",
-                        hover_data={"Transaction_count": True, "Transaction_amount": True},
-                        title=f"Insurance Amount({sel_year_map}, Q{sel_quarter_map})",
-                        width=1000, height=600
-                    )
-                    fig_map.update_geos(fitbounds="locations", visible=False)
-                    st.plotly_chart(fig_map, use_container_width=True)
-                plot_bar(map_df.nlargest(10, "Transaction_amount"), "States", "Transaction_amount", "Top 10 States by Insurance Amount", color="Transaction_amount")
-                plot_bar(map_df.nsmallest(10, "Transaction_amount"), "States", "Transaction_amount", "Bottom 10 States by Insurance Amount", color="Transaction_amount")
-                with col2:
-                    fig1 = px.bar(
-                        map_df,
-                        x="States",
-                        y="Transaction_amount",
-                        title =f"Insurance Amount({sel_year_map}, Q{sel_quarter_map})",
-                        text = "Transaction_amount"
+        if map_df.empty:
+            st.warning("⚠️ No state-level data available.")
+        else:
+            with st.spinner("Loading map..."):
+                tab1,tab2 = st.tabs(["Insurance amount" , "Insurance count"])
+                with tab1:
+                    col1,col2 = st.columns(2)
+                    with col1:
+                        geojson = load_geojson(INDIA_GEOJSON_URL)
+                        fig_map = charts.choropleth(
+                            map_df,
+                            geojson=geojson,
+                            featureidkey="properties.ST_NM",
+                            locations="States",
+                            scope="asia",
+                            color="Transaction_amount",
+                            hover_data={"Transaction_count": True, "Transaction_amount": True},
+                            title=f"Insurance Amount({sel_year_map}, Q{sel_quarter_map})",
+                            width=1000, height=600
                         )
-                    fig1.update_traces(textposition="outside")
-                    st.plotly_chart(fig1, use_container_width=True)
+                        fig_map.update_geos(fitbounds="locations", visible=False)
+                        plotly_chart(fig_map, use_container_width=True)
+                    plot_bar(state_rank.top("Transaction_amount", 10, sel_year_map, sel_quarter_map), "States", "Transaction_amount", "Top 10 States by Insurance Amount", color="Transaction_amount")
+                    plot_bar(state_rank.bottom("Transaction_amount", 10, sel_year_map, sel_quarter_map), "States", "Transaction_amount", "Bottom 10 States by Insurance Amount", color="Transaction_amount")
+                    with col2:
+                        fig1 = charts.bar(
+                            map_df,
+                            x="States",
+                            y="Transaction_amount",
+                            title =f"Insurance Amount({sel_year_map}, Q{sel_quarter_map})",
+                            text = "Transaction_amount"
+                            )
+                        fig1.update_traces(textposition="outside")
+                        plotly_chart(fig1, use_container_width=True)
                         
-            with tab2:
-                col1,col2 = st.columns(2)
-                with col1:
-                    map_df = safe_groupby(agg_filt, ["States"], {"Transaction_amount": "sum", "Transaction_count": "sum"})
-                    fig_map = px.choropleth(
-                        map_df,
-                        geojson=geojson,
-                        featureidkey="properties.ST_NM",
-                        locations="States",
-                        scope="asia",
-                        color="Transaction_count",
-                        hover_data={"Transaction_count": True, "Transaction_amount": True},
-                        title=f"Insurance Count ({sel_year_map}, Q{sel_quarter_map})",
-                        width=1000, height=600
-                    )
-                    fig_map.update_geos(fitbounds="locations", visible=False)
-                    st.plotly_chart(fig_map, use_container_width=True)
-                with col2:
-                    fig1 = px.bar(
-                        map_df,
-                        x="States",
-                        y="Transaction_count",
-                        title =f"Insurance Count ({sel_year_map}, Q{sel_quarter_map})",
-                        text = "Transaction_count"
+                with tab2:
+                    col1,col2 = st.columns(2)
+                    with col1:
+                        fig_map = charts.choropleth(
+                            map_df,
+                            geojson=geojson,
+                            featureidkey="properties.ST_NM",
+                            locations="States",
+                            scope="asia",
+                            color="Transaction_count",
+                            hover_data={"Transaction_count": True, "Transaction_amount": True},
+                            title=f"Insurance Count ({sel_year_map}, Q{sel_quarter_map})",
+                            width=1000, height=600
                         )
-                    fig1.update_traces(textposition="outside")
-                    st.plotly_chart(fig1, use_container_width=True)
-                plot_bar(map_df.nlargest(10, "Transaction_count"), "States", "Transaction_count", "Top 10 States by Transaction Count", color="Transaction_count")
-                plot_bar(map_df.nsmallest(10, "Transaction_count"), "States", "Transaction_count", "Bottom 10 States by Transaction Count", color="Transaction_count")
+                        fig_map.update_geos(fitbounds="locations", visible=False)
+                        plotly_chart(fig_map, use_container_width=True)
+                    with col2:
+                        fig1 = charts.bar(
+                            map_df,
+                            x="States",
+                            y="Transaction_count",
+                            title =f"Insurance Count ({sel_year_map}, Q{sel_quarter_map})",
+                            text = "Transaction_count"
+                            )
+                        fig1.update_traces(textposition="outside")
+                        plotly_chart(fig1, use_container_width=True)
+                    plot_bar(state_rank.top("Transaction_count", 10, sel_year_map, sel_quarter_map), "States", "Transaction_count", "Top 10 States by Transaction Count", color="Transaction_count")
+                    plot_bar(state_rank.bottom("Transaction_count", 10, sel_year_map, sel_quarter_map), "States", "Transaction_count", "Bottom 10 States by Transaction Count", color="Transaction_count")
+
+    insurance_map_section()
     
     st.write("*****************************************************************************************************")
     st.subheader("📈 Insurance Growth Trends (All India)")
@@ -1677,164 +1628,154 @@ def ques3(df_agg, df_map, df_top, Top_user, Map_user):
 
 
     st.write("*****************************************************************************************************")
-    st.subheader("📍 District & Pincode Hotspots")
-    years_hot = ["All"] + sorted(df_map.get("Years", pd.Series()).unique().tolist())
-    quarters_hot = ["All"] + sorted(df_map.get("Quarter", pd.Series()).unique().tolist())
-    states_hot = ["All"] + sorted(df_map.get("States", pd.Series()).unique().tolist())
-    sel_year_hot = st.selectbox("Select Year (Hotspots)", years_hot, key="hot_year")
-    sel_quarter_hot = st.selectbox("Select Quarter (Hotspots)", quarters_hot, key="hot_quarter")
-    sel_state_hot = st.selectbox("Select State (Hotspots)", states_hot, key="hot_state")
-    data = df_map.copy()
-    if sel_state_hot != "All":
-        data = data[data["States"] == sel_state_hot]
-    if sel_year_hot != "All":
-            data = data[data["Years"] == int(sel_year_hot)]
-    if sel_quarter_hot != "All":
-            data = data[data["Quarter"] == int(sel_quarter_hot)]
-    grouped = data.groupby(["States","District"])[["Transaction_amount", "Transaction_count"]].sum().reset_index()
-    if grouped.empty:
-        st.warning("No data available for the selected filters.")
-        
-    top5_amount = grouped.nlargest(5, "Transaction_amount")
-    top5_count = grouped.nlargest(5, "Transaction_count")
-    bottom5_amount = grouped.nsmallest(5, "Transaction_amount")
-    bottom5_count = grouped.nsmallest(5, "Transaction_count")
-    
-    data1 = df_top.copy()
-    if sel_state_hot != "All":
-        data1 = data1[data1["States"] == sel_state_hot]
-    if sel_year_hot != "All":
-        data1 = data1[data1["Years"] == int(sel_year_hot)]
-    if sel_quarter_hot != "All":
-        data1 = data1[data1["Quarter"] == int(sel_quarter_hot)]
-    grouped1 = data1.groupby(["States","Pincodes"])[["Transaction_amount", "Transaction_count"]].sum().reset_index()
-    if grouped.empty:
-        st.warning("No data available for the selected filters.")
-        
-    top5_amount1 = grouped1.nlargest(5, "Transaction_amount")
-    top5_count1 = grouped1.nlargest(5, "Transaction_count")
-    bottom5_amount1 = grouped1.nsmallest(5, "Transaction_amount")
-    bottom5_count1 = grouped1.nsmallest(5, "Transaction_count")
+    @st.fragment
+    @profiler.profiled()
+    def hotspots_section():
+        st.subheader("📍 District & Pincode Hotspots")
+        years_hot = ["All"] + sorted(df_map.get("Years", pd.Series()).unique().tolist())
+        quarters_hot = ["All"] + sorted(df_map.get("Quarter", pd.Series()).unique().tolist())
+        states_hot = ["All"] + sorted(df_map.get("States", pd.Series()).unique().tolist())
+        sel_year_hot = st.selectbox("Select Year (Hotspots)", years_hot, key="hot_year")
+        sel_quarter_hot = st.selectbox("Select Quarter (Hotspots)", quarters_hot, key="hot_quarter")
+        sel_state_hot = st.selectbox("Select State (Hotspots)", states_hot, key="hot_state")
+        hot_slice = {"year": sel_year_hot, "quarter": sel_quarter_hot, "where": {"States": sel_state_hot}}
+        district_rank = pages.index("insurance_district")
+        top5_amount = district_rank.top("Transaction_amount", 5, **hot_slice)
+        top5_count = district_rank.top("Transaction_count", 5, **hot_slice)
+        bottom5_amount = district_rank.bottom("Transaction_amount", 5, **hot_slice)
+        bottom5_count = district_rank.bottom("Transaction_count", 5, **hot_slice)
+        if top5_amount.empty:
+            st.warning("No data available for the selected filters.")
 
-    tab1,tab2 = st.tabs(["District - wise","Pincodes - wise"])
-    with tab1:
-        tab3,tab4 = st.tabs(["Transaction Amount","Transaction Count"])
-        with tab3:
-            col1,col2 = st.columns(2)
-            with col1:
-                fig1 = px.bar(
-                    top5_amount,
-                    x = "District",
-                    y = "Transaction_amount",
-                    title = f"Top 5 Insurance amount in {sel_state_hot} {sel_year_hot} Y and {sel_quarter_hot} Q",
-                    text = "Transaction_amount",
-                    hover_data=["States"]
-                )
-                fig1.update_traces(textposition="outside")
-                st.plotly_chart(fig1, use_container_width=True)
-            with col2:
-                fig1 = px.bar(
-                    bottom5_amount,
-                    x = "District",
-                    y = "Transaction_amount",
-                    title = f"Bottom 5 Insurance amount in {sel_state_hot} {sel_year_hot} Y and {sel_quarter_hot} Q",
-                    text = "Transaction_amount",
-                    hover_data=["States"]
-                )
-                fig1.update_traces(textposition="outside")
-                st.plotly_chart(fig1, use_container_width=True)
+        pincode_rank = pages.index("insurance_pincode")
+        top5_amount1 = pincode_rank.top("Transaction_amount", 5, **hot_slice)
+        top5_count1 = pincode_rank.top("Transaction_count", 5, **hot_slice)
+        bottom5_amount1 = pincode_rank.bottom("Transaction_amount", 5, **hot_slice)
+        bottom5_count1 = pincode_rank.bottom("Transaction_count", 5, **hot_slice)
+
+        tab1,tab2 = st.tabs(["District - wise","Pincodes - wise"])
+        with tab1:
+            tab3,tab4 = st.tabs(["Transaction Amount","Transaction Count"])
+            with tab3:
+                col1,col2 = st.columns(2)
+                with col1:
+                    fig1 = charts.bar(
+                        top5_amount,
+                        x = "District",
+                        y = "Transaction_amount",
+                        title = f"Top 5 Insurance amount in {sel_state_hot} {sel_year_hot} Y and {sel_quarter_hot} Q",
+                        text = "Transaction_amount",
+                        hover_data=["States"]
+                    )
+                    fig1.update_traces(textposition="outside")
+                    plotly_chart(fig1, use_container_width=True)
+                with col2:
+                    fig1 = charts.bar(
+                        bottom5_amount,
+                        x = "District",
+                        y = "Transaction_amount",
+                        title = f"Bottom 5 Insurance amount in {sel_state_hot} {sel_year_hot} Y and {sel_quarter_hot} Q",
+                        text = "Transaction_amount",
+                        hover_data=["States"]
+                    )
+                    fig1.update_traces(textposition="outside")
+                    plotly_chart(fig1, use_container_width=True)
         
-        with tab4:
-            col1,col2 = st.columns(2)
-            with col1:
-                fig1 = px.bar(
-                    top5_count,
-                    x = "District",
-                    y = "Transaction_count",
-                    title = f"Top 5 Insurance count in {sel_state_hot} {sel_year_hot} Y and {sel_quarter_hot} Q",
-                    text = "Transaction_count",
-                    hover_data=["States"]
-                )
-                fig1.update_traces(textposition="outside")
-                st.plotly_chart(fig1, use_container_width=True)
-            with col2:
-                fig1 = px.bar(
-                    bottom5_count,
-                    x = "District",
-                    y = "Transaction_count",
-                    title = f"Bottom 5 Insurance count in {sel_state_hot} {sel_year_hot} Y and {sel_quarter_hot} Q",
-                    text = "Transaction_count",
-                    hover_data=["States"]
-                )
-                fig1.update_traces(textposition="outside")
-                st.plotly_chart(fig1, use_container_width=True)
+            with tab4:
+                col1,col2 = st.columns(2)
+                with col1:
+                    fig1 = charts.bar(
+                        top5_count,
+                        x = "District",
+                        y = "Transaction_count",
+                        title = f"Top 5 Insurance count in {sel_state_hot} {sel_year_hot} Y and {sel_quarter_hot} Q",
+                        text = "Transaction_count",
+                        hover_data=["States"]
+                    )
+                    fig1.update_traces(textposition="outside")
+                    plotly_chart(fig1, use_container_width=True)
+                with col2:
+                    fig1 = charts.bar(
+                        bottom5_count,
+                        x = "District",
+                        y = "Transaction_count",
+                        title = f"Bottom 5 Insurance count in {sel_state_hot} {sel_year_hot} Y and {sel_quarter_hot} Q",
+                        text = "Transaction_count",
+                        hover_data=["States"]
+                    )
+                    fig1.update_traces(textposition="outside")
+                    plotly_chart(fig1, use_container_width=True)
     
-    with tab2:
-        tab3,tab4 = st.tabs(["Transaction Amount","Transaction Count"])
-        with tab3:
-            col1,col2 = st.columns(2)
-            with col1:
-                fig1 = px.bar(
-                    top5_amount1,
-                    x = "Pincodes",
-                    y = "Transaction_amount",
-                    title = f"Top 5 Insurance amount in {sel_state_hot} {sel_year_hot} Y and {sel_quarter_hot} Q",
-                    text = "Transaction_amount",
-                    hover_data=["States"]
-                )
-                fig1.update_xaxes(type="category")
-                fig1.update_traces(textposition="outside")
-                st.plotly_chart(fig1, use_container_width=True)
-            with col2:
-                fig1 = px.bar(
-                    bottom5_amount1,
-                    x = "Pincodes",
-                    y = "Transaction_amount",
-                    title = f"Bottom 5 Insurance amount in {sel_state_hot} {sel_year_hot} Y and {sel_quarter_hot} Q",
-                    text = "Transaction_amount",
-                    hover_data=["States"]
-                )
-                fig1.update_xaxes(type="category")
-                fig1.update_traces(textposition="outside")
-                st.plotly_chart(fig1, use_container_width=True)
+        with tab2:
+            tab3,tab4 = st.tabs(["Transaction Amount","Transaction Count"])
+            with tab3:
+                col1,col2 = st.columns(2)
+                with col1:
+                    fig1 = charts.bar(
+                        top5_amount1,
+                        x = "Pincodes",
+                        y = "Transaction_amount",
+                        title = f"Top 5 Insurance amount in {sel_state_hot} {sel_year_hot} Y and {sel_quarter_hot} Q",
+                        text = "Transaction_amount",
+                        hover_data=["States"]
+                    )
+                    fig1.update_xaxes(type="category")
+                    fig1.update_traces(textposition="outside")
+                    plotly_chart(fig1, use_container_width=True)
+                with col2:
+                    fig1 = charts.bar(
+                        bottom5_amount1,
+                        x = "Pincodes",
+                        y = "Transaction_amount",
+                        title = f"Bottom 5 Insurance amount in {sel_state_hot} {sel_year_hot} Y and {sel_quarter_hot} Q",
+                        text = "Transaction_amount",
+                        hover_data=["States"]
+                    )
+                    fig1.update_xaxes(type="category")
+                    fig1.update_traces(textposition="outside")
+                    plotly_chart(fig1, use_container_width=True)
         
-        with tab4:
-            col1,col2 = st.columns(2)
-            with col1:
-                fig1 = px.bar(
-                    top5_count1,
-                    x = "Pincodes",
-                    y = "Transaction_count",
-                    title = f"Top 5 Insurance count in {sel_state_hot} {sel_year_hot} Y and {sel_quarter_hot} Q",
-                    text = "Transaction_count",
-                    hover_data=["States"]
-                )
-                fig1.update_xaxes(type="category")
-                fig1.update_traces(textposition="outside")
-                st.plotly_chart(fig1, use_container_width=True)
-            with col2:
-                fig1 = px.bar(
-                    bottom5_count1,
-                    x = "Pincodes",
-                    y = "Transaction_count",
-                    title = f"Bottom 5 Insurance count in {sel_state_hot} {sel_year_hot} Y and {sel_quarter_hot} Q",
-                    text = "Transaction_count",
-                    hover_data=["States"]
-                )
-                fig1.update_xaxes(type="category")
-                fig1.update_traces(textposition="outside")
-                st.plotly_chart(fig1, use_container_width=True)
+            with tab4:
+                col1,col2 = st.columns(2)
+                with col1:
+                    fig1 = charts.bar(
+                        top5_count1,
+                        x = "Pincodes",
+                        y = "Transaction_count",
+                        title = f"Top 5 Insurance count in {sel_state_hot} {sel_year_hot} Y and {sel_quarter_hot} Q",
+                        text = "Transaction_count",
+                        hover_data=["States"]
+                    )
+                    fig1.update_xaxes(type="category")
+                    fig1.update_traces(textposition="outside")
+                    plotly_chart(fig1, use_container_width=True)
+                with col2:
+                    fig1 = charts.bar(
+                        bottom5_count1,
+                        x = "Pincodes",
+                        y = "Transaction_count",
+                        title = f"Bottom 5 Insurance count in {sel_state_hot} {sel_year_hot} Y and {sel_quarter_hot} Q",
+                        text = "Transaction_count",
+                        hover_data=["States"]
+                    )
+                    fig1.update_xaxes(type="category")
+                    fig1.update_traces(textposition="outside")
+                    plotly_chart(fig1, use_container_width=True)
+
+    hotspots_section()
             
     st.write("*****************************************************************************************************")
     st.subheader("📊 Insurance vs User Growth (State, District & Pincode)")
 
+    joins = pages.joins()
+    state_compare = joins["state"]
+    dist_compare = joins["district"]
+    pin_compare = joins["pincode"]
+
     tabs = st.tabs(["State wise", "District wise", "Pincode wise"])
     tab_state, tab_dist, tab_pin = tabs
 
     with tab_state:
-        state_ins = safe_groupby(Aggre_insurance, ["States", "Years", "Quarter"], {"Transaction_amount": "sum"})
-        state_user = safe_groupby(Map_user, ["States", "Years", "Quarter"], {"RegisteredUser": "sum"})
-        state_compare = pd.merge(state_ins, state_user, on=["States", "Years", "Quarter"], how="inner")
         plot_scatter(
             state_compare,
             x="Transaction_amount",
@@ -1845,9 +1786,6 @@ def ques3(df_agg, df_map, df_top, Top_user, Map_user):
         )
 
     with tab_dist:
-        dist_ins = safe_groupby(Map_insurance, ["States", "District", "Years", "Quarter"], {"Transaction_amount": "sum"})
-        dist_user = safe_groupby(Map_user, ["States", "District", "Years", "Quarter"], {"RegisteredUser": "sum"})
-        dist_compare = pd.merge(dist_ins, dist_user, on=["States", "District", "Years", "Quarter"], how="inner")
         plot_scatter(
             dist_compare,
             x="Transaction_amount",
@@ -1858,11 +1796,6 @@ def ques3(df_agg, df_map, df_top, Top_user, Map_user):
         )
 
     with tab_pin:
-        pin_ins = safe_groupby(Top_insurance, ["States", "Pincodes", "Years", "Quarter"], {"Transaction_amount": "sum"})
-        pin_user = safe_groupby(Top_user, ["States", "Pincodes", "Years", "Quarter"], {"RegisteredUser": "sum"})
-        pin_ins["Pincodes"] = pin_ins["Pincodes"].astype(str)
-        pin_user["Pincodes"] = pin_user["Pincodes"].astype(str)
-        pin_compare = pd.merge(pin_ins, pin_user, on=["States", "Pincodes", "Years", "Quarter"], how="inner")
         plot_scatter(
             pin_compare,
             x="Transaction_amount",
@@ -1872,273 +1805,184 @@ def ques3(df_agg, df_map, df_top, Top_user, Map_user):
             hover_data=["Pincodes", "Years", "Quarter"]
     )
     st.write("*****************************************************************************************************")
-    st.subheader("📈 Penetration & Growth Analysis (State, District & Pincode)")
+    @st.fragment
+    @profiler.profiled()
+    def penetration_section():
+        st.subheader("📈 Penetration & Growth Analysis (State, District & Pincode)")
 
-    # Year selection
-    available_years = sorted(state_compare["Years"].unique())
-    year_options = ["Overall"] + available_years
-    current_year = st.selectbox("Select Current Year", year_options, key="current_year_select")
-    selected_year = st.selectbox("Select Comparison Year", year_options, key="selected_year_select")
+        # Year selection
+        available_years = sorted(state_compare["Years"].unique())
+        year_options = ["Overall"] + available_years
+        current_year = st.selectbox("Select Current Year", year_options, key="current_year_select")
+        # growth_section() below has its own comparison year
+        st.selectbox("Select Comparison Year", year_options, key="selected_year_select")
 
-    def calc_penetration(df, group_cols, value_col, user_col):
-        df = df.copy()
-        df["Penetration"] = df[value_col] / df[user_col]
-        return df
+        penetration_year = ALL if current_year == "Overall" else current_year
+        state_pen_rank = pages.index("penetration_state")
+        dist_pen_rank = pages.index("penetration_district")
+        pin_pen_rank = pages.index("penetration_pincode")
 
-    # Apply filtering based on current_year
-    def filter_year(df, year):
-        if year != "Overall":
-            return df[df["Years"] == year]
-        return df
+        tabs1 = st.tabs(["State wise", "District wise", "Pincode wise"])
+        tab_state1, tab_dist1, tab_pin1 = tabs1
 
-    tabs1 = st.tabs(["State wise", "District wise", "Pincode wise"])
-    tab_state1, tab_dist1, tab_pin1 = tabs1
-
-    # STATE LEVEL PENETRATION
-    with tab_state1:
+        # STATE LEVEL PENETRATION
+        with tab_state1:
     
-        state_filt1 = filter_year(state_compare, current_year)
+            state_filt = state_pen_rank.table(penetration_year)
 
-        state_filt = (
-            state_filt1.groupby("States", as_index=False)
-            .agg({"Transaction_amount": "sum", "RegisteredUser": "sum"})
-        )
-        state_filt["Penetration"] = (
-            state_filt["Transaction_amount"] / state_filt["RegisteredUser"]
-        )
+            # GeoJSON for India states
+            geo_data = load_geojson(INDIA_GEOJSON_URL)
 
-        # GeoJSON for India states
-        url = "https://gist.githubusercontent.com/jbrobst/56c13bbbf9d97d187fea01ca62ea5112/raw/e388c4cae20aa53cb5090210a42ebb9b765c0a36/india_states.geojson"
-        geo_data = json.loads(requests.get(url).content)
-
-        fig = px.choropleth(
-            state_filt,
-            geojson=geo_data,
-            locations="States",
-            featureidkey="properties.ST_NM",
-            color="Penetration",
-            hover_name="States",
-            title=f"Penetration - {current_year}",
-            fitbounds="locations",
-            width=800,
-            height=600
-        )
-        fig.update_geos(visible=False)
-        st.plotly_chart(fig, use_container_width=True)
+            fig = charts.choropleth(
+                state_filt,
+                geojson=geo_data,
+                locations="States",
+                featureidkey="properties.ST_NM",
+                color="Penetration",
+                hover_name="States",
+                title=f"Penetration - {current_year}",
+                fitbounds="locations",
+                width=800,
+                height=600
+            )
+            fig.update_geos(visible=False)
+            plotly_chart(fig, use_container_width=True)
         
-        top5_states = state_filt.nlargest(5, "Penetration")
-        bottom5_states = state_filt.nsmallest(5, "Penetration")
+            top5_states = state_pen_rank.top("Penetration", 5, penetration_year)
+            bottom5_states = state_pen_rank.bottom("Penetration", 5, penetration_year)
 
-        col1, col2 = st.columns(2)
+            col1, col2 = st.columns(2)
 
-        with col1:
-            st.subheader(f"Top 5 States by Penetration ({current_year})")
-            fig_top5 = px.bar(
-            top5_states,
-            x="States",
-            y="Penetration",
-            title="Top 5 States by Penetration",
-            color="Penetration"
-        )
-            st.plotly_chart(fig_top5, use_container_width=True)
+            with col1:
+                st.subheader(f"Top 5 States by Penetration ({current_year})")
+                fig_top5 = charts.bar(
+                top5_states,
+                x="States",
+                y="Penetration",
+                title="Top 5 States by Penetration",
+                color="Penetration"
+            )
+                plotly_chart(fig_top5, use_container_width=True)
 
-        with col2:
-            st.subheader(f"Bottom 5 States by Penetration ({current_year})")
-            fig_bottom5 = px.bar(
-            bottom5_states,
-            x="States",
-            y="Penetration",
-            title="Bottom 5 States by Penetration",
-            color="Penetration"
-        )
-            st.plotly_chart(fig_bottom5, use_container_width=True)
+            with col2:
+                st.subheader(f"Bottom 5 States by Penetration ({current_year})")
+                fig_bottom5 = charts.bar(
+                bottom5_states,
+                x="States",
+                y="Penetration",
+                title="Bottom 5 States by Penetration",
+                color="Penetration"
+            )
+                plotly_chart(fig_bottom5, use_container_width=True)
 
-    # DISTRICT LEVEL PENETRATION
-    with tab_dist1:
-        dist_filt1 = calc_penetration(
-            filter_year(dist_compare, current_year), 
-            ["District", "States"], "Transaction_amount", "RegisteredUser"
-        )
+        # DISTRICT LEVEL PENETRATION
+        with tab_dist1:
+            top_state = dist_pen_rank.top("Penetration", 5, penetration_year)
+            bottom_state = dist_pen_rank.bottom("Penetration", 5, penetration_year)
 
-        top_state = dist_filt1.groupby(["District","States"])["Penetration"].mean().sort_values(ascending=False).head(5)
-        bottom_state = dist_filt1.groupby(["District","States"])["Penetration"].mean().sort_values().head(5)
+            col1, col2 = st.columns(2)
+            with col1:
+                plot_bar(top_state, "District", "Penetration",
+                        f"Top 5 Districts by Penetration ({current_year})", color="Penetration", hover_data=["States"])
+            with col2:
+                plot_bar(bottom_state, "District", "Penetration",
+                        f"Bottom 5 Districts by Penetration ({current_year})", color="Penetration", hover_data=["States"])
 
-        col1, col2 = st.columns(2)
-        with col1:
-            plot_bar(top_state.reset_index(), "District", "Penetration",
-                    f"Top 5 Districts by Penetration ({current_year})", color="Penetration", hover_data=["States"])
-        with col2:
-            plot_bar(bottom_state.reset_index(), "District", "Penetration",
-                    f"Bottom 5 Districts by Penetration ({current_year})", color="Penetration", hover_data=["States"])
-
-    # PINCODE LEVEL PENETRATION
-    with tab_pin1:
-        pin_filt1 = calc_penetration(
-            filter_year(pin_compare, current_year), 
-            ["District", "States"], "Transaction_amount", "RegisteredUser"
-        )
-        
-        top_pins = pin_filt1.groupby(["Pincodes","States"])["Penetration"].mean().sort_values(ascending=False).head(5).reset_index()
-        bottom_pins = pin_filt1.groupby(["Pincodes","States"])["Penetration"].mean().sort_values().head(5).reset_index()
+        # PINCODE LEVEL PENETRATION
+        with tab_pin1:
+            top_pins = pin_pen_rank.top("Penetration", 5, penetration_year)
+            bottom_pins = pin_pen_rank.bottom("Penetration", 5, penetration_year)
 
-        col1, col2 = st.columns(2)
-        with col1:
-            top_pins["Pincodes"] = top_pins["Pincodes"].astype(str)  
-            fig_top = px.bar(
-                top_pins, x="Pincodes", y="Penetration", 
-                title=f"Top 5 Pincodes by Penetration ({current_year})", 
-                color="Penetration", hover_data=["States"]
-            )
-            fig_top.update_xaxes(type="category")
-            st.plotly_chart(fig_top, use_container_width=True)
+            col1, col2 = st.columns(2)
+            with col1:
+                fig_top = charts.bar(
+                    top_pins, x="Pincodes", y="Penetration", 
+                    title=f"Top 5 Pincodes by Penetration ({current_year})", 
+                    color="Penetration", hover_data=["States"]
+                )
+                fig_top.update_xaxes(type="category")
+                plotly_chart(fig_top, use_container_width=True)
 
-        with col2:
-            bottom_pins["Pincodes"] = bottom_pins["Pincodes"].astype(str)  
-            fig_bottom = px.bar(
-                bottom_pins, x="Pincodes", y="Penetration", 
-                title=f"Bottom 5 Pincodes by Penetration ({current_year})", 
-                color="Penetration", hover_data=["States"]
-            )
-            fig_bottom.update_xaxes(type="category")
-            st.plotly_chart(fig_bottom, use_container_width=True)
+            with col2:
+                fig_bottom = charts.bar(
+                    bottom_pins, x="Pincodes", y="Penetration", 
+                    title=f"Bottom 5 Pincodes by Penetration ({current_year})", 
+                    color="Penetration", hover_data=["States"]
+                )
+                fig_bottom.update_xaxes(type="category")
+                plotly_chart(fig_bottom, use_container_width=True)
 
+    penetration_section()
 
-    st.write("*****************************************************************************************************")
-    st.subheader("📊 Growth Trend Analysis")
-    
-    available_years = sorted(state_compare["Years"].unique())
-    year_options = ["Overall"] + available_years
-    current_year = st.selectbox("Select Current Year", year_options, key="current_year_select_for_growth")
-    selected_year = st.selectbox("Select Comparison Year", year_options, key="selected_year_select_for_growth")
 
-    def calculate_year_growth(df, group_cols, current_year, selected_year):
-        years = sorted(df["Years"].unique())
-        if current_year == 'Overall' or selected_year == 'Overall':
-            if len(years) < 2:
-                return pd.DataFrame()  # Not enough data
-            first_year, last_year = years[0], years[-1]
-            df_years = df[df["Years"].isin([first_year, last_year])]
-            pivot = df_years.pivot_table(index=group_cols, columns="Years", values="Transaction_amount", aggfunc="sum")
-            pivot["Growth(%)"] = ((pivot[last_year] / pivot[first_year]) - 1) * 100
-            pivot = pivot.reset_index()
-            pivot["Compared Years"] = f"{first_year} vs {last_year}"
-            return pivot
-        else:
-            df_years = df[df["Years"].isin([current_year, selected_year])]
-            pivot = df_years.pivot_table(index=group_cols, columns="Years", values="Transaction_amount", aggfunc="sum")
-            pivot["Growth(%)"] = ((pivot[current_year] / pivot[selected_year]) - 1) * 100
-            pivot = pivot.reset_index()
-            pivot["Compared Years"] = f"{selected_year} vs {current_year}"
-            return pivot
-    tabs2 = st.tabs(["State wise", "District wise", "Pincode wise"])
-    tab_state2, tab_dist2, tab_pin2 = tabs2
-    
-    # State level growth
-    with tab_state2:
-        state_growth = calculate_year_growth(state_compare, ["States"], current_year, selected_year)
-        top5_state = state_growth.nlargest(5, "Growth(%)")
-        bottom5_state = state_growth.nsmallest(5, "Growth(%)")
-        col1, col2 = st.columns(2)
-        with col1:
-            plot_bar(top5_state, "States", "Growth(%)", f"Top 5 States by Growth (%) ({current_year} vs {selected_year})", color="Growth(%)", color_scale="Plasma")
-        with col2:
-            plot_bar(bottom5_state, "States", "Growth(%)", f"Bottom 5 States by Growth (%) ({current_year} vs {selected_year})", color="Growth(%)", color_scale="Magma")
-    
-    # District level growth
-    with tab_dist2: 
-        district_growth = calculate_year_growth(dist_compare, ["District", "States"], current_year, selected_year)
-        top5_dist = district_growth.nlargest(5, "Growth(%)")
-        bottom5_dist = district_growth.nsmallest(5, "Growth(%)")
-        col3, col4 = st.columns(2)
-        with col3:
-            plot_bar(top5_dist, "District", "Growth(%)", f"Top 5 Districts by Growth (%) ({current_year} vs {selected_year})", color="Growth(%)", color_scale="Plasma",hover_data="States")
-        with col4:
-            plot_bar(bottom5_dist, "District", "Growth(%)", f"Bottom 5 Districts by Growth (%) ({current_year} vs {selected_year})", color="Growth(%)", color_scale="Magma",hover_data="States")
-    
-    # Pincode level growth
-    with tab_pin2:
-        pincode_growth = calculate_year_growth(pin_compare, ["Pincodes", "States"], current_year, selected_year)
-        top5_pin = pincode_growth.nlargest(5, "Growth(%)")
-        bottom5_pin = pincode_growth.nsmallest(5, "Growth(%)")
-        top5_pin["Pincodes"] =top5_pin["Pincodes"].astype(str)
-        bottom5_pin["Pincodes"] =bottom5_pin["Pincodes"].astype(str)
-        col5, col6 = st.columns(2)
-        with col5:
-            top_pin=px.bar(
-                top5_pin,x="Pincodes", y="Growth(%)", title=f"Top 5 Pincodes by Growth (%) ({current_year} vs {selected_year})", 
-                color="Growth(%)", hover_data=["States"]
-            )
-            top_pin.update_xaxes(type="category")
-            st.plotly_chart(top_pin, use_container_width=True)
-        with col6:
+    st.write("*****************************************************************************************************")
+    @st.fragment
+    @profiler.profiled()
+    def growth_section():
+        st.subheader("📊 Growth Trend Analysis")
+    
+        available_years = sorted(state_compare["Years"].unique())
+        year_options = ["Overall"] + available_years
+        current_year = st.selectbox("Select Current Year", year_options, key="current_year_select_for_growth")
+        selected_year = st.selectbox("Select Comparison Year", year_options, key="selected_year_select_for_growth")
+
+        tabs2 = st.tabs(["State wise", "District wise", "Pincode wise"])
+        tab_state2, tab_dist2, tab_pin2 = tabs2
+    
+        # State level growth
+        with tab_state2:
+            state_growth = calculate_year_growth(state_compare, ["States"], current_year, selected_year, decimals=None)
+            top5_state = state_growth.nlargest(5, "Growth(%)")
+            bottom5_state = state_growth.nsmallest(5, "Growth(%)")
+            col1, col2 = st.columns(2)
+            with col1:
+                plot_bar(top5_state, "States", "Growth(%)", f"Top 5 States by Growth (%) ({current_year} vs {selected_year})", color="Growth(%)", color_scale="Plasma")
+            with col2:
+                plot_bar(bottom5_state, "States", "Growth(%)", f"Bottom 5 States by Growth (%) ({current_year} vs {selected_year})", color="Growth(%)", color_scale="Magma")
+    
+        # District level growth
+        with tab_dist2: 
+            district_growth = calculate_year_growth(dist_compare, ["District", "States"], current_year, selected_year, decimals=None)
+            top5_dist = district_growth.nlargest(5, "Growth(%)")
+            bottom5_dist = district_growth.nsmallest(5, "Growth(%)")
+            col3, col4 = st.columns(2)
+            with col3:
+                plot_bar(top5_dist, "District", "Growth(%)", f"Top 5 Districts by Growth (%) ({current_year} vs {selected_year})", color="Growth(%)", color_scale="Plasma",hover_data="States")
+            with col4:
+                plot_bar(bottom5_dist, "District", "Growth(%)", f"Bottom 5 Districts by Growth (%) ({current_year} vs {selected_year})", color="Growth(%)", color_scale="Magma",hover_data="States")
+    
+        # Pincode level growth
+        with tab_pin2:
+            pincode_growth = calculate_year_growth(pin_compare, ["Pincodes", "States"], current_year, selected_year, decimals=None)
+            top5_pin = pincode_growth.nlargest(5, "Growth(%)")
+            bottom5_pin = pincode_growth.nsmallest(5, "Growth(%)")
+            col5, col6 = st.columns(2)
+            with col5:
+                top_pin=charts.bar(
+                    top5_pin,x="Pincodes", y="Growth(%)", title=f"Top 5 Pincodes by Growth (%) ({current_year} vs {selected_year})", 
+                    color="Growth(%)", hover_data=["States"]
+                )
+                top_pin.update_xaxes(type="category")
+                plotly_chart(top_pin, use_container_width=True)
+            with col6:
             
-            bottom_pin1=px.bar(
-                bottom5_pin,x="Pincodes", y="Growth(%)", title=f"Bottom 5 Pincodes by Growth (%) ({current_year} vs {selected_year})", 
-                color="Growth(%)", hover_data=["States"]
-            )
-            bottom_pin1.update_xaxes(type="category")
-            st.plotly_chart(bottom_pin1, use_container_width=True)
+                bottom_pin1=charts.bar(
+                    bottom5_pin,x="Pincodes", y="Growth(%)", title=f"Bottom 5 Pincodes by Growth (%) ({current_year} vs {selected_year})", 
+                    color="Growth(%)", hover_data=["States"]
+                )
+                bottom_pin1.update_xaxes(type="category")
+                plotly_chart(bottom_pin1, use_container_width=True)
 
-# Helper Functions
-def calc_penetration(df, group_cols, value_col, user_col):
-    df = df.copy()
-    df["Penetration"] = df[value_col] / df[user_col]
-    return df
-
-def calculate_year_growth(df, group_cols, current_year, selected_year):
-    years = sorted(df["Years"].unique())
-    if current_year == 'Overall' or selected_year == 'Overall':
-        if len(years) < 2:
-            return pd.DataFrame()  # Not enough data
-        first_year, last_year = years[0], years[-1]
-        df_years = df[df["Years"].isin([first_year, last_year])]
-        pivot = df_years.pivot_table(index=group_cols, columns="Years",
-                                     values="Transaction_amount", aggfunc="sum")
-        pivot["Growth(%)"] = ((pivot[last_year] / pivot[first_year])- 1) * 100 
-        pivot["Growth(%)"] = pivot["Growth(%)"].round(0)
-        pivot = pivot.reset_index()
-        pivot["Compared Years"] = f"{first_year} vs {last_year}"
-        return pivot
-    else:
-        df_years = df[df["Years"].isin([current_year, selected_year])]
-        pivot = df_years.pivot_table(index=group_cols, columns="Years",
-                                     values="Transaction_amount", aggfunc="sum")
-        pivot["Growth(%)"] = ((pivot[current_year] / pivot[selected_year]) - 1) * 100
-        pivot["Growth(%)"] = pivot["Growth(%)"].round(0)
-        pivot = pivot.reset_index()
-        pivot["Compared Years"] = f"{selected_year} vs {current_year}"
-        return pivot
-def calculate_year_growth1(df, group_cols, current_year, selected_year):
-    years = sorted(df["Years"].unique())
-    if current_year == 'Overall' or selected_year == 'Overall':
-        if len(years) < 2:
-            return pd.DataFrame()  # Not enough data
-        first_year, last_year = years[0], years[-1]
-        df_years = df[df["Years"].isin([first_year, last_year])]
-        pivot = df_years.pivot_table(index=group_cols, columns="Years",
-                                     values="Transaction_amount", aggfunc="sum")
-        pivot["Growth(%)"] = ((pivot[last_year] / pivot[first_year])- 1) * 100 
-        pivot["Growth(%)"] = pivot["Growth(%)"].round(0).astype(int).astype(str) + "%"
-        pivot = pivot.reset_index()
-        pivot["Compared Years"] = f"{first_year} vs {last_year}"
-        return pivot
-    else:
-        df_years = df[df["Years"].isin([current_year, selected_year])]
-        pivot = df_years.pivot_table(index=group_cols, columns="Years",
-                                     values="Transaction_amount", aggfunc="sum")
-        pivot["Growth(%)"] = ((pivot[current_year] / pivot[selected_year]) - 1) * 100
-        pivot["Growth(%)"] = pivot["Growth(%)"].round(0).astype(int).astype(str) + "%"
-        pivot = pivot.reset_index()
-        pivot["Compared Years"] = f"{selected_year} vs {current_year}"
-        return pivot
+    growth_section()
 
 def plot_bar(df, x, y, title, color=None, color_scale="Viridis", hover_data=None):
-    fig = px.bar(df, x=x, y=y, color=color,
+    fig = charts.bar(df, x=x, y=y, color=color,
                  color_continuous_scale=color_scale if color else None,
                  hover_data=hover_data, title=title)
     fig.update_traces(texttemplate='%{y}', textposition="outside")
-    st.plotly_chart(fig, use_container_width=True)
+    plotly_chart(fig, use_container_width=True)
 
+@profiler.profiled()
 def ques4(df_transaction, df_user):
 
     st.header("Transaction Analysis for Market Expansion")
@@ -2146,53 +1990,30 @@ def ques4(df_transaction, df_user):
     selected_year = st.selectbox("Select Year", years, index=0)
     quarters = ["All"] + sorted(df_transaction["Quarter"].unique().tolist())
     selected_quarter = st.selectbox("Select Quarter", quarters, index=0)
-    df_txn = df_transaction.copy()
-    df_usr = df_user.copy()
-
-    if selected_year != "All":
-        df_txn = df_txn[df_txn["Years"] == selected_year]
-        df_usr = df_usr[df_usr["Years"] == selected_year]
-
-    if selected_quarter != "All":
-        df_txn = df_txn[df_txn["Quarter"] == selected_quarter]
-        df_usr = df_usr[df_usr["Quarter"] == selected_quarter]
-    df_txn_group = df_txn.groupby(["States", "Years", "Quarter"]).agg({
-        "Transaction_amount": "sum",
-        "Transaction_count": "sum"
-    }).reset_index()
-
-    df_usr_group = df_usr.groupby(["States", "Years", "Quarter"]).agg({
-        "RegisteredUser": "sum",
-        "AppOpens": "sum",
-    }).reset_index()
-
-    df_merge = pd.merge(df_txn_group, df_usr_group, on=["States", "Years", "Quarter"], how="inner")
+    market = pages.market()
+    df_merge = filter_slice(market, Years=selected_year, Quarter=selected_quarter)
 
     # States Aggregated
-    df_total = df_merge.groupby("States").agg({
-        "Transaction_amount": "sum",
-        "Transaction_count": "sum",
-        "RegisteredUser": "sum",
-        "AppOpens": "sum"
-    }).reset_index()
-     
-    top_state_count = df_total.nlargest(5, "Transaction_count")
-    bottom_state_count = df_total.nsmallest(5, "Transaction_count")
-    top_state_amount = df_total.nlargest(5, "Transaction_amount")
-    bottom_state_amount = df_total.nsmallest(5, "Transaction_amount")
-    top_state_user = df_total.nlargest(5, "RegisteredUser")
-    bottom_state_user = df_total.nsmallest(5, "RegisteredUser")
-    top_state_open = df_total.nlargest(5, "AppOpens")
-    bottom_state_open = df_total.nsmallest(5, "AppOpens")
-    
-    url = "https://gist.githubusercontent.com/jbrobst/56c13bbbf9d97d187fea01ca62ea5112/raw/e388c4cae20aa53cb5090210a42ebb9b765c0a36/india_states.geojson"
-    geo_data = json.loads(requests.get(url).content)
+    market_rank = pages.index("market_state")
+    market_slice = {"year": selected_year, "quarter": selected_quarter}
+    df_total = market_rank.table(**market_slice)
+
+    top_state_count = market_rank.top("Transaction_count", 5, **market_slice)
+    bottom_state_count = market_rank.bottom("Transaction_count", 5, **market_slice)
+    top_state_amount = market_rank.top("Transaction_amount", 5, **market_slice)
+    bottom_state_amount = market_rank.bottom("Transaction_amount", 5, **market_slice)
+    top_state_user = market_rank.top("RegisteredUser", 5, **market_slice)
+    bottom_state_user = market_rank.bottom("RegisteredUser", 5, **market_slice)
+    top_state_open = market_rank.top("AppOpens", 5, **market_slice)
+    bottom_state_open = market_rank.bottom("AppOpens", 5, **market_slice)
+    
+    geo_data = load_geojson(INDIA_GEOJSON_URL)
 
     tab_amt, tab_cnt = st.tabs(["Transaction Amount", "Transaction Count"])
     with tab_amt: 
         col1, col2 = st.columns(2)
         with col1:
-            fig = px.choropleth(
+            fig = charts.choropleth(
                 df_total, geojson=geo_data, locations="States",
                 featureidkey="properties.ST_NM", color="Transaction_amount",
                 hover_name="States", hover_data={"Transaction_amount": True},
@@ -2200,7 +2021,7 @@ def ques4(df_transaction, df_user):
                 fitbounds="locations", width=800, height=600
             )
             fig.update_geos(visible=False)
-            st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig, use_container_width=True)
             plot_bar(top_state_amount, "States", "Transaction_amount", "Top States - Transaction amount", color="Transaction_amount", color_scale="Blues")
            
         with col2:
@@ -2213,7 +2034,7 @@ def ques4(df_transaction, df_user):
     with tab_cnt:
         col1, col2 = st.columns(2)
         with col1:
-            fig = px.choropleth(
+            fig = charts.choropleth(
                 df_total, geojson=geo_data, locations="States",
                 featureidkey="properties.ST_NM", color="Transaction_count",
                 hover_name="States", hover_data={"Transaction_count": True},
@@ -2221,7 +2042,7 @@ def ques4(df_transaction, df_user):
                 fitbounds="locations", width=800, height=600
             )
             fig.update_geos(visible=False)
-            st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig, use_container_width=True)
             plot_bar(top_state_count, "States", "Transaction_count", "Top States - Transaction Count", color="Transaction_count", color_scale="Blues")  
         with col2:
             plot_bar(df_total, "States", "Transaction_count", 
@@ -2233,7 +2054,7 @@ def ques4(df_transaction, df_user):
     with tab_usr:
         col1, col2 = st.columns(2)
         with col1:
-            fig = px.choropleth(
+            fig = charts.choropleth(
                 df_total, geojson=geo_data, locations="States",
                 featureidkey="properties.ST_NM", color="RegisteredUser",
                 hover_name="States", hover_data={"RegisteredUser": True},
@@ -2241,7 +2062,7 @@ def ques4(df_transaction, df_user):
                 fitbounds="locations", width=800, height=600
             )
             fig.update_geos(visible=False)
-            st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig, use_container_width=True)
             plot_bar(top_state_user, "States", "RegisteredUser", "Top States - Registered Users", color="RegisteredUser", color_scale="Blues")
         with col2:
             plot_bar(df_total, "States", "RegisteredUser", 
@@ -2254,7 +2075,7 @@ def ques4(df_transaction, df_user):
             if df_total["AppOpens"].empty:
                 st.warning("no data in year or quarter")
             else:   
-                fig = px.choropleth(
+                fig = charts.choropleth(
                     df_total, geojson=geo_data, locations="States",
                     featureidkey="properties.ST_NM", color="AppOpens",
                     hover_name="States", hover_data={"AppOpens": True},
@@ -2262,7 +2083,7 @@ def ques4(df_transaction, df_user):
                     fitbounds="locations", width=800, height=600
                 )
                 fig.update_geos(visible=False)
-                st.plotly_chart(fig, use_container_width=True)
+                plotly_chart(fig, use_container_width=True)
                 plot_bar(top_state_open, "States", "AppOpens", "Top States - App Opens", color="AppOpens", color_scale="Blues")
         with col2:
             plot_bar(df_total, "States", "AppOpens", 
@@ -2270,14 +2091,13 @@ def ques4(df_transaction, df_user):
                     color="AppOpens")
             plot_bar(bottom_state_open, "States", "AppOpens", "Bottom States - App Opens", color="AppOpens", color_scale="Reds")
    
-    url = "https://gist.githubusercontent.com/jbrobst/56c13bbbf9d97d187fea01ca62ea5112/raw/e388c4cae20aa53cb5090210a42ebb9b765c0a36/india_states.geojson"
-    geo_data = json.loads(requests.get(url).content)
+    geo_data = load_geojson(INDIA_GEOJSON_URL)
 
     col1, col2 = st.columns(2)
 
     with col1:
         st.selectbox("Overall", ["ALL"])
-        fig = px.choropleth(
+        fig = charts.choropleth(
             df_total,
             geojson=geo_data,
             locations="States",
@@ -2295,28 +2115,17 @@ def ques4(df_transaction, df_user):
             height=600
         )
         fig.update_geos(visible=False)
-        st.plotly_chart(fig, use_container_width=True)
+        plotly_chart(fig, use_container_width=True)
 
     with col2:
         years = sorted(df_transaction["Years"].unique().tolist())
         years.insert(0, "All") 
         selected_year = st.selectbox("Select the Year", years)
 
-        if selected_year != "All":
-            df_transaction = df_transaction[df_transaction["Years"] == selected_year]
-            df_user = df_user[df_user["Years"] == selected_year]
-
-        if selected_year != "All":
-            df_year = df_merge[df_merge["Years"] == selected_year]
-        else:
-            df_year = df_merge.copy()
-
-        df_yearwise = df_year.groupby("States").agg({
-            "Transaction_count": "sum",
-            "RegisteredUser": "sum"
-        }).reset_index()
+        df_transaction = filter_slice(df_transaction, Years=selected_year)
+        df_yearwise = totals_by(df_merge, "States", ["Transaction_count", "RegisteredUser"], Years=selected_year)
 
-        fig1 = px.choropleth(
+        fig1 = charts.choropleth(
             df_yearwise,
             geojson=geo_data,
             locations="States",
@@ -2334,206 +2143,190 @@ def ques4(df_transaction, df_user):
             height=600
         )
         fig1.update_geos(visible=False)
-        st.plotly_chart(fig1, use_container_width=True)
+        plotly_chart(fig1, use_container_width=True)
 
     # State Level Penetration 
-    state_ins = safe_groupby(df_transaction, ["States", "Years", "Quarter"], {"Transaction_amount": "sum"})
-    state_user = safe_groupby(df_user, ["States", "Years", "Quarter"], {"RegisteredUser": "sum","AppOpens" : "sum"})
-    state_compare = pd.merge(state_ins, state_user, on=["States", "Years", "Quarter"], how="inner")
+    state_compare = filter_slice(market, Years=selected_year)
 
-    years = ["All"] + sorted(df_transaction["Years"].unique().tolist())
-    selected_year = st.selectbox("Select Year for Penetration", years, key="state")
-
-    st.subheader("State Level Penetration")
-    st.write("📌 Penetration = Transaction_amount / RegisteredUser")
+    @st.fragment
+    @profiler.profiled()
+    def state_penetration_section():
+        years = ["All"] + sorted(df_transaction["Years"].unique().tolist())
+        selected_year = st.selectbox("Select Year for Penetration", years, key="state")
 
-    # OVERALL (Aggregate Penetration)
-    state_filt1 = calc_penetration(state_compare, ["States", "Years"], "Transaction_amount", "RegisteredUser")
-    df_state_filt1 = state_filt1.groupby("States").agg({
-            "Penetration": "sum",
-        }).reset_index()
+        st.subheader("State Level Penetration")
+        st.write("📌 Penetration = Transaction_amount / RegisteredUser")
 
-    col1, col2 = st.columns(2)
-    with col1:
-        fig = px.choropleth(
-            df_state_filt1,
-            geojson=geo_data,
-            locations="States",
-            scope="asia",
-            featureidkey="properties.ST_NM",
-            color="Penetration",
-            hover_name="States",
-            hover_data={"Penetration": True},
-            title="🌍 Overall Penetration by States",
-            fitbounds="locations",
-            width=800,
-            height=600
-        )
-        fig.update_geos(visible=False)
-        st.plotly_chart(fig, use_container_width=True)
+        # OVERALL (Aggregate Penetration)
+        df_state_filt1 = penetration_by_state(state_compare)
 
-    with col2:
-        plot_bar(df_state_filt1, "States", "Penetration",
-                "States by Penetration (Overall)", color="Penetration")
+        col1, col2 = st.columns(2)
+        with col1:
+            fig = charts.choropleth(
+                df_state_filt1,
+                geojson=geo_data,
+                locations="States",
+                scope="asia",
+                featureidkey="properties.ST_NM",
+                color="Penetration",
+                hover_name="States",
+                hover_data={"Penetration": True},
+                title="🌍 Overall Penetration by States",
+                fitbounds="locations",
+                width=800,
+                height=600
+            )
+            fig.update_geos(visible=False)
+            plotly_chart(fig, use_container_width=True)
 
-    # YEAR-WISE Penetration
-    if selected_year == "All":
-        state_filt = calc_penetration(state_compare, ["States", "Years"], "Transaction_amount", "RegisteredUser")
-    else:
-        state_year = state_compare[state_compare["Years"] == selected_year]
-        state_filt = calc_penetration(state_year, ["States", "Years"], "Transaction_amount", "RegisteredUser")
+        with col2:
+            plot_bar(df_state_filt1, "States", "Penetration",
+                    "States by Penetration (Overall)", color="Penetration")
 
-    df_state_filt = state_filt.groupby("States").agg({
-            "Penetration": "sum",
-        }).reset_index()
+        # YEAR-WISE Penetration
+        df_state_filt = penetration_by_state(state_compare, Years=selected_year)
 
-    col3, col4 = st.columns(2)
-    with col3:
-        fig1 = px.choropleth(
-            df_state_filt,
-            geojson=geo_data,
-            locations="States",
-            scope="asia",
-            featureidkey="properties.ST_NM",
-            color="Penetration",
-            hover_name="States",
-            hover_data={"Penetration": True},
-            title=f"📅 Penetration by States ({selected_year})",
-            fitbounds="locations",
-            width=800,
-            height=600
-        )
-        fig1.update_geos(visible=False)
-        st.plotly_chart(fig1, use_container_width=True)
+        col3, col4 = st.columns(2)
+        with col3:
+            fig1 = charts.choropleth(
+                df_state_filt,
+                geojson=geo_data,
+                locations="States",
+                scope="asia",
+                featureidkey="properties.ST_NM",
+                color="Penetration",
+                hover_name="States",
+                hover_data={"Penetration": True},
+                title=f"📅 Penetration by States ({selected_year})",
+                fitbounds="locations",
+                width=800,
+                height=600
+            )
+            fig1.update_geos(visible=False)
+            plotly_chart(fig1, use_container_width=True)
 
-    with col4:
-        plot_bar(df_state_filt, "States", "Penetration",
-                f"States by Penetration ({selected_year})", color="Penetration")
+        with col4:
+            plot_bar(df_state_filt, "States", "Penetration",
+                    f"States by Penetration ({selected_year})", color="Penetration")
 
         
-    #Top & Bottom States by Penetration 
-    top_states = df_state_filt.nlargest(5, "Penetration")
-    bottom_states = df_state_filt.nsmallest(5, "Penetration")
-
-    col1, col2 = st.columns(2)
-    with col1:
-        plot_bar(top_states, "States", "Penetration", f"Top 5 States by Penetration ({selected_year})", color="Penetration", color_scale="Viridis")
-    with col2:
-        plot_bar(bottom_states, "States", "Penetration", f"Bottom 5 States by Penetration ({selected_year})", color="Penetration", color_scale="Reds")
-
-    # State Level Growth 
-    available_years = sorted(state_compare["Years"].unique())
-    year_options = ["Overall"] + available_years
-    current_year = st.selectbox("Select Current Year", year_options, key="current_year_select_for_growth1")
-    compare_year = st.selectbox("Select Comparison Year", year_options, key="selected_year_select_for_growth1")
-    state_growth = calculate_year_growth(state_compare, ["States"], current_year, compare_year)
-    state_growth1 = calculate_year_growth1(state_compare, ["States"], current_year, compare_year)
-    plot_bar(state_growth1, "States", "Growth(%)", f"States by Growth (%)", color="Growth(%)", color_scale="Growth(%)")
-    fig = px.pie(
-        state_growth,
-        names="States",         
-        values="Growth(%)",     
-        title="States by Growth (%)", 
-        hole=0.3,                
-        color="Growth(%)",       
-    )
-
-    st.plotly_chart(fig, use_container_width=True)
-    fig = px.choropleth( 
-     state_growth1, 
-     geojson=geo_data, 
-     locations="States", 
-     scope="world", 
-     featureidkey="properties.ST_NM", 
-     color="Growth(%)", 
-     hover_name="States", 
-     title=f"Growth(%)", 
-     fitbounds="locations", 
-     width=800, 
-     height=600) 
-    fig.update_geos(visible=False) 
-    st.plotly_chart(fig, use_container_width=True)
-
-    if not state_growth.empty:
-        top5_state = state_growth.nlargest(5, "Growth(%)")
-        bottom5_state = state_growth.nsmallest(5, "Growth(%)")
+        #Top & Bottom States by Penetration 
+        top_states = df_state_filt.nlargest(5, "Penetration")
+        bottom_states = df_state_filt.nsmallest(5, "Penetration")
 
         col1, col2 = st.columns(2)
         with col1:
-            plot_bar(top5_state, "States", "Growth(%)", f"Top 5 States by Growth (%) ", color="Growth(%)", color_scale="Plasma")
+            plot_bar(top_states, "States", "Penetration", f"Top 5 States by Penetration ({selected_year})", color="Penetration", color_scale="Viridis")
         with col2:
-            plot_bar(bottom5_state, "States", "Growth(%)", f"Bottom 5 States by Growth (%) )", color="Growth(%)", color_scale="Magma")
-    def calc_avg_user_usage(df, group_cols, value_col, user_col):
-        df = df.copy()
-        df["Average Usage"] = df[value_col] / df[user_col]
-        df["Average Usage"] = df["Average Usage"].round(0)
-        return df
-    
-    years =sorted(df_transaction["Years"].unique().tolist())
-    selected_year = st.selectbox("Select Year for Average usage", years, key="state1")
-    df_state_filt_all = calc_avg_user_usage(
-            df_total, 
-            ["States", "Years"], 
-            "AppOpens",             
-            "RegisteredUser"              
-        )
-    state_year = state_compare[state_compare["Years"] == selected_year]
-    state_filt = calc_avg_user_usage(
-            state_year, 
-            ["States", "Years"],
-            "AppOpens",        
-            "RegisteredUser" 
+            plot_bar(bottom_states, "States", "Penetration", f"Bottom 5 States by Penetration ({selected_year})", color="Penetration", color_scale="Reds")
+
+    state_penetration_section()
+
+    # State Level Growth 
+    @st.fragment
+    @profiler.profiled()
+    def state_growth_section():
+        available_years = sorted(state_compare["Years"].unique())
+        year_options = ["Overall"] + available_years
+        current_year = st.selectbox("Select Current Year", year_options, key="current_year_select_for_growth1")
+        compare_year = st.selectbox("Select Comparison Year", year_options, key="selected_year_select_for_growth1")
+        state_growth = calculate_year_growth(state_compare, ["States"], current_year, compare_year, decimals=0)
+        state_growth1 = calculate_year_growth1(state_compare, ["States"], current_year, compare_year)
+        plot_bar(state_growth1, "States", "Growth(%)", "States by Growth (%)", color="Growth(%)", color_scale="Growth(%)")
+        fig = charts.pie(
+            state_growth,
+            names="States",         
+            values="Growth(%)",     
+            title="States by Growth (%)", 
+            hole=0.3,                
+            color="Growth(%)",       
         )
-    df_state_filt = state_filt.groupby(["States", "Years"]).agg({
-        "Average Usage": "sum"
-    }).reset_index()
+
+        plotly_chart(fig, use_container_width=True)
+        fig = charts.choropleth( 
+         state_growth1, 
+         geojson=geo_data, 
+         locations="States", 
+         scope="world", 
+         featureidkey="properties.ST_NM", 
+         color="Growth(%)", 
+         hover_name="States", 
+         title="Growth(%)", 
+         fitbounds="locations", 
+         width=800, 
+         height=600) 
+        fig.update_geos(visible=False) 
+        plotly_chart(fig, use_container_width=True)
+
+        if not state_growth.empty:
+            top5_state = state_growth.nlargest(5, "Growth(%)")
+            bottom5_state = state_growth.nsmallest(5, "Growth(%)")
+
+            col1, col2 = st.columns(2)
+            with col1:
+                plot_bar(top5_state, "States", "Growth(%)", "Top 5 States by Growth (%) ", color="Growth(%)", color_scale="Plasma")
+            with col2:
+                plot_bar(bottom5_state, "States", "Growth(%)", "Bottom 5 States by Growth (%) )", color="Growth(%)", color_scale="Magma")
+
+    state_growth_section()
     
-    col1, col2 = st.columns(2)
+    @st.fragment
+    @profiler.profiled()
+    def average_usage_section():
+        years =sorted(df_transaction["Years"].unique().tolist())
+        selected_year = st.selectbox("Select Year for Average usage", years, key="state1")
+        df_state_filt_all = df_total
+        state_filt, df_state_filt = average_usage_by_state(state_compare, selected_year)
+    
+        col1, col2 = st.columns(2)
         
-    with col1:    
-        plot_bar(df_state_filt_all,"States","Average Usage",'Average usage by user',color="Average Usage")
-        fig = px.choropleth( 
-        df_state_filt_all, 
-        geojson=geo_data, 
-        locations="States", 
-        featureidkey="properties.ST_NM", 
-        color="Average Usage", 
-        hover_name="States", 
-        title=f"Average Usage", 
-        fitbounds="locations", 
-        width=800, 
-        height=600) 
-        fig.update_geos(visible=False) 
-        st.plotly_chart(fig, use_container_width=True)
-        st.subheader("Performance based on Average Usage")
-        top_state_Average = df_state_filt_all.nlargest(5, "Average Usage")
-        bottom_state_Average = df_state_filt_all.nsmallest(5, "Average Usage")
-        plot_bar(top_state_Average, "States", "Average Usage", f'Top 5 Average usage by user ', color="Average Usage")
-        plot_bar(bottom_state_Average, "States", "Average Usage", f'Bottom 5 Average usage by user ', color="Average Usage")
-    with col2:
-        if df_state_filt["Average Usage"].sum() == 0:   
-            st.warning(f"No data available for {selected_year}", icon="⚠️")
-        else:
-            plot_bar(df_state_filt, "States", "Average Usage", f'Average usage by user - {selected_year}', color="Average Usage")
-            fig = px.choropleth( 
-            state_filt, 
+        with col1:    
+            plot_bar(df_state_filt_all,"States","Average Usage",'Average usage by user',color="Average Usage")
+            fig = charts.choropleth( 
+            df_state_filt_all, 
             geojson=geo_data, 
             locations="States", 
             featureidkey="properties.ST_NM", 
             color="Average Usage", 
             hover_name="States", 
-            title=f"Average Usage- {selected_year}", 
+            title="Average Usage", 
             fitbounds="locations", 
             width=800, 
             height=600) 
             fig.update_geos(visible=False) 
-            st.plotly_chart(fig, use_container_width=True)
-            st.subheader(f"Performance based on Average Usage - {selected_year}")
-            top_state_Average = df_state_filt.nlargest(5, "Average Usage")
-            bottom_state_Average = df_state_filt.nsmallest(5, "Average Usage")
-            plot_bar(top_state_Average, "States", "Average Usage", f'Top 5 Average usage by user - {selected_year}',color="Average Usage")
-            plot_bar(bottom_state_Average, "States", "Average Usage", f'Bottom 5 Average usage by user - {selected_year}',color="Average Usage")
-    
+            plotly_chart(fig, use_container_width=True)
+            st.subheader("Performance based on Average Usage")
+            top_state_Average = market_rank.top("Average Usage", 5, **market_slice)
+            bottom_state_Average = market_rank.bottom("Average Usage", 5, **market_slice)
+            plot_bar(top_state_Average, "States", "Average Usage", 'Top 5 Average usage by user ', color="Average Usage")
+            plot_bar(bottom_state_Average, "States", "Average Usage", 'Bottom 5 Average usage by user ', color="Average Usage")
+        with col2:
+            if df_state_filt["Average Usage"].sum() == 0:   
+                st.warning(f"No data available for {selected_year}", icon="⚠️")
+            else:
+                plot_bar(df_state_filt, "States", "Average Usage", f'Average usage by user - {selected_year}', color="Average Usage")
+                fig = charts.choropleth( 
+                state_filt, 
+                geojson=geo_data, 
+                locations="States", 
+                featureidkey="properties.ST_NM", 
+                color="Average Usage", 
+                hover_name="States", 
+                title=f"Average Usage- {selected_year}", 
+                fitbounds="locations", 
+                width=800, 
+                height=600) 
+                fig.update_geos(visible=False) 
+                plotly_chart(fig, use_container_width=True)
+                st.subheader(f"Performance based on Average Usage - {selected_year}")
+                top_state_Average = df_state_filt.nlargest(5, "Average Usage")
+                bottom_state_Average = df_state_filt.nsmallest(5, "Average Usage")
+                plot_bar(top_state_Average, "States", "Average Usage", f'Top 5 Average usage by user - {selected_year}',color="Average Usage")
+                plot_bar(bottom_state_Average, "States", "Average Usage", f'Bottom 5 Average usage by user - {selected_year}',color="Average Usage")
+
+    average_usage_section()
+    
+@profiler.profiled()
 def ques5(Aggre_user, Map_user, Top_user, Top_district,Top_transaction):
     st.title("User Engagement & Growth Strategy")
     st.markdown("### Engagement Ratio by State")
@@ -2543,45 +2336,21 @@ def ques5(Aggre_user, Map_user, Top_user, Top_district,Top_transaction):
     sel_year = st.selectbox("Select Year", years, index=0)
     sel_quarter = st.selectbox("Select Quarter", quarters, index=0)
 
-    df_filtered = Map_user.copy()
-    if sel_year != "All":
-        df_filtered = df_filtered[df_filtered["Years"] == sel_year]
-    if sel_quarter != "All":
-        df_filtered = df_filtered[df_filtered["Quarter"] == sel_quarter]
-
-
-    total_users = df_filtered["RegisteredUser"].sum()
-    total_appopens = df_filtered["AppOpens"].sum()
-    engagement_ratio = round(total_appopens / total_users, 2) if total_users > 0 else 0
+    total_users, total_appopens, overall_ratio = engagement_summary(Map_user, Years=sel_year, Quarter=sel_quarter)
 
     st.markdown("### Key Metrics")
     col1, col2, col3 = st.columns(3)
     col1.metric("Total Registered Users", f"{total_users:,}")
     col2.metric("Total App Opens", f"{total_appopens:,}")
-    col3.metric("Engagement Ratio", engagement_ratio)
+    col3.metric("Engagement Ratio", overall_ratio)
 
   
-    # State Engagement
-    state_engagement = df_filtered.groupby("States").agg({
-        "RegisteredUser": "sum",
-        "AppOpens": "sum"
-    }).reset_index()
-
-    state_engagement["EngagementRatio"] = state_engagement.apply(
-        lambda row: row["AppOpens"] / row["RegisteredUser"] if row["RegisteredUser"] > 0 else 0, axis=1
-    )
-    state_engagement["EngagementRatio"] = state_engagement["EngagementRatio"].round(2)
-
-    # District Engagement 
-    District_engagement = df_filtered.groupby(["States","District"]).agg({
-        "RegisteredUser": "sum",
-        "AppOpens": "sum"
-    }).reset_index()
-
-    District_engagement["EngagementRatio"] = District_engagement.apply(
-        lambda row: row["AppOpens"] / row["RegisteredUser"] if row["RegisteredUser"] > 0 else 0, axis=1
-    )
-    District_engagement["EngagementRatio"] = District_engagement["EngagementRatio"].round(2)
+    # State and District Engagement
+    user_slice = {"year": sel_year, "quarter": sel_quarter}
+    state_rank = pages.index("engagement_state")
+    district_rank = pages.index("engagement_district")
+    state_engagement = state_rank.table(**user_slice)
+    District_engagement = district_rank.table(**user_slice)
     
     tab1 , tab2 = st.tabs(["🗺️ Map", "📊 Bar chart"])
     with tab2:
@@ -2594,7 +2363,7 @@ def ques5(Aggre_user, Map_user, Top_user, Top_district,Top_transaction):
         )
 
     with tab1:
-        fig = px.choropleth(
+        fig = charts.choropleth(
             state_engagement,
             geojson="https://gist.githubusercontent.com/jbrobst/56c13bbbf9d97d187fea01ca62ea5112/raw/e388c4cae20aa53cb5090210a42ebb9b765c0a36/india_states.geojson",
             featureidkey="properties.ST_NM",
@@ -2607,55 +2376,44 @@ def ques5(Aggre_user, Map_user, Top_user, Top_district,Top_transaction):
             height=700
         )
         fig.update_geos(fitbounds="locations", visible=False)
-        st.plotly_chart(fig, use_container_width=True)
+        plotly_chart(fig, use_container_width=True)
 
     # Year-wise Bar Charts
     st.markdown("### Year-wise Trends")
 
-    yearly_stats = Map_user.groupby("Years").agg({
-        "RegisteredUser": "sum",
-        "AppOpens": "sum"
-    }).reset_index()
-    yearly_stats["EngagementRatio"] = yearly_stats["AppOpens"] / yearly_stats["RegisteredUser"]
-    yearly_stats["EngagementRatio"] = yearly_stats["EngagementRatio"].round(2)
+    yearly_stats = engagement_over(Map_user, ["Years"])
     col1, col2, col3 = st.columns(3)
 
     with col1:
-        fig1 = px.bar(yearly_stats, x="Years", y="RegisteredUser", text="RegisteredUser",
+        fig1 = charts.bar(yearly_stats, x="Years", y="RegisteredUser", text="RegisteredUser",
                       title="Year-wise Registered Users")
         fig1.update_xaxes(type="category")
         fig1.update_traces(textposition="outside")
-        st.plotly_chart(fig1, use_container_width=True)
+        plotly_chart(fig1, use_container_width=True)
 
     with col2:
-        fig2 = px.bar(yearly_stats, x="Years", y="AppOpens", text="AppOpens",
+        fig2 = charts.bar(yearly_stats, x="Years", y="AppOpens", text="AppOpens",
                       title="Year-wise App Opens")
         fig2.update_traces(textposition="outside")
         fig2.update_xaxes(type="category")
-        st.plotly_chart(fig2, use_container_width=True)
+        plotly_chart(fig2, use_container_width=True)
 
     with col3:
-        fig3 = px.bar(yearly_stats, x="Years", y="EngagementRatio", text="EngagementRatio",
+        fig3 = charts.bar(yearly_stats, x="Years", y="EngagementRatio", text="EngagementRatio",
                       title="Year-wise Engagement Ratio")
         fig3.update_xaxes(type="category")
         fig3.update_traces(textposition="outside")
-        st.plotly_chart(fig3, use_container_width=True)
+        plotly_chart(fig3, use_container_width=True)
 
     st.markdown("### Quarter-wise Trends")
 
-    quarter_stats = Map_user.groupby(["Quarter"]).agg({
-        "RegisteredUser": "sum",
-        "AppOpens": "sum"
-    }).reset_index()
-    quarter_stats["EngagementRatio"] = (
-        quarter_stats["AppOpens"] / quarter_stats["RegisteredUser"]
-    ).round(2)
+    quarter_stats = engagement_over(Map_user, ["Quarter"])
 
     col1, col2 ,col3 = st.columns(3)
 
     with col1:
         st.subheader("Registered Users")
-        fig_reg = px.bar(
+        fig_reg = charts.bar(
             quarter_stats,
             x="Quarter",
             y="RegisteredUser",
@@ -2663,11 +2421,11 @@ def ques5(Aggre_user, Map_user, Top_user, Top_district,Top_transaction):
             title="Quarter-wise Registered Users"
         )
         fig_reg.update_traces(textposition="outside")
-        st.plotly_chart(fig_reg, use_container_width=True)
+        plotly_chart(fig_reg, use_container_width=True)
 
     with col2:
         st.subheader("App Opens")
-        fig_app = px.bar(
+        fig_app = charts.bar(
             quarter_stats,
             x="Quarter",
             y="AppOpens",
@@ -2675,11 +2433,11 @@ def ques5(Aggre_user, Map_user, Top_user, Top_district,Top_transaction):
             title="Quarter-wise App Opens"
         )
         fig_app.update_traces(textposition="outside")
-        st.plotly_chart(fig_app, use_container_width=True)
+        plotly_chart(fig_app, use_container_width=True)
 
     with col3:
         st.subheader("Engagement Ratio")
-        fig_app = px.bar(
+        fig_app = charts.bar(
             quarter_stats,
             x="Quarter",
             y="EngagementRatio",
@@ -2687,19 +2445,12 @@ def ques5(Aggre_user, Map_user, Top_user, Top_district,Top_transaction):
             title="Quarter-wise Engagement Ratio"
         )
         fig_app.update_traces(textposition="outside")
-        st.plotly_chart(fig_app, use_container_width=True)
+        plotly_chart(fig_app, use_container_width=True)
 
-    quarter_stats1 = Map_user.groupby(["Years","Quarter"]).agg({
-        "RegisteredUser": "sum",
-        "AppOpens": "sum"
-    }).reset_index()      
-    quarter_stats1["Period"] = quarter_stats1["Years"].astype(str) + "-Q" + quarter_stats1["Quarter"].astype(str) 
-    quarter_stats1["EngagementRatio"] = (
-        quarter_stats1["AppOpens"] / quarter_stats1["RegisteredUser"]
-    ).round(2)
+    quarter_stats1 = engagement_over(Map_user, ["Years", "Quarter"])
     
     st.markdown("### Engagement ratio Over Time")
-    fig2 = px.line(
+    fig2 = charts.line(
         quarter_stats1,
         x="Period",
         y="EngagementRatio",
@@ -2707,24 +2458,21 @@ def ques5(Aggre_user, Map_user, Top_user, Top_district,Top_transaction):
         title="Quarter-wise Engagement Ratio",
         hover_data=["RegisteredUser","AppOpens"]
     )
-    st.plotly_chart(fig2, use_container_width=True)
-
-    growth = Map_user.groupby(["Years", "Quarter"]).agg({"RegisteredUser":"sum"}).reset_index()
-    growth["Period"] = growth["Years"].astype(str) + "-Q" + growth["Quarter"].astype(str)
+    plotly_chart(fig2, use_container_width=True)
 
     st.markdown("### User Growth Over Time")
-    fig2 = px.line(
-        growth,
+    fig2 = charts.line(
+        quarter_stats1,
         x="Period",
         y="RegisteredUser",
         markers=True,
         title="Quarterly Growth of Registered Users",
         hover_data=["RegisteredUser"]
     )
-    st.plotly_chart(fig2, use_container_width=True)
+    plotly_chart(fig2, use_container_width=True)
     
     st.markdown("### User loyalty Index (App Opens vs Users)")
-    fig3 = px.scatter(
+    fig3 = charts.scatter(
         state_engagement,
         x="RegisteredUser",
         y="AppOpens",
@@ -2733,13 +2481,13 @@ def ques5(Aggre_user, Map_user, Top_user, Top_district,Top_transaction):
         hover_name="States",
         title=f"State-wise user loyalty Index {sel_year} Year and Quarter {sel_quarter}"
     )
-    st.plotly_chart(fig3, use_container_width=True)
+    plotly_chart(fig3, use_container_width=True)
     
-    top5_states = state_engagement.sort_values(by="EngagementRatio", ascending=False).head(5)
-    bottom5_states = state_engagement.sort_values(by="EngagementRatio", ascending=False).tail(5)
+    top5_states = state_rank.top("EngagementRatio", 5, **user_slice)
+    bottom5_states = state_rank.bottom("EngagementRatio", 5, **user_slice).iloc[::-1]
     col1,col2 = st.columns(2)
     with col1:
-        fig3 = px.bar(
+        fig3 = charts.bar(
             top5_states,
             x="States",
             y="EngagementRatio",
@@ -2749,10 +2497,10 @@ def ques5(Aggre_user, Map_user, Top_user, Top_district,Top_transaction):
             text="EngagementRatio"
             )
         fig3.update_traces(textposition="outside")
-        st.plotly_chart(fig3, use_container_width=True)
+        plotly_chart(fig3, use_container_width=True)
         
     with col2:
-        fig4 = px.bar(
+        fig4 = charts.bar(
             bottom5_states,
             x="States",
             y="EngagementRatio",
@@ -2762,11 +2510,11 @@ def ques5(Aggre_user, Map_user, Top_user, Top_district,Top_transaction):
             text="EngagementRatio"
             )
         fig4.update_traces(textposition="outside")
-        st.plotly_chart(fig4, use_container_width=True)
+        plotly_chart(fig4, use_container_width=True)
         
 
     st.markdown("### User loyalty Index (App Opens vs Users)")
-    fig3 = px.scatter(
+    fig3 = charts.scatter(
         District_engagement,
         x="RegisteredUser",
         y="AppOpens",
@@ -2775,13 +2523,13 @@ def ques5(Aggre_user, Map_user, Top_user, Top_district,Top_transaction):
         hover_name="District",
         title=f"District-wise user loyalty Index in in {sel_year} Year and Quarter {sel_quarter}"
     )
-    st.plotly_chart(fig3, use_container_width=True)
+    plotly_chart(fig3, use_container_width=True)
     
-    top5_dist = District_engagement.sort_values(by="EngagementRatio", ascending=False).head(5)
-    bottom5_dist = District_engagement.sort_values(by="EngagementRatio", ascending=False).tail(5)
+    top5_dist = district_rank.top("EngagementRatio", 5, **user_slice)
+    bottom5_dist = district_rank.bottom("EngagementRatio", 5, **user_slice).iloc[::-1]
     col1,col2 = st.columns(2)
     with col1:
-        fig3 = px.bar(
+        fig3 = charts.bar(
             top5_dist,
             x="District",
             y="EngagementRatio",
@@ -2791,10 +2539,10 @@ def ques5(Aggre_user, Map_user, Top_user, Top_district,Top_transaction):
             text="EngagementRatio"
             )
         fig3.update_traces(textposition="outside")
-        st.plotly_chart(fig3, use_container_width=True)
+        plotly_chart(fig3, use_container_width=True)
         
     with col2:
-        fig4 = px.bar(
+        fig4 = charts.bar(
             bottom5_dist,
             x="District",
             y="EngagementRatio",
@@ -2804,259 +2552,266 @@ def ques5(Aggre_user, Map_user, Top_user, Top_district,Top_transaction):
             text="EngagementRatio"
             )
         fig4.update_traces(textposition="outside")
-        st.plotly_chart(fig4, use_container_width=True)
+        plotly_chart(fig4, use_container_width=True)
    
     # Brand Share (Aggre_user)
-    brand_share = Aggre_user.groupby("Brand")["Transaction_count"].sum().reset_index()
+    brand_share = totals_by(Aggre_user, "Brand", ["Transaction_count"])
 
     st.markdown("### Brand-wise User Engagement")
-    fig4 = px.pie(
+    fig4 = charts.pie(
         brand_share,
         names="Brand",
         values="Transaction_count",
         title="Brand Contribution to Transactions"
     )
-    st.plotly_chart(fig4, use_container_width=True)
+    plotly_chart(fig4, use_container_width=True)
 
     #Top Registered Users (State/District/Pincode)
 
-    state = Map_user.groupby("States")[["RegisteredUser","AppOpens"]].sum().reset_index()
-    top_state1 = state.sort_values(by="RegisteredUser", ascending=False).head(5)
-    bottom_state1 = state.sort_values(by="RegisteredUser", ascending=True).head(5)
-    top_state2 = state.sort_values(by="AppOpens", ascending=False).head(5)
-    bottom_state2 = state.sort_values(by="AppOpens", ascending=True).head(5)
-
-    dist = Map_user.groupby(["States","District"])[["RegisteredUser","AppOpens"]].sum().reset_index()
-    top_dist1 = dist.sort_values(by="RegisteredUser", ascending=False).head(5)
-    bottom_dist1 = dist.sort_values(by="RegisteredUser", ascending=True).head(5)
-    top_dist2 = dist.sort_values(by="AppOpens", ascending=False).head(5)
-    bottom_dist2 = dist.sort_values(by="AppOpens", ascending=True).head(5)
-
-    pins = Top_user.groupby(["States","Pincodes"])["RegisteredUser"].sum().reset_index()
-    top_pins1 = pins.sort_values(by="RegisteredUser", ascending=False).head(5)
-    bottom_pins1 = pins.sort_values(by="RegisteredUser", ascending=True).head(5)
-    
-    view_option = st.selectbox(
-        "Select View",
-        ["State - wise", "District - wise", "Pincode - wise"]
-    )
+    @st.fragment
+    @profiler.profiled()
+    def top_users_section():
+        top_state1 = state_rank.top("RegisteredUser", 5)
+        bottom_state1 = state_rank.bottom("RegisteredUser", 5)
+        top_state2 = state_rank.top("AppOpens", 5)
+        bottom_state2 = state_rank.bottom("AppOpens", 5)
+
+        top_dist1 = district_rank.top("RegisteredUser", 5)
+        bottom_dist1 = district_rank.bottom("RegisteredUser", 5)
+        top_dist2 = district_rank.top("AppOpens", 5)
+        bottom_dist2 = district_rank.bottom("AppOpens", 5)
+
+        pin_rank = pages.index("user_pincode")
+        top_pins1 = pin_rank.top("RegisteredUser", 5)
+        bottom_pins1 = pin_rank.bottom("RegisteredUser", 5)
+    
+        view_option = st.selectbox(
+            "Select View",
+            ["State - wise", "District - wise", "Pincode - wise"]
+        )
 
-    if view_option == "State - wise":
-        col1,col2 = st.columns(2)
-        with col1:
-            fig5 = px.bar(
-                top_state1,
-                x="States",
-                y="RegisteredUser",
-                text="RegisteredUser",
-                title="Top 5 States with Highest Registered Users",
-                hover_data=["States","RegisteredUser"]
-            )
-            fig5.update_xaxes(type="category") 
-            st.plotly_chart(fig5, use_container_width=True)
+        if view_option == "State - wise":
+            col1,col2 = st.columns(2)
+            with col1:
+                fig5 = charts.bar(
+                    top_state1,
+                    x="States",
+                    y="RegisteredUser",
+                    text="RegisteredUser",
+                    title="Top 5 States with Highest Registered Users",
+                    hover_data=["States","RegisteredUser"]
+                )
+                fig5.update_xaxes(type="category") 
+                plotly_chart(fig5, use_container_width=True)
             
-            fig6 = px.bar(
-                top_state2,
-                x="States",
-                y="AppOpens",
-                text="AppOpens",
-                title="Top 5 States with Highest AppOpens",
-                hover_data=["States","AppOpens"]
-            )
-            fig6.update_xaxes(type="category") 
-            st.plotly_chart(fig6, use_container_width=True)
+                fig6 = charts.bar(
+                    top_state2,
+                    x="States",
+                    y="AppOpens",
+                    text="AppOpens",
+                    title="Top 5 States with Highest AppOpens",
+                    hover_data=["States","AppOpens"]
+                )
+                fig6.update_xaxes(type="category") 
+                plotly_chart(fig6, use_container_width=True)
             
-        with col2:
-            fig5 = px.bar(
-                bottom_state1,
-                x="States",
-                y="RegisteredUser",
-                text="RegisteredUser",
-                title="Bottom 5 States with Highest Registered Users",
-                hover_data=["States","RegisteredUser"]
-            )
-            fig5.update_xaxes(type="category") 
-            st.plotly_chart(fig5, use_container_width=True)
+            with col2:
+                fig5 = charts.bar(
+                    bottom_state1,
+                    x="States",
+                    y="RegisteredUser",
+                    text="RegisteredUser",
+                    title="Bottom 5 States with Highest Registered Users",
+                    hover_data=["States","RegisteredUser"]
+                )
+                fig5.update_xaxes(type="category") 
+                plotly_chart(fig5, use_container_width=True)
             
-            fig6 = px.bar(
-                bottom_state2,
-                x="States",
-                y="AppOpens",
-                text="AppOpens",
-                title="Bottom 5 States with Highest AppOpens",
-                hover_data=["States","AppOpens"]
-            )
-            fig6.update_xaxes(type="category") 
-            st.plotly_chart(fig6, use_container_width=True)
+                fig6 = charts.bar(
+                    bottom_state2,
+                    x="States",
+                    y="AppOpens",
+                    text="AppOpens",
+                    title="Bottom 5 States with Highest AppOpens",
+                    hover_data=["States","AppOpens"]
+                )
+                fig6.update_xaxes(type="category") 
+                plotly_chart(fig6, use_container_width=True)
 
-    elif view_option == "District - wise":
-        col1,col2 = st.columns(2)
-        with col1:
-            fig5 = px.bar(
-                top_dist1,
-                x="District",
-                y="RegisteredUser",
-                text="RegisteredUser",
-                title="Top 5 Districts with Highest Registered Users",
-                hover_data=["States","RegisteredUser"]
-            )
-            fig5.update_xaxes(type="category")
-            st.plotly_chart(fig5, use_container_width=True)
+        elif view_option == "District - wise":
+            col1,col2 = st.columns(2)
+            with col1:
+                fig5 = charts.bar(
+                    top_dist1,
+                    x="District",
+                    y="RegisteredUser",
+                    text="RegisteredUser",
+                    title="Top 5 Districts with Highest Registered Users",
+                    hover_data=["States","RegisteredUser"]
+                )
+                fig5.update_xaxes(type="category")
+                plotly_chart(fig5, use_container_width=True)
             
-            fig6 = px.bar(
-                top_dist2,
-                x="District",
-                y="AppOpens",
-                text="AppOpens",
-                title="Top 5 District with Highest AppOpens",
-                hover_data=["States","AppOpens"]
-            )
-            fig6.update_xaxes(type="category") 
-            st.plotly_chart(fig6, use_container_width=True)
+                fig6 = charts.bar(
+                    top_dist2,
+                    x="District",
+                    y="AppOpens",
+                    text="AppOpens",
+                    title="Top 5 District with Highest AppOpens",
+                    hover_data=["States","AppOpens"]
+                )
+                fig6.update_xaxes(type="category") 
+                plotly_chart(fig6, use_container_width=True)
             
-        with col2:
-            fig5 = px.bar(
-                bottom_dist1,
-                x="District",
-                y="RegisteredUser",
-                text="RegisteredUser",
-                title="bottom 5 Districts with Highest Registered Users",
-                hover_data=["States","RegisteredUser"]
-            )
-            fig5.update_xaxes(type="category")
-            st.plotly_chart(fig5, use_container_width=True)
+            with col2:
+                fig5 = charts.bar(
+                    bottom_dist1,
+                    x="District",
+                    y="RegisteredUser",
+                    text="RegisteredUser",
+                    title="bottom 5 Districts with Highest Registered Users",
+                    hover_data=["States","RegisteredUser"]
+                )
+                fig5.update_xaxes(type="category")
+                plotly_chart(fig5, use_container_width=True)
             
-            fig6 = px.bar(
-                bottom_dist2,
-                x="District",
-                y="AppOpens",
-                text="AppOpens",
-                title="bottom 5 District with Highest AppOpens",
-                hover_data=["States","AppOpens"]
-            )
-            fig6.update_xaxes(type="category") 
-            st.plotly_chart(fig6, use_container_width=True)
+                fig6 = charts.bar(
+                    bottom_dist2,
+                    x="District",
+                    y="AppOpens",
+                    text="AppOpens",
+                    title="bottom 5 District with Highest AppOpens",
+                    hover_data=["States","AppOpens"]
+                )
+                fig6.update_xaxes(type="category") 
+                plotly_chart(fig6, use_container_width=True)
 
-    elif view_option == "Pincode - wise":
-        col1,col2 = st.columns(2)
-        with col1:
-            fig5 = px.bar(
-                top_pins1,
-                x="Pincodes",
-                y="RegisteredUser",
-                text="RegisteredUser",
-                title="Top 5 Pincodes with Highest Registered Users"
-            )
-            fig5.update_xaxes(type="category")
-            st.plotly_chart(fig5, use_container_width=True)
+        elif view_option == "Pincode - wise":
+            col1,col2 = st.columns(2)
+            with col1:
+                fig5 = charts.bar(
+                    top_pins1,
+                    x="Pincodes",
+                    y="RegisteredUser",
+                    text="RegisteredUser",
+                    title="Top 5 Pincodes with Highest Registered Users"
+                )
+                fig5.update_xaxes(type="category")
+                plotly_chart(fig5, use_container_width=True)
             
-            st.warning("App Open data for Pincode is Unavailable")
+                st.warning("App Open data for Pincode is Unavailable")
             
-        with col2:
-            fig5 = px.bar(
-                bottom_pins1,
-                x="Pincodes",
-                y="RegisteredUser",
-                text="RegisteredUser",
-                title="Top 5 Pincodes with Highest Registered Users"
-            )
-            fig5.update_xaxes(type="category")
-            st.plotly_chart(fig5, use_container_width=True)
+            with col2:
+                fig5 = charts.bar(
+                    bottom_pins1,
+                    x="Pincodes",
+                    y="RegisteredUser",
+                    text="RegisteredUser",
+                    title="Top 5 Pincodes with Highest Registered Users"
+                )
+                fig5.update_xaxes(type="category")
+                plotly_chart(fig5, use_container_width=True)
             
-            st.warning("App Open data for Pincode is Unavailable")
+                st.warning("App Open data for Pincode is Unavailable")
+
+    top_users_section()
             
     # Transaction Insights (State / District / Pincode)
 
-    st.markdown("### Top 10 Transaction Amount and Transaction Count")
-    view_option = st.selectbox(
-        "📊 Select Level of Analysis",
-        ["State - wise", "District - wise", "Pincode - wise"]
-    )
+    @st.fragment
+    @profiler.profiled()
+    def top_transactions_section():
+        st.markdown("### Top 10 Transaction Amount and Transaction Count")
+        view_option = st.selectbox(
+            "📊 Select Level of Analysis",
+            ["State - wise", "District - wise", "Pincode - wise"]
+        )
 
-    # STATE-WISE
-    if view_option == "State - wise":
-        top_state = Top_district.groupby("States")[["Transaction_count","Transaction_amount"]].sum().reset_index()
-        top_state = top_state.sort_values(by="Transaction_amount", ascending=False).head(5)
 
-        col1, col2 = st.columns(2)
-        with col1:
-            fig = px.bar(
-                top_state,
-                x="States",
-                y="Transaction_amount",
-                text="Transaction_amount",
-                title="Top 5 States Driving Transactions Amount"
-            )
-            st.plotly_chart(fig, use_container_width=True)
+        # STATE-WISE
+        if view_option == "State - wise":
+            top_state = pages.index("top_district_state").top("Transaction_amount", 5)
 
-        with col2:
-            fig = px.bar(
-                top_state,
-                x="States",
-                y="Transaction_count",
-                text="Transaction_count",
-                title="Top 5 States Driving Transaction Count"
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            col1, col2 = st.columns(2)
+            with col1:
+                fig = charts.bar(
+                    top_state,
+                    x="States",
+                    y="Transaction_amount",
+                    text="Transaction_amount",
+                    title="Top 5 States Driving Transactions Amount"
+                )
+                plotly_chart(fig, use_container_width=True)
 
-    # DISTRICT-WISE
-    elif view_option == "District - wise":
-        top_dist = Top_district.groupby(["States","District"])[["Transaction_count","Transaction_amount"]].sum().reset_index()
-        top_dist = top_dist.sort_values(by="Transaction_amount", ascending=False).head(5)
+            with col2:
+                fig = charts.bar(
+                    top_state,
+                    x="States",
+                    y="Transaction_count",
+                    text="Transaction_count",
+                    title="Top 5 States Driving Transaction Count"
+                )
+                plotly_chart(fig, use_container_width=True)
 
-        col1, col2 = st.columns(2)
-        with col1:
-            fig = px.bar(
-                top_dist,
-                x="District",
-                y="Transaction_amount",
-                text="Transaction_amount",
-                title="Top 5 Districts Driving Transactions Amount",
-                hover_data=["States","District","Transaction_amount"]
-            )
-            st.plotly_chart(fig, use_container_width=True)
+        # DISTRICT-WISE
+        elif view_option == "District - wise":
+            top_dist = pages.index("top_district").top("Transaction_amount", 5)
 
-        with col2:
-            fig = px.bar(
-                top_dist,
-                x="District",
-                y="Transaction_count",
-                text="Transaction_count",
-                title="Top 5 Districts Driving Transaction Count",
-                hover_data=["States","District","Transaction_count"]
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            col1, col2 = st.columns(2)
+            with col1:
+                fig = charts.bar(
+                    top_dist,
+                    x="District",
+                    y="Transaction_amount",
+                    text="Transaction_amount",
+                    title="Top 5 Districts Driving Transactions Amount",
+                    hover_data=["States","District","Transaction_amount"]
+                )
+                plotly_chart(fig, use_container_width=True)
 
-    # PINCODE-WISE
-    elif view_option == "Pincode - wise":
-        top_pin = Top_transaction.groupby(["States","Pincodes"])[["Transaction_count","Transaction_amount"]].sum().reset_index()
-        top_pin = top_pin.sort_values(by="Transaction_amount", ascending=False).head(5)
+            with col2:
+                fig = charts.bar(
+                    top_dist,
+                    x="District",
+                    y="Transaction_count",
+                    text="Transaction_count",
+                    title="Top 5 Districts Driving Transaction Count",
+                    hover_data=["States","District","Transaction_count"]
+                )
+                plotly_chart(fig, use_container_width=True)
 
-        col1, col2 = st.columns(2)
-        with col1:
-            fig = px.bar(
-                top_pin,
-                x="Pincodes",
-                y="Transaction_amount",
-                text="Transaction_amount",
-                title="Top 5 Pincodes Driving Transactions Amount",
-                hover_data=["States","Pincodes","Transaction_amount"]
-            )
-            fig.update_xaxes(type="category")
-            st.plotly_chart(fig, use_container_width=True)
+        # PINCODE-WISE
+        elif view_option == "Pincode - wise":
+            top_pin = pages.index("top_transaction_pincode").top("Transaction_amount", 5)
 
-        with col2:
-            fig = px.bar(
-                top_pin,
-                x="Pincodes",
-                y="Transaction_count",
-                text="Transaction_count",
-                title="Top 5 Pincodes Driving Transaction Count",
-                hover_data=["States","Pincodes","Transaction_count"]
-            )
-            fig.update_xaxes(type="category")
-            st.plotly_chart(fig, use_container_width=True)
+            col1, col2 = st.columns(2)
+            with col1:
+                fig = charts.bar(
+                    top_pin,
+                    x="Pincodes",
+                    y="Transaction_amount",
+                    text="Transaction_amount",
+                    title="Top 5 Pincodes Driving Transactions Amount",
+                    hover_data=["States","Pincodes","Transaction_amount"]
+                )
+                fig.update_xaxes(type="category")
+                plotly_chart(fig, use_container_width=True)
 
+            with col2:
+                fig = charts.bar(
+                    top_pin,
+                    x="Pincodes",
+                    y="Transaction_count",
+                    text="Transaction_count",
+                    title="Top 5 Pincodes Driving Transaction Count",
+                    hover_data=["States","Pincodes","Transaction_count"]
+                )
+                fig.update_xaxes(type="category")
+                plotly_chart(fig, use_container_width=True)
+
+    top_transactions_section()
+
+@profiler.profiled()
 def map():
     st.title("MAP Visualization ")
     dataframes = {
@@ -3092,32 +2847,14 @@ def map():
             quarters = ["All"] + quarters
         Quarter = st.selectbox("Choose Quarter:", quarters)
 
-    filtered_df = df.copy()
-    if Year != "All":
-        filtered_df = filtered_df[filtered_df["Years"] == Year]
-    if Quarter != "All":
-        filtered_df = filtered_df[filtered_df["Quarter"] == Quarter]
-    url = "https://gist.githubusercontent.com/jbrobst/56c13bbbf9d97d187fea01ca62ea5112/raw/e388c4cae20aa53cb5090210a42ebb9b765c0a36/india_states.geojson"
-    geo_data = json.loads(requests.get(url).content)
+    filtered_df = filter_slice(df, Years=Year, Quarter=Quarter)
+    geo_data = load_geojson(INDIA_GEOJSON_URL)
    
     # Case 1: Transaction_type
     if df_choice1 == "Transaction_type":
-        map_df = filtered_df.copy()
-
-        most_used = (
-            map_df.groupby(["States", "Transaction_type"], as_index=False)["Transaction_amount"].sum()
-            .sort_values(["States", "Transaction_amount"], ascending=[True, False])
-            .groupby("States").first().reset_index()
-        )
+        totals = transaction_type_summary(filtered_df)
 
-        totals = map_df.groupby("States", as_index=False)[["Transaction_amount", "Transaction_count"]].sum()
-        total_amt, total_cnt = totals["Transaction_amount"].sum(), totals["Transaction_count"].sum()
-
-        totals["Transaction_Percentage"] = (totals["Transaction_amount"] / total_amt) * 100
-        totals["Count_Percentage"] = (totals["Transaction_count"] / total_cnt) * 100
-        totals["Transaction_type"] = most_used["Transaction_type"]
-
-        fig = px.choropleth(
+        fig = charts.choropleth(
             totals,
             geojson=geo_data,
             locations="States",
@@ -3137,7 +2874,7 @@ def map():
             color_continuous_scale="Sunsetdark"
         )
         fig.update_geos(visible=False)
-        st.plotly_chart(fig, use_container_width=True)
+        plotly_chart(fig, use_container_width=True)
         
         # Use Transaction_Percentage for ranking
         top5 = totals.nlargest(5, "Transaction_Percentage")
@@ -3164,17 +2901,14 @@ def map():
         if filtered_df.empty:
             st.warning("No data available for the selected filters.")
         else:
-            most_used = (
-                filtered_df.sort_values(["States", "Transaction_Percentage"], ascending=[True, False])
-                .groupby("States").first().reset_index()
-            )
+            most_used = most_used_brand(filtered_df)
             most_used["Transaction_Percentage"] = most_used["Transaction_Percentage"].round(2)
 
             title_text = "Most Used Device in Each State"
             if Year != "All": title_text += f" - {Year}"
             if Quarter != "All": title_text += f" Q{Quarter}"
 
-            fig = px.choropleth(
+            fig = charts.choropleth(
                 most_used,
                 geojson=geo_data,
                 locations="States",
@@ -3188,7 +2922,7 @@ def map():
                 height=900
             )
             fig.update_geos(visible=False)
-            st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig, use_container_width=True)
             top5 = most_used.nlargest(5, "Transaction_Percentage")
             bottom5 = most_used.nsmallest(5, "Transaction_Percentage")
 
@@ -3207,12 +2941,12 @@ def map():
                     "Transaction_Percentage", 
                     f"Bottom 5 States by Transaction Percentage ({Year}, Q{Quarter})"
                 )
-            df_grouped = filtered_df.groupby("States")[[df_choice1]].sum().reset_index()
+            df_grouped = totals_by(filtered_df, "States", [df_choice1])
     
     elif df_choice1 == "Transaction_Percentage":
-        df_grouped = filtered_df.groupby(["Brand","States"])[[df_choice1]].sum().reset_index()
+        df_grouped = totals_by(filtered_df, ["Brand", "States"], [df_choice1])
 
-        fig = px.choropleth(
+        fig = charts.choropleth(
             df_grouped,
             geojson=geo_data,
             locations="States",
@@ -3226,7 +2960,7 @@ def map():
             color_continuous_scale="Sunsetdark"
         )
         fig.update_geos(visible=False)
-        st.plotly_chart(fig, use_container_width=True)
+        plotly_chart(fig, use_container_width=True)
 
         top5 = df_grouped.nlargest(5, df_choice1)
         bottom5 = df_grouped.nsmallest(5, df_choice1)
@@ -3238,9 +2972,9 @@ def map():
 
     # Case 3: Other numeric columns
     else:
-        df_grouped = filtered_df.groupby("States")[[df_choice1]].sum().reset_index()
+        df_grouped = totals_by(filtered_df, "States", [df_choice1])
 
-        fig = px.choropleth(
+        fig = charts.choropleth(
             df_grouped,
             geojson=geo_data,
             locations="States",
@@ -3254,7 +2988,7 @@ def map():
             color_continuous_scale="Sunsetdark"
         )
         fig.update_geos(visible=False)
-        st.plotly_chart(fig, use_container_width=True)
+        plotly_chart(fig, use_container_width=True)
 
         top5 = df_grouped.nlargest(5, df_choice1)
         bottom5 = df_grouped.nsmallest(5, df_choice1)
@@ -3313,6 +3047,7 @@ with st.sidebar:
         icons=["house", "bar-chart", "pie-chart", "map"],
         default_index=0
     )
+profiler.context["page"] = select
     
 # HOME PAGE
 if select == "Home":
@@ -3324,9 +3059,7 @@ if select == "Home":
     state_choice = st.sidebar.selectbox("Select State:", states, key="state_choice")
 
     if state_choice != "All":
-        districts = ["All"] + sorted(
-            Map_transaction[Map_transaction["States"] == state_choice]["District"].unique()
-        )
+        districts = ["All"] + sorted(unique_values(Map_transaction, "District", States=state_choice))
     else:
         districts = ["All"]
 
@@ -3336,13 +3069,10 @@ if select == "Home":
 
     if state_choice != "All" and district_choice != "All":
         pincodes = ["All"] + sorted(
-            Map_transaction[(Map_transaction["States"] == state_choice) & 
-                            (Map_transaction["District"] == district_choice)]["District"].unique()
+            unique_values(Map_transaction, "District", States=state_choice, District=district_choice)
         )
     elif state_choice != "All":
-        pincodes = ["All"] + sorted(
-            Top_transaction[Top_transaction["States"] == state_choice]["Pincodes"].unique()
-        )
+        pincodes = ["All"] + sorted(unique_values(Top_transaction, "Pincodes", States=state_choice))
     else:
         pincodes = ["All"]  
 
@@ -3350,221 +3080,170 @@ if select == "Home":
         "Select Pincode:", pincodes, key="pincode_choice", disabled=(state_choice == "All")
     )
 
-    def get_filtered_data(state, district, pincode):
-        if state == "All" and district == "All" and pincode == "All":
-            return Aggre_insurance, Aggre_transaction, Map_user
-
-        elif state != "All" and district == "All" and pincode == "All":
-            return (Map_insurance[Map_insurance["States"] == state],
-                    Map_transaction[Map_transaction["States"] == state],
-                    Map_user[Map_user["States"] == state])
-        elif district != "All" and pincode == "All":
-            return (Map_insurance[(Map_insurance["States"] == state) & (Map_insurance["District"] == district)],
-                    Map_transaction[(Map_transaction["States"] == state) & (Map_transaction["District"] == district)],
-                    Map_user[(Map_user["States"] == state) & (Map_user["District"] == district)])
-        elif pincode != "All":
-            ins = Top_insurance[
-                (Top_insurance["States"] == state) & (Top_insurance["Pincodes"] == pincode)
-            ]
-            txn = Top_transaction[
-                (Top_transaction["States"] == state) & (Top_transaction["Pincodes"] == pincode)
-            ]
-            if "Pincodes" in Top_user.columns:
-                user = Top_user[
-                    (Top_user["States"] == state) & 
-                    (Top_user["Pincodes"].astype(str) == str(pincode))
-                ]
-            else:
-                user = pd.DataFrame()
-            return ins, txn, user
-        else:
-            return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
-
-    filtered_insurance, filtered_transaction, filtered_user = get_filtered_data(
-        state_choice, district_choice, pincode_choice
-    )
+    with profiler.span("home.slices"):
+        filtered_insurance, filtered_transaction, filtered_user = location_slices(
+            datasets, state_choice, district_choice, pincode_choice
+        )
+        ins_breakdown, txn_breakdown, user_breakdown = location_breakdown(
+            datasets, state_choice, district_choice, pincode_choice
+        )
+        profiler.note(rows_out=row_count([filtered_insurance, filtered_transaction, filtered_user]))
 
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        if filtered_insurance.empty:
-            st.warning("⚠️ No data available for Insurance.")
-        else:
-            st.metric("💰 Insurance Amount", f"₹ {filtered_insurance['Transaction_amount'].sum():,.0f}")
-            st.metric("🛡️ Insurance Count", f"{filtered_insurance['Transaction_count'].sum():,}")
-    with col2:
-        if filtered_transaction.empty:
-            st.warning("⚠️ No data available for Transactions.")
-        else:
-            st.metric("💸 Transaction Amount", f"₹ {filtered_transaction['Transaction_amount'].sum():,.0f}")
-            st.metric("📊 Transaction Count", f"{filtered_transaction['Transaction_count'].sum():,}")
-    with col3:
-        if filtered_user.empty:
-            st.warning("⚠️ No user data available.")
-        else:   
-            if "RegisteredUser" in filtered_user.columns:
-                st.metric("👥 Registered Users", f"{filtered_user['RegisteredUser'].sum():,}")
+    with profiler.span("home.metrics"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            if filtered_insurance.empty:
+                st.warning("⚠️ No data available for Insurance.")
             else:
-                st.warning("⚠️ RegisteredUser column missing.")
-
-            if "AppOpens" in filtered_user.columns and filtered_user["AppOpens"].sum() > 0:
-                st.metric("📱 App Opens", f"{filtered_user['AppOpens'].sum():,}")
+                st.metric("💰 Insurance Amount", f"₹ {filtered_insurance['Transaction_amount'].sum():,.0f}")
+                st.metric("🛡️ Insurance Count", f"{filtered_insurance['Transaction_count'].sum():,}")
+        with col2:
+            if filtered_transaction.empty:
+                st.warning("⚠️ No data available for Transactions.")
             else:
-                st.write("📱 App Opens")
-                st.warning("⚠️ No AppOpens data available.")
-    
-    if state_choice == "All":
-        tab1,tab2,tab3=st.columns(3)
-        with tab1:
-            insurance_state = Aggre_insurance.groupby("States")[["Transaction_count","Transaction_amount"]].sum().reset_index()
-            fig = px.bar(insurance_state, x="States", y="Transaction_amount",
-                        title="insurance Amount by State", text_auto=True)
-            st.plotly_chart(fig, use_container_width=True)
-            fig1 = px.bar(insurance_state, x="States", y="Transaction_count",
-                    title="insurance count by State", text_auto=True)
-            st.plotly_chart(fig1, use_container_width=True)
-        with tab2:   
-            trans_state = Aggre_transaction.groupby("States")[["Transaction_count","Transaction_amount"]].sum().reset_index()
-            fig = px.bar(trans_state, x="States", y="Transaction_amount",
-                        title="Transaction Amount by State", text_auto=True)
-            st.plotly_chart(fig, use_container_width=True)
-            fig1 = px.bar(trans_state, x="States", y="Transaction_count",
-                        title="Transaction count by State", text_auto=True)
-            st.plotly_chart(fig1, use_container_width=True)
-        with tab3:
-            user_state = Map_user.groupby("States")[["RegisteredUser","AppOpens"]].sum().reset_index()
-            fig = px.bar(user_state, x="States", y="RegisteredUser",
-                        title="Transaction Amount by State", text_auto=True)
-            st.plotly_chart(fig, use_container_width=True)
-            fig1 = px.bar(user_state, x="States", y="AppOpens",
-                        title="Transaction count by State", text_auto=True)
-            st.plotly_chart(fig1, use_container_width=True)
-
-    elif district_choice == "All" and pincode_choice == "All":
-        tab1,tab2,tab3 = st.columns(3)
-        with tab1:
-            trans_dist = Map_insurance[Map_insurance["States"] == state_choice].groupby("District")[["Transaction_count","Transaction_amount"]].sum().reset_index()
-            fig = px.bar(trans_dist, x="District", y="Transaction_amount",
-                        title=f"Insurance Amount in {state_choice} by District", text_auto=True)
-            st.plotly_chart(fig, use_container_width=True)
-
-            fig = px.bar(trans_dist, x="District", y="Transaction_count",
-                        title=f"Insurance Count in {state_choice} by District", text_auto=True)
-            st.plotly_chart(fig, use_container_width=True)
+                st.metric("💸 Transaction Amount", f"₹ {filtered_transaction['Transaction_amount'].sum():,.0f}")
+                st.metric("📊 Transaction Count", f"{filtered_transaction['Transaction_count'].sum():,}")
+        with col3:
+            if filtered_user.empty:
+                st.warning("⚠️ No user data available.")
+            else:   
+                if "RegisteredUser" in filtered_user.columns:
+                    st.metric("👥 Registered Users", f"{filtered_user['RegisteredUser'].sum():,}")
+                else:
+                    st.warning("⚠️ RegisteredUser column missing.")
+
+                if "AppOpens" in filtered_user.columns and filtered_user["AppOpens"].sum() > 0:
+                    st.metric("📱 App Opens", f"{filtered_user['AppOpens'].sum():,}")
+                else:
+                    st.write("📱 App Opens")
+                    st.warning("⚠️ No AppOpens data available.")
+    
+    with profiler.span("home.charts"):
+        if state_choice == "All":
+            tab1,tab2,tab3=st.columns(3)
+            with tab1:
+                fig = charts.bar(ins_breakdown, x="States", y="Transaction_amount",
+                            title="insurance Amount by State", text_auto=True)
+                plotly_chart(fig, use_container_width=True)
+                fig1 = charts.bar(ins_breakdown, x="States", y="Transaction_count",
+                        title="insurance count by State", text_auto=True)
+                plotly_chart(fig1, use_container_width=True)
+            with tab2:   
+                fig = charts.bar(txn_breakdown, x="States", y="Transaction_amount",
+                            title="Transaction Amount by State", text_auto=True)
+                plotly_chart(fig, use_container_width=True)
+                fig1 = charts.bar(txn_breakdown, x="States", y="Transaction_count",
+                            title="Transaction count by State", text_auto=True)
+                plotly_chart(fig1, use_container_width=True)
+            with tab3:
+                fig = charts.bar(user_breakdown, x="States", y="RegisteredUser",
+                            title="Transaction Amount by State", text_auto=True)
+                plotly_chart(fig, use_container_width=True)
+                fig1 = charts.bar(user_breakdown, x="States", y="AppOpens",
+                            title="Transaction count by State", text_auto=True)
+                plotly_chart(fig1, use_container_width=True)
+
+        elif district_choice == "All" and pincode_choice == "All":
+            tab1,tab2,tab3 = st.columns(3)
+            with tab1:
+                fig = charts.bar(ins_breakdown, x="District", y="Transaction_amount",
+                            title=f"Insurance Amount in {state_choice} by District", text_auto=True)
+                plotly_chart(fig, use_container_width=True)
+
+                fig = charts.bar(ins_breakdown, x="District", y="Transaction_count",
+                            title=f"Insurance Count in {state_choice} by District", text_auto=True)
+                plotly_chart(fig, use_container_width=True)
             
-        with tab2:
-            trans_dist = Map_transaction[Map_transaction["States"] == state_choice].groupby("District")[["Transaction_count","Transaction_amount"]].sum().reset_index()
-            fig = px.bar(trans_dist, x="District", y="Transaction_amount",
-                        title=f"Transaction Amount in {state_choice} by District", text_auto=True)
-            st.plotly_chart(fig, use_container_width=True)
+            with tab2:
+                fig = charts.bar(txn_breakdown, x="District", y="Transaction_amount",
+                            title=f"Transaction Amount in {state_choice} by District", text_auto=True)
+                plotly_chart(fig, use_container_width=True)
                 
-            fig = px.bar(trans_dist, x="District", y="Transaction_count",
-                        title=f"Transaction Count in {state_choice} by District", text_auto=True)
-            st.plotly_chart(fig, use_container_width=True)
+                fig = charts.bar(txn_breakdown, x="District", y="Transaction_count",
+                            title=f"Transaction Count in {state_choice} by District", text_auto=True)
+                plotly_chart(fig, use_container_width=True)
         
-        with tab3:
-            trans_dist = Map_user[Map_user["States"] == state_choice].groupby("District")[["RegisteredUser","AppOpens"]].sum().reset_index()
-            fig = px.bar(trans_dist, x="District", y="RegisteredUser",
-                        title=f"Registered User in {state_choice} by District", text_auto=True)
-            st.plotly_chart(fig, use_container_width=True)
+            with tab3:
+                fig = charts.bar(user_breakdown, x="District", y="RegisteredUser",
+                            title=f"Registered User in {state_choice} by District", text_auto=True)
+                plotly_chart(fig, use_container_width=True)
                 
-            fig = px.bar(trans_dist, x="District", y="AppOpens",
-                        title=f"App Opens in {state_choice} by District", text_auto=True)
-            st.plotly_chart(fig, use_container_width=True)
+                fig = charts.bar(user_breakdown, x="District", y="AppOpens",
+                            title=f"App Opens in {state_choice} by District", text_auto=True)
+                plotly_chart(fig, use_container_width=True)
     
-    elif pincode_choice == "All" and district_choice != "All":
-        tab1,tab2,tab3=st.columns(3)
-        with tab1:
-            trans_pin = Map_insurance[(Map_insurance["States"] == state_choice) &
-                                        (Map_insurance["District"] == district_choice)].groupby("Years")[["Transaction_count","Transaction_amount"]].sum().reset_index()
-            fig = px.bar(trans_pin, x="Years", y="Transaction_amount",
-                        title=f"Insurance Amount in {district_choice} by Years", text_auto=True)
-            fig.update_xaxes(type="category")
-            st.plotly_chart(fig, use_container_width=True) 
-
-            fig1 = px.bar(trans_pin, x="Years", y="Transaction_count",
-                        title=f"insurance count in {district_choice} by Years", text_auto=True)
-            fig1.update_xaxes(type="category")
-            st.plotly_chart(fig1, use_container_width=True) 
-        with tab2:
-            trans_pin = Map_transaction[(Map_transaction["States"] == state_choice) &
-                                        (Map_transaction["District"] == district_choice)].groupby("Years")[["Transaction_count","Transaction_amount"]].sum().reset_index()
-            fig = px.bar(trans_pin, x="Years", y="Transaction_amount",
-                        title=f"Transaction Amount in {district_choice} by Years", text_auto=True)
-            fig.update_xaxes(type="category")
-            st.plotly_chart(fig, use_container_width=True) 
-
-            fig1 = px.bar(trans_pin, x="Years", y="Transaction_count",
-                        title=f"Transaction count in {district_choice} by Years", text_auto=True)
-            fig1.update_xaxes(type="category")
-            st.plotly_chart(fig1, use_container_width=True) 
-        with tab3:
-            trans_pin = Map_user[(Map_user["States"] == state_choice) &
-                                        (Map_user["District"] == district_choice)].groupby("Years")[["RegisteredUser","AppOpens"]].sum().reset_index()
-            fig = px.bar(trans_pin, x="Years", y="RegisteredUser",
-                        title=f"RegisteredUser in {district_choice} by Years", text_auto=True)
-            fig.update_xaxes(type="category")
-            st.plotly_chart(fig, use_container_width=True) 
-
-            fig1 = px.bar(trans_pin, x="Years", y="AppOpens",
-                        title=f"AppOpens in {district_choice} by Years", text_auto=True)
-            fig1.update_xaxes(type="category")
-            st.plotly_chart(fig1, use_container_width=True) 
-        
-    elif pincode_choice != "All" :
-        tab1,tab2,tab3 = st.columns(3)
-        with tab1:
-            trans_pin = Top_insurance[
-                (Top_insurance["States"] == state_choice) &
-                (Top_insurance["Pincodes"] == pincode_choice)
-            ].groupby("Years")[["Transaction_count", "Transaction_amount"]].sum().reset_index()
+        elif pincode_choice == "All" and district_choice != "All":
+            tab1,tab2,tab3=st.columns(3)
+            with tab1:
+                fig = charts.bar(ins_breakdown, x="Years", y="Transaction_amount",
+                            title=f"Insurance Amount in {district_choice} by Years", text_auto=True)
+                fig.update_xaxes(type="category")
+                plotly_chart(fig, use_container_width=True) 
 
-            fig = px.bar(trans_pin, x="Years", y="Transaction_amount",
-                        title=f"Insurance Amount in {pincode_choice} by Years", text_auto=True)
-            fig.update_xaxes(type="category")
-            st.plotly_chart(fig, use_container_width=True)
+                fig1 = charts.bar(ins_breakdown, x="Years", y="Transaction_count",
+                            title=f"insurance count in {district_choice} by Years", text_auto=True)
+                fig1.update_xaxes(type="category")
+                plotly_chart(fig1, use_container_width=True) 
+            with tab2:
+                fig = charts.bar(txn_breakdown, x="Years", y="Transaction_amount",
+                            title=f"Transaction Amount in {district_choice} by Years", text_auto=True)
+                fig.update_xaxes(type="category")
+                plotly_chart(fig, use_container_width=True) 
 
-            fig1 = px.bar(trans_pin, x="Years", y="Transaction_count",
-                        title=f"Insurance Count in {pincode_choice} by Years", text_auto=True)
-            fig1.update_xaxes(type="category")
-            st.plotly_chart(fig1, use_container_width=True)
+                fig1 = charts.bar(txn_breakdown, x="Years", y="Transaction_count",
+                            title=f"Transaction count in {district_choice} by Years", text_auto=True)
+                fig1.update_xaxes(type="category")
+                plotly_chart(fig1, use_container_width=True) 
+            with tab3:
+                fig = charts.bar(user_breakdown, x="Years", y="RegisteredUser",
+                            title=f"RegisteredUser in {district_choice} by Years", text_auto=True)
+                fig.update_xaxes(type="category")
+                plotly_chart(fig, use_container_width=True) 
 
-        with tab2:
-            trans_pin = Top_transaction[
-                (Top_transaction["States"] == state_choice) &
-                (Top_transaction["Pincodes"] == pincode_choice)
-            ].groupby("Years")[["Transaction_count", "Transaction_amount"]].sum().reset_index()
+                fig1 = charts.bar(user_breakdown, x="Years", y="AppOpens",
+                            title=f"AppOpens in {district_choice} by Years", text_auto=True)
+                fig1.update_xaxes(type="category")
+                plotly_chart(fig1, use_container_width=True) 
+        
+        elif pincode_choice != "All" :
+            tab1,tab2,tab3 = st.columns(3)
+            with tab1:
 
-            fig = px.bar(trans_pin, x="Years", y="Transaction_amount",
-                        title=f"Transaction Amount in {pincode_choice} by Years", text_auto=True)
-            fig.update_xaxes(type="category")
-            st.plotly_chart(fig, use_container_width=True)
+                fig = charts.bar(ins_breakdown, x="Years", y="Transaction_amount",
+                            title=f"Insurance Amount in {pincode_choice} by Years", text_auto=True)
+                fig.update_xaxes(type="category")
+                plotly_chart(fig, use_container_width=True)
 
-            fig1 = px.bar(trans_pin, x="Years", y="Transaction_count",
-                        title=f"Transaction Count in {pincode_choice} by Years", text_auto=True)
-            fig1.update_xaxes(type="category")
-            st.plotly_chart(fig1, use_container_width=True)
+                fig1 = charts.bar(ins_breakdown, x="Years", y="Transaction_count",
+                            title=f"Insurance Count in {pincode_choice} by Years", text_auto=True)
+                fig1.update_xaxes(type="category")
+                plotly_chart(fig1, use_container_width=True)
 
-        with tab3:
-            if "Pincodes" in Top_user.columns:
-                user = Top_user[
-                    (Top_user["States"] == state_choice) & 
-                    (Top_user["Pincodes"].astype(str) == str(pincode_choice))
-                ]
-            else:
-                user = pd.DataFrame()
-            if not user.empty:
-                user_summary = user.groupby("Years")["RegisteredUser"].sum().reset_index()
-                fig = px.bar(
-                    user_summary,
-                    x="Years",
-                    y="RegisteredUser",
-                    text_auto=True,
-                    title=f"Registered Users in {pincode_choice}, {state_choice} (by Years)"
-                )
+            with tab2:
+
+                fig = charts.bar(txn_breakdown, x="Years", y="Transaction_amount",
+                            title=f"Transaction Amount in {pincode_choice} by Years", text_auto=True)
                 fig.update_xaxes(type="category")
-                st.plotly_chart(fig, use_container_width=True)
-            else:
-                st.warning(f"No user data available for {pincode_choice}, {state_choice}")
+                plotly_chart(fig, use_container_width=True)
+
+                fig1 = charts.bar(txn_breakdown, x="Years", y="Transaction_count",
+                            title=f"Transaction Count in {pincode_choice} by Years", text_auto=True)
+                fig1.update_xaxes(type="category")
+                plotly_chart(fig1, use_container_width=True)
+
+            with tab3:
+                if not user_breakdown.empty:
+                    fig = charts.bar(
+                        user_breakdown,
+                        x="Years",
+                        y="RegisteredUser",
+                        text_auto=True,
+                        title=f"Registered Users in {pincode_choice}, {state_choice} (by Years)"
+                    )
+                    fig.update_xaxes(type="category")
+                    plotly_chart(fig, use_container_width=True)
+                else:
+                    st.warning(f"No user data available for {pincode_choice}, {state_choice}")
                 
 # DATA EXPLORATION PAGE
 if select == "Data Exploration":
@@ -3575,42 +3254,17 @@ if select == "Data Exploration":
         analysis_type1 = st.selectbox("Select Analysis Type", ["Aggregated Transaction", "Aggregated Insurance", "Aggregated User"])
         st.write("************************************************************")
         if analysis_type1 == "Aggregated Transaction":
-            most_transaction_of_agg_transaction, fig1 = most_transaction(Aggre_transaction)
-            tab1, tab2 = st.tabs(["Bar Graph", "Raw Data"])
-            with tab1:
-                st.plotly_chart(fig1)
-            with tab2:
-                st.dataframe(most_transaction_of_agg_transaction, hide_index=True)
-            Aggre_india_map = Aggre_plot(Aggre_transaction)
-            df, fig = plot_transaction_dynamics(Aggre_transaction)
-            tab1, tab2 = st.tabs(["Bar Graph", "Raw Data"])
-            with tab1:
-                st.plotly_chart(fig)
-            with tab2:
-                st.dataframe(df,hide_index= True)
+            chart_and_data(most_transaction, Aggre_transaction)
+            Aggre_plot(Aggre_transaction)
+            chart_and_data(plot_transaction_dynamics, Aggre_transaction)
                       
         elif analysis_type1 == "Aggregated Insurance":            
-            df, fig = most_transaction(Aggre_insurance)
-            tab1, tab2 = st.tabs(["Bar Graph", "Raw Data"])
-            with tab1:
-                 st.plotly_chart(fig)
-            with tab2:
-                 st.dataframe(df, hide_index=True)                 
-            Aggre_india_map = Aggre_plot(Aggre_insurance)            
-            df, fig = plot_insurance_in_each_quarter(Aggre_insurance)
-            tab1, tab2 = st.tabs(["Bar Graph", "Raw Data"])
-            with tab1:
-                st.plotly_chart(fig)
-            with tab2:
-                st.dataframe(df,hide_index= True)
+            chart_and_data(most_transaction, Aggre_insurance)
+            Aggre_plot(Aggre_insurance)            
+            chart_and_data(plot_insurance_in_each_quarter, Aggre_insurance)
 
         elif analysis_type1 == "Aggregated User":
-            df, fig = user_brand_in_each_state(Aggre_user)
-            tab1, tab2 = st.tabs(["Bar Graph", "Raw Data"])
-            with tab1:
-                st.plotly_chart(fig)    
-            with tab2:
-                st.dataframe(df, hide_index=True)
+            chart_and_data(user_brand_in_each_state, Aggre_user)
             st.write("*******************************************************************")            
             most_used_device_in_each_state_in_india_map(Aggre_user)
     
@@ -3706,13 +3360,15 @@ if select == "Map":
     map()
 
 
+with st.sidebar.expander("Cache statistics"):
+    figure_stats = figure_cache().stats()
+    st.caption(f"Figures: {figure_stats['hit_rate']:.0%} hit rate "
+               f"({figure_stats['hits']} of {figure_stats['hits'] + figure_stats['misses']} lookups), "
+               f"{figure_stats['entries']} held in {figure_stats['bytes'] / 2**20:.1f} of "
+               f"{figure_stats['max_bytes'] / 2**20:.0f} MiB, {figure_stats['evictions']} evicted")
 
-
-
-
-
-
-
-
-
-
+if show_profile:
+    with st.sidebar.expander("Profile", expanded=True):
+        st.caption("Wall time per section and data-load step of this run; figure_hits/misses are figure-cache lookups.")
+        st.dataframe(profiler.summary(), hide_index=True)
+        st.dataframe(profiler.table(), hide_index=True)
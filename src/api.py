@@ -0,0 +1,393 @@
+"""
+Local JSON API over the aggregated Pulse datasets.
+
+    python src/api.py --data-dir output/ --port 8000
+    python src/api.py --storage gs://phonepe-insight-transaction --prefix output/
+    python src/api.py --storage gs://phonepe-insight-transaction --prefix output/ --out-of-core
+
+Endpoints (year/quarter default to "All"):
+    GET /health
+    GET /v1/states?dataset=Aggre_transaction&year=2023&quarter=1
+    GET /v1/districts?dataset=Map_transaction&state=Karnataka&year=2023
+    GET /v1/pincodes/top?dataset=Top_transaction&measure=Transaction_amount&n=10&state=Karnataka
+    GET /v1/growth?dataset=Aggre_transaction&level=state&current=2023&compare=2022
+    GET /v1/engagement?level=district&year=2023&quarter=4
+
+Responses carry an ETag derived from the data version and the normalized request,
+so a matching If-None-Match is answered with 304 before any query runs.
+
+With --out-of-core the pincode-level Top_* datasets are not loaded: their
+queries stream the published row groups through pulse_analytics.outofcore,
+with memory bounded by a row group and the groups aggregated, and answer
+exactly what the in-memory queries do.
+"""
+import argparse
+import hashlib
+import json
+import sys
+import threading
+import traceback
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from pulse_analytics import (
+    ALL,
+    DATASET_COLUMNS,
+    DATASET_FILES,
+    ChunkedTable,
+    Prewarmer,
+    RankingIndex,
+    VersionWatcher,
+    calculate_year_growth,
+    data_version,
+    engagement_ratio,
+    load_raw,
+    prepare_dataset,
+    read_manifest,
+    totals_by,
+)
+from pulse_storage import open_storage, storage_url
+
+KEY_COLUMNS = ("States", "Years", "Quarter", "District", "Pincodes", "Transaction_type", "Brand")
+LEVEL_COLUMNS = {
+    "state": ["States"],
+    "district": ["District", "States"],
+    "pincode": ["Pincodes", "States"],
+}
+
+
+# Indexes behind the default /v1/pincodes/top and /v1/engagement queries, built before a version is served
+WARM_INDEXES = [
+    ("Top_transaction", ("States", "Pincodes"), ("Transaction_count", "Transaction_amount"), None),
+    ("Map_user", ("States",), ("RegisteredUser", "AppOpens"), {"EngagementRatio": engagement_ratio}),
+]
+# Datasets queried from the published row groups instead of memory with --out-of-core
+OUT_OF_CORE_DATASETS = ("Top_insurance", "Top_transaction", "Top_user")
+
+
+class BadRequest(Exception):
+    pass
+
+
+def measures_of(dataset):
+    return [col for col in DATASET_COLUMNS[dataset] if col not in KEY_COLUMNS]
+
+
+class DataSnapshot:
+    """
+    Prepared datasets of one data version, with ranking indexes built on first
+    use; tables holds the datasets queried out of core, as ChunkedTables.
+    """
+
+    def __init__(self, version, datasets, tables=None):
+        self.version = version
+        self.datasets = datasets
+        self.tables = dict(tables or {})
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    def dataset(self, name):
+        if name not in self.datasets:
+            raise BadRequest(f"unknown dataset {name!r}")
+        return self.datasets[name]
+
+    def columns(self, name):
+        if name in self.tables:
+            return self.tables[name].columns
+        return self.dataset(name).columns
+
+    def totals_by(self, name, by, measures, **filters):
+        if name in self.tables:
+            return self.tables[name].totals_by(by, measures, **filters)
+        return totals_by(self.dataset(name), by, measures, **filters)
+
+    def ranking(self, dataset, entity_cols, measures, derived=None):
+        key = (dataset, tuple(entity_cols), tuple(measures))
+        with self._lock:
+            if key not in self._indexes:
+                self._indexes[key] = RankingIndex(self.dataset(dataset), entity_cols, measures, derived=derived)
+            return self._indexes[key]
+
+
+class DataSource:
+    """
+    Loads the datasets, and the ranking indexes of the default queries, in the
+    background whenever the source's version token changes; the token is polled
+    every refresh_seconds, and load(version) returns the raw frames of a version.
+    tables(version), when given, returns the datasets of a version queried out of
+    core; load() need not return those. Requests are answered from the newest
+    complete snapshot.
+    """
+
+    def __init__(self, load, version, refresh_seconds=5.0, tables=None):
+        self._load = load
+        self._tables = tables
+        self._snapshot = None
+        self.prewarmer = Prewarmer(self._build, VersionWatcher(version, refresh_seconds).start())
+
+    def start(self):
+        self.prewarmer.start()
+        return self
+
+    def _build(self, version):
+        tables = self._tables(version) if self._tables is not None else {}
+        raw = self._load(version)
+        datasets = {name: prepare_dataset(name, raw[file_name])
+                    for name, file_name in DATASET_FILES.items() if name not in tables}
+        snapshot = DataSnapshot(version, datasets, tables)
+        for dataset, entity_cols, measures, derived in WARM_INDEXES:
+            if dataset in datasets:
+                snapshot.ranking(dataset, entity_cols, measures, derived=derived)
+        self._snapshot = snapshot
+
+    def current(self, timeout=60.0):
+        """
+        The newest snapshot. Waits up to timeout for the first build to finish, and
+        raises RuntimeError, with the build's error, if no build has succeeded.
+        """
+        self.prewarmer.settled.wait(timeout)
+        if not self.prewarmer.ready.is_set():
+            status = self.prewarmer.status
+            detail = f": {status['error']}" if status["error"] else ""
+            raise RuntimeError(f"data not ready ({status['state']}{detail})")
+        return self._snapshot
+
+
+def storage_source(storage, prefix="", refresh_seconds=5.0, out_of_core=False, spill_dir=None):
+    """
+    Started DataSource over the published versions, or the CSVs, under prefix of a
+    pulse_storage backend. With out_of_core, the OUT_OF_CORE_DATASETS of published
+    versions are queried from storage, spilling aggregates under spill_dir.
+    """
+    if not out_of_core:
+        return DataSource(lambda version: load_raw(storage, prefix, version)[1], lambda: data_version(storage, prefix),
+                          refresh_seconds).start()
+
+    def tables(version):
+        manifest = read_manifest(storage, prefix, version)
+        if manifest is None:
+            raise ValueError(f"--out-of-core needs a published version under {prefix!r}")
+        return {name: ChunkedTable(storage, manifest, name, spill_dir=spill_dir) for name in OUT_OF_CORE_DATASETS}
+
+    files = [file_name for name, file_name in DATASET_FILES.items() if name not in OUT_OF_CORE_DATASETS]
+    return DataSource(lambda version: load_raw(storage, prefix, version, files=files)[1],
+                      lambda: data_version(storage, prefix), refresh_seconds, tables=tables).start()
+
+
+class ResponseCache:
+    """Response bodies of the current data version; entries of older versions are dropped."""
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._version = None
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, version, key):
+        with self._lock:
+            if version != self._version:
+                return None
+            return self._entries.get(key)
+
+    def put(self, version, key, body):
+        with self._lock:
+            if version != self._version:
+                self._version = version
+                self._entries = {}
+            if len(self._entries) >= self.max_entries:
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = body
+
+
+# Query parameters
+def period(params, name):
+    value = params.get(name, ALL)
+    if value == ALL:
+        return ALL
+    try:
+        return int(value)
+    except ValueError:
+        raise BadRequest(f"{name} must be an integer or {ALL!r}")
+
+
+def growth_year(params, name):
+    value = params.get(name, "Overall")
+    return value if value == "Overall" else period(params, name)
+
+
+def positive_int(params, name, default):
+    try:
+        value = int(params.get(name, default))
+    except ValueError:
+        raise BadRequest(f"{name} must be an integer")
+    if value < 1:
+        raise BadRequest(f"{name} must be positive")
+    return value
+
+
+def require_column(snapshot, dataset, column):
+    if column not in snapshot.columns(dataset):
+        raise BadRequest(f"{dataset} has no {column} column")
+
+
+# Endpoints
+def state_totals(snapshot, params):
+    dataset = params.get("dataset", "Aggre_transaction")
+    snapshot.columns(dataset)  # an unknown dataset is a BadRequest
+    return snapshot.totals_by(dataset, "States", measures_of(dataset), Years=period(params, "year"),
+                              Quarter=period(params, "quarter"))
+
+
+def district_totals(snapshot, params):
+    dataset = params.get("dataset", "Map_transaction")
+    require_column(snapshot, dataset, "District")
+    return snapshot.totals_by(dataset, ["States", "District"], measures_of(dataset), States=params.get("state", ALL),
+                              Years=period(params, "year"), Quarter=period(params, "quarter"))
+
+
+def top_pincodes(snapshot, params):
+    dataset = params.get("dataset", "Top_transaction")
+    require_column(snapshot, dataset, "Pincodes")
+    measures = measures_of(dataset)
+    measure = params.get("measure", measures[-1])
+    if measure not in measures:
+        raise BadRequest(f"measure must be one of {measures}")
+    n = positive_int(params, "n", 10)
+    where = {"States": params.get("state", ALL)}
+    if dataset in snapshot.tables:
+        return snapshot.tables[dataset].top(("States", "Pincodes"), measures, measure, n, period(params, "year"),
+                                            period(params, "quarter"), where=where)
+    index = snapshot.ranking(dataset, ("States", "Pincodes"), measures)
+    return index.top(measure, n, period(params, "year"), period(params, "quarter"), where=where)
+
+
+def year_growth(snapshot, params):
+    dataset = params.get("dataset", "Aggre_transaction")
+    level = params.get("level", "state")
+    if level not in LEVEL_COLUMNS:
+        raise BadRequest(f"level must be one of {list(LEVEL_COLUMNS)}")
+    require_column(snapshot, dataset, "Transaction_amount")
+    require_column(snapshot, dataset, LEVEL_COLUMNS[level][0])
+    current, compare = growth_year(params, "current"), growth_year(params, "compare")
+    if dataset in snapshot.tables:
+        # the amount per group and year: what the growth pivot sums the rows into
+        years = ALL if "Overall" in (current, compare) else [current, compare]
+        df = snapshot.tables[dataset].aggregate(LEVEL_COLUMNS[level] + ["Years"], ["Transaction_amount"], Years=years)
+    else:
+        df = snapshot.dataset(dataset)
+    years = set(df["Years"].unique())
+    for name, year in (("current", current), ("compare", compare)):
+        if year != "Overall" and year not in years:
+            raise BadRequest(f"{dataset} has no rows for {name} year {year}")
+    return calculate_year_growth(df, LEVEL_COLUMNS[level], current, compare, decimals=None)
+
+
+def engagement(snapshot, params):
+    level = params.get("level", "state")
+    if level not in ("state", "district"):
+        raise BadRequest("level must be 'state' or 'district'")
+    index = snapshot.ranking("Map_user", LEVEL_COLUMNS[level], ("RegisteredUser", "AppOpens"),
+                             derived={"EngagementRatio": engagement_ratio})
+    return index.table(period(params, "year"), period(params, "quarter"))
+
+
+ROUTES = {
+    "/v1/states": state_totals,
+    "/v1/districts": district_totals,
+    "/v1/pincodes/top": top_pincodes,
+    "/v1/growth": year_growth,
+    "/v1/engagement": engagement,
+}
+
+
+class PulseRequestHandler(BaseHTTPRequestHandler):
+    source = None
+    cache = None
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        try:
+            snapshot = self.source.current()
+        except Exception as exc:
+            return self.send_json(503, {"error": f"data unavailable: {exc}"})
+
+        if url.path == "/health":
+            return self.send_json(200, {"status": "ok", "version": snapshot.version, "warm": self.source.prewarmer.status})
+        endpoint = ROUTES.get(url.path)
+        if endpoint is None:
+            return self.send_json(404, {"error": f"unknown path {url.path}"})
+
+        key = url.path + "?" + "&".join(f"{name}={params[name]}" for name in sorted(params))
+        etag = '"' + hashlib.sha1(f"{snapshot.version}|{key}".encode()).hexdigest()[:20] + '"'
+        if etag in (tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")):
+            return self.send_body(304, b"", etag)
+
+        body = self.cache.get(snapshot.version, key)
+        if body is None:
+            try:
+                frame = endpoint(snapshot, params)
+                body = ('{"version": %s, "data": %s}' % (json.dumps(snapshot.version),
+                                                         frame.to_json(orient="records"))).encode()
+            except BadRequest as exc:
+                return self.send_json(400, {"error": str(exc)})
+            except Exception:
+                self.log_error("%s failed:\n%s", self.path, traceback.format_exc())
+                return self.send_json(500, {"error": "internal error"})
+            self.cache.put(snapshot.version, key, body)
+        self.send_body(200, body, etag)
+
+    def send_json(self, status, payload):
+        self.send_body(status, json.dumps(payload).encode())
+
+    def send_body(self, status, body, etag=None):
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        if status != 304:
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(body)
+
+
+def make_server(source, host="127.0.0.1", port=8000, cache_entries=512):
+    handler = type("Handler", (PulseRequestHandler,), {"source": source, "cache": ResponseCache(cache_entries)})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve aggregated Pulse metrics as JSON.")
+    parser.add_argument("--storage", help="storage URL (gs://bucket, file://dir or memory://); defaults to $PULSE_STORAGE")
+    parser.add_argument("--data-dir", help="directory holding the extracted CSVs, shorthand for --storage DIR --prefix ''")
+    parser.add_argument("--prefix", default="output/", help="prefix of the CSVs in the storage")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--refresh-seconds", type=float, default=5.0, help="how often to check for new data")
+    parser.add_argument("--out-of-core", action="store_true",
+                        help="query the Top_* datasets from the published row groups instead of loading them")
+    parser.add_argument("--spill-dir", help="directory for aggregates spilled by --out-of-core (default: the temp dir)")
+    args = parser.parse_args()
+
+    options = {"out_of_core": args.out_of_core, "spill_dir": args.spill_dir}
+    if args.data_dir:
+        source = storage_source(open_storage(args.data_dir), "", args.refresh_seconds, **options)
+    elif args.storage or storage_url(None):
+        source = storage_source(open_storage(args.storage or storage_url(None)), args.prefix, args.refresh_seconds,
+                                **options)
+    else:
+        parser.error("one of --storage, --data-dir or $PULSE_STORAGE is required")
+
+    try:
+        snapshot = source.current(timeout=None)
+    except RuntimeError as e:
+        sys.exit(f"Could not load the data: {e}")
+    server = make_server(source, args.host, args.port)
+    print(f"Serving Pulse API on http://{args.host}:{args.port} (data version {snapshot.version})")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
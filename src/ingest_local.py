@@ -0,0 +1,35 @@
+"""
+Builds the extractor CSVs straight from a local Pulse checkout, without going through GCS.
+
+    git clone https://github.com/PhonePe/pulse.git ../pulse
+    python src/ingest_local.py ../pulse --output-dir output/ --processes 8
+"""
+import argparse
+import os
+import time
+
+from pulse_etl import DATASETS, extract_local_shared, prefix_groups
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract the Pulse datasets from a local checkout.")
+    parser.add_argument("pulse_dir", help="clone of the Pulse repo (data/...) or a copy of the bucket (pulse-data/...)")
+    parser.add_argument("--output-dir", default=".", help="where to write the CSVs")
+    parser.add_argument("--datasets", nargs="+", choices=list(DATASETS), default=list(DATASETS))
+    parser.add_argument("--processes", type=int, default=None, help="parser processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    # datasets read from the same documents (e.g. top districts and pincodes) share one pass
+    for group in prefix_groups(args.datasets):
+        start = time.perf_counter()
+        frames = extract_local_shared(args.pulse_dir, group, args.processes)
+        elapsed = time.perf_counter() - start
+        for dataset, df in frames.items():
+            output = os.path.join(args.output_dir, DATASETS[dataset].output)
+            df.to_csv(output, index=False)
+            print(f"{dataset:22} {len(df):>9} rows  {elapsed:7.2f} s  -> {output}")
+
+
+if __name__ == "__main__":
+    main()
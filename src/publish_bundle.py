@@ -0,0 +1,37 @@
+"""
+Publishes the extractor CSVs as an immutable version of Parquet tables, then
+points LATEST at it; the dashboard and the API follow LATEST.
+
+    python src/publish_bundle.py --source output/ --target gs://phonepe-insight-transaction --prefix output/
+"""
+import argparse
+
+from pulse_analytics import PARTITION_BY, list_csvs, publish_version, read_csvs
+from pulse_storage import open_storage, storage_url
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publish the extracted CSVs as a new data version.")
+    parser.add_argument("--source", default=".", help="storage URL or directory holding the CSVs")
+    parser.add_argument("--source-prefix", default="", help="prefix of the CSVs in the source")
+    parser.add_argument("--target", help="storage URL to publish to (default: $PULSE_STORAGE or the bucket)")
+    parser.add_argument("--prefix", default="output/", help="prefix of the published versions in the target")
+    parser.add_argument("--workers", type=int, default=8, help="parallel table uploads")
+    parser.add_argument("--partition-by-state", action="store_true",
+                        help="partition the tables by state as well as by year (many small objects)")
+    args = parser.parse_args()
+
+    source = open_storage(args.source)
+    raw = read_csvs(source, list_csvs(source, args.source_prefix))
+    target = open_storage(args.target or storage_url("gs://phonepe-insight-transaction"))
+    partition_by = PARTITION_BY + (("States",) if args.partition_by_state else ())
+    manifest = publish_version(raw, target, args.prefix, workers=args.workers, partition_by=partition_by)
+    rows = sum(table["rows"] for table in manifest["tables"].values())
+    partitions = sum(len(table["partitions"]) for table in manifest["tables"].values())
+    print(f"Published version {manifest['version']} ({manifest['size'] / 2**20:.1f} MiB, {len(manifest['tables'])} tables "
+          f"in {partitions} partitions and a full copy, {manifest['uploaded']} objects new, {rows} rows); "
+          f"LATEST now points at it")
+
+
+if __name__ == "__main__":
+    main()
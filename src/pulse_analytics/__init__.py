@@ -0,0 +1,127 @@
+"""Analytics over the PhonePe Pulse datasets that do not depend on Streamlit."""
+
+from pulse_analytics.frames import ALL, filter_slice, safe_groupby, totals_by, unique_values
+from pulse_analytics.datasets import (
+    DATASET_COLUMNS,
+    DATASET_FILES,
+    csv_version,
+    list_csvs,
+    prepare_dataset,
+    prepare_datasets,
+    read_csvs,
+)
+from pulse_analytics.bundle import (
+    LATEST_NAME,
+    MANIFEST_NAME,
+    build_full,
+    build_tables,
+    data_version,
+    load_coverage,
+    load_raw,
+    publish_version,
+    read_bundle,
+    read_latest,
+    read_manifest,
+    read_tables,
+)
+from pulse_analytics.coverage import Coverage
+from pulse_analytics.partitions import PARTITION_BY, may_match, parse_where
+from pulse_analytics.outofcore import ChunkedTable
+from pulse_analytics.figures import CachedExpress, FigureCache, LazyFigure, frame_digest, spec_key
+from pulse_analytics.joins import encode_and_sum, insurance_user_joins, market_frame
+from pulse_analytics.measures import (
+    average_usage,
+    calc_penetration,
+    calculate_year_growth,
+    calculate_year_growth1,
+    engagement_ratio,
+    penetration,
+)
+from pulse_analytics.profiling import Profiler, row_count
+from pulse_analytics.ranking import RankingIndex
+from pulse_analytics.pages import INDEXES, PageData
+from pulse_analytics.versioning import Prewarmer, VersionWatcher
+from pulse_analytics.exploration import most_used_brand, quarterly_totals, ranked_rows, type_totals_by_state
+from pulse_analytics.business import (
+    average_usage_by_state,
+    brand_engagement,
+    brand_engagement_by_state,
+    brand_trend,
+    engagement_over,
+    engagement_summary,
+    penetration_by_state,
+    state_user_engagement,
+    transaction_type_summary,
+    type_amounts,
+)
+from pulse_analytics.home import location_breakdown, location_slices, pincode_users
+
+__all__ = [
+    "ALL",
+    "CachedExpress",
+    "ChunkedTable",
+    "Coverage",
+    "DATASET_COLUMNS",
+    "DATASET_FILES",
+    "FigureCache",
+    "INDEXES",
+    "LATEST_NAME",
+    "LazyFigure",
+    "MANIFEST_NAME",
+    "PARTITION_BY",
+    "PageData",
+    "Prewarmer",
+    "Profiler",
+    "RankingIndex",
+    "VersionWatcher",
+    "average_usage",
+    "average_usage_by_state",
+    "brand_engagement",
+    "brand_engagement_by_state",
+    "brand_trend",
+    "build_full",
+    "build_tables",
+    "calc_penetration",
+    "calculate_year_growth",
+    "calculate_year_growth1",
+    "csv_version",
+    "data_version",
+    "encode_and_sum",
+    "engagement_over",
+    "engagement_ratio",
+    "engagement_summary",
+    "filter_slice",
+    "frame_digest",
+    "insurance_user_joins",
+    "list_csvs",
+    "load_coverage",
+    "load_raw",
+    "location_breakdown",
+    "location_slices",
+    "market_frame",
+    "may_match",
+    "most_used_brand",
+    "parse_where",
+    "penetration",
+    "penetration_by_state",
+    "pincode_users",
+    "prepare_dataset",
+    "prepare_datasets",
+    "publish_version",
+    "quarterly_totals",
+    "ranked_rows",
+    "read_bundle",
+    "read_csvs",
+    "read_latest",
+    "read_manifest",
+    "read_tables",
+    "row_count",
+    "safe_groupby",
+    "spec_key",
+    "state_user_engagement",
+    "totals_by",
+    "transaction_type_summary",
+    "type_amounts",
+    "type_totals_by_state",
+    "unique_values",
+]
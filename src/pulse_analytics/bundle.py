@@ -0,0 +1,341 @@
+"""
+Versioned publishing of the extractor outputs.
+
+Under a prefix, a published data set is:
+
+    tables/<table>/Years=<year>/<sha256[:16]>.parquet   a table's rows of one year,
+                                                        named by their content
+    full/<sha256[:16]>.zip         every table whole, one Parquet member each
+    versions/<version>.json        manifest: partitions, their statistics and
+                                   checksums, the full copy, coverage
+    LATEST                         the current version, a few bytes
+
+Tables and manifests are never rewritten, so they can be cached forever. A
+publish uploads the tables it does not have yet in parallel, then the manifest,
+and only then moves LATEST. Readers resolve LATEST once and read that version's
+objects, so they see either the old or the new data set, never a mix.
+
+A full load reads the manifest and the full copy, two requests whatever the
+number of partitions. The partitions serve the filtered reads; the full copy
+costs its size again in storage, and is uploaded again whenever any table
+changes.
+
+Data published by earlier releases as a single zip behind manifest.json is
+still read when there is no LATEST.
+
+Tables are split into Hive-style partitions (see pulse_analytics.partitions),
+by year and optionally by state. A year whose data did not change keeps its
+objects, so a publish uploads only the partitions that did; and a read given
+where= filters opens only the partitions that can hold matching rows, and of
+those fetches only the row groups that can.
+"""
+import hashlib
+import json
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from pulse_analytics.coverage import Coverage
+from pulse_analytics.datasets import csv_version, list_csvs, read_csvs
+from pulse_analytics.frames import filter_slice
+from pulse_analytics.partitions import (
+    PARTITION_BY,
+    cluster,
+    column_stats,
+    document_order,
+    may_match,
+    partition_frame,
+    partition_path,
+    ranges,
+    restore_order,
+    row_groups,
+    write_parquet,
+)
+
+LATEST_NAME = "LATEST"
+MANIFEST_NAME = "manifest.json"
+PUBLISH_FORMAT = 5
+# Cache-Control of the objects that never change, and of the pointer that does
+IMMUTABLE = "public, max-age=31536000, immutable"
+MUTABLE = "no-cache, max-age=0"
+
+
+def _manifest_name(prefix, version):
+    return f"{prefix}versions/{version}.json"
+
+
+def build_tables(raw, prefix="", partition_by=PARTITION_BY):
+    """
+    {object name: Parquet bytes} and table entries of raw frames keyed by CSV
+    file name, each table split into partitions on the partition_by columns it has
+    and its rows clustered on (States, Years, Quarter).
+    """
+    objects = {}
+    tables = {}
+    for file_name in sorted(raw):
+        df = raw[file_name]
+        df = _published_order(df)
+        state_order = document_order(df)
+        table = file_name.rsplit(".", 1)[0]
+        partitions = []
+        for values, rows in partition_frame(df, partition_by):
+            data = write_parquet(rows)
+            digest = hashlib.sha256(data).hexdigest()
+            groups, footer = row_groups(data, rows)
+            name = f"{prefix}tables/{partition_path(table, values)}/{digest[:16]}.parquet"
+            objects[name] = data
+            partitions.append({
+                "values": values,
+                "object": name,
+                "rows": len(rows),
+                "size": len(data),
+                "sha256": digest,
+                "stats": column_stats(rows),
+                "row_groups": groups,
+                "footer": footer,
+            })
+        tables[file_name] = {
+            "rows": len(df),
+            "columns": list(df.columns),
+            "size": sum(partition["size"] for partition in partitions),
+            "sha256": hashlib.sha256("".join(partition["sha256"] for partition in partitions).encode()).hexdigest(),
+            "partition_by": list(partitions[0]["values"]),
+            "state_order": state_order,
+            "partitions": partitions,
+        }
+    return objects, tables
+
+
+def _published_order(df):
+    """df in the order it is published in: as is when in document order, else clustered."""
+    return df if document_order(df) is not None else cluster(df)
+
+
+def build_full(raw, prefix=""):
+    """
+    ({object name: zip bytes}, entry) of the full copy of raw frames keyed by CSV
+    file name: an uncompressed zip of one Parquet member per table, which
+    read_bundle reads. The zip is reproducible, so an unchanged data set keeps
+    its object name.
+    """
+    members = {}
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as bundle:
+        for file_name in sorted(raw):
+            data = _published_order(raw[file_name]).to_parquet(index=False, compression="zstd")
+            member = file_name.rsplit(".", 1)[0] + ".parquet"
+            # a fixed timestamp, so the same tables always make the same bytes
+            bundle.writestr(zipfile.ZipInfo(member, date_time=(1980, 1, 1, 0, 0, 0)), data)
+            members[file_name] = {"member": member, "sha256": hashlib.sha256(data).hexdigest()}
+    data = buffer.getvalue()
+    digest = hashlib.sha256(data).hexdigest()
+    name = f"{prefix}full/{digest[:16]}.zip"
+    return {name: data}, {"bundle": name, "size": len(data), "sha256": digest, "tables": members}
+
+
+def publish_version(raw, storage, prefix="", workers=8, partition_by=PARTITION_BY):
+    """
+    Publishes raw frames (keyed by CSV file name) as an immutable version under
+    prefix, partitioned on partition_by and as a full copy, and points LATEST
+    at it. Objects already in the storage are not uploaded again. Returns the
+    manifest, with the number of objects uploaded.
+    """
+    objects, tables = build_tables(raw, prefix, partition_by)
+    full_objects, full = build_full(raw, prefix)
+    objects.update(full_objects)
+    version = hashlib.sha256(json.dumps({name: table["sha256"] for name, table in tables.items()},
+                                        sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    manifest = {
+        "format": PUBLISH_FORMAT,
+        "version": version,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "size": sum(table["size"] for table in tables.values()),
+        "tables": tables,
+        "full": full,
+        "coverage": Coverage.from_frames(raw).to_json(),
+    }
+    manifest_name = _manifest_name(prefix, version)
+
+    def upload(name):
+        if storage.exists(name):
+            return False
+        storage.write_bytes(name, objects[name], cache_control=IMMUTABLE)
+        return True
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        uploaded = sum(pool.map(upload, sorted(objects)))
+    if not storage.exists(manifest_name):
+        storage.write_bytes(manifest_name, json.dumps(manifest, separators=(",", ":")).encode("utf-8"), cache_control=IMMUTABLE)
+    # the pointer moves last: until here readers keep resolving the previous version
+    storage.write_bytes(prefix + LATEST_NAME, version.encode("utf-8"), cache_control=MUTABLE)
+    return {**manifest, "uploaded": uploaded}
+
+
+def read_latest(storage, prefix=""):
+    """The version LATEST points at, or None when nothing is published that way."""
+    try:
+        return storage.read_text(prefix + LATEST_NAME).strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def read_manifest(storage, prefix="", version=None):
+    """
+    Manifest of version (default: the one LATEST points at), else the manifest.json
+    of a single-zip publish, else None.
+    """
+    version = version or read_latest(storage, prefix)
+    if version is not None:
+        try:
+            return json.loads(storage.read_bytes(_manifest_name(prefix, version)))
+        except FileNotFoundError:
+            pass  # a CSV listing digest, or the version of a single-zip publish
+    return _single_zip_manifest(storage, prefix)
+
+
+def _single_zip_manifest(storage, prefix):
+    try:
+        return json.loads(storage.read_bytes(prefix + MANIFEST_NAME))
+    except FileNotFoundError:
+        return None
+
+
+def _partitions(table):
+    """Partitions of a table entry; a table of an unpartitioned publish is a single one."""
+    if "partitions" in table:
+        return table["partitions"]
+    return [{"values": {}, "object": table["object"], "rows": table["rows"], "sha256": table["sha256"]}]
+
+
+def _select(raw, where=None, files=None):
+    """raw restricted to files and to the rows matching where on the columns each frame has."""
+    selected = {}
+    for file_name in raw if files is None else files:
+        df = raw[file_name]
+        filters = {column: value for column, value in (where or {}).items() if column in df.columns}
+        selected[file_name] = filter_slice(df, **filters).reset_index(drop=True) if filters else df
+    return selected
+
+
+def read_tables(storage, manifest, workers=8, where=None, files=None):
+    """
+    Raw frames keyed by CSV file name, as read_csvs returns them; checksums are
+    verified. files restricts the tables read and where ({column: value or list
+    of values}) the rows: only partitions that may hold matching rows are read.
+    A read of every table and row reads the full copy instead, when there is one.
+    """
+    if "bundle" in manifest:
+        return _select(read_bundle(storage, manifest), where, files)
+    if "full" in manifest and files is None and not where:
+        return read_bundle(storage, manifest["full"])
+    tables = manifest["tables"]
+    files = list(tables) if files is None else list(files)
+    reads = [(file_name, partition) for file_name in files for partition in _partitions(tables[file_name])
+             if may_match(partition, where)]
+
+    def read(item):
+        _, partition = item
+        groups = [i for i, group in enumerate(partition.get("row_groups", ())) if may_match(group, where)]
+        if len(groups) < len(partition.get("row_groups", ())):
+            return _read_row_groups(storage, partition, groups)
+        data = storage.read_bytes(partition["object"])
+        if hashlib.sha256(data).hexdigest() != partition["sha256"]:
+            raise ValueError(f"table {partition['object']} does not match its manifest checksum")
+        return pd.read_parquet(BytesIO(data))
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        frames = list(pool.map(read, reads))
+    parts = {}
+    for (file_name, _), df in zip(reads, frames):
+        parts.setdefault(file_name, []).append(df)
+    raw = {}
+    for file_name in files:
+        table = tables[file_name]
+        pieces = parts.get(file_name) or [pd.DataFrame(columns=table["columns"])]
+        df = _select({file_name: pd.concat(pieces, ignore_index=True) if len(pieces) > 1 else pieces[0]},
+                     where)[file_name]
+        if len(pieces) > 1 and table.get("state_order") is not None:
+            df = restore_order(df, table["state_order"])
+        raw[file_name] = df
+    return raw
+
+
+def _read_row_groups(storage, partition, groups):
+    """
+    Rows of the row groups numbered groups of a partition, fetching only their
+    byte ranges and the footer; each range is checked against its checksum.
+    """
+    buffer = bytearray(partition["size"])
+    entries = [partition["footer"]] + [partition["row_groups"][i] for i in groups]
+    for start, end, covered in ranges(entries):
+        data = storage.read_range(partition["object"], start, end - start)
+        for entry in covered:
+            part = data[entry["offset"] - start:entry["offset"] - start + entry["size"]]
+            if hashlib.sha256(part).hexdigest() != entry["sha256"]:
+                raise ValueError(f"table {partition['object']} does not match its manifest checksum "
+                                 f"at bytes {entry['offset']}-{entry['offset'] + entry['size']}")
+        buffer[start:end] = data
+    return pq.ParquetFile(BytesIO(buffer)).read_row_groups(groups).to_pandas()
+
+
+def read_bundle(storage, manifest):
+    """
+    Raw frames of a single-zip publish (manifest.json with a "bundle"), or of the
+    "full" copy of a version's manifest; checksums are verified.
+    """
+    data = storage.read_bytes(manifest["bundle"])
+    if hashlib.sha256(data).hexdigest() != manifest["sha256"]:
+        raise ValueError(f"bundle {manifest['bundle']} does not match its manifest checksum")
+    raw = {}
+    with zipfile.ZipFile(BytesIO(data)) as bundle:
+        for file_name, table in manifest["tables"].items():
+            member = bundle.read(table["member"])
+            if hashlib.sha256(member).hexdigest() != table["sha256"]:
+                raise ValueError(f"table {table['member']} does not match its manifest checksum")
+            raw[file_name] = pd.read_parquet(BytesIO(member))
+    return raw
+
+
+def data_version(storage, prefix=""):
+    """
+    Version of the data load_raw would return: LATEST, else the single-zip
+    manifest's version, else a digest of the CSV listing.
+    """
+    version = read_latest(storage, prefix)
+    if version is not None:
+        return version
+    manifest = _single_zip_manifest(storage, prefix)
+    return manifest["version"] if manifest is not None else csv_version(storage, prefix)
+
+
+def load_coverage(storage, prefix="", version=None, raw=None, where=None):
+    """
+    Coverage of the data of version: the index shipped in its manifest, else one
+    built from raw. With where, raw holds only a slice, and its coverage is built.
+    """
+    if where and raw is not None:
+        return Coverage.from_frames(raw)
+    manifest = read_manifest(storage, prefix, version)
+    if manifest is not None and "coverage" in manifest and (version is None or manifest["version"] == version):
+        return Coverage.from_json(manifest["coverage"])
+    if raw is None:
+        raise ValueError(f"no published coverage of version {version} under {prefix!r}")
+    return Coverage.from_frames(raw)
+
+
+def load_raw(storage, prefix="", version=None, where=None, files=None):
+    """
+    (version, raw frames) of version (default: the latest) from the published
+    tables, or from the CSVs when nothing is published. A published version
+    always reads the same objects, so callers may cache the result by version
+    (and where and files, which read_tables applies).
+    """
+    manifest = read_manifest(storage, prefix, version)
+    if manifest is not None:
+        return manifest["version"], read_tables(storage, manifest, where=where, files=files)
+    raw = read_csvs(storage, list_csvs(storage, prefix))
+    return csv_version(storage, prefix), _select(raw, where, files)
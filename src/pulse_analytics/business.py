@@ -0,0 +1,121 @@
+from pulse_analytics.frames import filter_slice, totals_by
+
+
+# Decoding transaction dynamics
+def transaction_type_summary(df, **filters):
+    """
+    Amount and count per state with their share of the national total and the
+    transaction type that moved the most money in that state.
+    """
+    df = filter_slice(df, **filters)
+    most_used = (
+        df.groupby(["States", "Transaction_type"], as_index=False)["Transaction_amount"].sum()
+        .sort_values(["States", "Transaction_amount"], ascending=[True, False])
+        .groupby("States").first().reset_index()
+    )
+    totals = df.groupby("States", as_index=False)[["Transaction_amount", "Transaction_count"]].sum()
+    totals["Transaction_Percentage"] = (totals["Transaction_amount"] / totals["Transaction_amount"].sum()) * 100
+    totals["Count_Percentage"] = (totals["Transaction_count"] / totals["Transaction_count"].sum()) * 100
+    totals["Transaction_type"] = most_used["Transaction_type"]
+    return totals
+
+
+def type_amounts(df, by=None, **filters):
+    """Transaction amount per transaction type, split by the by column when given."""
+    keys = [by, "Transaction_type"] if by else ["Transaction_type"]
+    return filter_slice(df, **filters).groupby(keys, as_index=False)["Transaction_amount"].sum()
+
+
+# Device dominance and user engagement
+def brand_engagement_by_state(df, **filters):
+    """
+    Engagement Score (Transaction_count x mean Transaction_Percentage) per state,
+    and the brand with the highest score in each state.
+    """
+    brand_state = filter_slice(df, **filters).groupby(["States", "Brand"]).agg({
+        "Transaction_count": "sum",
+        "Transaction_Percentage": "mean"
+    }).reset_index()
+    brand_state["Engagement_Score"] = brand_state["Transaction_count"] * brand_state["Transaction_Percentage"]
+
+    state_scores = brand_state.groupby("States").agg({
+        "Transaction_count": "sum",
+        "Transaction_Percentage": "mean"
+    }).reset_index()
+    state_scores["Engagement_Score"] = state_scores["Transaction_count"] * state_scores["Transaction_Percentage"]
+
+    best_brand = brand_state.loc[brand_state.groupby("States")["Engagement_Score"].idxmax()].reset_index(drop=True)
+    return state_scores, best_brand
+
+
+def brand_trend(df, brand=None):
+    """
+    Transaction count per (Years, Quarter, Brand), or per (Years, Quarter) for a single brand.
+    For a single brand Years comes back as str so the line chart treats it as a category.
+    """
+    if brand is None:
+        return df.groupby(["Years", "Quarter", "Brand"])["Transaction_count"].sum().reset_index()
+    trend = df[df["Brand"] == brand].groupby(["Years", "Quarter"])["Transaction_count"].sum().reset_index()
+    trend["Years"] = trend["Years"].astype(str)
+    return trend
+
+
+def brand_engagement(df):
+    """Total transaction count and Engagement Score per brand over the whole period."""
+    brand_totals = df.groupby("Brand")["Transaction_count"].sum().reset_index()
+    brand_totals["Engagement_Score"] = (
+        brand_totals["Transaction_count"] * df.groupby("Brand")["Transaction_Percentage"].mean().values
+    )
+    return brand_totals
+
+
+def state_user_engagement(df, **filters):
+    """Registered users, app opens and their (unrounded) ratio per state."""
+    totals = totals_by(df, "States", ["RegisteredUser", "AppOpens"], **filters)
+    totals["Engagement_Ratio"] = totals["AppOpens"] / totals["RegisteredUser"]
+    return totals
+
+
+# Transaction analysis for market expansion
+def penetration_by_state(state_compare, **filters):
+    """Sum of per-quarter Penetration (amount per registered user) for each state."""
+    df = filter_slice(state_compare, **filters)
+    df = df.assign(Penetration=df["Transaction_amount"] / df["RegisteredUser"])
+    return df.groupby("States").agg({"Penetration": "sum"}).reset_index()
+
+
+def average_usage_by_state(state_compare, year):
+    """
+    Average Usage (app opens per registered user) of each state and quarter in a year,
+    and its sum per (States, Years).
+    """
+    df = filter_slice(state_compare, Years=year)
+    df = df.assign(**{"Average Usage": (df["AppOpens"] / df["RegisteredUser"]).round(0)})
+    per_state = df.groupby(["States", "Years"]).agg({"Average Usage": "sum"}).reset_index()
+    return df, per_state
+
+
+# User engagement and growth strategy
+def engagement_summary(df, **filters):
+    """Total registered users, app opens and their ratio over the rows matching filters."""
+    df = filter_slice(df, **filters)
+    total_users = df["RegisteredUser"].sum()
+    total_appopens = df["AppOpens"].sum()
+    ratio = round(total_appopens / total_users, 2) if total_users > 0 else 0
+    return total_users, total_appopens, ratio
+
+
+def engagement_over(df, keys):
+    """
+    Registered users, app opens and Engagement Ratio per keys.
+    Grouping on both Years and Quarter adds a 'YYYY-Qn' Period label.
+    """
+    stats = df.groupby(keys).agg({
+        "RegisteredUser": "sum",
+        "AppOpens": "sum"
+    }).reset_index()
+    if "Years" in keys and "Quarter" in keys:
+        stats["Period"] = stats["Years"].astype(str) + "-Q" + stats["Quarter"].astype(str)
+    stats["EngagementRatio"] = (stats["AppOpens"] / stats["RegisteredUser"]).round(2)
+    return stats
+
@@ -0,0 +1,101 @@
+"""
+Coverage index: which (state, year, quarter) of each output file has at least
+one row, as one bit per state x year x quarter. It is built when the data is
+published and shipped in the manifest, so the dashboard can tell which choices
+hold data without scanning any frame.
+"""
+import base64
+
+import numpy as np
+import pandas as pd
+
+from pulse_analytics.frames import ALL
+
+QUARTERS = (1, 2, 3, 4)
+COLUMNS = ("States", "Years", "Quarter")
+
+
+class Coverage:
+    """bits maps a file name to a bool array of shape (len(states), len(years), 4)."""
+
+    def __init__(self, states, years, bits):
+        self.states = list(states)
+        self.years = [int(year) for year in years]
+        self.bits = bits
+        self._axes = (
+            {state: i for i, state in enumerate(self.states)},
+            {year: i for i, year in enumerate(self.years)},
+            {quarter: i for i, quarter in enumerate(QUARTERS)},
+        )
+
+    @classmethod
+    def from_frames(cls, raw):
+        """Coverage of raw frames keyed by file name; frames without the period columns are left out."""
+        frames = {name: df for name, df in raw.items() if all(column in df.columns for column in COLUMNS)}
+        states = sorted({state for df in frames.values() for state in df["States"].dropna().unique()})
+        years = sorted({int(year) for df in frames.values() for year in pd.to_numeric(df["Years"], errors="coerce").dropna().unique()})
+        bits = {}
+        for name, df in frames.items():
+            present = df[list(COLUMNS)].drop_duplicates()
+            state_idx = pd.Categorical(present["States"], categories=states).codes
+            year_idx = pd.Categorical(pd.to_numeric(present["Years"], errors="coerce"), categories=years).codes
+            quarter_idx = pd.Categorical(pd.to_numeric(present["Quarter"], errors="coerce"), categories=QUARTERS).codes
+            keep = (state_idx >= 0) & (year_idx >= 0) & (quarter_idx >= 0)
+            grid = np.zeros((len(states), len(years), len(QUARTERS)), dtype=bool)
+            grid[state_idx[keep], year_idx[keep], quarter_idx[keep]] = True
+            bits[name] = grid
+        return cls(states, years, bits)
+
+    def to_json(self):
+        """JSON-ready form: the axes, and each file's bits packed and base64-encoded."""
+        return {
+            "states": self.states,
+            "years": self.years,
+            "quarters": list(QUARTERS),
+            "bits": {name: base64.b64encode(np.packbits(grid.ravel())).decode("ascii")
+                     for name, grid in sorted(self.bits.items())},
+        }
+
+    @classmethod
+    def from_json(cls, doc):
+        shape = (len(doc["states"]), len(doc["years"]), len(QUARTERS))
+        bits = {}
+        for name, packed in doc["bits"].items():
+            flat = np.unpackbits(np.frombuffer(base64.b64decode(packed), dtype=np.uint8), count=int(np.prod(shape)))
+            bits[name] = flat.astype(bool).reshape(shape)
+        return cls(doc["states"], doc["years"], bits)
+
+    def _grid(self, name, States=ALL, Years=ALL, Quarter=ALL):
+        """name's bits restricted to the selections; None when a selection is outside the index."""
+        grid = self.bits.get(name)
+        if grid is None:
+            return None
+        for axis, (index, value) in enumerate(zip(self._axes, (States, Years, Quarter))):
+            if value == ALL:
+                continue
+            position = index.get(value)
+            if position is None:
+                return None
+            grid = np.take(grid, [position], axis=axis)
+        return grid
+
+    def has(self, name, States=ALL, Years=ALL, Quarter=ALL):
+        """Whether name has any row for the selections."""
+        grid = self._grid(name, States=States, Years=Years, Quarter=Quarter)
+        return grid is not None and bool(grid.any())
+
+    def values(self, name, column, **selected):
+        """
+        Values of column (States, Years or Quarter) that have rows in name under the
+        other selections, in index order; None when name is not indexed.
+        """
+        if name not in self.bits:
+            return None
+        selected = {key: value for key, value in selected.items() if key != column}
+        grid = self._grid(name, **selected)
+        axis = COLUMNS.index(column)
+        labels = (self.states, self.years, list(QUARTERS))[axis]
+        if grid is None:
+            return []
+        present = grid.any(axis=tuple(i for i in range(3) if i != axis))
+        return [label for label, found in zip(labels, present) if found]
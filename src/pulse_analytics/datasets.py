@@ -0,0 +1,81 @@
+import hashlib
+from io import BytesIO
+
+import pandas as pd
+
+# Output file of each dataset, as written by the extractors
+DATASET_FILES = {
+    "Aggre_insurance": "agg_insurance.csv",
+    "Aggre_transaction": "agg_trans.csv",
+    "Aggre_user": "agg_user.csv",
+    "Map_insurance": "map_insurance.csv",
+    "Map_transaction": "map_transaction.csv",
+    "Map_user": "map_user.csv",
+    "Top_insurance": "top_insurance.csv",
+    "Top_transaction": "top_transaction.csv",
+    "Top_user": "top_user.csv",
+    "Top_district": "top_district.csv",
+}
+
+DATASET_COLUMNS = {
+    "Aggre_insurance": ("States", "Years", "Quarter", "Transaction_type", "Transaction_count", "Transaction_amount"),
+    "Aggre_transaction": ("States", "Years", "Quarter", "Transaction_type", "Transaction_count", "Transaction_amount"),
+    "Aggre_user": ("States", "Years", "Quarter", "Brand", "Transaction_count", "Transaction_Percentage"),
+    "Map_insurance": ("States", "Years", "Quarter", "District", "Transaction_count", "Transaction_amount"),
+    "Map_transaction": ("States", "Years", "Quarter", "District", "Transaction_count", "Transaction_amount"),
+    "Map_user": ("States", "Years", "Quarter", "District", "RegisteredUser", "AppOpens"),
+    "Top_insurance": ("States", "Years", "Quarter", "Pincodes", "Transaction_count", "Transaction_amount"),
+    "Top_transaction": ("States", "Years", "Quarter", "Pincodes", "Transaction_count", "Transaction_amount"),
+    "Top_user": ("States", "Years", "Quarter", "Pincodes", "RegisteredUser"),
+    "Top_district": ("States", "Years", "Quarter", "District", "Transaction_count", "Transaction_amount"),
+}
+
+# Column names of outputs written by earlier extractors, and the names they have now
+RENAMED_COLUMNS = {"Districts": "District", "Transaction_percentage": "Transaction_Percentage"}
+
+
+def prepare_datasets(raw):
+    """
+    Projects the raw output frames (keyed by file name) onto the columns the
+    analysis expects and fixes up their types.
+    """
+    return {name: prepare_dataset(name, raw[file_name]) for name, file_name in DATASET_FILES.items()}
+
+
+def prepare_dataset(name, frame):
+    """prepare_datasets for one dataset; row by row, so a table prepared in chunks comes out the same."""
+    renamed = {old: new for old, new in RENAMED_COLUMNS.items() if old in frame.columns and new not in frame.columns}
+    if renamed:
+        frame = frame.rename(columns=renamed)
+    df = pd.DataFrame(frame, columns=DATASET_COLUMNS[name])
+    if name == "Aggre_user":
+        df["Transaction_count"] = pd.to_numeric(df["Transaction_count"], errors="coerce").fillna(0)
+        df["Transaction_Percentage"] = pd.to_numeric(df["Transaction_Percentage"], errors="coerce").fillna(0)
+    if name in ("Top_insurance", "Top_transaction", "Top_user"):
+        df["Pincodes"] = df["Pincodes"].astype("object")
+    return df
+
+
+def list_csvs(storage, prefix=""):
+    """Names of the CSV objects under prefix of a pulse_storage backend."""
+    return [obj.name for obj in storage.list(prefix) if obj.name.endswith(".csv")]
+
+
+def read_csvs(storage, names):
+    """
+    Reads CSV objects into DataFrames keyed by lower-cased file name, so the
+    Top_*.csv files the extractors write match DATASET_FILES.
+    """
+    dataframes = {}
+    for name in names:
+        dataframes[name.split("/")[-1].lower()] = pd.read_csv(BytesIO(storage.read_bytes(name)))
+    return dataframes
+
+
+def csv_version(storage, prefix=""):
+    """Token that changes whenever a CSV under prefix is added, removed or rewritten."""
+    digest = hashlib.sha1()
+    for obj in storage.list(prefix):
+        if obj.name.endswith(".csv"):
+            digest.update(f"{obj.name}:{obj.generation};".encode())
+    return digest.hexdigest()[:16]
@@ -0,0 +1,29 @@
+from pulse_analytics.frames import filter_slice, totals_by
+
+
+def quarterly_totals(df, measures, **filters):
+    """Per-quarter sums of measures over the rows matching filters."""
+    return totals_by(df, "Quarter", measures, **filters).sort_values("Quarter")
+
+
+def ranked_rows(df, sort_by, **filters):
+    """Rows matching filters, largest sort_by first."""
+    return filter_slice(df, **filters).sort_values(by=sort_by, ascending=False)
+
+
+def type_totals_by_state(df, transaction_type, year):
+    """Amount and count of one transaction type per state in a year, largest amount first."""
+    return totals_by(df, "States", ["Transaction_amount", "Transaction_count"],
+                     Transaction_type=transaction_type, Years=year).sort_values(
+                         "Transaction_amount", ascending=False, ignore_index=True)
+
+
+def most_used_brand(df, **filters):
+    """Brand with the highest Transaction_Percentage in each state."""
+    return (
+        filter_slice(df, **filters)
+        .sort_values(["States", "Transaction_Percentage"], ascending=[True, False])
+        .groupby("States")
+        .first()
+        .reset_index()
+    )
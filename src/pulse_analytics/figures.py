@@ -0,0 +1,176 @@
+"""
+Bounded cache of serialized Plotly figures.
+
+Charts are described lazily (LazyFigure: the plotly.express call plus the
+update_* calls made on it) and keyed by chart type, a digest of the data,
+the styling arguments and the data version; the figure is only built on a
+miss. plotly itself is not imported here: the express module is passed in.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+def frame_digest(df):
+    """Digest of a DataFrame's or Series' values, index, columns and dtypes."""
+    digest = hashlib.sha1(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    if isinstance(df, pd.DataFrame):
+        layout = list(zip(df.columns, df.dtypes))
+    else:
+        layout = [(df.name, df.dtype)]
+    digest.update(repr([(str(c), str(t)) for c, t in layout]).encode())
+    return digest.hexdigest()
+
+
+class _DigestMemo:
+    """GeoJSON documents are large and shared, so they are digested once per object."""
+
+    def __init__(self):
+        self._digests = {}
+        self._lock = threading.Lock()
+
+    def digest(self, obj):
+        with self._lock:
+            entry = self._digests.get(id(obj))
+            if entry is None:
+                # the entry holds obj, so its id cannot be reused while memoized
+                entry = (obj, hashlib.sha1(json.dumps(obj, sort_keys=True, default=str).encode()).hexdigest())
+                self._digests[id(obj)] = entry
+            return entry[1]
+
+
+_memo = _DigestMemo()
+
+
+def spec_key(value):
+    """Hashable, content-based stand-in for a chart argument."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return ("frame", frame_digest(value))
+    if isinstance(value, np.ndarray):
+        return ("array", str(value.dtype), value.shape, hashlib.sha1(np.ascontiguousarray(value).tobytes()).hexdigest())
+    if isinstance(value, dict):
+        if "features" in value:
+            return ("geojson", _memo.digest(value))
+        return ("dict", tuple(sorted((str(k), spec_key(v)) for k, v in value.items())))
+    if isinstance(value, (list, tuple)):
+        return ("seq", tuple(spec_key(v) for v in value))
+    if isinstance(value, np.generic):
+        return value.item()
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return ("repr", type(value).__name__, repr(value))
+
+
+class LazyFigure:
+    """A plotly.express call and the update_* calls made on its figure, replayed by build()."""
+
+    def __init__(self, express, kind, args, kwargs):
+        self._express = express
+        self.kind = kind
+        self._args = args
+        self._kwargs = kwargs
+        self._updates = []
+
+    def __getattr__(self, name):
+        if not name.startswith("update_"):
+            raise AttributeError(f"LazyFigure records only update_* calls, not {name}")
+
+        def record(*args, **kwargs):
+            self._updates.append((name, args, kwargs))
+            return self
+
+        return record
+
+    def key(self, version):
+        return hashlib.sha1(repr((
+            self.kind,
+            spec_key(list(self._args)),
+            spec_key(self._kwargs),
+            [(name, spec_key(list(args)), spec_key(kwargs)) for name, args, kwargs in self._updates],
+            version,
+        )).encode()).hexdigest()
+
+    def build(self):
+        fig = getattr(self._express, self.kind)(*self._args, **self._kwargs)
+        for name, args, kwargs in self._updates:
+            getattr(fig, name)(*args, **kwargs)
+        return fig
+
+
+class CachedExpress:
+    """Drop-in for plotly.express whose chart functions return LazyFigures; everything else passes through."""
+
+    CHART_KINDS = ("bar", "line", "pie", "scatter", "choropleth", "area", "histogram", "sunburst", "treemap")
+
+    def __init__(self, express):
+        self._express = express
+
+    def __getattr__(self, name):
+        if name in self.CHART_KINDS:
+            return lambda *args, **kwargs: LazyFigure(self._express, name, args, kwargs)
+        return getattr(self._express, name)
+
+
+class FigureCache:
+    """
+    LRU of serialized figures bounded by total bytes and entry count. Hits are
+    returned as freshly parsed figure dicts, so callers may not share state.
+    """
+
+    def __init__(self, max_bytes=256 * 2**20, max_entries=2048):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def spec(self, figure, version):
+        """Figure dict of a LazyFigure (or an already built figure, which is not cached)."""
+        if not isinstance(figure, LazyFigure):
+            return figure
+        key = figure.key(version)
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+            else:
+                self._misses += 1
+        if data is None:
+            data = figure.build().to_json(validate=False)
+            self._put(key, data)
+        return json.loads(data)
+
+    def _put(self, key, data):
+        size = len(data)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = data
+            self._bytes += size
+            while self._bytes > self.max_bytes or len(self._entries) > self.max_entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self._evictions += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self._evictions,
+            }
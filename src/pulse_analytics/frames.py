@@ -0,0 +1,39 @@
+import pandas as pd
+
+# Selection meaning "do not filter on this column"
+ALL = "All"
+
+
+def filter_slice(df, **filters):
+    """
+    Rows of df matching every column=value filter; a list, tuple or set matches
+    any of its values. None or ALL leaves a column unfiltered.
+    """
+    mask = pd.Series(True, index=df.index)
+    for col, value in filters.items():
+        if value is None or (isinstance(value, str) and value == ALL):
+            continue
+        if isinstance(value, (list, tuple, set, frozenset)):
+            mask &= df[col].isin(list(value))
+        else:
+            mask &= df[col] == value
+    return df[mask]
+
+
+def safe_groupby(df, group_cols, agg_dict):
+    if df.empty or not all(col in df.columns for col in group_cols):
+        return pd.DataFrame()
+    return df.groupby(group_cols).agg(agg_dict).reset_index()
+
+
+def unique_values(df, col, **filters):
+    """Distinct values of col among the rows matching filters, in order of appearance."""
+    return filter_slice(df, **filters)[col].unique().tolist()
+
+
+def totals_by(df, by, measures, sort_by=None, **filters):
+    """Sums measures per value of by over the rows matching filters, optionally largest sort_by first."""
+    totals = filter_slice(df, **filters).groupby(by, as_index=False)[list(measures)].sum()
+    if sort_by is not None:
+        totals = totals.sort_values(sort_by, ascending=False)
+    return totals
@@ -0,0 +1,62 @@
+import pandas as pd
+
+from pulse_analytics.frames import ALL, filter_slice, totals_by
+
+
+def pincode_users(top_user, state, pincode):
+    """Top_user rows of one pincode; pincodes are compared as strings since their dtype varies by source."""
+    if "Pincodes" not in top_user.columns:
+        return pd.DataFrame()
+    return top_user[(top_user["States"] == state) & (top_user["Pincodes"].astype(str) == str(pincode))]
+
+
+def location_slices(datasets, state=ALL, district=ALL, pincode=ALL):
+    """
+    Insurance, transaction and user rows for the selected location, read from the
+    finest dataset that covers it: Aggre_* for India, Map_* for a state or district,
+    Top_* for a pincode.
+    """
+    if state == ALL and district == ALL and pincode == ALL:
+        return datasets["Aggre_insurance"], datasets["Aggre_transaction"], datasets["Map_user"]
+    elif state != ALL and district == ALL and pincode == ALL:
+        return (filter_slice(datasets["Map_insurance"], States=state),
+                filter_slice(datasets["Map_transaction"], States=state),
+                filter_slice(datasets["Map_user"], States=state))
+    elif district != ALL and pincode == ALL:
+        return (filter_slice(datasets["Map_insurance"], States=state, District=district),
+                filter_slice(datasets["Map_transaction"], States=state, District=district),
+                filter_slice(datasets["Map_user"], States=state, District=district))
+    elif pincode != ALL:
+        return (filter_slice(datasets["Top_insurance"], States=state, Pincodes=pincode),
+                filter_slice(datasets["Top_transaction"], States=state, Pincodes=pincode),
+                pincode_users(datasets["Top_user"], state, pincode))
+    else:
+        return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+
+
+def location_breakdown(datasets, state=ALL, district=ALL, pincode=ALL):
+    """
+    Insurance, transaction and user totals one level below the selected location:
+    per state for India, per district for a state, per year for a district or pincode.
+    """
+    txn_measures = ["Transaction_count", "Transaction_amount"]
+    user_measures = ["RegisteredUser", "AppOpens"]
+    if state == ALL:
+        return (totals_by(datasets["Aggre_insurance"], "States", txn_measures),
+                totals_by(datasets["Aggre_transaction"], "States", txn_measures),
+                totals_by(datasets["Map_user"], "States", user_measures))
+    elif district == ALL and pincode == ALL:
+        return (totals_by(datasets["Map_insurance"], "District", txn_measures, States=state),
+                totals_by(datasets["Map_transaction"], "District", txn_measures, States=state),
+                totals_by(datasets["Map_user"], "District", user_measures, States=state))
+    elif pincode == ALL:
+        return (totals_by(datasets["Map_insurance"], "Years", txn_measures, States=state, District=district),
+                totals_by(datasets["Map_transaction"], "Years", txn_measures, States=state, District=district),
+                totals_by(datasets["Map_user"], "Years", user_measures, States=state, District=district))
+    else:
+        user = pincode_users(datasets["Top_user"], state, pincode)
+        if not user.empty:
+            user = user.groupby("Years")["RegisteredUser"].sum().reset_index()
+        return (totals_by(datasets["Top_insurance"], "Years", txn_measures, States=state, Pincodes=pincode),
+                totals_by(datasets["Top_transaction"], "Years", txn_measures, States=state, Pincodes=pincode),
+                user)
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+
+
+def encode_and_sum(df, keys, measures, categories):
+    """
+    Sums measures over integer-coded keys.
+    String keys listed in categories become category codes, the rest are cast to int64.
+    """
+    coded = pd.DataFrame(index=df.index)
+    for col in keys:
+        if col in categories:
+            coded[col] = pd.Categorical(df[col], categories=categories[col]).codes.astype("int64")
+        else:
+            coded[col] = pd.to_numeric(df[col], errors="coerce").fillna(-1).astype("int64")
+    for col in measures:
+        coded[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
+    coded = coded[(coded[keys] >= 0).all(axis=1)]
+    return coded.groupby(keys, sort=True)[measures].sum()
+
+
+def insurance_user_joins(agg_insurance, map_insurance, top_insurance, map_user, top_user):
+    """
+    Aligns insurance amount with registered users at State, District and Pincode level
+    on integer-coded (States, District, Pincodes, Years, Quarter) keys.
+    States and District come back as categoricals so the views group and filter
+    on codes instead of strings; Pincodes come back as their values.
+    """
+    categories = {
+        "States": sorted(
+            set(agg_insurance["States"].dropna()) | set(map_insurance["States"].dropna()) |
+            set(top_insurance["States"].dropna()) | set(map_user["States"].dropna()) |
+            set(top_user["States"].dropna())
+        ),
+        "District": sorted(set(map_insurance["District"].dropna()) | set(map_user["District"].dropna())),
+    }
+    # Pincodes are coded like the strings rather than cast to int, so non-numeric ones
+    # are joined too; numbers sort before strings
+    values = {
+        "Pincodes": sorted(set(top_insurance["Pincodes"].dropna()) | set(top_user["Pincodes"].dropna()),
+                           key=lambda pincode: (isinstance(pincode, str), pincode)),
+    }
+    levels = {
+        "state": (["States", "Years", "Quarter"], agg_insurance, map_user),
+        "district": (["States", "District", "Years", "Quarter"], map_insurance, map_user),
+        "pincode": (["States", "Pincodes", "Years", "Quarter"], top_insurance, top_user),
+    }
+    joins = {}
+    for level, (keys, insurance, users) in levels.items():
+        ins = encode_and_sum(insurance, keys, ["Transaction_amount"], {**categories, **values})
+        usr = encode_and_sum(users, keys, ["RegisteredUser"], {**categories, **values})
+        joined = ins.join(usr, how="inner").reset_index()
+        for col in keys:
+            if col in categories:
+                joined[col] = pd.Categorical.from_codes(joined[col], categories=categories[col])
+            elif col in values:
+                decoded = np.asarray(values[col], dtype=object)[joined[col].to_numpy()]
+                joined[col] = pd.Series(decoded, index=joined.index).infer_objects()
+        joined["Penetration"] = joined["Transaction_amount"] / joined["RegisteredUser"]
+        joins[level] = joined
+    return joins
+
+
+def market_frame(df_transaction, df_user):
+    """Transactions and users per (States, Years, Quarter), inner-joined."""
+    df_txn_group = df_transaction.groupby(["States", "Years", "Quarter"]).agg({
+        "Transaction_amount": "sum",
+        "Transaction_count": "sum"
+    }).reset_index()
+
+    df_usr_group = df_user.groupby(["States", "Years", "Quarter"]).agg({
+        "RegisteredUser": "sum",
+        "AppOpens": "sum",
+    }).reset_index()
+
+    return pd.merge(df_txn_group, df_usr_group, on=["States", "Years", "Quarter"], how="inner")
@@ -0,0 +1,51 @@
+import pandas as pd
+
+
+def penetration(table):
+    return table["Transaction_amount"] / table["RegisteredUser"]
+
+
+def engagement_ratio(table):
+    ratio = table["AppOpens"] / table["RegisteredUser"]
+    return ratio.where(table["RegisteredUser"] > 0, 0).round(2)
+
+
+def average_usage(table):
+    return (table["AppOpens"] / table["RegisteredUser"]).round(0)
+
+
+def calc_penetration(df, group_cols, value_col, user_col):
+    df = df.copy()
+    df["Penetration"] = df[value_col] / df[user_col]
+    return df
+
+
+def calculate_year_growth(df, group_cols, current_year, selected_year, decimals=None):
+    """
+    Growth (%) of Transaction_amount between two years per group, rounded to
+    decimals when given. 'Overall' for either year compares the first and last
+    year available.
+    """
+    years = sorted(df["Years"].unique())
+    if current_year == 'Overall' or selected_year == 'Overall':
+        if len(years) < 2:
+            return pd.DataFrame()  # Not enough data
+        current_year, selected_year = years[-1], years[0]
+    df_years = df[df["Years"].isin([current_year, selected_year])]
+    pivot = df_years.pivot_table(index=group_cols, columns="Years",
+                                 values="Transaction_amount", aggfunc="sum", observed=True)
+    pivot["Growth(%)"] = ((pivot[current_year] / pivot[selected_year]) - 1) * 100
+    if decimals is not None:
+        pivot["Growth(%)"] = pivot["Growth(%)"].round(decimals)
+    pivot = pivot.reset_index()
+    pivot["Compared Years"] = f"{selected_year} vs {current_year}"
+    return pivot
+
+
+def calculate_year_growth1(df, group_cols, current_year, selected_year):
+    """calculate_year_growth with Growth(%) formatted as a whole-number percentage label."""
+    pivot = calculate_year_growth(df, group_cols, current_year, selected_year, decimals=0)
+    if pivot.empty:
+        return pivot
+    pivot["Growth(%)"] = pivot["Growth(%)"].astype(int).astype(str) + "%"
+    return pivot
@@ -0,0 +1,466 @@
+"""
+Out-of-core queries over a published dataset, for tables too large to hold
+as a DataFrame (the pincode-level Top_* datasets at a finer grain).
+
+A ChunkedTable reads a published version a row group at a time, fetching
+only the row groups whose zone maps admit the filters, and yields them in
+the table's original row order: state by state, then by year and quarter,
+as the in-memory frame holds them. Memory is one decoded row group and its
+bytes per partition.
+
+Group-by aggregation is a hash aggregation with spilling: groups are
+assigned to buckets by hash, and while more than max_groups groups are held,
+the partial aggregates of the largest bucket are written to disk, and that
+bucket's later rows are appended to its spill file. Spilled buckets are
+finished one at a time. Sums are accumulated row by row per group with the
+compensation pandas' groupby uses, in the same order, so every result is
+identical to the in-memory path's, not just close to it.
+"""
+import hashlib
+import io
+import os
+import pickle
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from pulse_analytics.bundle import read_manifest
+from pulse_analytics.datasets import DATASET_FILES, prepare_dataset
+from pulse_analytics.frames import ALL, filter_slice
+from pulse_analytics.partitions import may_match
+
+# Rows of the chunks queries work through
+CHUNK_ROWS = 65536
+# Groups an aggregation holds in memory before it spills
+MAX_GROUPS = 1_000_000
+# Hash buckets of an aggregation; each spilled bucket is finished on its own
+BUCKETS = 32
+AGGREGATIONS = ("sum", "mean")
+
+
+class _RangeFile(io.RawIOBase):
+    """
+    Read-only file over one stored object that serves reads from the byte
+    ranges loaded into it; every range is checked against its checksum.
+    """
+
+    def __init__(self, storage, name, size):
+        self.storage = storage
+        self.name = name
+        self.size = size
+        self.blocks = {}
+        self.position = 0
+
+    def load(self, entry):
+        data = self.storage.read_range(self.name, entry["offset"], entry["size"])
+        if hashlib.sha256(data).hexdigest() != entry["sha256"]:
+            raise ValueError(f"table {self.name} does not match its manifest checksum "
+                             f"at bytes {entry['offset']}-{entry['offset'] + entry['size']}")
+        self.blocks[entry["offset"]] = data
+        return data
+
+    def release(self, entry):
+        self.blocks.pop(entry["offset"], None)
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self.position, io.SEEK_END: self.size}[whence]
+        self.position = base + offset
+        return self.position
+
+    def tell(self):
+        return self.position
+
+    def readinto(self, buffer):
+        n = min(len(buffer), self.size - self.position)
+        if n <= 0:
+            return 0
+        for offset, data in self.blocks.items():
+            if offset <= self.position and self.position + n <= offset + len(data):
+                start = self.position - offset
+                buffer[:n] = data[start:start + n]
+                self.position += n
+                return n
+        raise ValueError(f"read of bytes {self.position}-{self.position + n} of {self.name} outside its loaded row groups")
+
+
+class _PartitionReader:
+    """Row groups of one partition, decoded one at a time; the last one is kept for the next state."""
+
+    def __init__(self, storage, partition):
+        self.partition = partition
+        self.file = _RangeFile(storage, partition["object"], partition["size"])
+        footer = self.file.load(partition["footer"])
+        self.file.release(partition["footer"])
+        self.parquet = pq.ParquetFile(self.file, metadata=pq.read_metadata(io.BytesIO(b"PAR1" + footer)))
+        self.current = None
+
+    def row_group(self, i):
+        if self.current is None or self.current[0] != i:
+            entry = self.partition["row_groups"][i]
+            self.file.load(entry)
+            try:
+                self.current = (i, self.parquet.read_row_group(i).to_pandas())
+            finally:
+                self.file.release(entry)
+        return self.current[1]
+
+
+class ChunkedTable:
+    """
+    One dataset of a published version, queried a row group at a time. The
+    query methods return what their in-memory counterparts (filter_slice,
+    unique_values, totals_by, groupby aggregation, RankingIndex.top/bottom)
+    return over the prepared dataset, with a fresh RangeIndex.
+    """
+
+    def __init__(self, storage, manifest, name, max_groups=MAX_GROUPS, spill_dir=None, chunk_rows=CHUNK_ROWS):
+        if "tables" not in manifest or "bundle" in manifest:
+            raise ValueError("out-of-core reads need a version published with partitions; publish it again")
+        self.storage = storage
+        self.name = name
+        self.table = manifest["tables"][DATASET_FILES[name]]
+        if any("row_groups" not in partition for partition in self.table.get("partitions", [{}])):
+            raise ValueError(f"{name} was published without row groups; publish it again")
+        self.max_groups = max_groups
+        self.spill_dir = spill_dir
+        self.chunk_rows = chunk_rows
+
+    @classmethod
+    def open(cls, storage, prefix, name, version=None, **options):
+        """ChunkedTable of dataset name in version (default: the latest) under prefix."""
+        manifest = read_manifest(storage, prefix, version)
+        if manifest is None:
+            raise ValueError(f"nothing is published under {prefix!r}")
+        return cls(storage, manifest, name, **options)
+
+    @property
+    def rows(self):
+        return self.table["rows"]
+
+    def chunks(self, **filters):
+        """
+        Prepared frames of the rows matching filters, in the table's row order,
+        of about chunk_rows rows each.
+        """
+        batch = []
+        size = 0
+        for frame in self._frames(filters):
+            batch.append(frame)
+            size += len(frame)
+            if size >= self.chunk_rows:
+                yield self._prepared(batch, filters)
+                batch = []
+                size = 0
+        if batch:
+            yield self._prepared(batch, filters)
+
+    def _prepared(self, frames, filters):
+        frame = prepare_dataset(self.name, pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0])
+        return filter_slice(frame, **filters).reset_index(drop=True) if filters else frame
+
+    def _frames(self, filters):
+        """Raw rows of the row groups that may match filters, in the table's row order."""
+        partitions = [partition for partition in self.table["partitions"] if may_match(partition, filters)]
+        states = self.table.get("state_order")
+        if states is None or len(partitions) == 1:
+            for partition in partitions:
+                reader = _PartitionReader(self.storage, partition)
+                for i, group in enumerate(partition["row_groups"]):
+                    if may_match(group, filters):
+                        yield reader.row_group(i)
+            return
+        # the partitions split the table by year: walk them state by state, like the
+        # document order, keeping each partition's current row group between states
+        readers = {}
+        for state in states:
+            state_filters = {**filters, "States": state}
+            if not may_match({"values": {"States": state}}, filters):
+                continue
+            for k, partition in enumerate(partitions):
+                if not may_match(partition, state_filters):
+                    continue
+                for i, group in enumerate(partition["row_groups"]):
+                    if may_match(group, state_filters):
+                        if k not in readers:
+                            readers[k] = _PartitionReader(self.storage, partition)
+                        frame = readers[k].row_group(i)
+                        rows = frame[(frame["States"] == state).to_numpy()]
+                        if len(rows):
+                            yield rows
+
+    def filter(self, **filters):
+        """filter_slice of the rows matching filters."""
+        frames = [frame for frame in self.chunks(**filters) if len(frame)]
+        return pd.concat(frames, ignore_index=True) if frames else self._empty()
+
+    def _empty(self):
+        """The table without rows, its column types read from the footer of a partition."""
+        reader = _PartitionReader(self.storage, self.table["partitions"][0])
+        return self._prepared([reader.parquet.schema_arrow.empty_table().to_pandas()], {})
+
+    @property
+    def columns(self):
+        return list(prepare_dataset(self.name, pd.DataFrame(columns=self.table["columns"])).columns)
+
+    def unique(self, column, **filters):
+        """unique_values: distinct values of column among the matching rows, in order of appearance."""
+        seen = set()
+        values = []
+        for chunk in self.chunks(**filters):
+            for value in chunk[column].unique().tolist():
+                if value not in seen:
+                    seen.add(value)
+                    values.append(value)
+        return values
+
+    def aggregate(self, by, measures, agg="sum", **filters):
+        """df.groupby(by)[measures].agg(agg).reset_index() over the rows matching filters."""
+        by = [by] if isinstance(by, str) else list(by)
+        parts = [part for part in self._aggregated(by, list(measures), agg, filters) if len(part)]
+        if not parts:
+            return self._empty().groupby(by)[list(measures)].agg(agg).reset_index()
+        return _sort_groups(pd.concat(parts, ignore_index=True), by)
+
+    def totals_by(self, by, measures, sort_by=None, **filters):
+        """totals_by: sums of measures per value of by, optionally largest sort_by first."""
+        totals = self.aggregate(by, measures, "sum", **filters)
+        if sort_by is not None:
+            totals = totals.sort_values(sort_by, ascending=False)
+        return totals
+
+    def top(self, entity_cols, measures, measure, n=5, year=ALL, quarter=ALL, where=None, agg="sum", descending=True):
+        """
+        RankingIndex(df, entity_cols, measures, agg).top(measure, n, year, quarter, where),
+        where filtering on entity columns; bottom() without descending. Only the best
+        n groups of each bucket are kept.
+        """
+        entity_cols = list(entity_cols)
+        measures = list(measures)
+        filters = {**(where or {}), "Years": year, "Quarter": quarter}
+        candidates = [_ranked(part, entity_cols, measure, n, descending)
+                      for part in self._aggregated(entity_cols, measures, agg, filters)]
+        table = _sort_groups(_concat(candidates, entity_cols + measures), entity_cols)
+        return _ranked(table, entity_cols, measure, n, descending, sorted_groups=True)
+
+    def bottom(self, entity_cols, measures, measure, n=5, year=ALL, quarter=ALL, where=None, agg="sum"):
+        return self.top(entity_cols, measures, measure, n, year, quarter, where, agg, descending=False)
+
+    def _aggregated(self, by, measures, agg, filters):
+        aggregator = _HashAggregator(by, measures, agg, self.max_groups, self.spill_dir)
+        try:
+            for chunk in self.chunks(**filters):
+                aggregator.add(chunk)
+            yield from aggregator.results()
+        finally:
+            aggregator.close()
+
+
+class _Partial:
+    """Partial aggregates of the groups of one bucket: keys, and per measure sums, compensations and counts."""
+
+    def __init__(self, measures, integer):
+        self.positions = {}
+        self.keys = []
+        self.sums = {m: np.zeros(0, dtype=np.int64 if integer[m] else np.float64) for m in measures}
+        self.compensations = {m: np.zeros(0) for m in measures if not integer[m]}
+        self.counts = {m: np.zeros(0, dtype=np.int64) for m in measures}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def codes(self, codes, uniques):
+        """Group positions of factorized key tuples, adding the groups not seen yet."""
+        mapping = np.full(len(uniques), -1, dtype=np.int64)
+        for j in np.unique(codes):
+            key = uniques[j]
+            position = self.positions.get(key)
+            if position is None:
+                position = self.positions[key] = len(self.keys)
+                self.keys.append(key)
+            mapping[j] = position
+        grow = len(self.keys) - len(self.counts[next(iter(self.counts))]) if self.counts else 0
+        if grow:
+            for arrays in (self.sums, self.compensations, self.counts):
+                for m in arrays:
+                    arrays[m] = np.concatenate([arrays[m], np.zeros(grow, dtype=arrays[m].dtype)])
+        return mapping[codes]
+
+
+class _HashAggregator:
+    """Group-by sum or mean of measures by the by columns, spilling buckets to disk past max_groups groups."""
+
+    def __init__(self, by, measures, agg, max_groups, spill_dir=None):
+        if agg not in AGGREGATIONS:
+            raise ValueError(f"agg must be one of {AGGREGATIONS}")
+        self.by = by
+        self.measures = measures
+        self.agg = agg
+        self.max_groups = max_groups
+        self.spill_root = spill_dir
+        self.directory = None
+        self.integer = None
+        self.dtypes = None
+        self.partials = {}
+        self.spilled = set()
+
+    def add(self, chunk):
+        present = np.ones(len(chunk), dtype=bool)
+        for column in self.by:
+            present &= chunk[column].notna().to_numpy()
+        if not present.all():
+            chunk = chunk[present]
+        if not len(chunk):
+            return
+        if self.integer is None:
+            self.dtypes = {column: chunk[column].dtype for column in self.by + self.measures}
+            # pandas sums integers exactly, and everything else (and every mean) as compensated floats
+            self.integer = {m: self.agg == "sum" and pd.api.types.is_integer_dtype(chunk[m].dtype) for m in self.measures}
+        codes, keys = pd.factorize(pd.Series(list(zip(*(chunk[column].tolist() for column in self.by))), dtype=object))
+        # hash() of the keys is only stable within the process, which is all the buckets need
+        buckets = np.fromiter((hash(key) % BUCKETS for key in keys), dtype=np.int64, count=len(keys))[codes]
+        for bucket in np.unique(buckets):
+            selected = buckets == bucket
+            rows = chunk[selected]
+            if bucket in self.spilled:
+                with open(self._path(bucket, "rows"), "ab") as f:
+                    pickle.dump(rows, f, protocol=pickle.HIGHEST_PROTOCOL)
+                continue
+            partial = self.partials.setdefault(bucket, _Partial(self.measures, self.integer))
+            self._fold(partial, rows, (codes[selected], keys))
+        while sum(map(len, self.partials.values())) > self.max_groups and len(self.partials) > 1:
+            self._spill(max(self.partials, key=lambda bucket: len(self.partials[bucket])))
+
+    def _fold(self, partial, rows, factorized=None):
+        if factorized is None:
+            factorized = pd.factorize(pd.Series(list(zip(*(rows[column].tolist() for column in self.by))), dtype=object))
+        codes = partial.codes(*factorized)
+        for m in self.measures:
+            values = rows[m].to_numpy()
+            if self.integer[m]:
+                np.add.at(partial.sums[m], codes, values.astype(np.int64))
+                np.add.at(partial.counts[m], codes, 1)
+            else:
+                _compensated_add(partial.sums[m], partial.compensations[m], partial.counts[m], codes,
+                                 values.astype(np.float64))
+
+    def _spill(self, bucket):
+        if self.directory is None:
+            self.directory = tempfile.mkdtemp(prefix="pulse-spill-", dir=self.spill_root)
+        with open(self._path(bucket, "partial"), "wb") as f:
+            pickle.dump(self.partials.pop(bucket), f, protocol=pickle.HIGHEST_PROTOCOL)
+        self.spilled.add(bucket)
+
+    def _path(self, bucket, kind):
+        return os.path.join(self.directory, f"bucket-{bucket}.{kind}")
+
+    def results(self):
+        """The aggregated groups, a frame per bucket; spilled buckets are read back and finished one at a time."""
+        for bucket in sorted(self.partials):
+            yield self._frame(self.partials[bucket])
+        self.partials = {}
+        for bucket in sorted(self.spilled):
+            with open(self._path(bucket, "partial"), "rb") as f:
+                partial = pickle.load(f)
+            if os.path.exists(self._path(bucket, "rows")):
+                with open(self._path(bucket, "rows"), "rb") as f:
+                    while True:
+                        try:
+                            rows = pickle.load(f)
+                        except EOFError:
+                            break
+                        self._fold(partial, rows)
+            yield self._frame(partial)
+
+    def _frame(self, partial):
+        data = {}
+        keys = list(zip(*partial.keys)) if partial.keys else [[] for _ in self.by]
+        for column, values in zip(self.by, keys):
+            values = pd.Series(list(values), dtype=self.dtypes[column])
+            # groupby infers the type of object keys, such as Pincodes holding integers
+            data[column] = values.infer_objects() if values.dtype == object else values
+        for m in self.measures:
+            values = partial.sums[m]
+            if self.agg == "mean":
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    values = np.where(partial.counts[m] > 0, values / partial.counts[m], np.nan)
+            data[m] = values
+        return pd.DataFrame(data, columns=self.by + self.measures)
+
+    def close(self):
+        if self.directory is not None:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self.directory = None
+
+
+def _compensated_add(sums, compensations, counts, codes, values):
+    """
+    Adds values to sums[codes] one row at a time per group, in row order, with
+    the Kahan compensation of pandas' groupby sum and mean; NaNs are skipped.
+    Groups advance together: step k adds the k-th value of every group.
+    """
+    present = ~np.isnan(values)
+    codes = codes[present]
+    values = values[present]
+    if not len(codes):
+        return
+    order = np.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+    occurrence = np.arange(len(codes)) - np.repeat(starts, np.diff(np.r_[starts, len(codes)]))
+    by_step = np.argsort(occurrence, kind="stable")
+    bounds = np.searchsorted(occurrence[by_step], np.arange(occurrence.max() + 2))
+    np.add.at(counts, codes, 1)
+    if len(bounds) * 32 > len(codes):
+        # few groups, many values each: stepping through them one value at a time is cheaper
+        touched = np.unique(codes).tolist()
+        s = dict(zip(touched, sums[touched].tolist()))
+        c = dict(zip(touched, compensations[touched].tolist()))
+        for group, value in zip(codes.tolist(), values.tolist()):
+            y = value - c[group]
+            t = s[group] + y
+            compensation = (t - s[group]) - y
+            c[group] = 0.0 if compensation != compensation else compensation
+            s[group] = t
+        sums[touched] = [s[group] for group in touched]
+        compensations[touched] = [c[group] for group in touched]
+        return
+    for k in range(len(bounds) - 1):
+        rows = order[by_step[bounds[k]:bounds[k + 1]]]
+        groups = codes[rows]
+        y = values[rows] - compensations[groups]
+        t = sums[groups] + y
+        compensation = (t - sums[groups]) - y
+        compensation[np.isnan(compensation)] = 0.0
+        compensations[groups] = compensation
+        sums[groups] = t
+
+
+def _concat(frames, columns):
+    frames = [frame for frame in frames if len(frame)]
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(frames, ignore_index=True)
+
+
+def _sort_groups(table, by):
+    """Groups in the order groupby gives them: ascending keys."""
+    return table.sort_values(by, kind="stable").reset_index(drop=True)
+
+
+def _ranked(table, entity_cols, measure, n, descending, sorted_groups=False):
+    """First n groups by measure, ties in key order, like RankingIndex."""
+    if not sorted_groups:
+        table = _sort_groups(table, entity_cols)
+    values = table[measure].to_numpy(dtype=float)
+    valid = np.flatnonzero(~np.isnan(values))
+    order = valid[np.argsort(-values[valid] if descending else values[valid], kind="stable")]
+    return table.iloc[order[:n]].reset_index(drop=True)
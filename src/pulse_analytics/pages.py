@@ -0,0 +1,78 @@
+from pulse_analytics.joins import insurance_user_joins, market_frame
+from pulse_analytics.measures import average_usage, engagement_ratio, penetration
+from pulse_analytics.ranking import RankingIndex
+
+TXN = ("Transaction_amount", "Transaction_count")
+USERS = ("RegisteredUser", "AppOpens")
+
+# Ranking indexes the pages read, by name: (source, entity columns, measures, agg, derived measures).
+# A source is a dataset name, "joins.<level>" for insurance_user_joins or "market" for market_frame.
+INDEXES = {
+    "insurance_state": ("Aggre_insurance", ("States",), TXN, "sum", None),
+    "insurance_district": ("Map_insurance", ("States", "District"), TXN, "sum", None),
+    "insurance_pincode": ("Top_insurance", ("States", "Pincodes"), TXN, "sum", None),
+    "penetration_state": ("joins.state", ("States",), ("Transaction_amount", "RegisteredUser"), "sum",
+                          {"Penetration": penetration}),
+    "penetration_district": ("joins.district", ("District", "States"), ("Penetration",), "mean", None),
+    "penetration_pincode": ("joins.pincode", ("Pincodes", "States"), ("Penetration",), "mean", None),
+    "market_state": ("market", ("States",), TXN + USERS, "sum", {"Average Usage": average_usage}),
+    "engagement_state": ("Map_user", ("States",), USERS, "sum", {"EngagementRatio": engagement_ratio}),
+    "engagement_district": ("Map_user", ("States", "District"), USERS, "sum", {"EngagementRatio": engagement_ratio}),
+    "user_pincode": ("Top_user", ("States", "Pincodes"), ("RegisteredUser",), "sum", None),
+    "top_district_state": ("Top_district", ("States",), TXN[::-1], "sum", None),
+    "top_district": ("Top_district", ("States", "District"), TXN[::-1], "sum", None),
+    "top_transaction_pincode": ("Top_transaction", ("States", "Pincodes"), TXN[::-1], "sum", None),
+}
+
+
+class PageData:
+    """
+    The joins, market frame and ranking indexes of one set of prepared datasets,
+    each built on first use.
+
+    cache(name, make) returns the object called name, calling make() to build it
+    when it does not hold it yet; the dashboard passes its per-data-version caches.
+    Without one, each object is built once per PageData.
+    """
+
+    def __init__(self, datasets, cache=None):
+        self.datasets = datasets
+        self._built = {}
+        self._cache = cache or self._memo
+
+    def _memo(self, name, make):
+        if name not in self._built:
+            self._built[name] = make()
+        return self._built[name]
+
+    def joins(self):
+        """insurance_user_joins of the datasets: {"state", "district", "pincode"} frames."""
+        d = self.datasets
+        return self._cache("joins", lambda: insurance_user_joins(
+            d["Aggre_insurance"], d["Map_insurance"], d["Top_insurance"], d["Map_user"], d["Top_user"]))
+
+    def market(self):
+        """market_frame of Aggre_transaction and Map_user."""
+        return self._cache("market", lambda: market_frame(self.datasets["Aggre_transaction"], self.datasets["Map_user"]))
+
+    def source(self, name):
+        """The frame an INDEXES source names."""
+        if name == "market":
+            return self.market()
+        if name.startswith("joins."):
+            return self.joins()[name.split(".", 1)[1]]
+        return self.datasets[name]
+
+    def index(self, name):
+        """The RankingIndex called name in INDEXES."""
+        source, entity_cols, measures, agg, derived = INDEXES[name]
+        return self._cache(name, lambda: RankingIndex(self.source(source), entity_cols, measures,
+                                                      agg=agg, derived=derived))
+
+    def warm(self):
+        """Builds every join, frame and index, as the pages' default views read them."""
+        self.joins()
+        self.market()
+        for name in INDEXES:
+            self.index(name)
+        return self
@@ -0,0 +1,263 @@
+"""
+Hive-style partitions of the published tables, and pruning them by filters.
+
+A table partitioned by ("Years",) is one object per year, and by
+("Years", "States") one per year and state:
+
+    tables/<table>/Years=2022/States=Karnataka/<sha256[:16]>.parquet
+
+The manifest lists every partition with its key values and statistics of its
+columns: null count, min and max, and the distinct values of the columns that
+have few. A read with where={column: value or list of values} opens only the
+partitions whose keys and statistics admit a matching row, so a narrow slice
+costs about its own size whatever the history holds.
+
+Within a partition the rows are clustered on (States, Years, Quarter), the
+order the extractors write them in. Row groups hold whole runs of a state's
+rows, up to ROW_GROUP_ROWS, so each group's zone map (the statistics of the
+clustering columns) names only the few states it holds. The manifest keeps
+every row group's byte range, checksum and zone map, so a read of a state
+fetches the footer and the row groups holding that state with ranged reads,
+and skips the rest of the year. Smaller groups skip more rows but add a zone
+map to the manifest and an entry to every footer a filtered read fetches;
+ROW_GROUP_ROWS balances the two on the real Pulse data.
+"""
+import hashlib
+from io import BytesIO
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from pulse_analytics.frames import ALL
+
+PARTITION_BY = ("Years",)
+# Columns the rows of a partition are clustered on, and that row groups have zone maps of
+CLUSTER_BY = ("States", "Years", "Quarter")
+# Most rows of a Parquet row group, the unit a read can skip
+ROW_GROUP_ROWS = 1024
+# Columns with at most this many distinct values in a partition list them in its statistics
+DISTINCT_LIMIT = 40
+# Path segment of the rows whose key is missing, as Hive names it
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+
+def _plain(value):
+    """value as a JSON-ready Python scalar; NaN becomes None and integral floats ints."""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float):
+        if value != value:
+            return None
+        if value.is_integer():
+            return int(value)
+    return value
+
+
+def partition_frame(df, columns):
+    """[(key values, rows)] of df split on columns, keys ascending; [({}, df)] when there are none."""
+    columns = [column for column in columns if column in df.columns]
+    if not columns or df.empty:
+        return [({}, df)]
+    parts = []
+    for key, rows in df.groupby(columns, sort=True, dropna=False):
+        key = key if isinstance(key, tuple) else (key,)
+        parts.append(({column: _plain(value) for column, value in zip(columns, key)}, rows))
+    return parts
+
+
+def partition_path(table, values):
+    """Object path of a partition below tables/: <table>/<column>=<value>/..."""
+    segments = [table]
+    for column, value in values.items():
+        segments.append(f"{column}={NULL_PARTITION if value is None else quote(str(value), safe='')}")
+    return "/".join(segments)
+
+
+def column_stats(df):
+    """{column: {"nulls", "min", "max", "values"}} of df; min/max and values only where they apply."""
+    stats = {}
+    for column in df.columns:
+        series = df[column]
+        present = series.dropna()
+        entry = {"nulls": int(len(series) - len(present))}
+        if len(present):
+            try:
+                entry["min"] = _plain(present.min())
+                entry["max"] = _plain(present.max())
+            except TypeError:
+                pass  # mixed types have no order
+            distinct = present.unique()
+            if len(distinct) <= DISTINCT_LIMIT:
+                entry["values"] = sorted((_plain(value) for value in distinct), key=lambda value: (str(type(value)), value))
+        stats[column] = entry
+    return stats
+
+
+def cluster(df):
+    """df stably sorted on the CLUSTER_BY columns it has, for frames not already in document order."""
+    columns = [column for column in CLUSTER_BY if column in df.columns]
+    if not columns:
+        return df
+    return df.sort_values(columns, kind="stable").reset_index(drop=True)
+
+
+def row_group_bounds(df, target=ROW_GROUP_ROWS):
+    """
+    [(start, stop)] of df's row groups: whole runs of one state's consecutive rows,
+    packed up to target rows, so a group's zone map names few states; a run longer
+    than target is split into pieces of target rows.
+    """
+    if df.empty:
+        return [(0, 0)]
+    if "States" in df.columns:
+        states = df["States"].to_numpy()
+        changes = np.flatnonzero(pd.Series(states[1:]).ne(pd.Series(states[:-1])).to_numpy()) + 1
+    else:
+        changes = np.array([], dtype=np.int64)
+    bounds = []
+    for start, stop in zip(np.r_[0, changes].tolist(), np.r_[changes, len(df)].tolist()):
+        if bounds and bounds[-1][1] - bounds[-1][0] + stop - start <= target:
+            bounds[-1] = (bounds[-1][0], stop)
+            continue
+        for piece in range(start, stop, target):
+            bounds.append((piece, min(piece + target, stop)))
+    return bounds
+
+
+def write_parquet(df, target=ROW_GROUP_ROWS):
+    """
+    zstd Parquet bytes of df, one row group per row_group_bounds() range. Only the
+    clustering columns get Parquet statistics: the manifest holds the rest, and
+    every footer a filtered read fetches is smaller for it.
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    buffer = BytesIO()
+    statistics = [column for column in CLUSTER_BY if column in df.columns] or False
+    with pq.ParquetWriter(buffer, table.schema, compression="zstd", write_statistics=statistics) as writer:
+        for start, stop in row_group_bounds(df, target):
+            writer.write_table(table.slice(start, stop - start), row_group_size=max(stop - start, 1))
+    return buffer.getvalue()
+
+
+def row_groups(data, df):
+    """
+    (row groups, footer) of the Parquet bytes data written from df: each row
+    group's byte range, rows, checksum and zone map, and the footer's byte range
+    and checksum. Reading the footer and some row groups is enough to decode them.
+    """
+    metadata = pq.ParquetFile(BytesIO(data)).metadata
+    zone_columns = [column for column in CLUSTER_BY if column in df.columns]
+    groups = []
+    first = 0
+    for i in range(metadata.num_row_groups):
+        group = metadata.row_group(i)
+        start, end = len(data), 0
+        for j in range(group.num_columns):
+            column = group.column(j)
+            offset = column.dictionary_page_offset if column.has_dictionary_page else column.data_page_offset
+            start = min(start, offset)
+            end = max(end, offset + column.total_compressed_size)
+        rows = df.iloc[first:first + group.num_rows]
+        first += group.num_rows
+        groups.append({
+            "offset": start,
+            "size": end - start,
+            "rows": group.num_rows,
+            "sha256": hashlib.sha256(data[start:end]).hexdigest(),
+            "stats": column_stats(rows[zone_columns]),
+        })
+    # the file ends with the footer, its length as 4 little-endian bytes, and PAR1
+    size = int.from_bytes(data[-8:-4], "little") + 8
+    footer = {"offset": len(data) - size, "size": size, "sha256": hashlib.sha256(data[-size:]).hexdigest()}
+    return groups, footer
+
+
+def ranges(entries):
+    """Byte ranges entries (with "offset" and "size") cover, adjacent ones merged into one read."""
+    merged = []
+    for entry in sorted(entries, key=lambda entry: entry["offset"]):
+        if merged and merged[-1][1] == entry["offset"]:
+            merged[-1][1] += entry["size"]
+            merged[-1][2].append(entry)
+        else:
+            merged.append([entry["offset"], entry["offset"] + entry["size"], [entry]])
+    return merged
+
+
+def document_order(df):
+    """
+    States in order of first appearance when df's rows are in document order
+    (state, year, quarter, then as parsed), as the extractors write them; else
+    None. restore_order() puts rows read back from partitions in that order.
+    """
+    if not {"States", "Years", "Quarter"} <= set(df.columns) or df["States"].isna().any():
+        return None
+    states = pd.unique(df["States"])
+    key = pd.DataFrame({"rank": df["States"].map(pd.Series(np.arange(len(states)), index=states)).to_numpy(),
+                        "Years": df["Years"].to_numpy(), "Quarter": df["Quarter"].to_numpy()})
+    try:
+        order = key.sort_values(["rank", "Years", "Quarter"], kind="stable").index.to_numpy()
+    except TypeError:
+        return None
+    if not np.array_equal(order, np.arange(len(key))):
+        return None
+    return [_plain(state) for state in states]
+
+
+def restore_order(df, states):
+    """Rows of df concatenated from partitions, in the document order of the states document_order() gave."""
+    rank = df["States"].map({state: i for i, state in enumerate(states)})
+    key = pd.DataFrame({"rank": rank.to_numpy(), "Years": df["Years"].to_numpy(), "Quarter": df["Quarter"].to_numpy()})
+    order = key.sort_values(["rank", "Years", "Quarter"], kind="stable").index.to_numpy()
+    return df.iloc[order].reset_index(drop=True)
+
+
+def _wanted(value):
+    """Set of the values a where entry admits, or None when it does not filter."""
+    if value is None or (isinstance(value, str) and value == ALL):
+        return None
+    values = value if isinstance(value, (list, tuple, set, frozenset)) else [value]
+    return {_plain(v) for v in values}
+
+
+def may_match(partition, where):
+    """Whether a partition's key values and statistics admit rows matching every where entry."""
+    for column, value in (where or {}).items():
+        wanted = _wanted(value)
+        if wanted is None:
+            continue
+        values = partition.get("values", {})
+        if column in values:
+            if values[column] not in wanted:
+                return False
+            continue
+        stats = partition.get("stats", {}).get(column)
+        if stats is None:
+            continue
+        if "values" in stats:
+            if wanted.isdisjoint(stats["values"]):
+                return False
+        elif "min" in stats:
+            try:
+                if all(v is None or v < stats["min"] or v > stats["max"] for v in wanted):
+                    return False
+            except TypeError:
+                pass  # not comparable with the column: keep the partition
+    return True
+
+
+def parse_where(text):
+    """
+    where filters of a "Years=2023,2024;States=Karnataka" string: a list of
+    values per column, digits read as integers. An empty string filters nothing.
+    """
+    where = {}
+    for clause in filter(None, (part.strip() for part in (text or "").split(";"))):
+        column, sep, values = clause.partition("=")
+        if not sep or not column.strip():
+            raise ValueError(f"filter {clause!r}: expected <column>=<value>[,<value>...]")
+        where[column.strip()] = [int(v) if v.strip().lstrip("-").isdigit() else v.strip() for v in values.split(",")]
+    return where
@@ -0,0 +1,117 @@
+import contextlib
+import functools
+import json
+import threading
+import time
+
+import pandas as pd
+
+_DISABLED = contextlib.nullcontext()
+
+
+def row_count(value):
+    """Rows of a DataFrame, of the frames in a tuple, list or dict, else None."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return len(value)
+    if isinstance(value, dict):
+        value = list(value.values())
+    if isinstance(value, (tuple, list)):
+        counts = [len(item) for item in value if isinstance(item, (pd.DataFrame, pd.Series))]
+        return sum(counts) if counts else None
+    return None
+
+
+class Profiler:
+    """
+    Opt-in timing of the sections and data-load steps of one dashboard run.
+
+    Each span records its wall time, the rows that went in and came out, its
+    nesting, and how much each counter (e.g. figure-cache hits) moved while it
+    was open. Records are kept for the debug panel and, with log_path, appended
+    to a JSON-lines file. A disabled profiler hands back the undecorated function
+    from profiled() and a shared null context from span().
+    """
+
+    def __init__(self, enabled=False, log_path=None, counters=None, context=None):
+        self.enabled = enabled or bool(log_path)
+        self.log_path = log_path
+        self.counters = counters or {}
+        self.context = context or {}
+        self.records = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def span(self, name, rows_in=None, **fields):
+        if not self.enabled:
+            return _DISABLED
+        return self._span(name, rows_in, fields)
+
+    @contextlib.contextmanager
+    def _span(self, name, rows_in, fields):
+        stack = self._local.__dict__.setdefault("stack", [])
+        record = {"name": name, "parent": stack[-1]["name"] if stack else None, "depth": len(stack),
+                  "rows_in": rows_in, "rows_out": None, **fields}
+        before = {counter: read() for counter, read in self.counters.items()}
+        stack.append(record)
+        start = time.perf_counter()
+        record["started_at"] = time.time()
+        try:
+            yield record
+        except BaseException as exc:
+            record["error"] = type(exc).__name__
+            raise
+        finally:
+            record["ms"] = round((time.perf_counter() - start) * 1000, 3)
+            stack.pop()
+            for counter, read in self.counters.items():
+                record[counter] = read() - before[counter]
+            self._emit(record)
+
+    def note(self, **fields):
+        """Adds fields to the innermost open span of the calling thread, if any."""
+        stack = getattr(self._local, "stack", None)
+        if self.enabled and stack:
+            stack[-1].update(fields)
+
+    def profiled(self, name=None):
+        """Decorator recording one span per call, with the rows of the DataFrame arguments and of the result."""
+
+        def decorate(fn):
+            if not self.enabled:
+                return fn
+            span_name = name or fn.__name__
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                rows_in = row_count(list(args) + list(kwargs.values()))
+                with self._span(span_name, rows_in, {}) as record:
+                    result = fn(*args, **kwargs)
+                    record["rows_out"] = row_count(result)
+                    return result
+
+            return wrapper
+
+        return decorate
+
+    def _emit(self, record):
+        record = {**self.context, **record}
+        with self._lock:
+            self.records.append(record)
+            if self.log_path:
+                with open(self.log_path, "a") as f:
+                    f.write(json.dumps(record, default=str) + "\n")
+
+    def table(self):
+        """The records of this run as a DataFrame, in completion order."""
+        columns = ["name", "parent", "depth", "ms", "rows_in", "rows_out", *self.counters]
+        with self._lock:
+            records = list(self.records)
+        return pd.DataFrame(records, columns=list(dict.fromkeys(columns + [k for r in records for k in r])))
+
+    def summary(self):
+        """Calls, total and slowest wall time per span name, slowest first."""
+        records = self.table()
+        if records.empty:
+            return records
+        return (records.groupby("name", sort=False)["ms"].agg(calls="count", total_ms="sum", max_ms="max")
+                .sort_values("total_ms", ascending=False).reset_index())
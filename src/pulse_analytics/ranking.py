@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+
+from pulse_analytics.frames import ALL
+
+
+class RankingIndex:
+    """
+    Precomputed ordering of an entity level (States, District, Pincodes...) by every
+    measure for each (Years, Quarter) slice, including "All" years and/or quarters.
+    Top-N and bottom-N queries of any N are slices of the stored orderings.
+    """
+
+    def __init__(self, df, entity_cols, measures, agg="sum", derived=None, period_cols=("Years", "Quarter")):
+        self.entity_cols = list(entity_cols)
+        self.base_measures = list(measures)
+        self.derived = dict(derived or {})
+        for name, func in self.derived.items():
+            if not callable(func):
+                # e.g. a page variable shadowing the measure function of the same name
+                raise TypeError(f"derived measure {name} must be a function of the aggregated table, "
+                                f"not {type(func).__name__}")
+        self.measures = self.base_measures + list(self.derived)
+        self.agg = agg
+        self.tables = {}
+        self.orders = {}
+
+        year_col, quarter_col = period_cols
+        self.years = sorted(df[year_col].dropna().unique().tolist())
+        self.quarters = sorted(df[quarter_col].dropna().unique().tolist())
+        year_values = df[year_col].to_numpy()
+        quarter_values = df[quarter_col].to_numpy()
+
+        for year in [ALL] + self.years:
+            year_mask = np.ones(len(df), dtype=bool) if year == ALL else year_values == year
+            for quarter in [ALL] + self.quarters:
+                mask = year_mask if quarter == ALL else year_mask & (quarter_values == quarter)
+                self._add_slice((year, quarter), df[mask])
+
+    def _add_slice(self, key, rows):
+        table = (
+            rows.groupby(self.entity_cols, observed=True)[self.base_measures]
+            .agg(self.agg)
+            .reset_index()
+        )
+        for name, func in self.derived.items():
+            table[name] = func(table)
+        self.tables[key] = table
+        for measure in self.measures:
+            values = table[measure].to_numpy(dtype=float)
+            valid = np.flatnonzero(~np.isnan(values))
+            descending = valid[np.argsort(-values[valid], kind="stable")]
+            ascending = valid[np.argsort(values[valid], kind="stable")]
+            self.orders[key + (measure,)] = (descending, ascending)
+
+    def table(self, year=ALL, quarter=ALL):
+        """Grouped entity table for a slice, in entity order."""
+        table = self.tables.get((year, quarter))
+        if table is None:
+            return pd.DataFrame(columns=self.entity_cols + self.measures)
+        return table
+
+    def top(self, measure, n=5, year=ALL, quarter=ALL, where=None):
+        """Largest n entities by measure, like DataFrame.nlargest."""
+        return self._ranked(measure, n, year, quarter, where, descending=True)
+
+    def bottom(self, measure, n=5, year=ALL, quarter=ALL, where=None):
+        """Smallest n entities by measure, like DataFrame.nsmallest."""
+        return self._ranked(measure, n, year, quarter, where, descending=False)
+
+    def leaderboard(self, measure, year=ALL, quarter=ALL, where=None, descending=True):
+        """Every entity of the slice ordered by measure, with a 1-based Rank column."""
+        ranked = self._ranked(measure, None, year, quarter, where, descending).copy()
+        ranked.insert(0, "Rank", np.arange(1, len(ranked) + 1))
+        return ranked.reset_index(drop=True)
+
+    def _ranked(self, measure, n, year, quarter, where, descending):
+        key = (year, quarter)
+        table = self.table(year, quarter)
+        if key not in self.tables:
+            return table
+        descending_order, ascending_order = self.orders[key + (measure,)]
+        order = descending_order if descending else ascending_order
+        if where:
+            mask = np.ones(len(table), dtype=bool)
+            for col, value in where.items():
+                if value != ALL:
+                    mask &= table[col].to_numpy() == value
+            order = order[mask[order]]
+        if n is not None:
+            order = order[:n]
+        return table.iloc[order]
@@ -0,0 +1,110 @@
+import threading
+import time
+
+
+class VersionWatcher:
+    """
+    Keeps the data version token of a source up to date from a daemon thread,
+    so readers get `current` without any I/O. Listeners are called with the new
+    version, on the watcher thread, whenever it changes.
+    """
+
+    def __init__(self, version, interval=30.0):
+        self._version = version
+        self.interval = interval
+        self.current = version()
+        self.checked_at = time.time()
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="pulse-version-watcher", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def subscribe(self, listener):
+        with self._lock:
+            self._listeners.append(listener)
+
+    def check(self):
+        """Fetches the version now and notifies the listeners if it changed."""
+        version = self._version()
+        with self._lock:
+            self.checked_at = time.time()
+            changed = version != self.current
+            self.current = version
+            listeners = list(self._listeners) if changed else []
+        for listener in listeners:
+            listener(version)
+        return version
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as exc:
+                # keep serving the last known version until the source answers again
+                print(f"Data version check failed: {exc}")
+
+
+class Prewarmer:
+    """
+    Runs warm(version) on a background thread when started and whenever the
+    watcher reports a new version. `version` only moves to a version once it is
+    warm, so readers keep the previous one until then; `ready` is set after the
+    first successful warm-up, and `settled` once the first warm-up has finished,
+    warm or failed. A failed warm-up is retried every retry_seconds for as long
+    as its version is current.
+    """
+
+    def __init__(self, warm, watcher, retry_seconds=60.0):
+        self._warm = warm
+        self.watcher = watcher
+        self.retry_seconds = retry_seconds
+        self.version = None
+        self.ready = threading.Event()
+        self.settled = threading.Event()
+        self.status = {"state": "pending", "version": None, "seconds": None, "error": None}
+        self._run_lock = threading.Lock()
+
+    def start(self):
+        self.watcher.subscribe(self._trigger)
+        self._trigger(self.watcher.current)
+        return self
+
+    def wait(self, timeout=None):
+        """True once some version is warm."""
+        return self.ready.wait(timeout)
+
+    def _trigger(self, version):
+        threading.Thread(target=self._run, args=(version,), name="pulse-prewarm", daemon=True).start()
+
+    def _run(self, version):
+        with self._run_lock:
+            if version != self.watcher.current or version == self.version:
+                # superseded by a newer version, or already warm
+                return
+            self.status = {"state": "warming", "version": version, "seconds": None, "error": None}
+            start = time.perf_counter()
+            try:
+                self._warm(version)
+            except Exception as exc:
+                self.status = {"state": "failed", "version": version, "seconds": None, "error": str(exc)}
+                print(f"Prewarming data version {version} failed: {exc}")
+                self.settled.set()
+                self._retry(version)
+                return
+            self.version = version
+            self.status = {"state": "ready", "version": version,
+                           "seconds": round(time.perf_counter() - start, 3), "error": None}
+            self.ready.set()
+            self.settled.set()
+
+    def _retry(self, version):
+        timer = threading.Timer(self.retry_seconds, self._run, args=(version,))
+        timer.daemon = True
+        timer.start()
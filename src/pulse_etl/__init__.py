@@ -0,0 +1,71 @@
+"""Extraction of the PhonePe Pulse JSON tree into the flat CSVs the dashboard reads."""
+
+from pulse_etl.registry import DATASETS, Dataset, group_name, prefix_groups, siblings
+from pulse_etl.catalog import CATALOG_ENV, CATALOG_MAX_AGE_ENV, Catalog, discover
+from pulse_etl.checkpoint import (
+    CHECKPOINT_DIR_ENV,
+    Checkpoint,
+    IncompleteExtraction,
+    RetryPolicy,
+)
+from pulse_etl.extract import (
+    DEFAULT_STORAGE,
+    PROJECT_ID,
+    build_frame,
+    extract,
+    list_partitions,
+    normalize_states,
+    read_document,
+)
+from pulse_etl.pipeline import extract_pipelined, extract_shared, extract_to_csv, parse_chunk
+from pulse_etl.metrics import METRICS_DIR_ENV, RunMetrics
+from pulse_etl.sharding import DOCUMENT_COLUMN, Shard, merge_shards, shard_path
+from pulse_etl.cli import run_extractor
+from pulse_etl.local import (
+    dataset_dir,
+    extract_local,
+    extract_local_shared,
+    list_documents,
+    parse_file,
+    parse_sections,
+)
+
+__all__ = [
+    "CATALOG_ENV",
+    "CATALOG_MAX_AGE_ENV",
+    "CHECKPOINT_DIR_ENV",
+    "Catalog",
+    "Checkpoint",
+    "DATASETS",
+    "DEFAULT_STORAGE",
+    "DOCUMENT_COLUMN",
+    "Dataset",
+    "IncompleteExtraction",
+    "METRICS_DIR_ENV",
+    "PROJECT_ID",
+    "RetryPolicy",
+    "RunMetrics",
+    "Shard",
+    "build_frame",
+    "dataset_dir",
+    "discover",
+    "extract",
+    "extract_local",
+    "extract_local_shared",
+    "extract_pipelined",
+    "extract_shared",
+    "extract_to_csv",
+    "group_name",
+    "list_documents",
+    "list_partitions",
+    "merge_shards",
+    "normalize_states",
+    "parse_chunk",
+    "parse_file",
+    "parse_sections",
+    "prefix_groups",
+    "read_document",
+    "run_extractor",
+    "shard_path",
+    "siblings",
+]
@@ -0,0 +1,129 @@
+"""
+Availability catalog of the Pulse tree: the state/<state>/<year>/<quarter>.json
+objects under every dataset prefix, with their generations.
+
+Discovery walks a prefix level by level: delimiter listings name its state
+directories and then their year directories, and only the year directories,
+which hold the quarter documents, are listed object by object, concurrently.
+A run discovers only the prefixes it reads, and the catalog is saved as a
+small JSON file.
+
+A run discovers its prefixes afresh, so documents that landed since the last
+run are always found.
+Later runs may opt in to reusing a saved listing for max_age seconds
+($PULSE_CATALOG_MAX_AGE) when the bucket is known not to have changed.
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from pulse_etl.registry import DATASETS
+from pulse_storage import StorageObject
+
+CATALOG_ENV = "PULSE_CATALOG"
+CATALOG_MAX_AGE_ENV = "PULSE_CATALOG_MAX_AGE"
+DEFAULT_CATALOG_PATH = ".pulse_catalog.json"
+
+
+def discover(storage, prefix, workers=16):
+    """StorageObjects under the <state>/<year>/ directories of prefix, sorted by name."""
+    states = storage.list_prefixes(prefix)
+    if not states:
+        return []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        years = [year for listing in pool.map(storage.list_prefixes, states) for year in listing]
+        listings = list(pool.map(storage.list, years))
+    return sorted(obj for listing in listings for obj in listing)
+
+
+class Catalog:
+    """
+    Listed objects per prefix of one storage, discovered on first use and then
+    reused by this catalog. path, when given, is where the catalog is saved to;
+    entries saved there by an earlier run are reused only when max_age is set and
+    they are at most max_age seconds old (and made for the same storage).
+    """
+
+    def __init__(self, storage, path=None, max_age=0.0, prefixes=None, workers=16):
+        self.storage = storage
+        self.path = path
+        self.max_age = max_age
+        self.prefixes = sorted(set(prefixes if prefixes is not None else (spec.prefix for spec in DATASETS.values())))
+        self.workers = workers
+        self._entries = {}
+        self._discovered = set()
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            self._load()
+
+    @classmethod
+    def from_env(cls, storage):
+        """
+        Catalog saved at $PULSE_CATALOG (default .pulse_catalog.json); a saved
+        listing is reused for $PULSE_CATALOG_MAX_AGE seconds, by default not at all.
+        """
+        return cls(storage, os.environ.get(CATALOG_ENV, DEFAULT_CATALOG_PATH),
+                   float(os.environ.get(CATALOG_MAX_AGE_ENV, "0")))
+
+    def objects(self, prefix):
+        """StorageObjects under the state directories of prefix, sorted by name."""
+        with self._lock:
+            if not self._fresh(prefix):
+                self._refresh([prefix])
+            _, objects = self._entries[prefix]
+            return list(objects)
+
+    def refresh(self):
+        """Discovers every prefix again, whatever the age of its entry."""
+        with self._lock:
+            self._refresh(sorted(set(self.prefixes) | set(self._entries)))
+
+    def _fresh(self, prefix):
+        if prefix in self._discovered:
+            return True
+        entry = self._entries.get(prefix)
+        return entry is not None and self.max_age > 0 and time.time() - entry[0] <= self.max_age
+
+    def _refresh(self, prefixes):
+        # the prefixes are discovered concurrently; discover() then spreads over each prefix's directories
+        with ThreadPoolExecutor(max_workers=len(prefixes)) as pool:
+            discovered = list(pool.map(lambda prefix: discover(self.storage, prefix, self.workers), prefixes))
+        now = time.time()
+        for prefix, objects in zip(prefixes, discovered):
+            self._entries[prefix] = (now, objects)
+        self._discovered.update(prefixes)
+        if self.path:
+            self._save()
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                saved = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable catalog {self.path}: {e}")
+            return
+        if saved.get("storage") != repr(self.storage):
+            return
+        for prefix, entry in saved["prefixes"].items():
+            objects = [StorageObject(prefix + name, generation, size) for name, (generation, size) in entry["objects"].items()]
+            self._entries[prefix] = (entry["listed_at"], objects)
+
+    def _save(self):
+        saved = {
+            "storage": repr(self.storage),
+            "prefixes": {
+                prefix: {
+                    "listed_at": listed_at,
+                    "objects": {obj.name[len(prefix):]: [obj.generation, obj.size] for obj in objects},
+                }
+                for prefix, (listed_at, objects) in sorted(self._entries.items())
+            },
+        }
+        directory = os.path.dirname(os.path.abspath(self.path))
+        tmp = os.path.join(directory, f".{os.path.basename(self.path)}.{os.getpid()}.tmp")
+        with open(tmp, "w") as f:
+            json.dump(saved, f, separators=(",", ":"))
+        # replaced atomically, so extractors running side by side never read half a catalog
+        os.replace(tmp, self.path)
@@ -0,0 +1,169 @@
+"""
+Checkpoints of extraction runs, so an interrupted or partly failed run can be
+resumed without downloading what it already has.
+
+A checkpoint is a directory per group of datasets extracted together:
+
+    progress.pkl  parsed batches, appended as each batch completes
+    retry.json    blobs whose download or parse failed, with their attempts and last error
+    run.json      the storage and datasets the checkpoint belongs to
+
+A resumed run reuses the parsed rows of every document whose generation has
+not changed, and fetches only the documents that never completed, including
+those in the retry queue.
+"""
+import json
+import os
+import pickle
+import random
+import shutil
+import threading
+import time
+
+from pulse_etl.registry import group_name
+CHECKPOINT_DIR_ENV = "PULSE_CHECKPOINT_DIR"
+DEFAULT_CHECKPOINT_DIR = ".pulse_checkpoints"
+
+
+class RetryPolicy:
+    """Exponential backoff with jitter: attempt n waits about base * 2**(n-1) seconds, at most cap."""
+
+    def __init__(self, attempts=5, base=0.5, cap=30.0):
+        self.attempts = attempts
+        self.base = base
+        self.cap = cap
+
+    def delay(self, attempt):
+        return min(self.cap, self.base * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+
+    def call(self, fn, name, on_failure=None):
+        """
+        fn() retried until it succeeds or attempts run out, when the last error is
+        raised. on_failure(name, attempt, error) is told of every failed attempt.
+        """
+        for attempt in range(1, self.attempts + 1):
+            try:
+                return fn()
+            except Exception as e:
+                if on_failure is not None:
+                    on_failure(name, attempt, e)
+                if attempt == self.attempts:
+                    raise
+                time.sleep(self.delay(attempt))
+
+
+class IncompleteExtraction(RuntimeError):
+    """Some documents could not be downloaded; their names are in .failed and the run can be resumed."""
+
+    def __init__(self, failed, checkpoint=None):
+        self.failed = sorted(failed)
+        self.checkpoint = checkpoint
+        where = f"; resume from {checkpoint.path}" if checkpoint is not None else ""
+        super().__init__(f"{len(self.failed)} documents could not be downloaded{where}")
+
+
+class Checkpoint:
+    """
+    Progress of one extraction run, kept under path. Unless resume is set, any
+    progress found there is discarded first; so is progress saved for another
+    storage or set of datasets.
+    """
+
+    def __init__(self, path, storage, datasets, resume=False, shard=None):
+        self.path = path
+        self.run = {"storage": repr(storage), "datasets": sorted(datasets), "shard": repr(shard)}
+        self._lock = threading.Lock()
+        if not resume or self._saved_run() != self.run:
+            if resume and os.path.exists(path):
+                print(f"Ignoring checkpoint {path}: it was made for another run")
+            self.clear()
+        os.makedirs(path, exist_ok=True)
+        self._write_json("run.json", self.run)
+        self.retry = self._read_json("retry.json") or {}
+
+    @classmethod
+    def for_datasets(cls, storage, datasets, resume=False, root=None, shard=None):
+        """Checkpoint of datasets (or of one shard of them) under root (default $PULSE_CHECKPOINT_DIR, else .pulse_checkpoints)."""
+        root = root or os.environ.get(CHECKPOINT_DIR_ENV, DEFAULT_CHECKPOINT_DIR)
+        return cls(os.path.join(root, group_name(datasets, shard)), storage, datasets, resume, shard)
+
+    def completed(self, generations):
+        """
+        Parsed batches saved so far, as (names, chunk) pairs keeping only the
+        documents still listed with the generation they were parsed at.
+        """
+        batches = []
+        for names, saved_generations, chunk in self._records():
+            current = [generations.get(name) == generation for name, generation in zip(names, saved_generations)]
+            if any(current):
+                batches.append(([name if ok else None for name, ok in zip(names, current)], chunk))
+        return batches
+
+    def save(self, names, generations, chunk):
+        """Appends one parsed batch: its document names, their generations and parse_chunk's output over them."""
+        record = pickle.dumps((names, generations, chunk), protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock, open(os.path.join(self.path, "progress.pkl"), "ab") as f:
+            f.write(record)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def failed(self, name, attempt, error):
+        """Records a failed download or parse of name in the retry queue."""
+        with self._lock:
+            entry = self.retry.setdefault(name, {"attempts": 0})
+            entry["attempts"] += 1
+            entry["error"] = f"{type(error).__name__}: {error}"
+            entry["failed_at"] = time.time()
+            self._write_json("retry.json", self.retry)
+
+    def succeeded(self, name):
+        """Takes name off the retry queue once it has been downloaded."""
+        with self._lock:
+            if self.retry.pop(name, None) is not None:
+                self._write_json("retry.json", self.retry)
+
+    def clear(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+        try:
+            os.rmdir(os.path.dirname(self.path) or ".")
+        except OSError:
+            pass  # other groups' checkpoints are still there
+
+    def _records(self):
+        path = os.path.join(self.path, "progress.pkl")
+        if not os.path.exists(path):
+            return []
+        records = []
+        with open(path, "r+b") as f:
+            end = 0
+            while True:
+                try:
+                    records.append(pickle.load(f))
+                except EOFError:
+                    break
+                except (pickle.UnpicklingError, ValueError, TypeError, AttributeError, IndexError):
+                    break
+                end = f.tell()
+            if end < os.fstat(f.fileno()).st_size:
+                # a batch cut short by the interruption: its documents are fetched again, and
+                # the torn bytes are dropped so batches appended from now on stay readable
+                print(f"Ignoring a truncated batch at the end of {path}")
+                f.truncate(end)
+        return records
+
+    def _saved_run(self):
+        return self._read_json("run.json")
+
+    def _read_json(self, file_name):
+        try:
+            with open(os.path.join(self.path, file_name)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_json(self, file_name, value):
+        path = os.path.join(self.path, file_name)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(value, f, indent=2, sort_keys=True)
+        os.replace(tmp, path)
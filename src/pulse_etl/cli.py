@@ -0,0 +1,62 @@
+"""Command line shared by the extractor scripts (src/agg_user.py and the others)."""
+import argparse
+import sys
+
+from pulse_etl.checkpoint import IncompleteExtraction
+from pulse_etl.extract import DEFAULT_STORAGE, PROJECT_ID
+from pulse_etl.metrics import RunMetrics
+from pulse_etl.pipeline import extract_to_csv
+from pulse_etl.registry import DATASETS, group_name, siblings
+from pulse_etl.sharding import Shard, merge_shards
+from pulse_storage import storage_from_env
+
+
+def _shard(text):
+    try:
+        return Shard.parse(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def run_extractor(dataset, argv=None):
+    """
+    Extracts dataset (and its siblings) to CSV, then writes the run's metrics;
+    exits non-zero, keeping the checkpoint, if documents failed. --shard extracts
+    one shard into partial CSVs, and --merge combines the partial CSVs of N shards.
+    """
+    parser = argparse.ArgumentParser(description=f"Extract {dataset} from the Pulse tree into {DATASETS[dataset].output}.")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue an interrupted or failed run: fetch only its unfinished and failed documents")
+    parser.add_argument("--metrics-dir", help="where to write the JSON run report and the Prometheus textfile; "
+                                              "defaults to $PULSE_METRICS_DIR, else .pulse_metrics")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--shard", type=_shard, metavar="I/N",
+                      help="extract only shard I of N (1 <= I <= N) of the state/period documents into partial CSVs")
+    mode.add_argument("--merge", type=int, metavar="N",
+                      help="combine the partial CSVs of N shards into the final CSVs, without extracting")
+    args = parser.parse_args(argv)
+
+    if args.merge:
+        try:
+            for name in siblings(dataset):
+                merge_shards(name, args.merge)
+        except (FileNotFoundError, ValueError) as e:
+            sys.exit(str(e))
+        return
+
+    storage = storage_from_env(DEFAULT_STORAGE, project=PROJECT_ID)
+    metrics = RunMetrics(group_name(siblings(dataset), args.shard))
+    try:
+        extract_to_csv(storage, dataset, resume=args.resume, metrics=metrics, shard=args.shard)
+    except IncompleteExtraction as e:
+        metrics.finish("incomplete")
+        for name in e.failed:
+            print(f"Failed: {name}")
+        sys.exit(f"{e}. Run again with --resume to retry them.")
+    except BaseException:
+        metrics.finish("failed")
+        raise
+    else:
+        metrics.finish("ok")
+    finally:
+        metrics.write(args.metrics_dir)
@@ -0,0 +1,110 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from pulse_etl.registry import DATASETS
+
+# Where the extractors read from unless PULSE_STORAGE says otherwise
+DEFAULT_STORAGE = "gs://phonepe-insight-transaction"
+PROJECT_ID = "424692832551"
+
+
+def list_partitions(storage, prefix="", catalog=None):
+    """
+    States, years and quarter file names found under prefix
+    (.../state/<state>/<year>/<quarter>.json), and the generation of every listed object.
+    With a Catalog the objects come from it instead of a listing of the whole prefix.
+    """
+    blobs = catalog.objects(prefix) if catalog is not None else storage.list(prefix)
+    depth = prefix.rstrip("/").count("/") + 1
+
+    state_set = set()
+    year_set = set()
+    quater_set = set()
+    generations = {}
+    for blob in blobs:
+        generations[blob.name] = blob.generation
+        parts = blob.name.split('/')
+        if len(parts) > depth:
+            state_set.add(parts[depth])
+        if len(parts) > depth + 1:
+            year_set.add(parts[depth + 1])
+        if len(parts) > depth + 2:
+            quater_set.add(parts[depth + 2])
+    return list(sorted(state_set)), list(sorted(year_set)), list(sorted(quater_set)), generations
+
+
+def normalize_states(df):
+    """Turns Pulse state slugs into the names used by the India GeoJSON."""
+    if df.empty:
+        return df
+    df["States"] = (
+        df["States"]
+        .str.replace("andaman-&-nicobar-islands", "Andaman & Nicobar", regex=False)
+        .str.replace("-", " ")
+        .str.title()
+        .str.replace("Dadra & Nagar Haveli & Daman & Diu", "Dadra and Nagar Haveli and Daman and Diu", regex=False)
+    )
+    return df
+
+
+def read_document(storage, blob_path, parse):
+    """Parsed rows of one document, or None when it is missing or unreadable."""
+    if not storage.exists(blob_path):
+        print(f"Skipping missing file: {blob_path}")
+        return None
+    try:
+        return parse(json.loads(storage.read_text(blob_path)))
+    except Exception as e:
+        print(f"Error processing {blob_path}: {e}")
+        return None
+
+
+def extract(storage, dataset, workers=1, cache=None, catalog=None):
+    """
+    Reads every state/year/quarter document of a dataset into a DataFrame.
+    With workers > 1 the documents are fetched by a thread pool; rows keep the
+    serial (state, year, quarter) order either way.
+
+    cache, when given, maps blob path -> (generation, rows) and is updated in place;
+    documents whose listed generation matches their entry are not downloaded again.
+    catalog, when given, replaces the listing of the dataset's prefix.
+    """
+    spec = DATASETS[dataset]
+    states, years, quarters, generations = list_partitions(storage, prefix=spec.prefix, catalog=catalog)
+    # the listing is the coverage of the prefix: combinations it does not hold are never probed
+    keys = [(state, year, quarter) for state in states for year in years for quarter in quarters
+            if f"{spec.prefix}{state}/{year}/{quarter}" in generations]
+    paths = [f"{spec.prefix}{state}/{year}/{quarter}" for state, year, quarter in keys]
+    missing = len(states) * len(years) * len(quarters) - len(keys)
+    if missing:
+        print(f"Skipping {missing} state/year/quarter combinations with no document under {spec.prefix}")
+
+    def fetch(path):
+        if cache is not None:
+            entry = cache.get(path)
+            if entry is not None and path in generations and entry[0] == generations[path]:
+                return entry[1]
+        parsed = read_document(storage, path, spec.parse)
+        if cache is not None and parsed is not None and path in generations:
+            cache[path] = (generations[path], parsed)
+        return parsed
+
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            documents = list(pool.map(fetch, paths))
+    else:
+        documents = [fetch(path) for path in paths]
+
+    return build_frame(spec, zip(keys, documents))
+
+
+def build_frame(spec, documents):
+    """DataFrame of ((state, year, quarter file), parsed rows) pairs, in the extractor's output layout."""
+    rows = []
+    for (state, year, quarter), parsed in documents:
+        quarter_num = int(quarter.replace(".json", ""))
+        rows.extend((state, year, quarter_num) + row for row in parsed or ())
+    df = pd.DataFrame(rows, columns=("States", "Years", "Quarter") + spec.columns)
+    return normalize_states(df)
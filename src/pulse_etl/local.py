@@ -0,0 +1,92 @@
+"""
+Ingestion straight from a local mirror of the Pulse JSON tree, either a clone
+of the Pulse repository (data/...) or a copy of the bucket (pulse-data/...),
+with the documents parsed by a process pool.
+"""
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from pulse_etl.extract import build_frame
+from pulse_etl.registry import DATASETS
+from pulse_storage import PULSE_REPO_ALIASES, is_pulse_checkout
+
+
+def dataset_dir(root, dataset):
+    """Directory of a dataset's state/<state>/<year>/<quarter>.json files under root."""
+    prefix = DATASETS[dataset].prefix
+    if is_pulse_checkout(root):
+        for object_prefix, dir_prefix in PULSE_REPO_ALIASES.items():
+            if prefix.startswith(object_prefix):
+                prefix = dir_prefix + prefix[len(object_prefix):]
+    return os.path.join(root, *prefix.rstrip("/").split("/"))
+
+
+def list_documents(root, dataset):
+    """((state, year, quarter file), path) of every document, in the order extract() reads them."""
+    base = dataset_dir(root, dataset)
+    documents = []
+    if not os.path.isdir(base):
+        return documents
+    for state in sorted(os.listdir(base)):
+        state_dir = os.path.join(base, state)
+        if not os.path.isdir(state_dir):
+            continue
+        for year in sorted(os.listdir(state_dir)):
+            year_dir = os.path.join(state_dir, year)
+            if not os.path.isdir(year_dir):
+                continue
+            for quarter in sorted(os.listdir(year_dir)):
+                if quarter.endswith(".json"):
+                    documents.append(((state, year, quarter), os.path.join(year_dir, quarter)))
+    return documents
+
+
+def parse_file(path, parse):
+    """Parsed rows of one file, or None when it is unreadable. Runs in the worker processes."""
+    return parse_sections(path, (parse,))[0]
+
+
+def parse_sections(path, parses):
+    """Rows of one file for each parser, None where the file or that parser failed. Runs in the worker processes."""
+    try:
+        with open(path, "rb") as f:
+            document = json.loads(f.read())
+    except Exception as e:
+        print(f"Error processing {path}: {e}")
+        return [None] * len(parses)
+    sections = []
+    for parse in parses:
+        try:
+            sections.append(parse(document))
+        except Exception as e:
+            print(f"Error processing {path}: {e}")
+            sections.append(None)
+    return sections
+
+
+def extract_local(root, dataset, processes=None, chunksize=64):
+    """
+    Same DataFrame as extract() over the bucket, read from a local mirror.
+    processes=1 parses in this process; otherwise a pool of that many
+    processes (default: one per CPU) parses the files in chunks.
+    """
+    return extract_local_shared(root, [dataset], processes, chunksize)[dataset]
+
+
+def extract_local_shared(root, datasets, processes=None, chunksize=64):
+    """{dataset: DataFrame} of datasets that share a prefix, reading and decoding each file once."""
+    specs = [DATASETS[dataset] for dataset in datasets]
+    if any(spec.prefix != specs[0].prefix for spec in specs):
+        raise ValueError(f"{datasets} are not read from the same documents")
+    parses = tuple(spec.parse for spec in specs)
+    documents = list_documents(root, datasets[0])
+    keys = [key for key, _ in documents]
+    paths = [path for _, path in documents]
+    if processes == 1 or len(paths) < chunksize:
+        parsed = [parse_sections(path, parses) for path in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            parsed = list(pool.map(parse_sections, paths, [parses] * len(paths), chunksize=chunksize))
+    return {dataset: build_frame(spec, zip(keys, (sections[i] for sections in parsed)))
+            for i, (dataset, spec) in enumerate(zip(datasets, specs))}
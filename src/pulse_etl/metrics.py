@@ -0,0 +1,132 @@
+"""
+Per-stage metrics of extraction runs, written as a JSON run report and as a
+Prometheus textfile (for node_exporter's textfile collector).
+
+Stages of the pipeline:
+
+    list           finding the documents (listing or catalog)
+    resume         documents taken from a checkpoint instead of downloaded
+    download       reading documents, retry waits included (summed over threads)
+    download_wait  the parse loop waiting for downloads: downloads are the bottleneck
+    parse          decoding and flattening batches (summed over processes)
+    parse_wait     the parse loop waiting for a free parser: parsing is the bottleneck
+    assemble       building each dataset's DataFrame from the parsed rows
+    normalize      turning state slugs into display names
+    write          DataFrame.to_csv
+
+Stages shared by the datasets extracted together are recorded under the
+group's name (datasets joined by "+"), the others under the dataset.
+"""
+import contextlib
+import json
+import os
+import threading
+import time
+
+METRICS_DIR_ENV = "PULSE_METRICS_DIR"
+DEFAULT_METRICS_DIR = ".pulse_metrics"
+COUNTERS = ("calls", "seconds", "bytes", "records", "errors", "retries")
+
+_HELP = {
+    "calls": "Operations of the stage in the last run.",
+    "seconds": "Seconds spent in the stage in the last run, summed over workers.",
+    "bytes": "Bytes handled by the stage in the last run.",
+    "records": "Documents or rows handled by the stage in the last run.",
+    "errors": "Operations of the stage that failed in the last run.",
+    "retries": "Retried attempts of the stage in the last run.",
+}
+
+
+class RunMetrics:
+    """Thread-safe counters per (dataset, stage) of one extraction run."""
+
+    def __init__(self, name):
+        self.name = name
+        self.started = time.time()
+        self._start = time.perf_counter()
+        self.finished = None
+        self.status = "running"
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    def add(self, dataset, stage, seconds=0.0, calls=1, bytes=0, records=0, errors=0, retries=0):
+        with self._lock:
+            counters = self.stages.setdefault((dataset, stage), dict.fromkeys(COUNTERS, 0))
+            counters["calls"] += calls
+            counters["seconds"] += seconds
+            counters["bytes"] += bytes
+            counters["records"] += records
+            counters["errors"] += errors
+            counters["retries"] += retries
+
+    @contextlib.contextmanager
+    def timed(self, dataset, stage, **counts):
+        """Times the block as one call of stage; the yielded dict takes the block's counts."""
+        start = time.perf_counter()
+        try:
+            yield counts
+        except Exception:
+            counts["errors"] = counts.get("errors", 0) + 1
+            raise
+        finally:
+            self.add(dataset, stage, seconds=time.perf_counter() - start, **counts)
+
+    def finish(self, status):
+        self.status = status
+        self.finished = time.perf_counter() - self._start
+
+    def report(self):
+        """The run as a JSON-ready dict, stages in insertion order."""
+        with self._lock:
+            stages = [{"dataset": dataset, "stage": stage, **{k: round(v, 6) if k == "seconds" else v
+                                                              for k, v in counters.items()}}
+                      for (dataset, stage), counters in self.stages.items()]
+        wall = self.finished if self.finished is not None else time.perf_counter() - self._start
+        return {
+            "run": self.name,
+            "status": self.status,
+            "started": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self.started)),
+            "wall_seconds": round(wall, 6),
+            "stages": stages,
+        }
+
+    def prometheus(self):
+        """The run in the Prometheus text exposition format."""
+        report = self.report()
+        run = _label(self.name)
+        lines = [
+            "# HELP pulse_etl_run_seconds Wall time of the last run.",
+            "# TYPE pulse_etl_run_seconds gauge",
+            f'pulse_etl_run_seconds{{run="{run}"}} {report["wall_seconds"]}',
+            "# HELP pulse_etl_run_success Whether the last run completed.",
+            "# TYPE pulse_etl_run_success gauge",
+            f'pulse_etl_run_success{{run="{run}"}} {int(report["status"] == "ok")}',
+            "# HELP pulse_etl_run_timestamp_seconds Start of the last run.",
+            "# TYPE pulse_etl_run_timestamp_seconds gauge",
+            f'pulse_etl_run_timestamp_seconds{{run="{run}"}} {self.started:.0f}',
+        ]
+        for counter in COUNTERS:
+            metric = f"pulse_etl_stage_{counter}"
+            lines += [f"# HELP {metric} {_HELP[counter]}", f"# TYPE {metric} gauge"]
+            for stage in report["stages"]:
+                labels = f'run="{run}",dataset="{_label(stage["dataset"])}",stage="{stage["stage"]}"'
+                lines.append(f"{metric}{{{labels}}} {stage[counter]}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, directory=None):
+        """
+        Writes <name>.json and <name>.prom under directory (default
+        $PULSE_METRICS_DIR, else .pulse_metrics), each replaced atomically.
+        """
+        directory = directory or os.environ.get(METRICS_DIR_ENV, DEFAULT_METRICS_DIR)
+        os.makedirs(directory, exist_ok=True)
+        for extension, text in ((".json", json.dumps(self.report(), indent=2) + "\n"), (".prom", self.prometheus())):
+            path = os.path.join(directory, self.name + extension)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                f.write(text)
+            os.replace(tmp, path)
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
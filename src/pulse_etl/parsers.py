@@ -0,0 +1,44 @@
+"""
+Row parsers of the Pulse JSON documents, one per dataset.
+Each takes the decoded document and returns the dataset-specific part of its rows;
+they are plain module-level functions so they can be shipped to worker processes.
+"""
+
+
+def parse_aggregated_transaction(D):
+    rows = []
+    for record in D["data"].get("transactionData") or []:
+        instrument = record["paymentInstruments"][0]
+        rows.append((record["name"], instrument["count"], instrument["amount"]))
+    return rows
+
+
+def parse_aggregated_user(D):
+    users_by_device = D.get("data", {}).get("usersByDevice")
+    if not users_by_device:
+        return []
+    return [(z.get("brand"), z.get("count"), z.get("percentage")) for z in users_by_device]
+
+
+def parse_map_hover(D):
+    return [(z["name"], z["metric"][0]["count"], z["metric"][0]["amount"]) for z in D["data"]["hoverDataList"]]
+
+
+def parse_map_user(D):
+    return [(district, data["registeredUsers"], data["appOpens"]) for district, data in D["data"]["hoverData"].items()]
+
+
+def parse_top_districts(D):
+    return [(z["entityName"], z["metric"]["count"], z["metric"]["amount"]) for z in D["data"]["districts"]]
+
+
+def parse_top_pincodes(D):
+    return [(z["entityName"], z["metric"]["count"], z["metric"]["amount"]) for z in D["data"]["pincodes"]]
+
+
+def parse_top_user_districts(D):
+    return [(z["name"], z["registeredUsers"]) for z in D["data"]["districts"]]
+
+
+def parse_top_user_pincodes(D):
+    return [(z["name"], z["registeredUsers"]) for z in D["data"]["pincodes"]]
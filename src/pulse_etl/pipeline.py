@@ -0,0 +1,309 @@
+"""
+Two-stage extraction: I/O threads download raw documents into a bounded queue,
+and a process pool decodes and flattens them into columnar chunks.
+
+Back-pressure runs from the parsers to the network: at most max_inflight batches
+are being parsed at once, and while they are the queue fills up and the
+downloaders block on it.
+
+Datasets read from the same documents (top/transaction districts and pincodes)
+are extracted together: each document is downloaded and decoded once, and every
+dataset's parser runs on it.
+"""
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+
+from pulse_etl.catalog import Catalog
+from pulse_etl.checkpoint import Checkpoint, IncompleteExtraction, RetryPolicy
+from pulse_etl.extract import list_partitions, normalize_states
+from pulse_etl.metrics import RunMetrics
+from pulse_etl.registry import DATASETS, group_name, siblings
+from pulse_etl.sharding import DOCUMENT_COLUMN, shard_path
+
+
+def parse_chunk(parses, widths, items, errors=None):
+    """
+    For each parser, (positions, columns) of a batch of (position, name, raw bytes)
+    documents: one position per row, and the parsed rows transposed into that
+    parser's width of lists. A parser failing on a document skips only its own rows;
+    the names of failing documents are appended to errors when it is given.
+    Runs in the worker processes.
+    """
+    out = [([], [[] for _ in range(width)]) for width in widths]
+    for position, name, data in items:
+        try:
+            document = json.loads(data)
+        except Exception as e:
+            print(f"Error processing {name}: {e}")
+            if errors is not None:
+                errors.append(name)
+            continue
+        for parse, (positions, columns) in zip(parses, out):
+            try:
+                rows = parse(document)
+            except Exception as e:
+                print(f"Error processing {name}: {e}")
+                if errors is not None:
+                    errors.append(name)
+                continue
+            positions.extend([position] * len(rows))
+            for column, values in zip(columns, zip(*rows)):
+                column.extend(values)
+    return out
+
+
+def _parse_timed(parses, widths, items):
+    """(parse_chunk's output, seconds, names of the failed documents) of a batch; runs in the worker processes."""
+    start = time.perf_counter()
+    errors = []
+    out = parse_chunk(parses, widths, items, errors)
+    return out, time.perf_counter() - start, sorted(set(errors))
+
+
+def _download(storage, paths, tasks, raw, retry, checkpoint, metrics, group):
+    while True:
+        try:
+            position = tasks.get_nowait()
+        except queue.Empty:
+            return
+        name = paths[position]
+        attempts = []
+
+        def failed(name, attempt, error):
+            attempts.append(attempt)
+            if checkpoint is not None:
+                checkpoint.failed(name, attempt, error)
+
+        start = time.perf_counter()
+        try:
+            data = retry.call(lambda: storage.read_bytes(name), name, failed)
+        except Exception as e:
+            print(f"Error downloading {name}: {e}")
+            data = None
+        else:
+            if checkpoint is not None:
+                checkpoint.succeeded(name)
+        metrics.add(group, "download", seconds=time.perf_counter() - start, bytes=len(data or b""),
+                    records=int(data is not None), errors=int(data is None),
+                    retries=len(attempts) - int(data is None))
+        raw.put((position, data))
+
+
+def _batch_record(batch, chunk, generations, failed=()):
+    """
+    (names, generations, chunk) of a parsed batch, its row positions made relative
+    to the batch; the documents named in failed, and any rows they gave, are left out.
+    """
+    kept = [(position, name) for position, name, _ in batch if name not in failed]
+    local = {position: i for i, (position, _) in enumerate(kept)}
+    names = [name for _, name in kept]
+    relative = []
+    for positions, columns in chunk:
+        rows = [j for j, p in enumerate(positions) if p in local]
+        relative.append(([local[positions[j]] for j in rows], [[column[j] for j in rows] for column in columns]))
+    return names, [generations[name] for name in names], relative
+
+
+def _resumed_chunk(names, chunk, position_of):
+    """A saved batch's chunk with rows of this run's positions, dropping documents that are gone or changed."""
+    out = []
+    for positions, columns in chunk:
+        keep = [j for j, p in enumerate(positions) if names[p] is not None and names[p] in position_of]
+        out.append(([position_of[names[positions[j]]] for j in keep], [[column[j] for j in keep] for column in columns]))
+    return out
+
+
+def extract_pipelined(storage, dataset, io_workers=16, processes=None, batch_size=32, queue_size=256,
+                      max_inflight=None, catalog=None, checkpoint=None, retry=None, metrics=None):
+    """
+    Same DataFrame as extract(), with downloads and parsing overlapped.
+    io_workers threads fill a queue of at most queue_size documents; batches of
+    batch_size are parsed by a pool of processes (default: one per CPU, 0 parses
+    in this process). catalog, when given, replaces the listing of the prefix.
+
+    Downloads are retried by retry (default RetryPolicy()); documents still failing
+    raise IncompleteExtraction once the others are done. With a checkpoint, parsed
+    batches and failures are saved as they happen, and documents the checkpoint
+    already holds are not downloaded again; documents that failed to parse are
+    queued for retry instead. metrics, a RunMetrics, is given the
+    time, bytes, records, errors and retries of every stage.
+    """
+    return extract_shared(storage, [dataset], io_workers, processes, batch_size, queue_size, max_inflight,
+                          catalog, checkpoint, retry, metrics)[dataset]
+
+
+def extract_shared(storage, datasets, io_workers=16, processes=None, batch_size=32, queue_size=256,
+                   max_inflight=None, catalog=None, checkpoint=None, retry=None, metrics=None, shard=None):
+    """
+    {dataset: DataFrame} of datasets that share a prefix, from one pass over its
+    documents; the pipeline and its parameters are those of extract_pipelined().
+    With a Shard, only the documents it owns are read, and every frame gets a
+    Document column for merge_shards() to order the rows by.
+    """
+    specs = [DATASETS[dataset] for dataset in datasets]
+    prefix = specs[0].prefix
+    if any(spec.prefix != prefix for spec in specs):
+        raise ValueError(f"{datasets} are not read from the same documents")
+    retry = retry or RetryPolicy()
+    group = group_name(datasets)
+    metrics = metrics if metrics is not None else RunMetrics(group)
+    with metrics.timed(group, "list") as counts:
+        _, _, _, generations = list_partitions(storage, prefix=prefix, catalog=catalog)
+        counts["records"] = len(generations)
+    depth = prefix.rstrip("/").count("/") + 1
+    paths = [name for name in sorted(generations) if name.count("/") == depth + 2 and name.endswith(".json")]
+    if shard is not None:
+        paths = [path for path in paths if shard.owns(path[len(prefix):])]
+    keys = [tuple(path.split("/")[depth:depth + 3]) for path in paths]
+
+    chunks = []
+    done = set()
+    if checkpoint is not None:
+        position_of = {name: position for position, name in enumerate(paths)}
+        for names, chunk in checkpoint.completed(generations):
+            chunks.append(_resumed_chunk(names, chunk, position_of))
+            done.update(position_of[name] for name in names if name in position_of)
+        if done:
+            print(f"Resuming {prefix}: {len(done)} of {len(paths)} documents already extracted")
+        metrics.add(group, "resume", calls=0, records=len(done))
+    pending = [position for position in range(len(paths)) if position not in done]
+    if checkpoint is not None:
+        # documents of the retry queue go first, so they have the most time left for their retries
+        pending.sort(key=lambda position: paths[position] not in checkpoint.retry)
+
+    tasks = queue.Queue()
+    for position in pending:
+        tasks.put(position)
+    raw = queue.Queue(maxsize=queue_size)
+    threads = [threading.Thread(target=_download, args=(storage, paths, tasks, raw, retry, checkpoint, metrics, group),
+                                daemon=True)
+               for _ in range(min(io_workers, len(pending)))]
+    for thread in threads:
+        thread.start()
+
+    processes = os.cpu_count() if processes is None else processes
+    pool = ProcessPoolExecutor(max_workers=processes) if processes else None
+    max_inflight = max_inflight or 2 * max(processes, 1)
+    parses = [spec.parse for spec in specs]
+    widths = [len(spec.columns) for spec in specs]
+    inflight = {}
+    failed = []
+
+    def finish(batch, result):
+        chunk, seconds, errors = result
+        metrics.add(group, "parse", seconds=seconds, bytes=sum(len(data) for _, _, data in batch),
+                    records=len(batch), errors=len(errors))
+        chunks.append(chunk)
+        if checkpoint is not None:
+            # documents that failed to parse are not saved as done, so a resumed run fetches them again
+            for name in errors:
+                checkpoint.failed(name, 1, ValueError("document could not be parsed"))
+            checkpoint.save(*_batch_record(batch, chunk, generations, set(errors)))
+
+    def dispatch(batch):
+        if pool is None:
+            finish(batch, _parse_timed(parses, widths, batch))
+            return
+        if len(inflight) >= max_inflight:
+            with metrics.timed(group, "parse_wait"):
+                while len(inflight) >= max_inflight:
+                    completed, _ = wait(inflight, return_when=FIRST_COMPLETED)
+                    for future in completed:
+                        finish(inflight.pop(future), future.result())
+        inflight[pool.submit(_parse_timed, parses, widths, batch)] = batch
+
+    try:
+        batch = []
+        for _ in range(len(pending)):
+            start = time.perf_counter()
+            position, data = raw.get()
+            metrics.add(group, "download_wait", seconds=time.perf_counter() - start)
+            if data is None:
+                failed.append(paths[position])
+                continue
+            batch.append((position, paths[position], data))
+            if len(batch) >= batch_size:
+                dispatch(batch)
+                batch = []
+        if batch:
+            dispatch(batch)
+        for future, batch in inflight.items():
+            finish(batch, future.result())
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    if failed:
+        raise IncompleteExtraction(failed, checkpoint)
+    frames = {}
+    for i, (dataset, spec) in enumerate(zip(datasets, specs)):
+        with metrics.timed(dataset, "assemble") as counts:
+            df = assemble(spec, keys, [chunk[i] for chunk in chunks], normalize=False, documents=shard is not None)
+            counts["records"] = len(df)
+        with metrics.timed(dataset, "normalize", records=len(df)):
+            frames[dataset] = normalize_states(df)
+    return frames
+
+
+def assemble(spec, keys, chunks, normalize=True, documents=False):
+    """
+    DataFrame of parsed chunks, rows ordered by document position like extract();
+    with documents, a last Document column holds each row's state/year/quarter key.
+    """
+    positions = np.fromiter((p for chunk_positions, _ in chunks for p in chunk_positions), dtype=np.int64)
+    quarters = [int(quarter.replace(".json", "")) for _, _, quarter in keys]
+    data = {
+        "States": [keys[p][0] for p in positions],
+        "Years": [keys[p][1] for p in positions],
+        "Quarter": [quarters[p] for p in positions],
+    }
+    for i, column in enumerate(spec.columns):
+        data[column] = [value for _, chunk_columns in chunks for value in chunk_columns[i]]
+    columns = ("States", "Years", "Quarter") + spec.columns
+    if documents:
+        data[DOCUMENT_COLUMN] = ["/".join(keys[p]) for p in positions]
+        columns += (DOCUMENT_COLUMN,)
+    df = pd.DataFrame(data, columns=columns)
+    df = df.iloc[np.argsort(positions, kind="stable")].reset_index(drop=True)
+    return normalize_states(df) if normalize else df
+
+
+def extract_to_csv(storage, dataset, io_workers=16, processes=None, output=None, catalog=None, resume=False,
+                   checkpoint_root=None, metrics=None, shard=None):
+    """
+    Writes dataset to output (default: its registry file name) and, from the same
+    pass, every sibling dataset read from the same documents next to it. The
+    documents are found through catalog, by default the one shared by the
+    extractor scripts (Catalog.from_env).
+
+    Progress is checkpointed under checkpoint_root (see Checkpoint.for_datasets)
+    until the CSVs are written. With resume, the checkpoint of an earlier run is
+    picked up, so only its unfinished and failed documents are fetched again.
+    metrics, a RunMetrics, also gets the time and size of each CSV written.
+
+    With a Shard, only its documents are extracted, into partial outputs named
+    by shard_path() that merge_shards() combines.
+    """
+    output = output or DATASETS[dataset].output
+    catalog = catalog or Catalog.from_env(storage)
+    datasets = siblings(dataset)
+    checkpoint = Checkpoint.for_datasets(storage, datasets, resume=resume, root=checkpoint_root, shard=shard)
+    metrics = metrics if metrics is not None else RunMetrics(group_name(datasets, shard))
+    frames = extract_shared(storage, datasets, io_workers, processes, catalog=catalog, checkpoint=checkpoint,
+                            metrics=metrics, shard=shard)
+    for name, df in frames.items():
+        path = output if name == dataset else os.path.join(os.path.dirname(output), DATASETS[name].output)
+        if shard is not None:
+            path = shard_path(path, shard)
+        with metrics.timed(name, "write", records=len(df)) as counts:
+            df.to_csv(path, index=False)
+            counts["bytes"] = os.path.getsize(path)
+    checkpoint.clear()
+    return frames[dataset]
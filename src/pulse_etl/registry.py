@@ -0,0 +1,80 @@
+from collections import namedtuple
+
+from pulse_etl import parsers
+
+# prefix: where the state/<state>/<year>/<quarter>.json documents live in the bucket
+# columns: output columns after States, Years, Quarter
+# parse: document -> rows of those columns
+# output: CSV file written by the extractor script
+Dataset = namedtuple("Dataset", ["prefix", "columns", "parse", "output"])
+
+DATASETS = {
+    "agg_insurance": Dataset(
+        "pulse-data/aggregated/insurance/country/india/state/",
+        ("Transaction_type", "Transaction_count", "Transaction_amount"),
+        parsers.parse_aggregated_transaction, "agg_insurance.csv"),
+    "agg_transaction": Dataset(
+        "pulse-data/aggregated/transaction/country/india/state/",
+        ("Transaction_type", "Transaction_count", "Transaction_amount"),
+        parsers.parse_aggregated_transaction, "agg_trans.csv"),
+    "agg_user": Dataset(
+        "pulse-data/aggregated/user/country/india/state/",
+        ("Brand", "Transaction_count", "Transaction_Percentage"),
+        parsers.parse_aggregated_user, "agg_user.csv"),
+    "map_insurance": Dataset(
+        "pulse-data/map/insurance/hover/country/india/state/",
+        ("District", "Transaction_count", "Transaction_amount"),
+        parsers.parse_map_hover, "map_insurance.csv"),
+    "map_transaction": Dataset(
+        "pulse-data/map/transaction/hover/country/india/state/",
+        ("District", "Transaction_count", "Transaction_amount"),
+        parsers.parse_map_hover, "map_transaction.csv"),
+    "map_user": Dataset(
+        "pulse-data/map/user/hover/country/india/state/",
+        ("District", "RegisteredUser", "AppOpens"),
+        parsers.parse_map_user, "map_user.csv"),
+    "top_district": Dataset(
+        "pulse-data/top/transaction/country/india/state/",
+        ("District", "Transaction_count", "Transaction_amount"),
+        parsers.parse_top_districts, "Top_district.csv"),
+    "top_insurance": Dataset(
+        "pulse-data/top/insurance/country/india/state/",
+        ("Pincodes", "Transaction_count", "Transaction_amount"),
+        parsers.parse_top_pincodes, "Top_insurance.csv"),
+    "top_insurance_district": Dataset(
+        "pulse-data/top/insurance/country/india/state/",
+        ("District", "Transaction_count", "Transaction_amount"),
+        parsers.parse_top_districts, "Top_insurance_district.csv"),
+    "top_transaction": Dataset(
+        "pulse-data/top/transaction/country/india/state/",
+        ("Pincodes", "Transaction_count", "Transaction_amount"),
+        parsers.parse_top_pincodes, "Top_transaction.csv"),
+    "top_user": Dataset(
+        "pulse-data/top/user/country/india/state/",
+        ("Pincodes", "RegisteredUser"),
+        parsers.parse_top_user_pincodes, "Top_user.csv"),
+    "top_user_district": Dataset(
+        "pulse-data/top/user/country/india/state/",
+        ("District", "RegisteredUser"),
+        parsers.parse_top_user_districts, "Top_user_district.csv"),
+}
+
+
+def siblings(dataset):
+    """The datasets read from the same documents as dataset, itself included, in DATASETS order."""
+    prefix = DATASETS[dataset].prefix
+    return [name for name, spec in DATASETS.items() if spec.prefix == prefix]
+
+
+def prefix_groups(datasets):
+    """datasets grouped by the documents they are read from, so each group can be extracted in one pass."""
+    groups = {}
+    for name in datasets:
+        groups.setdefault(DATASETS[name].prefix, []).append(name)
+    return list(groups.values())
+
+
+def group_name(datasets, shard=None):
+    """Name of datasets extracted together (by shard, when given), e.g. for their checkpoint and metrics files."""
+    name = "+".join(sorted(datasets))
+    return f"{name}.{shard.suffix}" if shard is not None else name
@@ -0,0 +1,74 @@
+"""
+Splitting an extraction across processes or machines.
+
+The work units are the state/<state>/<year>/<quarter>.json documents. A unit
+belongs to shard crc32("<state>/<year>/<quarter>.json") % count, so every
+node computes the same split from its own listing, and a state and period
+lands on the same shard for every dataset. Each shard writes partial CSVs
+that keep the document of every row; merge_shards() puts them back together
+in the order a single run writes.
+"""
+import os
+import zlib
+
+import pandas as pd
+
+from pulse_etl.registry import DATASETS
+
+DOCUMENT_COLUMN = "Document"
+
+
+class Shard:
+    """Shard index of count, numbered from 1 like the --shard i/N option."""
+
+    def __init__(self, index, count):
+        if count < 1 or not 1 <= index <= count:
+            raise ValueError(f"shard {index}/{count}: expected 1 <= i <= N")
+        self.index = index
+        self.count = count
+
+    @classmethod
+    def parse(cls, text):
+        """Shard of an "i/N" string."""
+        try:
+            index, count = (int(part) for part in text.split("/"))
+        except ValueError:
+            raise ValueError(f"shard {text!r}: expected i/N, e.g. 1/4")
+        return cls(index, count)
+
+    def owns(self, document):
+        """Whether document, a "<state>/<year>/<quarter>.json" key, is this shard's work."""
+        return zlib.crc32(document.encode("utf-8")) % self.count == self.index - 1
+
+    @property
+    def suffix(self):
+        return f"shard-{self.index}-of-{self.count}"
+
+    def __repr__(self):
+        return f"Shard({self.index}, {self.count})"
+
+
+def shard_path(path, shard):
+    """Partial output of shard next to path: Top_user.csv -> Top_user.shard-2-of-4.csv."""
+    root, extension = os.path.splitext(path)
+    return f"{root}.{shard.suffix}{extension}"
+
+
+def merge_shards(dataset, count, output=None):
+    """
+    Combines the partial CSVs of count shards into dataset's output (default: its
+    registry file name) and returns the merged frame. Raises FileNotFoundError
+    naming every missing shard. Values are copied as text, so the file matches
+    what a single run writes.
+    """
+    output = output or DATASETS[dataset].output
+    paths = [shard_path(output, Shard(index, count)) for index in range(1, count + 1)]
+    missing = [path for path in paths if not os.path.exists(path)]
+    if missing:
+        raise FileNotFoundError(f"missing shard outputs of {dataset}: {', '.join(missing)}")
+    parts = [pd.read_csv(path, dtype=str, keep_default_na=False) for path in paths]
+    df = pd.concat(parts, ignore_index=True)
+    # documents sort like the listing a single run reads them in, and each shard kept their rows in order
+    df = df.sort_values(DOCUMENT_COLUMN, kind="stable").drop(columns=DOCUMENT_COLUMN)
+    df.to_csv(output, index=False)
+    return df
@@ -0,0 +1,25 @@
+"""Object storage backends (GCS, local directory, in-memory) behind one listing/reading interface."""
+
+from pulse_storage.backends import GCSStorage, LocalStorage, MemoryStorage, Storage, StorageObject
+from pulse_storage.config import (
+    PULSE_REPO_ALIASES,
+    STORAGE_ENV,
+    is_pulse_checkout,
+    open_storage,
+    storage_from_env,
+    storage_url,
+)
+
+__all__ = [
+    "GCSStorage",
+    "LocalStorage",
+    "MemoryStorage",
+    "PULSE_REPO_ALIASES",
+    "STORAGE_ENV",
+    "Storage",
+    "StorageObject",
+    "is_pulse_checkout",
+    "open_storage",
+    "storage_from_env",
+    "storage_url",
+]
@@ -0,0 +1,219 @@
+import os
+import tempfile
+import threading
+from collections import namedtuple
+
+try:
+    from google.api_core.exceptions import NotFound as GCSNotFound
+except ImportError:
+    # google-cloud-storage is only needed for gs:// storage
+    GCSNotFound = FileNotFoundError
+
+# generation changes whenever the object is rewritten
+StorageObject = namedtuple("StorageObject", ["name", "generation", "size"])
+
+
+class Storage:
+    """
+    Flat object store addressed by "/"-separated names, the interface the
+    extractors and the dashboard loader need from a bucket.
+    """
+
+    def list(self, prefix=""):
+        """StorageObjects whose name starts with prefix, sorted by name."""
+        raise NotImplementedError
+
+    def list_prefixes(self, prefix=""):
+        """
+        Sorted "directories" one level below prefix, each ending in "/", like a
+        delimiter listing. Backends that can ask for them directly override this.
+        """
+        return sorted({prefix + obj.name[len(prefix):].split("/", 1)[0] + "/"
+                       for obj in self.list(prefix) if "/" in obj.name[len(prefix):]})
+
+    def exists(self, name):
+        raise NotImplementedError
+
+    def read_bytes(self, name):
+        """Contents of name; FileNotFoundError when there is no such object."""
+        raise NotImplementedError
+
+    def read_range(self, name, start, length):
+        """
+        length bytes of name from offset start, fewer at its end. Backends that can
+        fetch a range without the rest of the object override this.
+        """
+        return self.read_bytes(name)[start:start + length]
+
+    def write_bytes(self, name, data, cache_control=None):
+        """
+        Creates or replaces name. cache_control is passed on as the object's
+        Cache-Control by backends that serve objects over HTTP.
+        """
+        raise NotImplementedError
+
+    def read_text(self, name):
+        return self.read_bytes(name).decode("utf-8")
+
+
+class GCSStorage(Storage):
+    """One Google Cloud Storage bucket. client defaults to a google.cloud.storage.Client."""
+
+    def __init__(self, bucket_name, client=None, project=None, credentials=None):
+        if client is None:
+            from google.cloud import storage
+
+            client = storage.Client(project=project, credentials=credentials)
+        self.client = client
+        self.bucket_name = bucket_name
+        self._bucket = client.bucket(bucket_name)
+
+    def __repr__(self):
+        return f"GCSStorage(gs://{self.bucket_name})"
+
+    def list(self, prefix=""):
+        return [StorageObject(blob.name, blob.generation, blob.size)
+                for blob in self.client.list_blobs(self.bucket_name, prefix=prefix)]
+
+    def list_prefixes(self, prefix=""):
+        listing = self.client.list_blobs(self.bucket_name, prefix=prefix, delimiter="/")
+        # the prefixes are collected page by page as the listing is consumed
+        for _ in listing:
+            pass
+        return sorted(listing.prefixes)
+
+    def exists(self, name):
+        return self._bucket.blob(name).exists()
+
+    def read_bytes(self, name):
+        try:
+            return self._bucket.blob(name).download_as_bytes()
+        except GCSNotFound:
+            raise FileNotFoundError(f"gs://{self.bucket_name}/{name}")
+
+    def read_range(self, name, start, length):
+        if length <= 0:
+            return b""
+        try:
+            # end is inclusive
+            return self._bucket.blob(name).download_as_bytes(start=start, end=start + length - 1)
+        except GCSNotFound:
+            raise FileNotFoundError(f"gs://{self.bucket_name}/{name}")
+
+    def write_bytes(self, name, data, cache_control=None):
+        blob = self._bucket.blob(name)
+        if cache_control is not None:
+            blob.cache_control = cache_control
+        blob.upload_from_string(data)
+
+
+class LocalStorage(Storage):
+    """
+    A directory, with object names mapped to relative paths. aliases maps an
+    object name prefix to the directory prefix it is stored under, e.g.
+    {"pulse-data/": "data/"} to read a clone of the PhonePe Pulse repository.
+    Generations are file modification times.
+    """
+
+    def __init__(self, root, aliases=None):
+        self.root = os.path.abspath(root)
+        self.aliases = dict(aliases or {})
+
+    def __repr__(self):
+        return f"LocalStorage({self.root!r})"
+
+    def _relative(self, name):
+        for object_prefix, dir_prefix in self.aliases.items():
+            if name.startswith(object_prefix):
+                return dir_prefix + name[len(object_prefix):]
+        return name
+
+    def _name(self, relative):
+        for object_prefix, dir_prefix in self.aliases.items():
+            if relative.startswith(dir_prefix):
+                return object_prefix + relative[len(dir_prefix):]
+        return relative
+
+    def _path(self, name):
+        return os.path.join(self.root, *self._relative(name).split("/"))
+
+    def list(self, prefix=""):
+        relative_prefix = self._relative(prefix)
+        # walk only the deepest directory the prefix names
+        top = os.path.join(self.root, *relative_prefix.split("/")[:-1])
+        objects = []
+        for dirpath, dirnames, filenames in os.walk(top):
+            dirnames.sort()
+            for file_name in filenames:
+                path = os.path.join(dirpath, file_name)
+                relative = os.path.relpath(path, self.root).replace(os.sep, "/")
+                if not relative.startswith(relative_prefix):
+                    continue
+                stat = os.stat(path)
+                objects.append(StorageObject(self._name(relative), stat.st_mtime_ns, stat.st_size))
+        return sorted(objects)
+
+    def list_prefixes(self, prefix=""):
+        relative_prefix = self._relative(prefix)
+        parent, _, partial = relative_prefix.rpartition("/")
+        top = os.path.join(self.root, *parent.split("/")) if parent else self.root
+        if not os.path.isdir(top):
+            return []
+        base = parent + "/" if parent else ""
+        return sorted(self._name(base + entry.name + "/") for entry in os.scandir(top)
+                      if entry.is_dir() and entry.name.startswith(partial))
+
+    def exists(self, name):
+        return os.path.isfile(self._path(name))
+
+    def read_bytes(self, name):
+        with open(self._path(name), "rb") as f:
+            return f.read()
+
+    def read_range(self, name, start, length):
+        with open(self._path(name), "rb") as f:
+            f.seek(start)
+            return f.read(length)
+
+    def write_bytes(self, name, data, cache_control=None):
+        path = self._path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # write to a sibling and rename, so readers never see a partial file
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+
+class MemoryStorage(Storage):
+    """Objects held in a dict of name -> (bytes, generation); safe to share between threads."""
+
+    def __init__(self, objects=None):
+        self.objects = dict(objects or {})
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"MemoryStorage({len(self.objects)} objects)"
+
+    def list(self, prefix=""):
+        with self._lock:
+            return [StorageObject(name, generation, len(data))
+                    for name, (data, generation) in sorted(self.objects.items()) if name.startswith(prefix)]
+
+    def exists(self, name):
+        return name in self.objects
+
+    def read_bytes(self, name):
+        with self._lock:
+            if name not in self.objects:
+                raise FileNotFoundError(name)
+            return self.objects[name][0]
+
+    def write_bytes(self, name, data, cache_control=None):
+        with self._lock:
+            previous = self.objects.get(name)
+            self.objects[name] = (bytes(data), previous[1] + 1 if previous else 1)
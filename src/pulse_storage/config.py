@@ -0,0 +1,40 @@
+import os
+
+from pulse_storage.backends import GCSStorage, LocalStorage, MemoryStorage
+
+STORAGE_ENV = "PULSE_STORAGE"
+
+# Object prefix of the Pulse JSON tree in the bucket -> its directory in a Pulse repo clone
+PULSE_REPO_ALIASES = {"pulse-data/": "data/"}
+
+
+def is_pulse_checkout(root):
+    """True for a clone of github.com/PhonePe/pulse, whose JSON tree lives in data/."""
+    return os.path.isdir(os.path.join(root, "data", "aggregated")) and not os.path.isdir(os.path.join(root, "pulse-data"))
+
+
+def open_storage(url, **gcs_options):
+    """
+    Storage backend of a URL:
+        gs://<bucket>          Google Cloud Storage; gcs_options go to GCSStorage
+        memory://              an empty in-memory store
+        file://<dir> or <dir>  a local directory (a Pulse repo clone is detected and mapped)
+    """
+    if url.startswith("gs://"):
+        return GCSStorage(url[len("gs://"):].strip("/"), **gcs_options)
+    if url.startswith("memory://"):
+        return MemoryStorage()
+    root = url[len("file://"):] if url.startswith("file://") else url
+    root = os.path.expanduser(root)
+    if not os.path.isdir(root):
+        raise ValueError(f"storage directory {root!r} does not exist")
+    return LocalStorage(root, PULSE_REPO_ALIASES if is_pulse_checkout(root) else None)
+
+
+def storage_url(default):
+    """The storage URL configured in the environment, or default."""
+    return os.environ.get(STORAGE_ENV) or default
+
+
+def storage_from_env(default, **gcs_options):
+    return open_storage(storage_url(default), **gcs_options)
@@ -0,0 +1,71 @@
+import itertools
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from pulse_analytics import DATASET_COLUMNS, DATASET_FILES
+from pulse_storage import MemoryStorage
+
+TOP_USER_PREFIX = "pulse-data/top/user/country/india/state/"
+STATES = ("andhra-pradesh", "karnataka", "tamil-nadu")
+YEARS = ("2021", "2022")
+QUARTERS = ("1.json", "2.json", "3.json", "4.json")
+
+
+def top_user_document(state, year, quarter):
+    """A top/user document with two districts and two pincodes, its numbers derived from the key."""
+    base = (STATES.index(state) + 1) * 1000 + int(year) * 10 + int(quarter[0])
+    return {"data": {
+        "districts": [{"name": f"{state} district {i}", "registeredUsers": base + i} for i in range(2)],
+        "pincodes": [{"name": f"5{STATES.index(state)}00{i}", "registeredUsers": base * 2 + i} for i in range(2)],
+    }}
+
+
+@pytest.fixture
+def top_user_storage():
+    """MemoryStorage holding the top/user documents of STATES x YEARS x QUARTERS."""
+    storage = MemoryStorage()
+    for state in STATES:
+        for year in YEARS:
+            for quarter in QUARTERS:
+                document = top_user_document(state, year, quarter)
+                storage.write_bytes(f"{TOP_USER_PREFIX}{state}/{year}/{quarter}", json.dumps(document).encode())
+    return storage
+
+
+DATA_STATES = ("Karnataka", "Kerala", "Tamil Nadu")
+DATA_YEARS = (2021, 2022, 2023)
+MEMBERS = {
+    "Transaction_type": lambda state: ["Recharge & bill payments", "Peer-to-peer payments"],
+    "Brand": lambda state: ["Samsung", "Xiaomi"],
+    "District": lambda state: [f"{state} district {i}" for i in range(3)],
+    "Pincodes": lambda state: [560000 + DATA_STATES.index(state) * 1000 + i for i in range(4)],
+}
+
+
+def pulse_frames(seed=0):
+    """
+    Raw output frames of every dataset, keyed by file name: each state, year,
+    quarter and member (district, pincode, type or brand) of DATA_STATES x DATA_YEARS.
+    """
+    rng = np.random.default_rng(seed)
+    frames = {}
+    for name, columns in DATASET_COLUMNS.items():
+        member = columns[3]
+        rows = [(state, year, quarter, value)
+                for state, year, quarter in itertools.product(DATA_STATES, DATA_YEARS, (1, 2, 3, 4))
+                for value in MEMBERS[member](state)]
+        df = pd.DataFrame(rows, columns=columns[:4])
+        for column in columns[4:]:
+            if column in ("Transaction_amount", "Transaction_Percentage"):
+                df[column] = rng.uniform(1, 1e6, len(df))
+            else:
+                df[column] = rng.integers(1, 100_000, len(df))
+        frames[DATASET_FILES[name]] = df
+    return frames
@@ -0,0 +1,134 @@
+import http.client
+import json
+import threading
+
+import pandas as pd
+import pytest
+
+import api
+from conftest import pulse_frames
+from pulse_analytics import DATASET_FILES, calculate_year_growth, prepare_dataset, publish_version, totals_by
+from pulse_storage import MemoryStorage
+
+
+@pytest.fixture(scope="module")
+def raw():
+    return pulse_frames()
+
+
+@pytest.fixture(scope="module", params=[False, True], ids=["in_memory", "out_of_core"])
+def server(request, raw, tmp_path_factory):
+    """(host, port) of an API server over a published version, loaded in memory or queried out of core."""
+    storage = MemoryStorage()
+    publish_version(raw, storage, "out/")
+    source = api.storage_source(storage, "out/", refresh_seconds=3600, out_of_core=request.param,
+                                spill_dir=str(tmp_path_factory.mktemp("spill")))
+    source.current(timeout=30)
+    server = api.make_server(source, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server.server_address
+    server.shutdown()
+    server.server_close()
+
+
+def get(server, path, headers=None):
+    connection = http.client.HTTPConnection(*server, timeout=30)
+    connection.request("GET", path, headers=headers or {})
+    response = connection.getresponse()
+    body = response.read()
+    connection.close()
+    return response.status, response.getheader("ETag"), json.loads(body) if body else None
+
+
+def prepared(raw, name):
+    return prepare_dataset(name, raw[DATASET_FILES[name]])
+
+
+def test_health_reports_the_served_version(server):
+    status, _, body = get(server, "/health")
+    assert status == 200
+    assert body["status"] == "ok"
+    assert body["warm"]["state"] == "ready"
+    assert body["version"] == body["warm"]["version"]
+
+
+@pytest.mark.parametrize("dataset", ["Aggre_transaction", "Top_user"])
+def test_state_totals_match_totals_by(server, raw, dataset):
+    status, _, body = get(server, f"/v1/states?dataset={dataset}&year=2022&quarter=3")
+    assert status == 200
+    df = prepared(raw, dataset)
+    measures = [c for c in df.columns if c in ("Transaction_count", "Transaction_amount", "RegisteredUser")]
+    expected = totals_by(df, "States", measures, Years=2022, Quarter=3)
+    pd.testing.assert_frame_equal(pd.DataFrame(body["data"]), expected.reset_index(drop=True), check_dtype=False)
+
+
+def test_top_pincodes_are_ranked(server, raw):
+    status, _, body = get(server, "/v1/pincodes/top?measure=Transaction_amount&n=3&state=Kerala")
+    assert status == 200
+    top = pd.DataFrame(body["data"])
+    assert len(top) == 3
+    assert (top["States"] == "Kerala").all()
+    assert top["Transaction_amount"].is_monotonic_decreasing
+    df = prepared(raw, "Top_transaction")
+    best = df[df["States"] == "Kerala"].groupby("Pincodes")["Transaction_amount"].sum().max()
+    assert top["Transaction_amount"].iloc[0] == pytest.approx(best)
+
+
+def test_growth_between_two_years(server, raw):
+    status, _, body = get(server, "/v1/growth?dataset=Top_transaction&level=state&current=2023&compare=2021")
+    assert status == 200
+    expected = calculate_year_growth(prepared(raw, "Top_transaction"), ["States"], 2023, 2021)
+    assert [row["Growth(%)"] for row in body["data"]] == pytest.approx(expected["Growth(%)"].tolist())
+
+
+@pytest.mark.parametrize("path", [
+    "/v1/growth?current=2023&compare=2030",
+    "/v1/growth?dataset=Top_transaction&current=2030",
+    "/v1/growth?level=country",
+    "/v1/states?dataset=Nope",
+    "/v1/states?year=twenty",
+    "/v1/districts?dataset=Aggre_transaction",
+    "/v1/pincodes/top?n=0",
+    "/v1/pincodes/top?measure=AppOpens",
+    "/v1/engagement?level=pincode",
+])
+def test_invalid_requests_are_answered_400(server, path):
+    status, _, body = get(server, path)
+    assert status == 400
+    assert body["error"]
+
+
+def test_unknown_path_is_404(server):
+    assert get(server, "/v2/states")[0] == 404
+
+
+def test_failing_endpoint_is_answered_500_and_the_server_keeps_serving(server, monkeypatch):
+    def broken(snapshot, params):
+        raise KeyError(2030)
+    monkeypatch.setitem(api.ROUTES, "/v1/broken", broken)
+    status, _, body = get(server, "/v1/broken")
+    assert status == 500
+    assert body == {"error": "internal error"}
+    assert get(server, "/health")[0] == 200
+
+
+def test_matching_etag_is_answered_304(server):
+    status, etag, _ = get(server, "/v1/engagement?level=district&year=2023")
+    assert status == 200 and etag
+    assert get(server, "/v1/engagement?year=2023&level=district", {"If-None-Match": etag})[0] == 304
+    assert get(server, "/v1/engagement?level=district&year=2022", {"If-None-Match": etag})[0] == 200
+
+
+def test_failed_first_build_is_raised_instead_of_waited_on():
+    def load(version):
+        raise ConnectionError("bucket unreachable")
+    source = api.DataSource(load, lambda: "v1", refresh_seconds=3600).start()
+    with pytest.raises(RuntimeError, match="bucket unreachable"):
+        source.current(timeout=None)
+
+
+def test_main_exits_when_the_data_cannot_be_loaded(monkeypatch):
+    monkeypatch.setattr("sys.argv", ["api.py", "--storage", "memory://"])
+    with pytest.raises(SystemExit) as raised:
+        api.main()
+    assert "Could not load the data" in str(raised.value)
@@ -0,0 +1,136 @@
+import pandas as pd
+import pytest
+
+from conftest import pulse_frames
+from pulse_analytics import bundle, filter_slice, load_raw, publish_version, read_manifest
+from pulse_analytics.partitions import row_group_bounds, write_parquet
+from pulse_storage import MemoryStorage
+
+
+class CountingStorage(MemoryStorage):
+    """MemoryStorage that records the name of every object read."""
+
+    def __init__(self, objects=None):
+        super().__init__(objects)
+        self.reads = []
+
+    def read_bytes(self, name):
+        self.reads.append(name)
+        return super().read_bytes(name)
+
+    def read_range(self, name, start, length):
+        self.reads.append(name)
+        return MemoryStorage.read_bytes(self, name)[start:start + length]
+
+
+@pytest.fixture(scope="module")
+def raw():
+    return pulse_frames()
+
+
+@pytest.fixture(scope="module", params=[("Years",), ("States", "Years")], ids=["by_year", "by_state"])
+def published(request, raw):
+    storage = CountingStorage()
+    manifest = publish_version(raw, storage, "out/", partition_by=request.param)
+    return storage, manifest, request.param
+
+
+def assert_raw_equal(actual, expected):
+    assert sorted(actual) == sorted(expected)
+    for file_name in expected:
+        pd.testing.assert_frame_equal(actual[file_name].reset_index(drop=True),
+                                      expected[file_name].reset_index(drop=True), check_dtype=False)
+
+
+def test_full_load_reads_the_manifest_and_the_full_copy(published, raw):
+    storage, manifest, _ = published
+    storage.reads.clear()
+    version, loaded = load_raw(storage, "out/")
+
+    assert version == manifest["version"]
+    assert_raw_equal(loaded, raw)
+    assert storage.reads == ["out/LATEST", f"out/versions/{version}.json", manifest["full"]["bundle"]]
+
+
+def test_partitions_hold_the_same_rows_as_the_full_copy(published, raw):
+    storage, manifest, _ = published
+    storage.reads.clear()
+    _, loaded = load_raw(storage, "out/", files=list(raw))
+
+    assert_raw_equal(loaded, raw)
+    assert manifest["full"]["bundle"] not in storage.reads
+
+
+@pytest.mark.parametrize("where", [
+    {"States": "Kerala"},
+    {"Years": [2021, 2023]},
+    {"States": ["Karnataka", "Tamil Nadu"], "Years": 2022, "Quarter": 4},
+])
+def test_filtered_load_matches_filter_slice(published, raw, where):
+    storage, manifest, _ = published
+    storage.reads.clear()
+    _, loaded = load_raw(storage, "out/", where=where)
+
+    expected = {}
+    for file_name, df in raw.items():
+        filters = {column: value for column, value in where.items() if column in df.columns}
+        expected[file_name] = filter_slice(df, **filters)
+    assert_raw_equal(loaded, expected)
+    assert manifest["full"]["bundle"] not in storage.reads
+
+
+def test_republishing_uploads_nothing(published, raw):
+    storage, manifest, partition_by = published
+    again = publish_version(raw, storage, "out/", partition_by=partition_by)
+
+    assert again["version"] == manifest["version"]
+    assert again["uploaded"] == 0
+
+
+def test_corrupted_full_copy_fails_its_checksum(raw):
+    storage = MemoryStorage()
+    manifest = publish_version(raw, storage, "out/")
+    name = manifest["full"]["bundle"]
+    data = bytearray(storage.read_bytes(name))
+    data[len(data) // 2] ^= 0xFF
+    storage.write_bytes(name, bytes(data))
+
+    with pytest.raises(ValueError, match="checksum"):
+        load_raw(storage, "out/")
+    assert read_manifest(storage, "out/")["version"] == manifest["version"]
+
+
+def test_filtered_load_reads_only_the_matching_partitions(published):
+    storage, manifest, _ = published
+    storage.reads.clear()
+    load_raw(storage, "out/", where={"Years": 2022, "States": "Kerala"})
+
+    tables = [name for name in storage.reads if "/tables/" in name]
+    assert tables
+    assert all("/Years=2022/" in name for name in tables)
+    if "States" in manifest["tables"]["map_user.csv"]["partition_by"]:
+        assert all("/States=Kerala/" in name for name in tables)
+
+
+def test_row_groups_hold_whole_runs_of_a_state():
+    df = pd.DataFrame({"States": ["a"] * 5 + ["b"] * 3 + ["c"] * 10 + ["d"] * 2, "x": range(20)})
+    # c's run is split, and its last piece packed with d's
+    assert row_group_bounds(df, 8) == [(0, 8), (8, 16), (16, 20)]
+    assert row_group_bounds(df.drop(columns="States"), 8) == [(0, 8), (8, 16), (16, 20)]
+
+
+def test_state_read_fetches_only_its_row_groups(raw, monkeypatch):
+    monkeypatch.setattr(bundle, "write_parquet", lambda df: write_parquet(df, 16))
+    storage = CountingStorage()
+    manifest = publish_version(raw, storage, "out/")
+    partition = manifest["tables"]["map_user.csv"]["partitions"][0]
+    assert len(partition["row_groups"]) > 1
+    assert all(len(group["stats"]["States"]["values"]) == 1 for group in partition["row_groups"])
+
+    storage.reads.clear()
+    _, loaded = load_raw(storage, "out/", where={"States": "Kerala"}, files=["map_user.csv"])
+    assert_raw_equal(loaded, {"map_user.csv": filter_slice(raw["map_user.csv"], States="Kerala")})
+    ranged = [name for name in storage.reads if name == partition["object"]]
+    # the footer and Kerala's row groups, merged into as few ranges as they are adjacent
+    kerala = [group for group in partition["row_groups"] if group["stats"]["States"]["values"] == ["Kerala"]]
+    assert 1 < len(ranged) <= 1 + len(kerala) < 1 + len(partition["row_groups"])
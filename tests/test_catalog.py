@@ -0,0 +1,92 @@
+import json
+
+import pytest
+
+from conftest import QUARTERS, STATES, TOP_USER_PREFIX, YEARS, top_user_document
+from pulse_etl import Catalog
+from pulse_storage import LocalStorage, MemoryStorage
+
+OTHER_PREFIX = "pulse-data/top/insurance/country/india/state/"
+
+
+class CountingStorage(MemoryStorage):
+    """MemoryStorage that records the prefix of every listing."""
+
+    def __init__(self, objects=None):
+        super().__init__(objects)
+        self.listed = []
+        self.listed_prefixes = []
+
+    def list(self, prefix=""):
+        self.listed.append(prefix)
+        return super().list(prefix)
+
+    def list_prefixes(self, prefix=""):
+        self.listed_prefixes.append(prefix)
+        # a delimiter listing, without recording the full listing the base class makes
+        return sorted({prefix + obj.name[len(prefix):].split("/", 1)[0] + "/"
+                       for obj in super().list(prefix) if "/" in obj.name[len(prefix):]})
+
+
+@pytest.fixture
+def storage(top_user_storage):
+    storage = CountingStorage(top_user_storage.objects)
+    storage.write_bytes(f"{OTHER_PREFIX}karnataka/2021/1.json", b"{}")
+    return storage
+
+
+def names(objects):
+    return [obj.name for obj in objects]
+
+
+def test_objects_lists_only_the_requested_prefix_level_by_level(storage):
+    expected = names(storage.list(TOP_USER_PREFIX))
+    storage.listed.clear()
+    catalog = Catalog(storage, prefixes=[TOP_USER_PREFIX, OTHER_PREFIX])
+    objects = catalog.objects(TOP_USER_PREFIX)
+
+    assert names(objects) == expected
+    assert len(objects) == len(STATES) * len(YEARS) * len(QUARTERS)
+    assert all(obj.generation for obj in objects)
+    states = [f"{TOP_USER_PREFIX}{state}/" for state in STATES]
+    assert sorted(storage.listed_prefixes) == sorted([TOP_USER_PREFIX] + states)
+    # only the year directories, which hold the documents, are listed in full
+    assert sorted(storage.listed) == [f"{state}{year}/" for state in states for year in YEARS]
+
+    storage.listed.clear()
+    storage.listed_prefixes.clear()
+    assert names(catalog.objects(TOP_USER_PREFIX)) == names(objects)
+    assert storage.listed == storage.listed_prefixes == []
+
+
+def test_each_run_finds_documents_added_since_the_last_one(storage, tmp_path):
+    path = str(tmp_path / "catalog.json")
+    Catalog(storage, path).objects(TOP_USER_PREFIX)
+    added = f"{TOP_USER_PREFIX}karnataka/2023/1.json"
+    storage.write_bytes(added, json.dumps(top_user_document("karnataka", "2023", "1.json")).encode())
+
+    assert added in names(Catalog(storage, path).objects(TOP_USER_PREFIX))
+
+
+def test_saved_catalog_is_reused_within_its_max_age(storage, tmp_path):
+    path = str(tmp_path / "catalog.json")
+    expected = names(Catalog(storage, path).objects(TOP_USER_PREFIX))
+    storage.listed.clear()
+    storage.listed_prefixes.clear()
+
+    assert names(Catalog(storage, path, max_age=3600).objects(TOP_USER_PREFIX)) == expected
+    assert storage.listed == storage.listed_prefixes == []
+    # a listing saved for another storage is not reused
+    other = CountingStorage(storage.objects)
+    other.write_bytes("elsewhere.json", b"{}")
+    Catalog(other, path, max_age=3600).objects(TOP_USER_PREFIX)
+    assert other.listed_prefixes
+
+
+def test_local_storage_discovers_the_same_documents(top_user_storage, tmp_path):
+    local = LocalStorage(str(tmp_path / "tree"))
+    for obj in top_user_storage.list():
+        local.write_bytes(obj.name, top_user_storage.read_bytes(obj.name))
+
+    assert names(Catalog(local).objects(TOP_USER_PREFIX)) == names(top_user_storage.list(TOP_USER_PREFIX))
+    assert Catalog(local).objects("pulse-data/missing/") == []
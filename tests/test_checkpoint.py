@@ -0,0 +1,190 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from conftest import TOP_USER_PREFIX
+from pulse_etl import Checkpoint, IncompleteExtraction, RetryPolicy, extract_shared
+from pulse_storage import MemoryStorage
+
+DATASETS = ["top_user", "top_user_district"]
+NO_WAIT = RetryPolicy(attempts=3, base=0.0)
+
+
+class FlakyStorage(MemoryStorage):
+    """MemoryStorage that records every read and fails the next failures[name] reads of name."""
+
+    def __init__(self, objects, failures=None):
+        super().__init__(objects)
+        self.failures = dict(failures or {})
+        self.reads = []
+
+    def read_bytes(self, name):
+        self.reads.append(name)
+        if self.failures.get(name, 0) > 0:
+            self.failures[name] -= 1
+            raise ConnectionError(f"503 Service Unavailable: {name}")
+        return super().read_bytes(name)
+
+
+class InterruptedCheckpoint(Checkpoint):
+    """Checkpoint whose run is interrupted when it is about to save more than batches batches."""
+
+    def __init__(self, *args, batches, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.batches = batches
+
+    def save(self, names, generations, chunk):
+        if self.batches == 0:
+            raise KeyboardInterrupt
+        self.batches -= 1
+        super().save(names, generations, chunk)
+
+
+def run(storage, checkpoint=None, retry=NO_WAIT):
+    return extract_shared(storage, DATASETS, io_workers=1, processes=0, batch_size=4,
+                          checkpoint=checkpoint, retry=retry)
+
+
+def assert_frames_equal(frames, expected):
+    assert list(frames) == list(expected)
+    for name in expected:
+        pd.testing.assert_frame_equal(frames[name], expected[name])
+
+
+@pytest.fixture
+def checkpoint_path(tmp_path):
+    return str(tmp_path / "checkpoints" / "top_user+top_user_district")
+
+
+def test_interrupted_run_resumes_from_saved_batches(top_user_storage, checkpoint_path):
+    expected = run(top_user_storage)
+    paths = [obj.name for obj in top_user_storage.list(TOP_USER_PREFIX)]
+
+    with pytest.raises(KeyboardInterrupt):
+        run(top_user_storage, InterruptedCheckpoint(checkpoint_path, top_user_storage, DATASETS, batches=2))
+
+    storage = FlakyStorage(top_user_storage.objects)
+    frames = run(storage, Checkpoint(checkpoint_path, storage, DATASETS, resume=True))
+    # the two saved batches of four documents are not downloaded again
+    assert sorted(storage.reads) == paths[8:]
+    assert_frames_equal(frames, expected)
+
+
+def test_resume_is_ignored_for_another_set_of_datasets(top_user_storage, checkpoint_path):
+    with pytest.raises(KeyboardInterrupt):
+        run(top_user_storage, InterruptedCheckpoint(checkpoint_path, top_user_storage, DATASETS, batches=2))
+
+    checkpoint = Checkpoint(checkpoint_path, top_user_storage, ["top_user"], resume=True)
+    assert checkpoint.completed({obj.name: obj.generation for obj in top_user_storage.list()}) == []
+
+
+def test_failing_document_is_retried_then_given_up_and_resumed(top_user_storage, checkpoint_path):
+    expected = run(top_user_storage)
+    broken = f"{TOP_USER_PREFIX}karnataka/2022/3.json"
+
+    storage = FlakyStorage(top_user_storage.objects, failures={broken: 10})
+    with pytest.raises(IncompleteExtraction) as raised:
+        run(storage, Checkpoint(checkpoint_path, storage, DATASETS))
+    assert raised.value.failed == [broken]
+    assert storage.reads.count(broken) == NO_WAIT.attempts
+    with open(os.path.join(checkpoint_path, "retry.json")) as f:
+        queued = json.load(f)
+    assert list(queued) == [broken]
+    assert queued[broken]["attempts"] == NO_WAIT.attempts
+    assert queued[broken]["error"].startswith("ConnectionError: 503")
+
+    storage = FlakyStorage(top_user_storage.objects)
+    checkpoint = Checkpoint(checkpoint_path, storage, DATASETS, resume=True)
+    assert list(checkpoint.retry) == [broken]
+    frames = run(storage, checkpoint)
+    assert storage.reads == [broken]
+    assert checkpoint.retry == {}
+    assert_frames_equal(frames, expected)
+
+
+def test_flaky_document_succeeds_within_its_attempts(top_user_storage, checkpoint_path):
+    flaky = f"{TOP_USER_PREFIX}tamil-nadu/2021/1.json"
+    storage = FlakyStorage(top_user_storage.objects, failures={flaky: NO_WAIT.attempts - 1})
+    checkpoint = Checkpoint(checkpoint_path, storage, DATASETS)
+
+    assert_frames_equal(run(storage, checkpoint), run(top_user_storage))
+    assert storage.reads.count(flaky) == NO_WAIT.attempts
+    # the failed attempts were queued, and the success took the document off the queue
+    assert checkpoint.retry == {}
+    with open(os.path.join(checkpoint_path, "retry.json")) as f:
+        assert json.load(f) == {}
+
+
+def test_torn_batch_at_the_end_of_the_log_is_dropped(top_user_storage, checkpoint_path):
+    run(top_user_storage, Checkpoint(checkpoint_path, top_user_storage, DATASETS))
+    log = os.path.join(checkpoint_path, "progress.pkl")
+    size = os.path.getsize(log)
+    with open(log, "ab") as f:
+        f.write(b"\x80\x05\x95\xff\x00\x00torn")
+
+    generations = {obj.name: obj.generation for obj in top_user_storage.list()}
+    checkpoint = Checkpoint(checkpoint_path, top_user_storage, DATASETS, resume=True)
+    batches = checkpoint.completed(generations)
+    assert sum(len(names) for names, _ in batches) == len(generations)
+    assert os.path.getsize(log) == size
+
+    storage = FlakyStorage(top_user_storage.objects)
+    run(storage, checkpoint)
+    assert storage.reads == []
+
+
+def test_changed_document_is_fetched_again_on_resume(top_user_storage, checkpoint_path):
+    run(top_user_storage, Checkpoint(checkpoint_path, top_user_storage, DATASETS))
+    changed = f"{TOP_USER_PREFIX}andhra-pradesh/2022/4.json"
+    storage = FlakyStorage(top_user_storage.objects)
+    storage.write_bytes(changed, storage.read_bytes(changed))
+    storage.reads.clear()
+
+    frames = run(storage, Checkpoint(checkpoint_path, storage, DATASETS, resume=True))
+    assert storage.reads == [changed]
+    assert_frames_equal(frames, run(top_user_storage))
+
+
+def test_retry_policy_raises_the_last_error_after_its_attempts():
+    failures = []
+
+    def fail():
+        raise ConnectionError(f"attempt {len(failures) + 1}")
+
+    with pytest.raises(ConnectionError, match="attempt 3"):
+        NO_WAIT.call(fail, "doc", lambda name, attempt, error: failures.append((name, attempt, str(error))))
+    assert failures == [("doc", 1, "attempt 1"), ("doc", 2, "attempt 2"), ("doc", 3, "attempt 3")]
+
+
+def test_retry_policy_backs_off_exponentially_up_to_its_cap():
+    policy = RetryPolicy(base=0.5, cap=3.0)
+    for attempt, ceiling in ((1, 0.5), (2, 1.0), (3, 2.0), (4, 3.0), (10, 3.0)):
+        assert ceiling / 2 <= policy.delay(attempt) <= ceiling
+
+
+def test_document_that_fails_to_parse_is_not_saved_as_done(top_user_storage, checkpoint_path):
+    expected = run(top_user_storage)
+    broken = f"{TOP_USER_PREFIX}karnataka/2021/2.json"
+    storage = FlakyStorage(top_user_storage.objects)
+    good = storage.read_bytes(broken)
+    storage.write_bytes(broken, good[:len(good) // 2])
+
+    checkpoint = Checkpoint(checkpoint_path, storage, DATASETS)
+    run(storage, checkpoint)
+    assert list(checkpoint.retry) == [broken]
+    assert checkpoint.retry[broken]["error"].startswith("ValueError")
+    generations = {obj.name: obj.generation for obj in storage.list()}
+    saved = [name for names, _ in checkpoint.completed(generations) for name in names]
+    assert broken not in saved
+    assert len(saved) == len(generations) - 1
+
+    # once the document is readable again, a resumed run fetches only it
+    storage.write_bytes(broken, good)
+    storage.reads.clear()
+    checkpoint = Checkpoint(checkpoint_path, storage, DATASETS, resume=True)
+    frames = run(storage, checkpoint)
+    assert storage.reads == [broken]
+    assert checkpoint.retry == {}
+    assert_frames_equal(frames, expected)
@@ -0,0 +1,58 @@
+import itertools
+
+import pandas as pd
+import pytest
+
+from conftest import DATA_STATES, DATA_YEARS, pulse_frames
+from pulse_analytics import ALL, Coverage, filter_slice, load_coverage, publish_version
+from pulse_storage import MemoryStorage
+
+FILE = "map_user.csv"
+SELECTIONS = list(itertools.product([ALL, *DATA_STATES, "Goa"], [ALL, *DATA_YEARS, 2030], [ALL, 1, 2, 3, 4]))
+
+
+@pytest.fixture(scope="module")
+def raw():
+    raw = pulse_frames()
+    df = raw[FILE]
+    # gaps: Kerala has no 2023 rows, and nobody has 2022 Q4
+    gone = ((df["States"] == "Kerala") & (df["Years"] == 2023)) | ((df["Years"] == 2022) & (df["Quarter"] == 4))
+    raw[FILE] = df[~gone].reset_index(drop=True)
+    raw["notes.csv"] = pd.DataFrame({"Note": ["no period columns"]})
+    return raw
+
+
+@pytest.fixture(scope="module")
+def coverage(raw):
+    return Coverage.from_frames(raw)
+
+
+@pytest.mark.parametrize("state, year, quarter", SELECTIONS)
+def test_has_matches_a_scan(raw, coverage, state, year, quarter):
+    expected = not filter_slice(raw[FILE], States=state, Years=year, Quarter=quarter).empty
+    assert coverage.has(FILE, States=state, Years=year, Quarter=quarter) == expected
+
+
+@pytest.mark.parametrize("column", ["States", "Years", "Quarter"])
+@pytest.mark.parametrize("state, year, quarter", SELECTIONS[::7])
+def test_values_match_a_scan(raw, coverage, column, state, year, quarter):
+    selected = {"States": state, "Years": year, "Quarter": quarter}
+    rows = filter_slice(raw[FILE], **{key: value for key, value in selected.items() if key != column})
+    assert coverage.values(FILE, column, **selected) == sorted(rows[column].unique().tolist())
+
+
+def test_unindexed_files(coverage):
+    assert "notes.csv" not in coverage.bits
+    assert coverage.values("notes.csv", "States") is None
+    assert not coverage.has("missing.csv")
+
+
+def test_json_round_trip_and_the_published_index(raw, coverage):
+    again = Coverage.from_json(coverage.to_json())
+    assert (again.states, again.years) == (coverage.states, coverage.years)
+    assert all((again.bits[name] == coverage.bits[name]).all() for name in coverage.bits)
+
+    storage = MemoryStorage()
+    manifest = publish_version(raw, storage, "out/")
+    shipped = load_coverage(storage, "out/", manifest["version"])
+    assert shipped.to_json() == coverage.to_json()
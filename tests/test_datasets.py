@@ -0,0 +1,26 @@
+import pandas as pd
+import pytest
+
+from pulse_analytics import DATASET_COLUMNS, DATASET_FILES, prepare_dataset
+from pulse_etl import DATASETS
+
+OUTPUTS = {spec.output.lower(): spec for spec in DATASETS.values()}
+
+
+@pytest.mark.parametrize("name", DATASET_FILES)
+def test_extractors_write_the_columns_the_dashboard_reads(name):
+    spec = OUTPUTS[DATASET_FILES[name]]
+    assert ("States", "Years", "Quarter") + tuple(spec.columns) == DATASET_COLUMNS[name]
+
+
+@pytest.mark.parametrize("name, old, new", [
+    ("Top_district", "Districts", "District"),
+    ("Aggre_user", "Transaction_percentage", "Transaction_Percentage"),
+])
+def test_outputs_of_earlier_extractors_are_renamed(name, old, new):
+    row = {"States": "Kerala", "Years": 2023, "Quarter": 1}
+    frame = pd.DataFrame([[row.get(column, 7) for column in DATASET_COLUMNS[name]]], columns=DATASET_COLUMNS[name])
+
+    df = prepare_dataset(name, frame.rename(columns={new: old}))
+    assert list(df.columns) == list(DATASET_COLUMNS[name])
+    assert df[new].tolist() == [7]
@@ -0,0 +1,104 @@
+import json
+
+import pandas as pd
+import plotly.express as px
+import pytest
+
+from pulse_analytics import CachedExpress, FigureCache, LazyFigure, frame_digest, spec_key
+
+
+class CountingExpress:
+    """plotly.express that counts the figures it builds."""
+
+    def __init__(self):
+        self.built = 0
+
+    def __getattr__(self, name):
+        if name not in CachedExpress.CHART_KINDS:
+            return getattr(px, name)
+
+        def chart(*args, **kwargs):
+            self.built += 1
+            return getattr(px, name)(*args, **kwargs)
+        return chart
+
+
+@pytest.fixture
+def express():
+    return CountingExpress()
+
+
+@pytest.fixture
+def charts(express):
+    return CachedExpress(express)
+
+
+def frame(scale=1):
+    return pd.DataFrame({"States": ["Kerala", "Goa", "Assam"], "Amount": [3.0 * scale, 1.0, 2.0]})
+
+
+def test_same_spec_is_built_once_and_equals_plotly(express, charts):
+    cache = FigureCache()
+    first = cache.spec(charts.bar(frame(), x="States", y="Amount", title="Amount").update_layout(xaxis_tickangle=45),
+                       "v1")
+    again = cache.spec(charts.bar(frame(), x="States", y="Amount", title="Amount").update_layout(xaxis_tickangle=45),
+                       "v1")
+
+    assert express.built == 1
+    assert first == again
+    expected = px.bar(frame(), x="States", y="Amount", title="Amount").update_layout(xaxis_tickangle=45)
+    assert first == json.loads(expected.to_json(validate=False))
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+    # a hit is a fresh dict, so a caller changing it does not change the cache
+    first["layout"]["title"] = "changed"
+    assert cache.spec(charts.bar(frame(), x="States", y="Amount", title="Amount")
+                      .update_layout(xaxis_tickangle=45), "v1")["layout"]["title"] != "changed"
+
+
+@pytest.mark.parametrize("change", [
+    lambda charts: charts.bar(frame(scale=2), x="States", y="Amount"),
+    lambda charts: charts.bar(frame(), x="States", y="Amount", title="Other"),
+    lambda charts: charts.bar(frame(), x="States", y="Amount").update_layout(height=300),
+    lambda charts: charts.line(frame(), x="States", y="Amount"),
+])
+def test_data_styling_updates_and_kind_are_part_of_the_key(express, charts, change):
+    cache = FigureCache()
+    cache.spec(charts.bar(frame(), x="States", y="Amount"), "v1")
+    cache.spec(change(charts), "v1")
+    assert express.built == 2
+
+
+def test_new_data_version_misses(express, charts):
+    cache = FigureCache()
+    for version in ("v1", "v2"):
+        cache.spec(charts.pie(frame(), names="States", values="Amount"), version)
+    assert express.built == 2
+
+
+def test_cache_is_bounded_by_entries_and_bytes(charts):
+    cache = FigureCache(max_entries=2)
+    for scale in (1, 2, 3):
+        cache.spec(charts.bar(frame(scale), x="States", y="Amount"), "v1")
+    stats = cache.stats()
+    assert stats["entries"] == 2 and stats["evictions"] == 1
+
+    tiny = FigureCache(max_bytes=100)
+    spec = tiny.spec(charts.bar(frame(), x="States", y="Amount"), "v1")
+    assert spec["data"] and tiny.stats()["entries"] == 0
+
+
+def test_built_figures_pass_through(charts):
+    fig = px.bar(frame(), x="States", y="Amount")
+    assert FigureCache().spec(fig, "v1") is fig
+    assert isinstance(charts.bar(frame()), LazyFigure)
+    assert charts.colors is px.colors
+    with pytest.raises(AttributeError):
+        charts.bar(frame()).add_trace
+
+
+def test_keys_follow_content_not_identity():
+    assert frame_digest(frame()) == frame_digest(frame())
+    assert frame_digest(frame()) != frame_digest(frame().astype({"Amount": "float32"}))
+    geojson = {"type": "FeatureCollection", "features": [{"id": 1}]}
+    assert spec_key(geojson) == spec_key(json.loads(json.dumps(geojson)))
+    assert spec_key({"a": [1, 2]}) != spec_key({"a": [2, 1]})
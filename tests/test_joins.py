@@ -0,0 +1,50 @@
+import pandas as pd
+import pytest
+
+from conftest import pulse_frames
+from pulse_analytics import DATASET_FILES, insurance_user_joins, prepare_datasets
+
+LEVELS = {
+    "state": (["States", "Years", "Quarter"], "Aggre_insurance", "Map_user"),
+    "district": (["States", "District", "Years", "Quarter"], "Map_insurance", "Map_user"),
+    "pincode": (["States", "Pincodes", "Years", "Quarter"], "Top_insurance", "Top_user"),
+}
+
+
+@pytest.fixture(scope="module")
+def datasets():
+    raw = pulse_frames()
+    # a pincode that is not a number, in both tables it is joined from
+    for name, measure in (("Top_insurance", "Transaction_amount"), ("Top_user", "RegisteredUser")):
+        df = raw[DATASET_FILES[name]]
+        extra = df.iloc[:1].copy()
+        extra["Pincodes"] = "PO Box 17"
+        extra[measure] = 1000
+        raw[DATASET_FILES[name]] = pd.concat([df, extra], ignore_index=True)
+    return prepare_datasets(raw)
+
+
+def joins_of(datasets):
+    return insurance_user_joins(datasets["Aggre_insurance"], datasets["Map_insurance"], datasets["Top_insurance"],
+                                datasets["Map_user"], datasets["Top_user"])
+
+
+@pytest.mark.parametrize("level", LEVELS)
+def test_joins_match_a_merge_on_the_plain_keys(datasets, level):
+    keys, insurance, users = LEVELS[level]
+    ins = datasets[insurance].groupby(keys)["Transaction_amount"].sum()
+    usr = datasets[users].groupby(keys)["RegisteredUser"].sum()
+    expected = pd.merge(ins, usr, left_index=True, right_index=True).reset_index()
+    expected["Penetration"] = expected["Transaction_amount"] / expected["RegisteredUser"]
+
+    joined = joins_of(datasets)[level]
+    actual = joined.astype({col: object for col in ("States", "District") if col in joined})
+    actual = actual.sort_values(keys, key=lambda col: col.astype(str)).reset_index(drop=True)
+    expected = expected.sort_values(keys, key=lambda col: col.astype(str)).reset_index(drop=True)
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+
+
+def test_non_numeric_pincode_is_joined(datasets):
+    pincode = joins_of(datasets)["pincode"]
+    assert (pincode["Pincodes"] == "PO Box 17").sum() == 1
+    assert isinstance(pincode["States"].dtype, pd.CategoricalDtype)
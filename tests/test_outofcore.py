@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pulse_analytics import (
+    ChunkedTable,
+    DATASET_FILES,
+    RankingIndex,
+    filter_slice,
+    load_raw,
+    prepare_dataset,
+    publish_version,
+    totals_by,
+    unique_values,
+)
+from pulse_analytics import outofcore
+from pulse_storage import MemoryStorage
+
+STATES = [f"State {i:02d}" for i in range(6)]
+YEARS = [2021, 2022, 2023]
+PINCODES_PER_STATE = 100
+TABLES = ("Top_insurance", "Top_transaction", "Top_user")
+
+
+def top_table(rng, measures):
+    """Rows of every state, year, quarter and pincode, in the order the extractors write them."""
+    keys = pd.MultiIndex.from_product(
+        [STATES, YEARS, [1, 2, 3, 4], range(PINCODES_PER_STATE)], names=["States", "Years", "Quarter", "Pincodes"]
+    ).to_frame(index=False)
+    keys["Pincodes"] = 500000 + keys["States"].str[-2:].astype(int) * 1000 + keys["Pincodes"]
+    for name, values in measures.items():
+        keys[name] = values(len(keys))
+    return keys
+
+
+def amounts(rng):
+    # signs and magnitudes that make the order of a float sum show
+    def values(n):
+        out = rng.uniform(1e3, 1e11, n) * np.where(rng.random(n) < 0.3, -1, 1) + 1e-7
+        out[rng.random(n) < 0.01] = np.nan
+        return out
+    return values
+
+
+@pytest.fixture(scope="module")
+def published():
+    """(storage, {dataset: prepared in-memory frame}) of a version holding the Top_* tables."""
+    rng = np.random.default_rng(7)
+    counts = lambda n: rng.integers(1, 5_000_000, n)
+    raw = {
+        "top_insurance.csv": top_table(rng, {"Transaction_count": counts, "Transaction_amount": amounts(rng)}),
+        "top_transaction.csv": top_table(rng, {"Transaction_count": counts, "Transaction_amount": amounts(rng)}),
+        "top_user.csv": top_table(rng, {"RegisteredUser": counts}),
+    }
+    storage = MemoryStorage()
+    publish_version(raw, storage, "out/")
+    _, loaded = load_raw(storage, "out/")
+    return storage, {name: prepare_dataset(name, loaded[DATASET_FILES[name]]) for name in TABLES}
+
+
+@pytest.fixture
+def spills(monkeypatch):
+    """Counts the buckets aggregations spill to disk."""
+    spilled = []
+    spill = outofcore._HashAggregator._spill
+
+    def counted(self, bucket):
+        spilled.append(bucket)
+        spill(self, bucket)
+    monkeypatch.setattr(outofcore._HashAggregator, "_spill", counted)
+    return spilled
+
+
+def assert_identical(actual, expected):
+    pd.testing.assert_frame_equal(actual.reset_index(drop=True), expected.reset_index(drop=True), check_exact=True)
+
+
+def measures_of(df):
+    return [c for c in df.columns if c not in ("States", "Years", "Quarter", "Pincodes")]
+
+
+def tables(storage, name, **options):
+    """The table read in small chunks, with and without a group limit low enough to spill."""
+    return [ChunkedTable.open(storage, "out/", name, chunk_rows=500, **options),
+            ChunkedTable.open(storage, "out/", name, chunk_rows=500, max_groups=50, **options)]
+
+
+@pytest.mark.parametrize("name", TABLES)
+def test_filter_and_unique_match_the_frame(published, name):
+    storage, datasets = published
+    df = datasets[name]
+    table = ChunkedTable.open(storage, "out/", name, chunk_rows=500)
+    assert table.rows == len(df)
+    assert_identical(table.filter(), df)
+    for filters in ({"States": "State 03", "Years": 2022}, {"Quarter": [1, 3]}, {"Years": 2030}):
+        assert_identical(table.filter(**filters), filter_slice(df, **filters))
+    assert table.unique("States") == unique_values(df, "States")
+    assert table.unique("Pincodes", States="State 04", Quarter=2) == unique_values(df, "Pincodes", States="State 04",
+                                                                                  Quarter=2)
+
+
+@pytest.mark.parametrize("name", TABLES)
+def test_aggregates_match_groupby(published, name, tmp_path, spills):
+    storage, datasets = published
+    df = datasets[name]
+    measures = measures_of(df)
+    for table in tables(storage, name, spill_dir=str(tmp_path)):
+        for by in ("States", ["States", "Pincodes"], ["Years", "Quarter"]):
+            assert_identical(table.totals_by(by, measures, sort_by=measures[-1]),
+                             totals_by(df, by, measures, sort_by=measures[-1]))
+            for year in (2022, 2030):
+                assert_identical(table.totals_by(by, measures, Years=year), totals_by(df, by, measures, Years=year))
+            columns = [by] if isinstance(by, str) else by
+            assert_identical(table.aggregate(columns, measures, "mean"),
+                             df.groupby(columns)[measures].agg("mean").reset_index())
+    assert spills, "max_groups=50 should have spilled the pincode groups"
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize("name", TABLES)
+@pytest.mark.parametrize("agg", ["sum", "mean"])
+def test_top_and_bottom_match_the_ranking_index(published, name, agg, spills):
+    storage, datasets = published
+    df = datasets[name]
+    measures = measures_of(df)
+    entity = ("States", "Pincodes")
+    index = RankingIndex(df, entity, measures, agg=agg)
+    for table in tables(storage, name):
+        for year, quarter, where in (("All", "All", None), (2023, "All", None), (2021, 2, {"States": "State 05"}),
+                                     (2030, 1, None)):
+            for measure in measures:
+                assert_identical(table.top(entity, measures, measure, 10, year, quarter, where, agg=agg),
+                                 index.top(measure, 10, year, quarter, where))
+                assert_identical(table.bottom(entity, measures, measure, 7, year, quarter, where, agg=agg),
+                                 index.bottom(measure, 7, year, quarter, where))
+    assert spills
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import pulse_frames
+from pulse_analytics import ALL, DATASET_FILES, RankingIndex, filter_slice, prepare_dataset
+
+MEASURES = ["Transaction_count", "Transaction_amount"]
+
+
+@pytest.fixture(scope="module")
+def df():
+    return prepare_dataset("Top_transaction", pulse_frames()[DATASET_FILES["Top_transaction"]])
+
+
+@pytest.fixture(scope="module")
+def index(df):
+    return RankingIndex(df, ["States", "Pincodes"], MEASURES,
+                        derived={"Average": lambda t: t["Transaction_amount"] / t["Transaction_count"]})
+
+
+def grouped(df, year, quarter):
+    table = filter_slice(df, Years=year, Quarter=quarter).groupby(["States", "Pincodes"])[MEASURES].sum().reset_index()
+    table["Average"] = table["Transaction_amount"] / table["Transaction_count"]
+    return table
+
+
+def assert_same_rows(actual, expected):
+    pd.testing.assert_frame_equal(actual.reset_index(drop=True), expected.reset_index(drop=True), check_dtype=False)
+
+
+@pytest.mark.parametrize("year, quarter", [(ALL, ALL), (2022, ALL), (ALL, 3), (2023, 1)])
+@pytest.mark.parametrize("measure", MEASURES + ["Average"])
+def test_top_and_bottom_match_nlargest_and_nsmallest(df, index, year, quarter, measure):
+    table = grouped(df, year, quarter)
+    assert_same_rows(index.top(measure, 5, year, quarter), table.nlargest(5, measure))
+    assert_same_rows(index.bottom(measure, 3, year, quarter), table.nsmallest(3, measure))
+
+
+def test_where_restricts_the_ranked_entities(df, index):
+    table = grouped(df, 2021, ALL)
+    expected = table[table["States"] == "Kerala"].nlargest(4, "Transaction_amount")
+    assert_same_rows(index.top("Transaction_amount", 4, 2021, where={"States": "Kerala"}), expected)
+    assert_same_rows(index.top("Transaction_amount", 4, 2021, where={"States": ALL}),
+                     table.nlargest(4, "Transaction_amount"))
+
+
+def test_leaderboard_ranks_every_entity(df, index):
+    board = index.leaderboard("Transaction_count", year=2022, quarter=2, descending=False)
+    table = grouped(df, 2022, 2)
+    assert board["Rank"].tolist() == list(range(1, len(table) + 1))
+    assert_same_rows(board.drop(columns="Rank"), table.sort_values("Transaction_count", kind="stable"))
+
+
+def test_missing_values_are_left_out_and_unknown_slices_are_empty():
+    df = pd.DataFrame({"States": ["a", "b", "c"], "Years": [2021] * 3, "Quarter": [1] * 3,
+                       "Value": [1.0, np.nan, 3.0]})
+    index = RankingIndex(df, ["States"], ["Value"], agg="mean")
+    assert index.top("Value", 5)["States"].tolist() == ["c", "a"]
+    assert index.bottom("Value", 5, 2021, 1)["States"].tolist() == ["a", "c"]
+    assert index.top("Value", 5, 2030).empty
+
+
+def test_derived_measure_must_be_a_function(df):
+    with pytest.raises(TypeError, match="derived measure Average"):
+        RankingIndex(df, ["States"], MEASURES, derived={"Average": 1.5})
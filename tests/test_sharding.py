@@ -0,0 +1,67 @@
+import os
+
+import pandas as pd
+import pytest
+
+from conftest import TOP_USER_PREFIX
+from pulse_etl import DOCUMENT_COLUMN, Catalog, Shard, extract_to_csv, merge_shards, shard_path
+
+OUTPUTS = ("Top_user.csv", "Top_user_district.csv")
+
+
+def extract(storage, directory, shard=None):
+    os.makedirs(directory, exist_ok=True)
+    extract_to_csv(storage, "top_user", processes=0, output=os.path.join(directory, "Top_user.csv"),
+                   catalog=Catalog(storage), checkpoint_root=os.path.join(directory, "checkpoints"), shard=shard)
+
+
+def read_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("count", [1, 2, 3, 5])
+def test_shards_own_every_document_exactly_once(top_user_storage, count):
+    documents = [obj.name[len(TOP_USER_PREFIX):] for obj in top_user_storage.list(TOP_USER_PREFIX)]
+    owners = {document: [index for index in range(1, count + 1) if Shard(index, count).owns(document)]
+              for document in documents}
+    assert all(len(indexes) == 1 for indexes in owners.values())
+
+
+@pytest.mark.parametrize("count", [2, 3, 5])
+def test_merged_shards_match_a_single_run(top_user_storage, tmp_path, count):
+    single = str(tmp_path / "single")
+    extract(top_user_storage, single)
+    sharded = str(tmp_path / "sharded")
+    for index in range(1, count + 1):
+        extract(top_user_storage, sharded, Shard(index, count))
+
+    # the partial outputs cover the documents without overlap or gaps
+    documents = [obj.name[len(TOP_USER_PREFIX):] for obj in top_user_storage.list(TOP_USER_PREFIX)]
+    seen = []
+    for index in range(1, count + 1):
+        part = pd.read_csv(shard_path(os.path.join(sharded, "Top_user.csv"), Shard(index, count)), dtype=str)
+        seen.extend(part[DOCUMENT_COLUMN].unique())
+    assert sorted(seen) == sorted(documents)
+
+    merge_shards("top_user", count, os.path.join(sharded, "Top_user.csv"))
+    merge_shards("top_user_district", count, os.path.join(sharded, "Top_user_district.csv"))
+    for name in OUTPUTS:
+        assert read_bytes(os.path.join(sharded, name)) == read_bytes(os.path.join(single, name))
+
+
+def test_merge_names_every_missing_shard(top_user_storage, tmp_path):
+    extract(top_user_storage, str(tmp_path), Shard(2, 3))
+    output = str(tmp_path / "Top_user.csv")
+    with pytest.raises(FileNotFoundError) as raised:
+        merge_shards("top_user", 3, output)
+    message = str(raised.value)
+    assert shard_path(output, Shard(1, 3)) in message
+    assert shard_path(output, Shard(3, 3)) in message
+    assert shard_path(output, Shard(2, 3)) not in message
+
+
+@pytest.mark.parametrize("text", ["0/4", "5/4", "1/0", "2", "a/b"])
+def test_invalid_shard_is_rejected(text):
+    with pytest.raises(ValueError):
+        Shard.parse(text)
@@ -0,0 +1,43 @@
+import threading
+import time
+
+from pulse_analytics import Prewarmer, VersionWatcher
+
+
+def test_failed_warm_up_settles_and_is_retried():
+    attempts = []
+    first_failed = threading.Event()
+
+    def warm(version):
+        attempts.append(version)
+        if len(attempts) == 1:
+            first_failed.set()
+            raise ConnectionError("no network")
+
+    warmer = Prewarmer(warm, VersionWatcher(lambda: "v1", interval=3600), retry_seconds=0.05).start()
+    assert warmer.settled.wait(5)
+    assert first_failed.is_set()
+    # the retry warms the same version without a version change
+    assert warmer.wait(5)
+    assert warmer.version == "v1"
+    assert attempts == ["v1", "v1"]
+    assert warmer.status["state"] == "ready"
+
+
+def test_superseded_version_is_not_retried():
+    versions = iter(["v1", "v2"])
+    watcher = VersionWatcher(lambda: next(versions), interval=3600)
+    attempts = []
+
+    def warm(version):
+        attempts.append(version)
+        if version == "v1":
+            raise ConnectionError("no network")
+
+    warmer = Prewarmer(warm, watcher, retry_seconds=0.3).start()
+    assert warmer.settled.wait(5)
+    watcher.check()
+    assert warmer.wait(5)
+    assert warmer.version == "v2"
+    time.sleep(0.5)
+    assert attempts.count("v1") == 1